@@ -1,4 +1,6 @@
+import copy
 import math as m
+import numpy as nu
 from galpy.util import config
 from galpy.util.bovy_conversion import physical_conversion_actionAngle, \
     actionAngle_physical_input
@@ -247,3 +249,72 @@ class UnboundError(Exception): #pragma: no cover
         self.value = value
     def __str__(self):
         return repr(self.value)
+
+def _findStartVec(func,x,fx,fac,xmax=None):
+    """
+    NAME:
+       _findStartVec
+    PURPOSE:
+       Find brackets of the roots of func for all elements at once, by stepping away from x by factors of fac
+    INPUT:
+       func - function func(x,indx) of the elements indx
+       x - starting points
+       fx - func at x (>= 0)
+       fac - factor to step by
+       xmax= (None) if set, elements that step beyond xmax are unbound
+    OUTPUT:
+       (xlo,xhi,flo,fhi) brackets and function values (the bracket is (0,0) where the root is at zero and NaN for unbound elements)
+    """
+    prev= copy.copy(x)
+    fprev= copy.copy(fx)
+    xtry= x*fac
+    ftry= nu.empty(len(x))
+    todo= nu.arange(len(x))
+    unbound= nu.zeros(len(x),dtype='bool')
+    while len(todo) > 0:
+        ftry[todo]= func(xtry[todo],todo)
+        todo= todo[(ftry[todo] >= 0.)*(xtry[todo] > 0.000000001)]
+        if not xmax is None:
+            unbound[todo[xtry[todo] > xmax]]= True
+            todo= todo[xtry[todo] <= xmax]
+        prev[todo]= xtry[todo]
+        fprev[todo]= ftry[todo]
+        xtry[todo]*= fac
+    indx= xtry < 0.000000001
+    xtry[indx]= 0.
+    prev[indx]= 0.
+    xtry[unbound]= nu.nan
+    prev[unbound]= nu.nan
+    return (xtry,prev,ftry,fprev)
+
+def _findRootVec(func,a,b,fa,fb,xtol=10.**-12.,maxiter=100):
+    """
+    NAME:
+       _findRootVec
+    PURPOSE:
+       Find the roots of func in [a,b] (with func(a) < 0 <= func(b)) for all elements at once using the Illinois variant of regula falsi
+    INPUT:
+       func - function func(x,indx) of the elements indx
+       a, b - brackets
+       fa, fb - func at a and b
+       xtol= (1e-12) relative tolerance
+       maxiter= (100) maximum number of iterations
+    OUTPUT:
+       roots (NaN where the brackets are NaN)
+    """
+    a, b, fa, fb= copy.copy(a), copy.copy(b), copy.copy(fa), copy.copy(fb)
+    todo= nu.arange(len(a))[(fb != 0.)*(a != b)*~nu.isnan(b)]
+    for ii in range(maxiter):
+        if len(todo) == 0: break
+        c= (a[todo]*fb[todo]-b[todo]*fa[todo])/(fb[todo]-fa[todo])
+        fc= func(c,todo)
+        # Where the sign changes, b becomes the other end of the bracket,
+        # otherwise halve the function value at a to avoid stagnation
+        flip= fc*fb[todo] < 0.
+        a[todo[flip]]= b[todo[flip]]
+        fa[todo[flip]]= fb[todo[flip]]
+        fa[todo[~flip]]/= 2.
+        b[todo]= c
+        fb[todo]= fc
+        todo= todo[(fc != 0.)*(nu.fabs(a[todo]-c) > xtol*nu.fabs(c)+xtol)]
+    return b
@@ -21,6 +21,7 @@ from galpy.actionAngle_src.actionAngle import actionAngle
 import galpy.actionAngle_src.actionAngleAdiabatic_c as actionAngleAdiabatic_c
 from galpy.actionAngle_src.actionAngleAdiabatic_c import _ext_loaded as ext_loaded
 from galpy.potential_src.Potential import _check_c
+from galpy.potential_src.CompiledPotential import _underlying_pot
 class actionAngleAdiabatic(actionAngle):
     """Action-angle formalism for axisymmetric potentials using the adiabatic approximation"""
     def __init__(self,*args,**kwargs):
@@ -35,7 +36,7 @@ class actionAngleAdiabatic(actionAngle):
 
         INPUT:
 
-           pot= potential or list of potentials (planarPotentials)
+           pot= potential or list of potentials (planarPotentials), or a CompiledPotential (re-used by the C code)
 
            gamma= (default=1.) replace Lz by Lz+gamma Jz in effective potential
 
@@ -56,7 +57,9 @@ class actionAngleAdiabatic(actionAngle):
                              ro=kwargs.get('ro',None),vo=kwargs.get('vo',None))
         if not 'pot' in kwargs: #pragma: no cover
             raise IOError("Must specify pot= for actionAngleAxi")
-        self._pot= kwargs['pot']
+        self._pot= _underlying_pot(kwargs['pot'])
+        # The C code can directly use a CompiledPotential
+        self._cpot= kwargs['pot']
         if self._pot == MWPotential:
             warnings.warn("Use of MWPotential as a Milky-Way-like potential is deprecated; galpy.potential.MWPotential2014, a potential fit to a large variety of dynamical constraints (see Bovy 2015), is the preferred Milky-Way-like potential in galpy",
                           galpyWarning)
@@ -111,7 +114,7 @@ class actionAngleAdiabatic(actionAngle):
                 vz= nu.array([vz])
             Lz= R*vT
             jr, jz, err= actionAngleAdiabatic_c.actionAngleAdiabatic_c(\
-                self._pot,self._gamma,R,vR,vT,z,vz)
+                self._cpot,self._gamma,R,vR,vT,z,vz)
             if err == 0:
                 return (jr,Lz,jz)
             else: #pragma: no cover
@@ -171,11 +174,16 @@ class actionAngleAdiabatic(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
+           c= (object-wide default) True/False to override the object-wide setting for whether or not to use the C implementation (for arrays of 5 or 6 phase-space coordinates)
         OUTPUT:
            (rperi,rap)
         HISTORY:
            2013-11-27 - Written - Bovy (IAS)
         """
+        if self._use_c_arrays(*args,**kwargs):
+            rperi,rap,zmax= self._RperiRapZmax_c(*args)
+            return (rperi,rap)
+        kwargs.pop('c',None)
         #Set up the actionAngleAxi object
         if isinstance(self._pot,list):
             thispot= [p.toPlanar() for p in self._pot if not isinstance(p,planarPotential)]
@@ -199,11 +207,15 @@ class actionAngleAdiabatic(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
+           c= (object-wide default) True/False to override the object-wide setting for whether or not to use the C implementation (for arrays of 5 or 6 phase-space coordinates)
         OUTPUT:
            zmax
         HISTORY:
            2012-06-01 - Written - Bovy (IAS)
         """
+        if self._use_c_arrays(*args,**kwargs):
+            return self._RperiRapZmax_c(*args)[2]
+        kwargs.pop('c',None)
         #Set up the actionAngleAxi object
         self._parse_eval_args(*args)
         if isinstance(self._pot,list):
@@ -218,3 +230,22 @@ class actionAngleAdiabatic(actionAngle):
                                verticalPot=thisverticalpot,
                                gamma=self._gamma)
         return aAAxi.calczmax(**kwargs)
+
+    def _use_c_arrays(self,*args,**kwargs):
+        """Whether to compute rperi, rap, and zmax for arrays in C"""
+        return ((self._c and not ('c' in kwargs and not kwargs['c']))\
+                    or (ext_loaded and kwargs.get('c',False))) \
+                    and (len(args) == 5 or len(args) == 6) \
+                    and isinstance(args[0],nu.ndarray) \
+                    and _check_c(self._pot)
+
+    def _RperiRapZmax_c(self,*args):
+        """Compute (rperi,rap,zmax) for arrays of R,vR,vT,z,vz[,phi] in C"""
+        R,vR,vT,z,vz= args[:5]
+        rperi,rap,zmax,err= \
+            actionAngleAdiabatic_c.actionAngleRperiRapZmaxAdiabatic_c(\
+            self._cpot,R,vR,vT,z,vz)
+        if err == 0:
+            return (rperi,rap,zmax)
+        else: #pragma: no cover
+            raise RuntimeError("C-code for calculation of rperi, rap, and zmax failed; try with c=False")
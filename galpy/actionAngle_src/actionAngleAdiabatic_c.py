@@ -8,6 +8,7 @@ import numpy
 from numpy.ctypeslib import ndpointer
 from galpy.util import galpyWarning
 from galpy.orbit_src.integrateFullOrbit import _parse_pot
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
 #Find and load the library
 _lib= None
 outerr= None
@@ -43,7 +44,7 @@ def actionAngleAdiabatic_c(pot,gamma,R,vR,vT,z,vz):
     PURPOSE:
        Use C to calculate actions using the adiabatic approximation
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        gamma - as in Lz -> Lz+\gamma * J_z
        R, vR, vT, z, vz - coordinates (arrays)
     OUTPUT:
@@ -54,7 +55,8 @@ def actionAngleAdiabatic_c(pot,gamma,R,vR,vT,z,vz):
        2012-12-10 - Written - Bovy (IAS)
     """
     #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot,potforactions=True)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
 
     #Set up result arrays
     jr= numpy.empty(len(R))
@@ -63,20 +65,18 @@ def actionAngleAdiabatic_c(pot,gamma,R,vR,vT,z,vz):
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    actionAngleAdiabatic_actionsFunc= _lib.actionAngleAdiabatic_actions
+    actionAngleAdiabatic_actionsFunc= getattr(_lib,'actionAngleAdiabatic_actions'+pot_suffix)
     actionAngleAdiabatic_actionsFunc.argtypes= [ctypes.c_int,
                                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                ctypes.c_int,
-                                                ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                ctypes.c_double,
-                                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                ctypes.POINTER(ctypes.c_int)]
+                                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                                                +pot_argtypes\
+                                                +[ctypes.c_double,
+                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                                  ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [R.flags['F_CONTIGUOUS'],
@@ -99,13 +99,11 @@ def actionAngleAdiabatic_c(pot,gamma,R,vR,vT,z,vz):
                                      vT,
                                      z,
                                      vz,
-                                     ctypes.c_int(npot),
-                                     pot_type,
-                                     pot_args,
-                                     ctypes.c_double(gamma),
-                                     jr,
-                                     jz,
-                                     ctypes.byref(err))
+                                     *(pot_cargs
+                                       +[ctypes.c_double(gamma),
+                                         jr,
+                                         jz,
+                                         ctypes.byref(err)]))
 
     #Reset input arrays
     if f_cont[0]: R= numpy.asfortranarray(R)
@@ -116,3 +114,58 @@ def actionAngleAdiabatic_c(pot,gamma,R,vR,vT,z,vz):
 
     return (jr,jz,err.value)
 
+
+def actionAngleRperiRapZmaxAdiabatic_c(pot,R,vR,vT,z,vz):
+    """
+    NAME:
+       actionAngleRperiRapZmaxAdiabatic_c
+    PURPOSE:
+       Use C to calculate the pericenter, apocenter, and maximum height using the adiabatic approximation
+    INPUT:
+       pot - Potential or list of such instances, or a CompiledPotential
+       R, vR, vT, z, vz - coordinates (arrays)
+    OUTPUT:
+       (rperi,rap,zmax,err)
+       rperi,rap,zmax : array, shape (len(R))
+       err - non-zero if error occured
+    """
+    #Parse the potential
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
+
+    #Set up result arrays
+    rperi= numpy.empty(len(R))
+    rap= numpy.empty(len(R))
+    zmax= numpy.empty(len(R))
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    actionAngleAdiabatic_RperiRapZmaxFunc= getattr(_lib,'actionAngleAdiabatic_RperiRapZmax'+pot_suffix)
+    actionAngleAdiabatic_RperiRapZmaxFunc.argtypes=\
+        [ctypes.c_int,
+         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+         ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+         +pot_argtypes\
+         +[ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+           ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+           ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+           ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C','W'])
+    vR= numpy.require(vR,dtype=numpy.float64,requirements=['C','W'])
+    vT= numpy.require(vT,dtype=numpy.float64,requirements=['C','W'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C','W'])
+    vz= numpy.require(vz,dtype=numpy.float64,requirements=['C','W'])
+
+    #Run the C code
+    actionAngleAdiabatic_RperiRapZmaxFunc(len(R),R,vR,vT,z,vz,
+                                          *(pot_cargs
+                                            +[rperi,rap,zmax,
+                                              ctypes.byref(err)]))
+
+    return (rperi,rap,zmax,err.value)
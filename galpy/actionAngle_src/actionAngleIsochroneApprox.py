@@ -24,6 +24,11 @@ from galpy.potential import IsochronePotential, MWPotential
 from galpy.util import bovy_plot, galpyWarning
 from galpy.util.bovy_conversion import physical_conversion, \
     potential_physical_input, time_in_Gyr
+from galpy.actionAngle_src.actionAngleIsochroneApprox_c import \
+    actionAngleIsochroneApprox_c
+from galpy.orbit_src.integrateFullOrbit import _ext_loaded as ext_loaded
+from galpy.potential_src.Potential import _check_c
+from galpy.potential_src.CompiledPotential import _underlying_pot
 _TWOPI= 2.*nu.pi
 _ANGLETOL= 0.02 #tolerance for deciding whether full angle range is covered
 _APY_LOADED= True
@@ -57,6 +62,8 @@ class actionAngleIsochroneApprox(actionAngle):
 
            integrate_method= (default: 'dopr54_c') integration method to use
 
+           c= (True) if True and the potential and integrate_method allow it, use C to integrate the orbits and compute the actions, frequencies, and angles for phase-space inputs without storing the orbits
+
            ro= distance from vantage point to GC (kpc; can be Quantity)
 
            vo= circular velocity at ro (km/s; can be Quantity)
@@ -102,11 +109,15 @@ class actionAngleIsochroneApprox(actionAngle):
         self._ntintJ= kwargs.get('ntintJ',10000)
         self._tsJ= nu.linspace(0.,self._tintJ,self._ntintJ)
         self._integrate_method= kwargs.get('integrate_method','dopr54_c')
-        self._c= False
-        ext_loaded= False
         if ext_loaded and (('c' in kwargs and kwargs['c'])
-                           or not 'c' in kwargs): #pragma: no cover
-            self._c= True
+                           or not 'c' in kwargs):
+            self._c= _check_c(_underlying_pot(self._pot)) \
+                and self._integrate_method.lower() in ['leapfrog_c','rk4_c',
+                                                       'rk6_c','symplec4_c',
+                                                       'symplec6_c',
+                                                       'dopr54_c']
+            if 'c' in kwargs and kwargs['c'] and not self._c:
+                warnings.warn("C module not used because potential does not have a C implementation or integrate_method is not a C integrator",galpyWarning) #pragma: no cover
         else:
             self._c= False
         # Check the units
@@ -136,10 +147,19 @@ class actionAngleIsochroneApprox(actionAngle):
         HISTORY:
            2013-09-10 - Written - Bovy (IAS)
         """
-        R,vR,vT,z,vz,phi= self._parse_args(False,False,*args)
-        if self._c: #pragma: no cover
-            pass
+        cargs= self._parse_c_args(*args)
+        if not cargs is None and not kwargs.get('cumul',False) \
+                and not kwargs.get('nonaxi',False):
+            R,vR,vT,z,vz,phi= cargs
+            out, err= actionAngleIsochroneApprox_c(self._pot,self._aAI.amp,
+                                                   self._aAI.b,
+                                                   R,vR,vT,z,vz,phi,
+                                                   self._tsJ,
+                                                   self._integrate_method)
+            self._check_angle_range_c(out)
+            return (out[:,0],R*vT,out[:,1])
         else:
+            R,vR,vT,z,vz,phi= self._parse_args(False,False,*args)
             #Use self._aAI to calculate the actions and angles in the isochrone potential
             acfs= self._aAI._actionsFreqsAngles(R.flatten(),
                                                 vR.flatten(),
@@ -229,6 +249,21 @@ class actionAngleIsochroneApprox(actionAngle):
         from galpy.orbit import Orbit
         if kwargs.get('nonaxi',False):
             raise NotImplementedError('angles for non-axisymmetric potentials not implemented yet') #once this is implemented, remove the pragma further down
+        cargs= self._parse_c_args(*args)
+        if not cargs is None and not 'ts' in kwargs \
+                and not '_acfs' in kwargs \
+                and not kwargs.get('_retacfs',False):
+            R,vR,vT,z,vz,phi= cargs
+            gridR, gridZ= _angleFitGrid(kwargs.get('maxn',3))
+            out, err= actionAngleIsochroneApprox_c(self._pot,self._aAI.amp,
+                                                   self._aAI.b,
+                                                   R,vR,vT,z,vz,phi,
+                                                   self._tsJ,
+                                                   self._integrate_method,
+                                                   gridR=gridR,gridZ=gridZ)
+            self._check_angle_range_c(out)
+            return (out[:,0],R*vT,out[:,1],out[:,2],out[:,3],out[:,4],
+                    out[:,5],out[:,6],out[:,7])
         _firstFlip= kwargs.get('_firstFlip',False)
         #If the orbit was already integrated, set ts to the integration times
         if isinstance(args[0],Orbit) and hasattr(args[0]._orb,'orbit') \
@@ -249,103 +284,89 @@ class actionAngleIsochroneApprox(actionAngle):
             ts[self._ntintJ-1:]= self._tsJ
             ts[:self._ntintJ-1]= -self._tsJ[1:][::-1]
         maxn= kwargs.get('maxn',3)
-        if self._c: #pragma: no cover
-            pass
+        #Use self._aAI to calculate the actions and angles in the isochrone potential
+        if '_acfs' in kwargs: acfs= kwargs['_acfs']
         else:
-            #Use self._aAI to calculate the actions and angles in the isochrone potential
-            if '_acfs' in kwargs: acfs= kwargs['_acfs']
-            else:
-                acfs= self._aAI._actionsFreqsAngles(R.flatten(),
-                                                    vR.flatten(),
-                                                    vT.flatten(),
-                                                    z.flatten(),
-                                                    vz.flatten(),
-                                                    phi.flatten())
-            jrI= nu.reshape(acfs[0],R.shape)[:,:-1]
-            jzI= nu.reshape(acfs[2],R.shape)[:,:-1]
-            anglerI= nu.reshape(acfs[6],R.shape)
-            anglezI= nu.reshape(acfs[8],R.shape)
-            if nu.any((nu.fabs(nu.amax(anglerI,axis=1)-_TWOPI) > _ANGLETOL)\
-                          *(nu.fabs(nu.amin(anglerI,axis=1)) > _ANGLETOL)): #pragma: no cover
-                warnings.warn("Full radial angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-            if nu.any((nu.fabs(nu.amax(anglezI,axis=1)-_TWOPI) > _ANGLETOL)\
-                          *(nu.fabs(nu.amin(anglezI,axis=1)) > _ANGLETOL)): #pragma: no cover
-                warnings.warn("Full vertical angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-            danglerI= ((nu.roll(anglerI,-1,axis=1)-anglerI) % _TWOPI)[:,:-1]
-            danglezI= ((nu.roll(anglezI,-1,axis=1)-anglezI) % _TWOPI)[:,:-1]
-            jr= nu.sum(jrI*danglerI,axis=1)/nu.sum(danglerI,axis=1)
-            jz= nu.sum(jzI*danglezI,axis=1)/nu.sum(danglezI,axis=1)
-            if kwargs.get('nonaxi',False): #pragma: no cover
-                lzI= nu.reshape(acfs[1],R.shape)[:,:-1]
-                anglephiI= nu.reshape(acfs[7],R.shape)
-                if nu.any((nu.fabs(nu.amax(anglephiI,axis=1)-_TWOPI) > _ANGLETOL)\
-                              *(nu.fabs(nu.amin(anglephiI,axis=1)) > _ANGLETOL)): #pragma: no cover
-                    warnings.warn("Full azimuthal angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-                danglephiI= ((nu.roll(anglephiI,-1,axis=1)-anglephiI) % _TWOPI)[:,:-1]
-                lz= nu.sum(lzI*danglephiI,axis=1)/nu.sum(danglephiI,axis=1)
-            else:
-                lz= R[:,len(ts)//2]*vT[:,len(ts)//2]
-            #Now do an 'angle-fit'
-            angleRT= dePeriod(nu.reshape(acfs[6],R.shape))
-            acfs7= nu.reshape(acfs[7],R.shape)
-            negFreqIndx= nu.median(acfs7-nu.roll(acfs7,1,axis=1),axis=1) < 0. #anglephi is decreasing
-            anglephiT= nu.empty(acfs7.shape)
-            anglephiT[negFreqIndx,:]= dePeriod(_TWOPI-acfs7[negFreqIndx,:])
-            negFreqPhi= nu.zeros(R.shape[0],dtype='bool')
-            negFreqPhi[negFreqIndx]= True
-            anglephiT[True-negFreqIndx,:]= dePeriod(acfs7[True-negFreqIndx,:])
-            angleZT= dePeriod(nu.reshape(acfs[8],R.shape))
-            #Write the angle-fit as Y=AX, build A and Y
-            nt= len(ts)
-            no= R.shape[0]
-            nn= maxn*(2*maxn-1)-maxn #remove 0,0,0
-            A= nu.zeros((no,nt,2+nn))
-            A[:,:,0]= 1.
-            A[:,:,1]= ts
-            #sorting the phi and Z grids this way makes it easy to exclude the origin
-            phig= list(nu.arange(-maxn+1,maxn,1))
-            phig.sort(key = lambda x: abs(x))
-            phig= nu.array(phig,dtype='int')
-            grid= nu.meshgrid(nu.arange(maxn),
-                              phig)
-            gridR= grid[0].T.flatten()[1:] #remove 0,0,0
-            gridZ= grid[1].T.flatten()[1:]
-            mask = nu.ones(len(gridR),dtype=bool)
-            mask[:2*maxn-3:2]= False
-            gridR= gridR[mask]
-            gridZ= gridZ[mask]
-            tangleR= nu.tile(angleRT.T,(nn,1,1)).T
-            tgridR= nu.tile(gridR,(no,nt,1))
-            tangleZ= nu.tile(angleZT.T,(nn,1,1)).T
-            tgridZ= nu.tile(gridZ,(no,nt,1))
-            sinnR= nu.sin(tgridR*tangleR+tgridZ*tangleZ)
-            A[:,:,2:]= sinnR
-            #Matrix magic
-            atainv= nu.empty((no,2+nn,2+nn))
-            AT= nu.transpose(A,axes=(0,2,1))
-            for ii in range(no):
-                atainv[ii,:,:,]= linalg.inv(nu.dot(AT[ii,:,:],A[ii,:,:]))
-            ATAR= nu.sum(AT*nu.transpose(nu.tile(angleRT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
-            ATAT= nu.sum(AT*nu.transpose(nu.tile(anglephiT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
-            ATAZ= nu.sum(AT*nu.transpose(nu.tile(angleZT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
-            angleR= nu.sum(atainv[:,0,:]*ATAR,axis=1)
-            OmegaR= nu.sum(atainv[:,1,:]*ATAR,axis=1)
-            anglephi= nu.sum(atainv[:,0,:]*ATAT,axis=1)
-            Omegaphi= nu.sum(atainv[:,1,:]*ATAT,axis=1)
-            angleZ= nu.sum(atainv[:,0,:]*ATAZ,axis=1)
-            OmegaZ= nu.sum(atainv[:,1,:]*ATAZ,axis=1)
-            Omegaphi[negFreqIndx]= -Omegaphi[negFreqIndx]
-            anglephi[negFreqIndx]= _TWOPI-anglephi[negFreqIndx]
-            if kwargs.get('_retacfs',False):
-                return (jr,lz,jz,OmegaR,Omegaphi,OmegaZ, #pragma: no cover
-                        angleR % _TWOPI,
-                        anglephi % _TWOPI,
-                        angleZ % _TWOPI,acfs)
-            else:
-                return (jr,lz,jz,OmegaR,Omegaphi,OmegaZ,
-                        angleR % _TWOPI,
-                        anglephi % _TWOPI,
-                        angleZ % _TWOPI)
+            acfs= self._aAI._actionsFreqsAngles(R.flatten(),
+                                                vR.flatten(),
+                                                vT.flatten(),
+                                                z.flatten(),
+                                                vz.flatten(),
+                                                phi.flatten())
+        jrI= nu.reshape(acfs[0],R.shape)[:,:-1]
+        jzI= nu.reshape(acfs[2],R.shape)[:,:-1]
+        anglerI= nu.reshape(acfs[6],R.shape)
+        anglezI= nu.reshape(acfs[8],R.shape)
+        if nu.any((nu.fabs(nu.amax(anglerI,axis=1)-_TWOPI) > _ANGLETOL)\
+                      *(nu.fabs(nu.amin(anglerI,axis=1)) > _ANGLETOL)): #pragma: no cover
+            warnings.warn("Full radial angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
+        if nu.any((nu.fabs(nu.amax(anglezI,axis=1)-_TWOPI) > _ANGLETOL)\
+                      *(nu.fabs(nu.amin(anglezI,axis=1)) > _ANGLETOL)): #pragma: no cover
+            warnings.warn("Full vertical angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
+        danglerI= ((nu.roll(anglerI,-1,axis=1)-anglerI) % _TWOPI)[:,:-1]
+        danglezI= ((nu.roll(anglezI,-1,axis=1)-anglezI) % _TWOPI)[:,:-1]
+        jr= nu.sum(jrI*danglerI,axis=1)/nu.sum(danglerI,axis=1)
+        jz= nu.sum(jzI*danglezI,axis=1)/nu.sum(danglezI,axis=1)
+        if kwargs.get('nonaxi',False): #pragma: no cover
+            lzI= nu.reshape(acfs[1],R.shape)[:,:-1]
+            anglephiI= nu.reshape(acfs[7],R.shape)
+            if nu.any((nu.fabs(nu.amax(anglephiI,axis=1)-_TWOPI) > _ANGLETOL)\
+                          *(nu.fabs(nu.amin(anglephiI,axis=1)) > _ANGLETOL)): #pragma: no cover
+                warnings.warn("Full azimuthal angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
+            danglephiI= ((nu.roll(anglephiI,-1,axis=1)-anglephiI) % _TWOPI)[:,:-1]
+            lz= nu.sum(lzI*danglephiI,axis=1)/nu.sum(danglephiI,axis=1)
+        else:
+            lz= R[:,len(ts)//2]*vT[:,len(ts)//2]
+        #Now do an 'angle-fit'
+        angleRT= dePeriod(nu.reshape(acfs[6],R.shape))
+        acfs7= nu.reshape(acfs[7],R.shape)
+        negFreqIndx= nu.median(acfs7-nu.roll(acfs7,1,axis=1),axis=1) < 0. #anglephi is decreasing
+        anglephiT= nu.empty(acfs7.shape)
+        anglephiT[negFreqIndx,:]= dePeriod(_TWOPI-acfs7[negFreqIndx,:])
+        negFreqPhi= nu.zeros(R.shape[0],dtype='bool')
+        negFreqPhi[negFreqIndx]= True
+        anglephiT[True-negFreqIndx,:]= dePeriod(acfs7[True-negFreqIndx,:])
+        angleZT= dePeriod(nu.reshape(acfs[8],R.shape))
+        #Write the angle-fit as Y=AX, build A and Y
+        nt= len(ts)
+        no= R.shape[0]
+        nn= maxn*(2*maxn-1)-maxn #remove 0,0,0
+        A= nu.zeros((no,nt,2+nn))
+        A[:,:,0]= 1.
+        A[:,:,1]= ts
+        gridR, gridZ= _angleFitGrid(maxn)
+        tangleR= nu.tile(angleRT.T,(nn,1,1)).T
+        tgridR= nu.tile(gridR,(no,nt,1))
+        tangleZ= nu.tile(angleZT.T,(nn,1,1)).T
+        tgridZ= nu.tile(gridZ,(no,nt,1))
+        sinnR= nu.sin(tgridR*tangleR+tgridZ*tangleZ)
+        A[:,:,2:]= sinnR
+        #Matrix magic
+        atainv= nu.empty((no,2+nn,2+nn))
+        AT= nu.transpose(A,axes=(0,2,1))
+        for ii in range(no):
+            atainv[ii,:,:,]= linalg.inv(nu.dot(AT[ii,:,:],A[ii,:,:]))
+        ATAR= nu.sum(AT*nu.transpose(nu.tile(angleRT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
+        ATAT= nu.sum(AT*nu.transpose(nu.tile(anglephiT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
+        ATAZ= nu.sum(AT*nu.transpose(nu.tile(angleZT,(2+nn,1,1)),axes=(1,0,2)),axis=2)
+        angleR= nu.sum(atainv[:,0,:]*ATAR,axis=1)
+        OmegaR= nu.sum(atainv[:,1,:]*ATAR,axis=1)
+        anglephi= nu.sum(atainv[:,0,:]*ATAT,axis=1)
+        Omegaphi= nu.sum(atainv[:,1,:]*ATAT,axis=1)
+        angleZ= nu.sum(atainv[:,0,:]*ATAZ,axis=1)
+        OmegaZ= nu.sum(atainv[:,1,:]*ATAZ,axis=1)
+        Omegaphi[negFreqIndx]= -Omegaphi[negFreqIndx]
+        anglephi[negFreqIndx]= _TWOPI-anglephi[negFreqIndx]
+        if kwargs.get('_retacfs',False):
+            return (jr,lz,jz,OmegaR,Omegaphi,OmegaZ, #pragma: no cover
+                    angleR % _TWOPI,
+                    anglephi % _TWOPI,
+                    angleZ % _TWOPI,acfs)
+        else:
+            return (jr,lz,jz,OmegaR,Omegaphi,OmegaZ,
+                    angleR % _TWOPI,
+                    anglephi % _TWOPI,
+                    angleZ % _TWOPI)
 
     def plot(self,*args,**kwargs):
         """
@@ -560,6 +581,27 @@ class actionAngleIsochroneApprox(actionAngle):
                                     **kwargs)           
         return None
 
+    def _parse_c_args(self,*args):
+        """Helper function to determine whether the C code can be used for the inputs and, if so, to return them as arrays (returns None if the C code cannot be used)"""
+        if not self._c or len(args) != 6: return None
+        R,vR,vT,z,vz,phi= args
+        if isinstance(R,float):
+            return tuple([nu.array([x],dtype='float') for x in args])
+        elif isinstance(R,nu.ndarray) and len(R.shape) == 1:
+            return tuple([nu.asarray(x,dtype='float') for x in args])
+        else:
+            return None
+
+    def _check_angle_range_c(self,out):
+        """Helper function to warn when the full angle ranges were not covered in the C calculation"""
+        if nu.any((nu.fabs(out[:,9]-_TWOPI) > _ANGLETOL)\
+                      *(nu.fabs(out[:,8]) > _ANGLETOL)): #pragma: no cover
+            warnings.warn("Full radial angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
+        if nu.any((nu.fabs(out[:,11]-_TWOPI) > _ANGLETOL)\
+                      *(nu.fabs(out[:,10]) > _ANGLETOL)): #pragma: no cover
+            warnings.warn("Full vertical angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
+        return None
+
     def _parse_args(self,freqsAngles=True,_firstFlip=False,*args):
         """Helper function to parse the arguments to the __call__ and actionsFreqsAngles functions"""
         from galpy.orbit import Orbit
@@ -723,6 +765,22 @@ def estimateBIsochrone(pot,R,z):
             b= nu.nan
         return b
 
+def _angleFitGrid(maxn):
+    """the (nR,nZ) of the sin(nR x angleR + nZ x angleZ) terms in the angle-fit, up to nR,|nZ| < maxn, excluding (0,0)"""
+    #sorting the phi and Z grids this way makes it easy to exclude the origin
+    phig= list(nu.arange(-maxn+1,maxn,1))
+    phig.sort(key = lambda x: abs(x))
+    phig= nu.array(phig,dtype='int')
+    grid= nu.meshgrid(nu.arange(maxn),
+                      phig)
+    gridR= grid[0].T.flatten()[1:] #remove 0,0,0
+    gridZ= grid[1].T.flatten()[1:]
+    mask = nu.ones(len(gridR),dtype=bool)
+    mask[:2*maxn-3:2]= False
+    gridR= gridR[mask]
+    gridZ= gridZ[mask]
+    return (gridR,gridZ)
+
 def dePeriod(arr):
     """make an array of periodic angles increase linearly"""
     diff= arr-nu.roll(arr,1,axis=1)
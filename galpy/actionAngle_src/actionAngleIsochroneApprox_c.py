@@ -0,0 +1,98 @@
+import ctypes
+import ctypes.util
+import numpy
+from numpy.ctypeslib import ndpointer
+from galpy.orbit_src.integrateFullOrbit import _lib, _parse_pot
+from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+from galpy.util import bovy_coords
+_NOUT= 12 #number of outputs per object of the C code
+
+def actionAngleIsochroneApprox_c(pot,amp,b,R,vR,vT,z,vz,phi,ts,int_method,
+                                 gridR=None,gridZ=None,rtol=None,atol=None,
+                                 dt=None):
+    """
+    NAME:
+       actionAngleIsochroneApprox_c
+    PURPOSE:
+       Use C to integrate the orbits and calculate the actions (and, if gridR and gridZ are given, frequencies and angles) using the isochrone approximation, without storing the orbits
+    INPUT:
+       pot - Potential or list of such instances, or a CompiledPotential
+       amp, b - amplitude and scale parameter of the isochrone potential
+       R, vR, vT, z, vz, phi - coordinates (arrays)
+       ts - (increasing) integration times, starting at zero; orbits are integrated forward over ts and, when calculating frequencies and angles, backward over -ts
+       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c', 'symplec6_c', 'dopr54_c'
+       gridR, gridZ= (None) integer arrays of the radial and vertical wave numbers of the sine terms in the angle-fit; if None, only the actions are calculated
+       rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+    OUTPUT:
+       (out,err)
+       out : array, shape (len(R),12) of [jr,jz,Omegar,Omegaphi,Omegaz,angler,anglephi,anglez,min(angler),max(angler),min(anglez),max(anglez)], where the frequencies and angles are only set if gridR and gridZ are given
+       err - array of shape (len(R),), if not zero: 1 means maximum step reduction happened for adaptive integrators
+    """
+    rtol, atol= _parse_tol(rtol,atol)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full',_parse_pot,ncopy=True)
+    int_method_c= _parse_integrator(int_method)
+    if dt is None:
+        dt= -9999.99
+    freqsAngles= not gridR is None
+    if not freqsAngles:
+        gridR= numpy.zeros(1,dtype=numpy.int32)
+        gridZ= numpy.zeros(1,dtype=numpy.int32)
+    nobj= len(R)
+    #Rectangular initial conditions
+    x,y,zz= bovy_coords.cyl_to_rect(R,phi,z)
+    vx,vy,vzz= bovy_coords.cyl_to_rect_vec(vR,vT,vz,phi)
+    yo= numpy.array([x,y,zz,vx,vy,vzz]).T
+
+    #Set up result arrays
+    out= numpy.empty((nobj,_NOUT))
+    err= numpy.zeros(nobj,dtype=numpy.int32)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    actionAngleFunc= getattr(_lib,'actionAngleIsochroneApprox'+pot_suffix)
+    actionAngleFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_int,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_int,
+                                 ctypes.c_int,
+                                 ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.int32,flags=ndarrayFlags)]
+
+    #Array requirements
+    yo= numpy.require(yo,dtype=numpy.float64,requirements=['C','W'])
+    ts= numpy.require(ts,dtype=numpy.float64,requirements=['C','W'])
+    gridR= numpy.require(gridR,dtype=numpy.int32,requirements=['C','W'])
+    gridZ= numpy.require(gridZ,dtype=numpy.int32,requirements=['C','W'])
+    out= numpy.require(out,dtype=numpy.float64,requirements=['C','W'])
+    err= numpy.require(err,dtype=numpy.int32,requirements=['C','W'])
+
+    #Run the C code
+    actionAngleFunc(ctypes.c_int(nobj),
+                    yo,
+                    ctypes.c_int(len(ts)),
+                    ts,
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        ctypes.c_int(int_method_c),
+                        ctypes.c_double(amp),ctypes.c_double(b),
+                        ctypes.c_int(freqsAngles),
+                        ctypes.c_int(len(gridR)*freqsAngles),
+                        gridR,
+                        gridZ,
+                        out,
+                        err]))
+    return (out,err)
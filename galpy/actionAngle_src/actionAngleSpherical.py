@@ -11,12 +11,18 @@
 ###############################################################################
 import copy
 import math as m
+import warnings
 import numpy as nu
 from scipy import integrate
 from galpy.potential import epifreq, omegac
-from galpy.potential_src.Potential import _evaluatePotentials
+from galpy.potential_src.Potential import _evaluatePotentials, _check_c
+from galpy.potential_src.CompiledPotential import _underlying_pot
+from galpy.util import galpyWarning
 from galpy.actionAngle_src.actionAngle import *
 from galpy.actionAngle_src.actionAngleAxi import actionAngleAxi, potentialAxi
+from galpy.actionAngle_src.actionAngle import _findStartVec, _findRootVec
+import galpy.actionAngle_src.actionAngleSpherical_c as actionAngleSpherical_c
+from galpy.actionAngle_src.actionAngleSpherical_c import _ext_loaded as ext_loaded
 class actionAngleSpherical(actionAngle):
     """Action-angle formalism for spherical potentials"""
     def __init__(self,*args,**kwargs):
@@ -31,7 +37,9 @@ class actionAngleSpherical(actionAngle):
 
         INPUT:
 
-           pot= a Spherical potential
+           pot= a Spherical potential, or a CompiledPotential of one (re-used by the C code)
+
+           c= if True, always use C for calculations
 
            ro= distance from vantage point to GC (kpc; can be Quantity)
 
@@ -50,18 +58,19 @@ class actionAngleSpherical(actionAngle):
                              ro=kwargs.get('ro',None),vo=kwargs.get('vo',None))
         if not 'pot' in kwargs: #pragma: no cover
             raise IOError("Must specify pot= for actionAngleSpherical")
-        self._pot= kwargs['pot']
+        self._pot= _underlying_pot(kwargs['pot'])
+        # The C code can directly use a CompiledPotential
+        self._cpot= kwargs['pot']
         #Also store a 'planar' (2D) version of the potential
         if isinstance(self._pot,list):
             self._2dpot= [p.toPlanar() for p in self._pot]
         else:
             self._2dpot= self._pot.toPlanar()
-        #The following for if we ever implement this code in C
-        self._c= False
-        ext_loaded= False
         if ext_loaded and (('c' in kwargs and kwargs['c'])
                            or not 'c' in kwargs):
-            self._c= True #pragma: no cover
+            self._c= _check_c(self._pot)
+            if 'c' in kwargs and kwargs['c'] and not self._c:
+                warnings.warn("C module not used because potential does not have a C implementation",galpyWarning) #pragma: no cover
         else:
             self._c= False
         # Check the units
@@ -79,7 +88,10 @@ class actionAngleSpherical(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
-           fixed_quad= (False) if True, use n=10 fixed_quad integration
+           c= True/False; overrides the object's c= keyword to use C or not
+           vectorized= (True) when not using C, calculate for arrays of phase-space points all at once using NumPy (rather than one by one using scipy.integrate)
+           order= (20) order of the Gauss-Legendre quadrature when using C or vectorized
+           fixed_quad= (False) if True, use n=10 fixed_quad integration (when not using C or vectorized)
            scipy.integrate.quadrature keywords
         OUTPUT:
            (jr,lz,jz)
@@ -87,6 +99,10 @@ class actionAngleSpherical(actionAngle):
            2013-12-28 - Written - Bovy (IAS)
         """
         fixed_quad= kwargs.pop('fixed_quad',False)
+        usec= self._use_c(**kwargs)
+        kwargs.pop('c',None)
+        vectorized= kwargs.pop('vectorized',True)
+        order= kwargs.pop('order',20)
         if len(args) == 5: #R,vR.vT, z, vz
             R,vR,vT, z, vz= args
         elif len(args) == 6: #R,vR.vT, z, vz, phi
@@ -104,8 +120,11 @@ class actionAngleSpherical(actionAngle):
             vT= nu.array([vT])
             z= nu.array([z])
             vz= nu.array([vz])
-        if self._c: #pragma: no cover
-            pass
+        if usec or vectorized:
+            Lz= R*vT
+            L= nu.sqrt(Lz**2.+(z*vT)**2.+(z*vR-R*vz)**2.)
+            jr= self._calc_spherical(R,vR,vT,z,vz,0,usec,order)[0]
+            return (jr,Lz,L-nu.fabs(Lz))
         else:
             Lz= R*vT
             Lx= -z*vT
@@ -143,7 +162,10 @@ class actionAngleSpherical(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
-           fixed_quad= (False) if True, use n=10 fixed_quad integration
+           c= True/False; overrides the object's c= keyword to use C or not
+           vectorized= (True) when not using C, calculate for arrays of phase-space points all at once using NumPy (rather than one by one using scipy.integrate)
+           order= (20) order of the Gauss-Legendre quadrature when using C or vectorized
+           fixed_quad= (False) if True, use n=10 fixed_quad integration (when not using C or vectorized)
            scipy.integrate.quadrature keywords
         OUTPUT:
             (jr,lz,jz,Omegar,Omegaphi,Omegaz)
@@ -151,6 +173,10 @@ class actionAngleSpherical(actionAngle):
            2013-12-28 - Written - Bovy (IAS)
         """
         fixed_quad= kwargs.pop('fixed_quad',False)
+        usec= self._use_c(**kwargs)
+        kwargs.pop('c',None)
+        vectorized= kwargs.pop('vectorized',True)
+        order= kwargs.pop('order',20)
         if len(args) == 5: #R,vR.vT, z, vz
             R,vR,vT, z, vz= args
         elif len(args) == 6: #R,vR.vT, z, vz, phi
@@ -168,8 +194,15 @@ class actionAngleSpherical(actionAngle):
             vT= nu.array([vT])
             z= nu.array([z])
             vz= nu.array([vz])
-        if self._c: #pragma: no cover
-            pass
+        if usec or vectorized:
+            Lz= R*vT
+            L= nu.sqrt(Lz**2.+(z*vT)**2.+(z*vR-R*vz)**2.)
+            jr, Tr, I, dum1, dum2, dum3, dum4= \
+                self._calc_spherical(R,vR,vT,z,vz,1,usec,order)
+            Or, Op= self._calc_or_op_spherical(nu.sqrt(R**2.+z**2.),jr,Tr,I)
+            Oz= copy.copy(Op)
+            Op[vT < 0.]*= -1.
+            return (jr,Lz,L-nu.fabs(Lz),Or,Op,Oz)
         else:
             Lz= R*vT
             Lx= -z*vT
@@ -220,7 +253,10 @@ class actionAngleSpherical(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
-           fixed_quad= (False) if True, use n=10 fixed_quad integration
+           c= True/False; overrides the object's c= keyword to use C or not
+           vectorized= (True) when not using C, calculate for arrays of phase-space points all at once using NumPy (rather than one by one using scipy.integrate)
+           order= (20) order of the Gauss-Legendre quadrature when using C or vectorized
+           fixed_quad= (False) if True, use n=10 fixed_quad integration (when not using C or vectorized)
            scipy.integrate.quadrature keywords
         OUTPUT:
             (jr,lz,jz,Omegar,Omegaphi,Omegaz,ar,aphi,az)
@@ -228,6 +264,10 @@ class actionAngleSpherical(actionAngle):
            2013-12-29 - Written - Bovy (IAS)
         """
         fixed_quad= kwargs.pop('fixed_quad',False)
+        usec= self._use_c(**kwargs)
+        kwargs.pop('c',None)
+        vectorized= kwargs.pop('vectorized',True)
+        order= kwargs.pop('order',20)
         if len(args) == 5: #R,vR.vT, z, vz pragma: no cover
             raise IOError("You need to provide phi when calculating angles")
         elif len(args) == 6: #R,vR.vT, z, vz, phi
@@ -247,8 +287,34 @@ class actionAngleSpherical(actionAngle):
             z= nu.array([z])
             vz= nu.array([vz])
             phi= nu.array([phi])
-        if self._c: #pragma: no cover
-            pass
+        if usec or vectorized:
+            Lz= R*vT
+            L= nu.sqrt(Lz**2.+(z*vT)**2.+(z*vR-R*vz)**2.)
+            axiR= nu.sqrt(R**2.+z**2.)
+            axivR= (R*vR+z*vz)/axiR
+            axivz= (z*vR-R*vz)/axiR
+            jr, Tr, I, tr, Ir, rperi, rap= \
+                self._calc_spherical(R,vR,vT,z,vz,2,usec,order)
+            Or, Op= self._calc_or_op_spherical(axiR,jr,Tr,I)
+            #Angles
+            ar= Or*tr
+            ar[axivR < 0.]= 2.*nu.pi-ar[axivR < 0.]
+            dpsi= Op/Or*2.*nu.pi #this is the full I integral
+            wz= copy.copy(Ir)
+            wz[axivR < 0.]= dpsi[axivR < 0.]-wz[axivR < 0.]
+            circ= rap == rperi
+            wz[circ]= dpsi[circ]/2.
+            az= -wz+self._calc_psi(z,axiR,Lz,L,axivz)+Op/Or*ar
+            asc= self._calc_long_asc(z,R,axivz,phi,Lz,L)
+            Oz= copy.copy(Op)
+            Op[vT < 0.]*= -1.
+            ap= copy.copy(asc)
+            ap[vT < 0.]-= az[vT < 0.]
+            ap[vT >= 0.]+= az[vT >= 0.]
+            ar= ar % (2.*nu.pi)
+            ap= ap % (2.*nu.pi)
+            az= az % (2.*nu.pi)
+            return (jr,Lz,L-nu.fabs(Lz),Or,Op,Oz,ar,ap,az)
         else:
             Lz= R*vT
             Lx= -z*vT
@@ -309,6 +375,92 @@ class actionAngleSpherical(actionAngle):
             return (nu.array(Jr),Jphi,Jz,nu.array(Or),Op,Oz,
                     ar,ap,az)
     
+    def _use_c(self,**kwargs):
+        """
+        NAME:
+           _use_c
+        PURPOSE:
+           determine whether to use C for a calculation
+        INPUT:
+           c= (object-wide default) keyword given to the calculation
+        OUTPUT:
+           True if the calculation should use C
+        """
+        return ((self._c and not ('c' in kwargs and not kwargs['c']))\
+                    or (ext_loaded and (('c' in kwargs and kwargs['c'])))) \
+                    and _check_c(self._pot)
+
+    def _calc_spherical(self,R,vR,vT,z,vz,freqsAngles,usec,order):
+        """
+        NAME:
+           _calc_spherical
+        PURPOSE:
+           calculate the radial action and the integrals needed for the frequencies and angles for arrays of phase-space points, in C or using NumPy
+        INPUT:
+           R,vR,vT,z,vz - coordinates (arrays)
+           freqsAngles - 0: only calculate jr; 1: also calculate the radial period and the azimuthal integral; 2: also calculate the integrals from pericenter to the current radius
+           usec - if True, use C
+           order - order of the Gauss-Legendre quadrature
+        OUTPUT:
+           (jr,Tr,I,tr,Ir,rperi,rap)
+        """
+        if usec:
+            return actionAngleSpherical_c.actionAngleSpherical_c(\
+                self._cpot,R,vR,vT,z,vz,freqsAngles=freqsAngles,order=order)
+        else:
+            return _actionsFreqsAnglesSphericalVec(R,vR,vT,z,vz,self._pot,
+                                                   freqsAngles=freqsAngles,
+                                                   order=order)
+
+    def _calc_or_op_spherical(self,r,jr,Tr,I):
+        """
+        NAME:
+           _calc_or_op_spherical
+        PURPOSE:
+           calculate the radial and azimuthal frequencies from the integrals returned by _calc_spherical, using the epicycle and circular frequencies for circular orbits
+        INPUT:
+           r - spherical radius
+           jr - radial action
+           Tr - radial period
+           I - angle swept in the orbital plane during a radial period, 2 L int_rperi^rap dr / r^2 / v_r
+        OUTPUT:
+           (Or,Op)
+        """
+        Or= nu.empty(len(r))
+        Op= nu.empty(len(r))
+        circ= jr < 10.**-9. #Circular orbits
+        Or[circ]= epifreq(self._pot,r[circ],use_physical=False)
+        Op[circ]= omegac(self._pot,r[circ],use_physical=False)
+        Or[~circ]= 2.*nu.pi/Tr[~circ]
+        Op[~circ]= I[~circ]/Tr[~circ]
+        return (Or,Op)
+
+    def _calc_psi(self,z,r,Lz,L,axivz):
+        """
+        NAME:
+           _calc_psi
+        PURPOSE:
+           calculate the angle in the orbital plane between the ascending node and the current position
+        INPUT:
+           z - height
+           r - spherical radius
+           Lz - z component of the angular momentum
+           L - total angular momentum
+           axivz - velocity perpendicular to the radius in the meridional plane
+        OUTPUT:
+           psi in [0,2pi)
+        """
+        i= nu.arccos(Lz/L)
+        sinpsi= z/r/nu.sin(i)
+        pindx= (sinpsi > 1.)*(sinpsi < (1.+10.**-7.))
+        sinpsi[pindx]= 1.
+        pindx= (sinpsi < -1.)*(sinpsi > (-1.-10.**-7.))
+        sinpsi[pindx]= -1.
+        psi= nu.arcsin(sinpsi)
+        vzindx= axivz > 0.
+        psi[vzindx]= nu.pi-psi[vzindx]
+        return psi % (2.*nu.pi)
+
     def _calc_jr(self,rperi,rap,E,L,fixed_quad,**kwargs):
         if fixed_quad:
             return integrate.fixed_quad(_JrSphericalIntegrand,
@@ -492,3 +644,69 @@ def _ISphericalIntegrandSmall(t,E,L,pot,rperi):
 def _ISphericalIntegrandLarge(t,E,L,pot,rap):
     r= rap-t**2.#part of the transformation
     return 2.*t/_JrSphericalIntegrand(r,E,L,pot)/r**2.
+
+def _actionsFreqsAnglesSphericalVec(R,vR,vT,z,vz,pot,freqsAngles=0,order=20):
+    """
+    NAME:
+       _actionsFreqsAnglesSphericalVec
+    PURPOSE:
+       calculate the radial action and the integrals needed for the frequencies and angles for arrays of phase-space points all at once using NumPy
+    INPUT:
+       R,vR,vT,z,vz - coordinates (arrays)
+       pot - potential or list of potentials
+       freqsAngles= (0) 0: only calculate jr; 1: also calculate the radial period and the azimuthal integral; 2: also calculate the integrals from pericenter to the current radius needed for the angles
+       order= (20) order of the Gauss-Legendre quadrature
+    OUTPUT:
+       (jr,Tr,I,tr,Ir,rperi,rap) (see actionAngleSpherical_c)
+    """
+    R= nu.asarray(R,dtype='float')
+    r= nu.sqrt(R**2.+z**2.)
+    vr= (R*vR+z*vz)/r
+    L2= (R*vT)**2.+(z*vT)**2.+(z*vR-R*vz)**2.
+    E= _evaluatePotentials(pot,r,0.*r)+vR**2./2.+vT**2./2.+vz**2./2.
+    # Squared J_r integrand for the elements indx
+    def fr(x,indx):
+        return 2.*(E[indx]-_evaluatePotentials(pot,x,0.*x))-L2[indx]/x**2.
+    # rperi and rap; the squared integrand is vr^2 at r
+    lo, hi, flo, fhi= _findStartVec(fr,r,vr**2.,0.9)
+    rperi= _findRootVec(fr,lo,hi,flo,fhi)
+    lo, hi, flo, fhi= _findStartVec(fr,r,vr**2.,1.1,xmax=100.)
+    rap= _findRootVec(fr,lo,hi,flo,fhi)
+    if nu.any(nu.isnan(rap)):
+        raise UnboundError("Orbit seems to be unbound")
+    # Integrate using Gauss-Legendre quadrature, substituting
+    # r= mid+hw sin(theta) to remove the square-root behavior at the
+    # turning points
+    glx, glw= nu.polynomial.legendre.leggauss(order)
+    ndata= len(R)
+    jr= nu.zeros(ndata)
+    Tr= nu.zeros(ndata)
+    I= nu.zeros(ndata)
+    tr= nu.zeros(ndata)
+    Ir= nu.zeros(ndata)
+    todo= nu.arange(ndata)[rap > rperi]
+    if len(todo) == 0:
+        return (jr,Tr,I,tr,Ir,rperi,rap)
+    L= nu.sqrt(L2[todo])
+    mid= (rap[todo]+rperi[todo])/2.
+    hw= (rap[todo]-rperi[todo])/2.
+    theta= nu.pi/2.*glx
+    tr2= mid+nu.outer(nu.sin(theta),hw)
+    f2= fr(tr2.flatten(),nu.tile(todo,order)).reshape((order,len(todo)))
+    wc= (nu.pi/2.*glw*nu.cos(theta))[:,None]
+    jr[todo]= hw/nu.pi*nu.sum(wc*nu.sqrt(nu.maximum(f2,0.)),axis=0)
+    if freqsAngles < 1:
+        return (jr,Tr,I,tr,Ir,rperi,rap)
+    Tr[todo]= 2.*hw*nu.sum(wc/nu.sqrt(f2),axis=0)
+    I[todo]= 2.*L*hw*nu.sum(wc/nu.sqrt(f2)/tr2**2.,axis=0)
+    if freqsAngles < 2:
+        return (jr,Tr,I,tr,Ir,rperi,rap)
+    # Integrals from pericenter to r
+    thetar= nu.arcsin(nu.clip((r[todo]-mid)/hw,-1.,1.))
+    theta= -nu.pi/2.+nu.outer(glx+1.,thetar+nu.pi/2.)/2.
+    tr2= mid+nu.sin(theta)*hw
+    f2= fr(tr2.flatten(),nu.tile(todo,order)).reshape((order,len(todo)))
+    wc= glw[:,None]*(thetar+nu.pi/2.)/2.*nu.cos(theta)
+    tr[todo]= hw*nu.sum(wc/nu.sqrt(f2),axis=0)
+    Ir[todo]= L*hw*nu.sum(wc/nu.sqrt(f2)/tr2**2.,axis=0)
+    return (jr,Tr,I,tr,Ir,rperi,rap)
@@ -0,0 +1,125 @@
+import os
+import sys
+import sysconfig
+import warnings
+import ctypes
+import ctypes.util
+import numpy
+from numpy.ctypeslib import ndpointer
+from galpy.util import galpyWarning
+from galpy.orbit_src.integrateFullOrbit import _parse_pot
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+from galpy.actionAngle_src.actionAngle import UnboundError
+#Find and load the library
+_lib= None
+outerr= None
+PY3= sys.version > '3'
+if PY3: #pragma: no cover
+    _ext_suffix= sysconfig.get_config_var('EXT_SUFFIX')
+else:
+    _ext_suffix= '.so'
+for path in sys.path:
+    try:
+        _lib = ctypes.CDLL(os.path.join(path,'galpy_actionAngle_c%s' % _ext_suffix))
+    except OSError as e:
+        if os.path.exists(os.path.join(path,'galpy_actionAngle_c%s' % _ext_suffix)): #pragma: no cover
+            outerr= e
+        _lib = None
+    else:
+        break
+if _lib is None: #pragma: no cover
+    if not outerr is None:
+        warnings.warn("actionAngleSpherical_c extension module not loaded, because of error '%s' " % outerr,
+                      galpyWarning)
+    else:
+        warnings.warn("actionAngleSpherical_c extension module not loaded, because galpy_actionAngle_c%s image was not found" % _ext_suffix,
+                      galpyWarning)
+    _ext_loaded= False
+else:
+    _ext_loaded= True
+
+def actionAngleSpherical_c(pot,R,vR,vT,z,vz,freqsAngles=0,order=20):
+    """
+    NAME:
+       actionAngleSpherical_c
+    PURPOSE:
+       Use C to calculate the radial action and the integrals needed for the frequencies and angles in a spherical potential
+    INPUT:
+       pot - Potential or list of such instances, or a CompiledPotential
+       R, vR, vT, z, vz - coordinates (arrays)
+       freqsAngles= (0) 0: only calculate jr; 1: also calculate the radial period and the azimuthal integral; 2: also calculate the integrals from pericenter to the current radius needed for the angles
+       order= (20) order of the Gauss-Legendre quadrature
+    OUTPUT:
+       (jr,Tr,I,tr,Ir,rperi,rap)
+       jr - radial action
+       Tr - radial period
+       I - 2 L int_rperi^rap dr / r^2 / sqrt(2(E-Phi)-L^2/r^2)
+       tr, Ir - int_rperi^r dr / sqrt(...) and L int_rperi^r dr / r^2 / sqrt(...)
+       rperi, rap - pericenter and apocenter
+    """
+    #Parse the potential
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
+
+    #Set up result arrays
+    ndata= len(R)
+    jr= numpy.empty(ndata)
+    Tr= numpy.empty(ndata)
+    I= numpy.empty(ndata)
+    tr= numpy.empty(ndata)
+    Ir= numpy.empty(ndata)
+    rperi= numpy.empty(ndata)
+    rap= numpy.empty(ndata)
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    actionAngleSpherical_actionsFunc= getattr(_lib,'actionAngleSpherical_actionsFreqsAngles'+pot_suffix)
+    actionAngleSpherical_actionsFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_int,
+                                 ctypes.c_int,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C','W'])
+    vR= numpy.require(vR,dtype=numpy.float64,requirements=['C','W'])
+    vT= numpy.require(vT,dtype=numpy.float64,requirements=['C','W'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C','W'])
+    vz= numpy.require(vz,dtype=numpy.float64,requirements=['C','W'])
+
+    #Run the C code
+    actionAngleSpherical_actionsFunc(ndata,
+                                     R,
+                                     vR,
+                                     vT,
+                                     z,
+                                     vz,
+                                     *(pot_cargs
+                                       +[ctypes.c_int(freqsAngles),
+                                         ctypes.c_int(order),
+                                         jr,
+                                         Tr,
+                                         I,
+                                         tr,
+                                         Ir,
+                                         rperi,
+                                         rap,
+                                         ctypes.byref(err)]))
+    if err.value == -1:
+        raise UnboundError("Orbit seems to be unbound")
+    elif err.value != 0: #pragma: no cover
+        raise RuntimeError("C-code for calculation actions failed; try with c=False")
+    return (jr,Tr,I,tr,Ir,rperi,rap)
@@ -22,10 +22,12 @@ from galpy.util import bovy_coords #for prolate confocal transforms
 from galpy.util import galpyWarning
 from galpy.util.bovy_conversion import physical_conversion, \
     potential_physical_input
-from galpy.actionAngle_src.actionAngle import actionAngle, UnboundError
+from galpy.actionAngle_src.actionAngle import actionAngle, UnboundError, \
+    _findStartVec, _findRootVec
 import galpy.actionAngle_src.actionAngleStaeckel_c as actionAngleStaeckel_c
 from galpy.actionAngle_src.actionAngleStaeckel_c import _ext_loaded as ext_loaded
 from galpy.potential_src.Potential import _check_c
+from galpy.potential_src.CompiledPotential import _underlying_pot
 _APY_LOADED= True
 try:
     from astropy import units
@@ -40,7 +42,7 @@ class actionAngleStaeckel(actionAngle):
         PURPOSE:
            initialize an actionAngleStaeckel object
         INPUT:
-           pot= potential or list of potentials (3D)
+           pot= potential or list of potentials (3D), or a CompiledPotential (re-used by the C code)
 
            delta= focus (can be Quantity)
 
@@ -65,7 +67,9 @@ class actionAngleStaeckel(actionAngle):
                              ro=kwargs.get('ro',None),vo=kwargs.get('vo',None))
         if not 'pot' in kwargs: #pragma: no cover
             raise IOError("Must specify pot= for actionAngleStaeckel")
-        self._pot= kwargs['pot']
+        self._pot= _underlying_pot(kwargs['pot'])
+        # The C code can directly use a CompiledPotential
+        self._cpot= kwargs['pot']
         if self._pot == MWPotential:
             warnings.warn("Use of MWPotential as a Milky-Way-like potential is deprecated; galpy.potential.MWPotential2014, a potential fit to a large variety of dynamical constraints (see Bovy 2015), is the preferred Milky-Way-like potential in galpy",
                           galpyWarning)
@@ -97,7 +101,10 @@ class actionAngleStaeckel(actionAngle):
               a) R,vR,vT,z,vz
               b) Orbit instance: initial condition used if that's it, orbit(t)
                  if there is a time given as well
+              when using C or vectorized, R,vR,vT,z,vz of shape (N,nt) are N orbits sampled at nt times; with C, the turning points of each time sample are then used to start the root finding for the next one
             c= True/False; overrides the object's c= keyword to use C or not
+            vectorized= (True) when not using C, calculate the actions for arrays of phase-space points all at once using NumPy (rather than one by one using scipy.integrate.quad); jr is then NaN for unbound orbits (rather than raising UnboundError)
+            order= (10) order of the Gauss-Legendre quadrature when vectorized
            scipy.integrate.quadrature keywords
         OUTPUT:
            (jr,lz,jz)
@@ -130,16 +137,15 @@ class actionAngleStaeckel(actionAngle):
                 if 'u0' in kwargs:
                     u0= nu.asarray(kwargs['u0'])
                 else:
-                    E= nu.array([_evaluatePotentials(self._pot,R[ii],z[ii])
-                                 +vR[ii]**2./2.+vz[ii]**2./2.+vT[ii]**2./2. for ii in range(len(R))])
-                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0(E,Lz,
-                                                                         self._pot,
-                                                                         self._delta)[0]
+                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0_phasespace(\
+                        R.flatten(),vR.flatten(),vT.flatten(),z.flatten(),
+                        vz.flatten(),self._cpot,self._delta)[0]\
+                        .reshape(R.shape)
                 kwargs.pop('u0',None)
             else:
                 u0= None
             jr, jz, err= actionAngleStaeckel_c.actionAngleStaeckel_c(\
-                self._pot,self._delta,R,vR,vT,z,vz,u0=u0)
+                self._cpot,self._delta,R,vR,vT,z,vz,u0=u0)
             if err == 0:
                 return (jr,Lz,jz)
             else: #pragma: no cover
@@ -149,6 +155,12 @@ class actionAngleStaeckel(actionAngle):
                 warnings.warn("C module not used because potential does not have a C implementation",galpyWarning)
             kwargs.pop('c',None)
             if (len(args) == 5 or len(args) == 6) \
+                    and isinstance(args[0],nu.ndarray) \
+                    and kwargs.pop('vectorized',True):
+                return _actionsStaeckelVec(args[0],args[1],args[2],args[3],
+                                           args[4],self._pot,self._delta,
+                                           order=kwargs.get('order',10))
+            elif (len(args) == 5 or len(args) == 6) \
                     and isinstance(args[0],nu.ndarray):
                 ojr= nu.zeros((len(args[0])))
                 olz= nu.zeros((len(args[0])))
@@ -187,6 +199,8 @@ class actionAngleStaeckel(actionAngle):
            scipy.integrate.quadrature keywords
         OUTPUT:
             (jr,lz,jz,Omegar,Omegaphi,Omegaz)
+        NOTE:
+           only implemented in C; unlike the actions, the frequencies are not calculated without C (neither vectorized nor star by star)
         HISTORY:
            2013-08-28 - Written - Bovy (IAS)
         """
@@ -216,16 +230,13 @@ class actionAngleStaeckel(actionAngle):
                 if 'u0' in kwargs:
                     u0= nu.asarray(kwargs['u0'])
                 else:
-                    E= nu.array([_evaluatePotentials(self._pot,R[ii],z[ii])
-                                 +vR[ii]**2./2.+vz[ii]**2./2.+vT[ii]**2./2. for ii in range(len(R))])
-                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0(E,Lz,
-                                                                         self._pot,
-                                                                         self._delta)[0]
+                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0_phasespace(\
+                        R,vR,vT,z,vz,self._cpot,self._delta)[0]
                 kwargs.pop('u0',None)
             else:
                 u0= None
             jr, jz, Omegar, Omegaphi, Omegaz, err= actionAngleStaeckel_c.actionAngleFreqStaeckel_c(\
-                self._pot,self._delta,R,vR,vT,z,vz,u0=u0)
+                self._cpot,self._delta,R,vR,vT,z,vz,u0=u0)
             # Adjustements for close-to-circular orbits
             indx= nu.isnan(Omegar)*(jr < 10.**-3.)+nu.isnan(Omegaz)*(jz < 10.**-3.) #Close-to-circular and close-to-the-plane orbits
             if nu.sum(indx) > 0:
@@ -239,7 +250,7 @@ class actionAngleStaeckel(actionAngle):
         else:
             if 'c' in kwargs and kwargs['c'] and not self._c: #pragma: no cover
                 warnings.warn("C module not used because potential does not have a C implementation",galpyWarning)
-            raise NotImplementedError("actionsFreqs with c=False not implemented")
+            raise NotImplementedError("actionsFreqs with c=False not implemented; only the actions are calculated without C")
 
     def _actionsFreqsAngles(self,*args,**kwargs):
         """
@@ -256,6 +267,8 @@ class actionAngleStaeckel(actionAngle):
            scipy.integrate.quadrature keywords
         OUTPUT:
             (jr,lz,jz,Omegar,Omegaphi,Omegaz,angler,anglephi,anglez)
+        NOTE:
+           only implemented in C; unlike the actions, the frequencies and angles are not calculated without C (neither vectorized nor star by star)
         HISTORY:
            2013-08-28 - Written - Bovy (IAS)
         """
@@ -287,16 +300,13 @@ class actionAngleStaeckel(actionAngle):
                 if 'u0' in kwargs:
                     u0= nu.asarray(kwargs['u0'])
                 else:
-                    E= nu.array([_evaluatePotentials(self._pot,R[ii],z[ii])
-                                 +vR[ii]**2./2.+vz[ii]**2./2.+vT[ii]**2./2. for ii in range(len(R))])
-                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0(E,Lz,
-                                                                         self._pot,
-                                                                         self._delta)[0]
+                    u0= actionAngleStaeckel_c.actionAngleStaeckel_calcu0_phasespace(\
+                        R,vR,vT,z,vz,self._cpot,self._delta)[0]
                 kwargs.pop('u0',None)
             else:
                 u0= None
             jr, jz, Omegar, Omegaphi, Omegaz, angler, anglephi,anglez, err= actionAngleStaeckel_c.actionAngleFreqAngleStaeckel_c(\
-                self._pot,self._delta,R,vR,vT,z,vz,phi,u0=u0)
+                self._cpot,self._delta,R,vR,vT,z,vz,phi,u0=u0)
             # Adjustements for close-to-circular orbits
             indx= nu.isnan(Omegar)*(jr < 10.**-3.)+nu.isnan(Omegaz)*(jz < 10.**-3.) #Close-to-circular and close-to-the-plane orbits
             if nu.sum(indx) > 0:
@@ -310,7 +320,7 @@ class actionAngleStaeckel(actionAngle):
         else: #pragma: no cover
             if 'c' in kwargs and kwargs['c'] and not self._c: #pragma: no cover
                 warnings.warn("C module not used because potential does not have a C implementation",galpyWarning)
-            raise NotImplementedError("actionsFreqs with c=False not implemented")
+            raise NotImplementedError("actionsFreqs with c=False not implemented; only the actions are calculated without C")
 
 class actionAngleStaeckelSingle(actionAngle):
     """Action-angle formalism for axisymmetric potentials using Binney (2012)'s Staeckel approximation"""
@@ -831,6 +841,85 @@ def _JzStaeckelIntegrandSquared(v,E,Lz,I3V,delta,u0,cosh2u0,sinh2u0,
         -(sinh2u0+sin2v)*potentialStaeckel(u0,v,pot,delta)
     return E*sin2v+I3V+dV-Lz**2./2./delta**2./sin2v
 
+def _actionsStaeckelVec(R,vR,vT,z,vz,pot,delta,order=10):
+    """
+    NAME:
+       _actionsStaeckelVec
+    PURPOSE:
+       calculate the actions for arrays of phase-space points all at once using NumPy, for potentials without a C implementation
+    INPUT:
+       R,vR,vT,z,vz - coordinates (arrays of any shape)
+       pot - potential or list of potentials
+       delta - focus
+       order= (10) order of the Gauss-Legendre quadrature
+    OUTPUT:
+       (jr,lz,jz); jr is NaN for unbound orbits
+    """
+    R= nu.asarray(R,dtype='float')
+    if R.ndim > 1: # (N,nt) time series
+        shape= R.shape
+        jr, Lz, jz= _actionsStaeckelVec(R.flatten(),vR.flatten(),
+                                        vT.flatten(),z.flatten(),
+                                        vz.flatten(),pot,delta,order=order)
+        return (jr.reshape(shape),Lz.reshape(shape),jz.reshape(shape))
+    ux, vx= bovy_coords.Rz_to_uv(R,z,delta=delta)
+    coshux, sinhux= nu.cosh(ux), nu.sinh(ux)
+    sinvx, cosvx= nu.sin(vx), nu.cos(vx)
+    pux= delta*(vR*coshux*sinvx+vz*sinhux*cosvx)
+    pvx= delta*(vR*sinhux*cosvx-vz*coshux*sinvx)
+    E, Lz= calcELStaeckel(R,vR,vT,z,vz,pot)
+    potuxvx= potentialStaeckel(ux,vx,pot,delta)
+    potupi2= potentialStaeckel(ux,nu.pi/2.,pot,delta)
+    I3U= E*sinhux**2.-pux**2./2./delta**2.-Lz**2./2./delta**2./sinhux**2.
+    I3V= -E*sinvx**2.+pvx**2./2./delta**2.+Lz**2./2./delta**2./sinvx**2.\
+        -coshux**2.*potupi2+(sinhux**2.+sinvx**2.)*potuxvx
+    # Squared integrands for the elements indx
+    def fU(u,indx):
+        return _JRStaeckelIntegrandSquared(u,E[indx],Lz[indx],I3U[indx],
+                                           delta,ux[indx],sinhux[indx]**2.,
+                                           vx[indx],sinvx[indx]**2.,
+                                           potuxvx[indx],pot)
+    def fV(v,indx):
+        return _JzStaeckelIntegrandSquared(v,E[indx],Lz[indx],I3V[indx],
+                                           delta,ux[indx],coshux[indx]**2.,
+                                           sinhux[indx]**2.,
+                                           potupi2[indx],pot)
+    # umin and umax; the squared integrands are pu^2/2/delta^2 at ux
+    # (similar for v)
+    fux= pux**2./2./delta**2.
+    lo, hi, flo, fhi= _findStartVec(fU,ux,fux,0.9)
+    umin= _findRootVec(fU,lo,hi,flo,fhi)
+    lo, hi, flo, fhi= _findStartVec(fU,ux,fux,1.1,xmax=100.)
+    umax= _findRootVec(fU,lo,hi,flo,fhi)
+    lo, hi, flo, fhi= _findStartVec(fV,vx,pvx**2./2./delta**2.,0.9)
+    vmin= _findRootVec(fV,lo,hi,flo,fhi)
+    # Integrate using Gauss-Legendre quadrature, with substitutions that
+    # remove the square-root behavior at the turning points
+    glx, glw= nu.polynomial.legendre.leggauss(order)
+    jr= nu.zeros(len(R))
+    jr[nu.isnan(umax)]= nu.nan
+    todo= nu.arange(len(R))[(umax-umin)/umax >= 10.**-6.]
+    if len(todo) > 0:
+        theta= nu.pi/2.*glx
+        mid= (umax[todo]+umin[todo])/2.
+        hw= (umax[todo]-umin[todo])/2.
+        tu= (mid+nu.outer(nu.sin(theta),hw)).flatten()
+        integrand= nu.sqrt(nu.maximum(fU(tu,nu.tile(todo,order)),0.))\
+            .reshape((order,len(todo)))
+        jr[todo]= nu.sqrt(2.)*delta/nu.pi*nu.pi/2.*hw\
+            *nu.sum((glw*nu.cos(theta))[:,None]*integrand,axis=0)
+    jz= nu.zeros(len(R))
+    todo= nu.arange(len(R))[nu.pi/2.-vmin >= 10.**-7.]
+    if len(todo) > 0:
+        phi= nu.pi/4.*(glx+1.)
+        hw= nu.pi/2.-vmin[todo]
+        tv= (nu.pi/2.-nu.outer(nu.cos(phi),hw)).flatten()
+        integrand= nu.sqrt(nu.maximum(fV(tv,nu.tile(todo,order)),0.))\
+            .reshape((order,len(todo)))
+        jz[todo]= 2.*nu.sqrt(2.)*delta/nu.pi*nu.pi/4.*hw\
+            *nu.sum((glw*nu.sin(phi))[:,None]*integrand,axis=0)
+    return (jr,Lz,jz)
+
 def _uminUmaxFindStart(u,
                        E,Lz,I3U,delta,u0,sinh2u0,v0,sin2v0,
                        potu0v0,pot,umax=False):
@@ -8,6 +8,7 @@ import numpy
 from numpy.ctypeslib import ndpointer
 from galpy.util import galpyWarning
 from galpy.orbit_src.integrateFullOrbit import _parse_pot
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
 from galpy.util import bovy_coords
 #Find and load the library
 _lib= None
@@ -44,12 +45,12 @@ def actionAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
     PURPOSE:
        Use C to calculate actions using the Staeckel approximation
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        delta - focal length of prolate spheroidal coordinates
-       R, vR, vT, z, vz - coordinates (arrays)
+       R, vR, vT, z, vz - coordinates (arrays); if these have shape (N,nt), each row is taken to be an orbit sampled at nt times and the turning points of each time sample are used to start the root finding for the next one
     OUTPUT:
        (jr,jz,err)
-       jr,jz : array, shape (len(R))
+       jr,jz : array, shape (len(R)) or R.shape
        err - non-zero if error occured
     HISTORY:
        2012-12-01 - Written - Bovy (IAS)
@@ -57,30 +58,39 @@ def actionAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
     if u0 is None:
         u0, dummy= bovy_coords.Rz_to_uv(R,z,delta=delta)
     #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot,potforactions=True)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
+
+    #Time series?
+    shape= R.shape
+    if R.ndim > 1:
+        nobj= shape[0]
+        nt= R.size//nobj
+    else:
+        nobj= len(R)
+        nt= 1
 
     #Set up result arrays
-    jr= numpy.empty(len(R))
-    jz= numpy.empty(len(R))
+    jr= numpy.empty(shape)
+    jz= numpy.empty(shape)
     err= ctypes.c_int(0)
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    actionAngleStaeckel_actionsFunc= _lib.actionAngleStaeckel_actions
+    actionAngleStaeckel_actionsFunc= getattr(_lib,'actionAngleStaeckel_actionsTimeSeries'+pot_suffix)
     actionAngleStaeckel_actionsFunc.argtypes= [ctypes.c_int,
+                               ctypes.c_int,
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int)]
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [R.flags['F_CONTIGUOUS'],
@@ -99,20 +109,19 @@ def actionAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
     jz= numpy.require(jz,dtype=numpy.float64,requirements=['C','W'])
 
     #Run the C code
-    actionAngleStaeckel_actionsFunc(len(R),
+    actionAngleStaeckel_actionsFunc(nobj,
+                                    nt,
                                     R,
                                     vR,
                                     vT,
                                     z,
                                     vz,
                                     u0,
-                                    ctypes.c_int(npot),
-                                    pot_type,
-                                    pot_args,
-                                    ctypes.c_double(delta),
-                                    jr,
-                                    jz,
-                                    ctypes.byref(err))
+                                    *(pot_cargs
+                                      +[ctypes.c_double(delta),
+                                        jr,
+                                        jz,
+                                        ctypes.byref(err)]))
 
     #Reset input arrays
     if f_cont[0]: R= numpy.asfortranarray(R)
@@ -132,7 +141,7 @@ def actionAngleStaeckel_calcu0(E,Lz,pot,delta):
        Use C to calculate u0 in the Staeckel approximation
     INPUT:
        E, Lz - energy and angular momentum
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        delta - focal length of prolate spheroidal coordinates
     OUTPUT:
        (u0,err)
@@ -142,7 +151,8 @@ def actionAngleStaeckel_calcu0(E,Lz,pot,delta):
        2012-12-03 - Written - Bovy (IAS)
     """
     #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot,potforactions=True)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
 
     #Set up result arrays
     u0= numpy.empty(len(E))
@@ -150,16 +160,14 @@ def actionAngleStaeckel_calcu0(E,Lz,pot,delta):
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    actionAngleStaeckel_actionsFunc= _lib.calcu0
+    actionAngleStaeckel_actionsFunc= getattr(_lib,'calcu0'+pot_suffix)
     actionAngleStaeckel_actionsFunc.argtypes= [ctypes.c_int,
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int)]
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [E.flags['F_CONTIGUOUS'],
@@ -172,12 +180,10 @@ def actionAngleStaeckel_calcu0(E,Lz,pot,delta):
     actionAngleStaeckel_actionsFunc(len(E),
                                     E,
                                     Lz,
-                                    ctypes.c_int(npot),
-                                    pot_type,
-                                    pot_args,
-                                    ctypes.c_double(delta),
-                                    u0,
-                                    ctypes.byref(err))
+                                    *(pot_cargs
+                                      +[ctypes.c_double(delta),
+                                        u0,
+                                        ctypes.byref(err)]))
 
     #Reset input arrays
     if f_cont[0]: E= numpy.asfortranarray(E)
@@ -185,6 +191,78 @@ def actionAngleStaeckel_calcu0(E,Lz,pot,delta):
 
     return (u0,err.value)
 
+def actionAngleStaeckel_calcu0_phasespace(R,vR,vT,z,vz,pot,delta):
+    """
+    NAME:
+       actionAngleStaeckel_calcu0_phasespace
+    PURPOSE:
+       Use C to calculate u0 in the Staeckel approximation directly from the phase-space coordinates, computing the energy and angular momentum in C
+    INPUT:
+       R, vR, vT, z, vz - coordinates (arrays)
+       pot - Potential or list of such instances, or a CompiledPotential
+       delta - focal length of prolate spheroidal coordinates
+    OUTPUT:
+       (u0,err)
+       u0 : array, shape (len(R))
+       err - non-zero if error occured
+    """
+    #Parse the potential
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
+
+    #Set up result arrays
+    u0= numpy.empty(len(R))
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    actionAngleStaeckel_actionsFunc= getattr(_lib,'calcu0_phasespace'
+                                             +pot_suffix)
+    actionAngleStaeckel_actionsFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements, first store old order
+    f_cont= [R.flags['F_CONTIGUOUS'],
+             vR.flags['F_CONTIGUOUS'],
+             vT.flags['F_CONTIGUOUS'],
+             z.flags['F_CONTIGUOUS'],
+             vz.flags['F_CONTIGUOUS']]
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C','W'])
+    vR= numpy.require(vR,dtype=numpy.float64,requirements=['C','W'])
+    vT= numpy.require(vT,dtype=numpy.float64,requirements=['C','W'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C','W'])
+    vz= numpy.require(vz,dtype=numpy.float64,requirements=['C','W'])
+    u0= numpy.require(u0,dtype=numpy.float64,requirements=['C','W'])
+
+    #Run the C code
+    actionAngleStaeckel_actionsFunc(len(R),
+                                    R,
+                                    vR,
+                                    vT,
+                                    z,
+                                    vz,
+                                    *(pot_cargs
+                                      +[ctypes.c_double(delta),
+                                        u0,
+                                        ctypes.byref(err)]))
+
+    #Reset input arrays
+    if f_cont[0]: R= numpy.asfortranarray(R)
+    if f_cont[1]: vR= numpy.asfortranarray(vR)
+    if f_cont[2]: vT= numpy.asfortranarray(vT)
+    if f_cont[3]: z= numpy.asfortranarray(z)
+    if f_cont[4]: vz= numpy.asfortranarray(vz)
+
+    return (u0,err.value)
+
 def actionAngleFreqStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
     """
     NAME:
@@ -193,7 +271,7 @@ def actionAngleFreqStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
        Use C to calculate actions and frequencies 
        using the Staeckel approximation
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        delta - focal length of prolate spheroidal coordinates
        R, vR, vT, z, vz - coordinates (arrays)
     OUTPUT:
@@ -206,7 +284,8 @@ def actionAngleFreqStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
     if u0 is None:
         u0, dummy= bovy_coords.Rz_to_uv(R,z,delta=delta)
     #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot,potforactions=True)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
 
     #Set up result arrays
     jr= numpy.empty(len(R))
@@ -218,24 +297,22 @@ def actionAngleFreqStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    actionAngleStaeckel_actionsFunc= _lib.actionAngleStaeckel_actionsFreqs
+    actionAngleStaeckel_actionsFunc= getattr(_lib,'actionAngleStaeckel_actionsFreqs'+pot_suffix)
     actionAngleStaeckel_actionsFunc.argtypes= [ctypes.c_int,
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int)]
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [R.flags['F_CONTIGUOUS'],
@@ -265,16 +342,14 @@ def actionAngleFreqStaeckel_c(pot,delta,R,vR,vT,z,vz,u0=None):
                                     z,
                                     vz,
                                     u0,
-                                    ctypes.c_int(npot),
-                                    pot_type,
-                                    pot_args,
-                                    ctypes.c_double(delta),
-                                    jr,
-                                    jz,
-                                    Omegar,
-                                    Omegaphi,
-                                    Omegaz,
-                                    ctypes.byref(err))
+                                    *(pot_cargs
+                                      +[ctypes.c_double(delta),
+                                        jr,
+                                        jz,
+                                        Omegar,
+                                        Omegaphi,
+                                        Omegaz,
+                                        ctypes.byref(err)]))
 
     #Reset input arrays
     if f_cont[0]: R= numpy.asfortranarray(R)
@@ -294,7 +369,7 @@ def actionAngleFreqAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,phi,u0=None):
        Use C to calculate actions, frequencies, and angles
        using the Staeckel approximation
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        delta - focal length of prolate spheroidal coordinates
        R, vR, vT, z, vz, phi - coordinates (arrays)
     OUTPUT:
@@ -307,7 +382,8 @@ def actionAngleFreqAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,phi,u0=None):
     if u0 is None:
         u0, dummy= bovy_coords.Rz_to_uv(R,z,delta=delta)
     #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot,potforactions=True)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'actionAngle',_parse_pot,potforactions=True)
 
     #Set up result arrays
     jr= numpy.empty(len(R))
@@ -322,27 +398,25 @@ def actionAngleFreqAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,phi,u0=None):
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    actionAngleStaeckel_actionsFunc= _lib.actionAngleStaeckel_actionsFreqsAngles
+    actionAngleStaeckel_actionsFunc= getattr(_lib,'actionAngleStaeckel_actionsFreqsAngles'+pot_suffix)
     actionAngleStaeckel_actionsFunc.argtypes= [ctypes.c_int,
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int)]
+                               ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [R.flags['F_CONTIGUOUS'],
@@ -376,19 +450,17 @@ def actionAngleFreqAngleStaeckel_c(pot,delta,R,vR,vT,z,vz,phi,u0=None):
                                     z,
                                     vz,
                                     u0,
-                                    ctypes.c_int(npot),
-                                    pot_type,
-                                    pot_args,
-                                    ctypes.c_double(delta),
-                                    jr,
-                                    jz,
-                                    Omegar,
-                                    Omegaphi,
-                                    Omegaz,
-                                    Angler,
-                                    Anglephi,
-                                    Anglez,
-                                    ctypes.byref(err))
+                                    *(pot_cargs
+                                      +[ctypes.c_double(delta),
+                                        jr,
+                                        jz,
+                                        Omegar,
+                                        Omegaphi,
+                                        Omegaz,
+                                        Angler,
+                                        Anglephi,
+                                        Anglez,
+                                        ctypes.byref(err)]))
 
     #Reset input arrays
     if f_cont[0]: R= numpy.asfortranarray(R)
@@ -155,6 +155,53 @@ void parse_actionAngleArgs(int npot,
       potentialArgs->accx= NULL;
       potentialArgs->accy= NULL;
       break;
+    case 23: //interpRZPotential on a non-uniform grid, XX arguments
+      potentialArgs->potentialEval= &interpRZPotentialKnotsEval;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (5 + *(pot_args+3) + *(pot_args+4)
+				   + ( *(pot_args+3) - 4 ) * ( *(pot_args+4) - 4 ));
+      potentialArgs->i2d= NULL;
+      potentialArgs->accx= NULL;
+      potentialArgs->accy= NULL;
+      break;
+    case 24: //SCFPotential, XX arguments
+      potentialArgs->potentialEval= &SCFPotentialEval;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (5 + ( 1 + *(pot_args+4) )
+				   * *(pot_args+2) * *(pot_args+3)
+				   * *(pot_args+3));
+      potentialArgs->i2d= NULL;
+      potentialArgs->accx= NULL;
+      potentialArgs->accy= NULL;
+      break;
+    case 25: //DiskMultipolePotential, XX arguments
+      potentialArgs->potentialEval= &DiskMultipolePotentialEval;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (6 + 6 * *(pot_args+1)
+				   + 3 * *(pot_args+2+6 * (int) *(pot_args+1))
+				   * *(pot_args+3+6 * (int) *(pot_args+1)));
+      potentialArgs->i2d= NULL;
+      potentialArgs->accx= NULL;
+      potentialArgs->accy= NULL;
+      break;
+    case 26: //interpRZTimeSeriesPotential, XX arguments
+      potentialArgs->potentialEval= &interpRZTimeSeriesPotentialEval;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (11 + *(pot_args+5)
+				   + ( *(pot_args+3) + 2 ) * ( *(pot_args+4) + 2 )
+				   * *(pot_args+5));
+      potentialArgs->i2d= NULL;
+      potentialArgs->accx= NULL;
+      potentialArgs->accy= NULL;
+      break;
+    case 27: //interpSphericalPotential, XX arguments
+      potentialArgs->potentialEval= &interpSphericalPotentialEval;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (8 + 6 * ( *(pot_args+1) - 1 ));
+      potentialArgs->i2d= NULL;
+      potentialArgs->accx= NULL;
+      potentialArgs->accy= NULL;
+      break;
     }
     potentialArgs->args= (double *) malloc( potentialArgs->nargs * sizeof(double));
     for (jj=0; jj < potentialArgs->nargs; jj++){
@@ -166,3 +213,28 @@ void parse_actionAngleArgs(int npot,
   }
   potentialArgs-= npot;
 }
+struct potentialArg * new_potentialArgs_actionAngle(int npot,
+						     int * pot_type,
+						     double * pot_args,
+						     int * ncopy){
+  //Parse the potential once, such that the result can be re-used in many 
+  //calls to the _pa versions of the actionAngle functions
+  *ncopy= 1;
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,potentialArgs,pot_type,pot_args);
+  return potentialArgs;
+}
+void delete_potentialArgs_actionAngle(int npot,int ncopy,
+				      struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < npot; ii++) {
+    if ( (potentialArgs+ii)->i2d )
+      interp_2d_free((potentialArgs+ii)->i2d) ;
+    if ((potentialArgs+ii)->accx )
+      gsl_interp_accel_free ((potentialArgs+ii)->accx);
+    if ((potentialArgs+ii)->accy )
+      gsl_interp_accel_free ((potentialArgs+ii)->accy);
+    free((potentialArgs+ii)->args);
+  }
+  free(potentialArgs);
+}
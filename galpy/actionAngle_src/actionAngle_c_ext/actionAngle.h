@@ -37,4 +37,6 @@ struct pragmasolver{
 */
 double evaluatePotentials(double,double,int, struct potentialArg *);
 void parse_actionAngleArgs(int,struct potentialArg *,int *,double *);
+struct potentialArg * new_potentialArgs_actionAngle(int,int *,double *,int *);
+void delete_potentialArgs_actionAngle(int,int,struct potentialArg *);
 #endif /* actionAngle.h */
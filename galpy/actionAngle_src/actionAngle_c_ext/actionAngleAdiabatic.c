@@ -41,6 +41,16 @@ struct JzAdiabaticArg{
 void actionAngleAdiabatic_actions(int,double *,double *,double *,double *,
 				 double *,int,int *,double *,double,
 				 double *,double *,int *);
+void actionAngleAdiabatic_actions_pa(int,double *,double *,double *,double *,
+				    double *,int,struct potentialArg *,double,
+				    double *,double *,int *);
+void actionAngleAdiabatic_RperiRapZmax(int,double *,double *,double *,
+				       double *,double *,int,int *,double *,
+				       double *,double *,double *,int *);
+void actionAngleAdiabatic_RperiRapZmax_pa(int,double *,double *,double *,
+					  double *,double *,int,
+					  struct potentialArg *,
+					  double *,double *,double *,int *);
 void calcJRAdiabatic(int,double *,double *,double *,double *,double *,
 		     int,struct potentialArg *,int);
 void calcJzAdiabatic(int,double *,double *,double *,double *,int,
@@ -98,10 +108,26 @@ void actionAngleAdiabatic_actions(int ndata,
 				  double *jr,
 				  double *jz,
 				  int * err){
-  int ii;
   //Set up the potentials
   struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleAdiabatic_actions_pa(ndata,R,vR,vT,z,vz,npot,
+				  actionAngleArgs,gamma,jr,jz,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleAdiabatic_actions_pa(int ndata,
+				     double *R,
+				     double *vR,
+				     double *vT,
+				     double *z,
+				     double *vz,
+				     int npot,
+				     struct potentialArg * actionAngleArgs,
+				     double gamma,
+				     double *jr,
+				     double *jz,
+				     int * err){
+  int ii;
   //ER, Ez, Lz
   double *ER= (double *) malloc ( ndata * sizeof(double) );
   double *Ez= (double *) malloc ( ndata * sizeof(double) );
@@ -123,16 +149,6 @@ void actionAngleAdiabatic_actions(int ndata,
   }
   calcRapRperi(ndata,rperi,rap,R,ER,Lz,npot,actionAngleArgs);
   calcJRAdiabatic(ndata,jr,rperi,rap,ER,Lz,npot,actionAngleArgs,10);
-  for (ii=0; ii < npot; ii++) {
-    if ( (actionAngleArgs+ii)->i2d )
-      interp_2d_free((actionAngleArgs+ii)->i2d) ;
-    if ((actionAngleArgs+ii)->accx )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accx);
-    if ((actionAngleArgs+ii)->accy )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accy);
-    free((actionAngleArgs+ii)->args);
-  }
-  free(actionAngleArgs);
   free(ER);
   free(Ez);
   free(Lz);
@@ -140,6 +156,54 @@ void actionAngleAdiabatic_actions(int ndata,
   free(rap);
   free(zmax);
 }
+void actionAngleAdiabatic_RperiRapZmax(int ndata,
+				       double *R,
+				       double *vR,
+				       double *vT,
+				       double *z,
+				       double *vz,
+				       int npot,
+				       int * pot_type,
+				       double * pot_args,
+				       double *rperi,
+				       double *rap,
+				       double *zmax,
+				       int * err){
+  //Set up the potentials
+  struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleAdiabatic_RperiRapZmax_pa(ndata,R,vR,vT,z,vz,npot,
+				       actionAngleArgs,rperi,rap,zmax,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleAdiabatic_RperiRapZmax_pa(int ndata,
+					  double *R,
+					  double *vR,
+					  double *vT,
+					  double *z,
+					  double *vz,
+					  int npot,
+					  struct potentialArg * actionAngleArgs,
+					  double *rperi,
+					  double *rap,
+					  double *zmax,
+					  int * err){
+  //Pericenter and apocenter in the planar potential (no Lz+gamma Jz
+  //adjustment) and maximum height in the vertical potential at R
+  int ii;
+  double *ER= (double *) malloc ( ndata * sizeof(double) );
+  double *Ez= (double *) malloc ( ndata * sizeof(double) );
+  double *Lz= (double *) malloc ( ndata * sizeof(double) );
+  calcEREzL(ndata,R,vR,vT,z,vz,ER,Ez,Lz,npot,actionAngleArgs);
+  calcZmax(ndata,zmax,z,R,Ez,npot,actionAngleArgs);
+  calcRapRperi(ndata,rperi,rap,R,ER,Lz,npot,actionAngleArgs);
+  *err= 0;
+  for (ii=0; ii < ndata; ii++)
+    if ( *(rperi+ii) == -9999.99 || *(zmax+ii) == -9999.99 ) *err= 1;
+  free(ER);
+  free(Ez);
+  free(Lz);
+}
 void calcJRAdiabatic(int ndata,
 		     double * jr,
 		     double * rperi,
@@ -0,0 +1,267 @@
+/*
+  C code for the actions, frequencies, and angles in spherical potentials
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include <gsl/gsl_math.h>
+#include <gsl/gsl_errno.h>
+#include <gsl/gsl_roots.h>
+#include <gsl/gsl_integration.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#define CHUNKSIZE 10
+//Potentials
+#include <galpy_potentials.h>
+#include <actionAngle.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+/*
+  Structure Declarations
+*/
+struct JRSphericalArg{
+  double E;
+  double L2;
+  int nargs;
+  struct potentialArg * actionAngleArgs;
+};
+/*
+  Function Declarations
+*/
+void actionAngleSpherical_actionsFreqsAngles(int,double *,double *,double *,
+					     double *,double *,int,int *,
+					     double *,int,int,double *,
+					     double *,double *,double *,
+					     double *,double *,double *,
+					     int *);
+void actionAngleSpherical_actionsFreqsAngles_pa(int,double *,double *,
+						double *,double *,double *,
+						int,struct potentialArg *,
+						int,int,double *,double *,
+						double *,double *,double *,
+						double *,double *,int *);
+double JRSphericalIntegrandSquared(double,void *);
+double evaluatePotentials(double,double,int, struct potentialArg *);
+/*
+  Actual functions
+*/
+static int findRootSpherical(gsl_root_fsolver * s,gsl_function * F,
+			     double r_lo,double r_hi,double * root){
+  int status;
+  int iter= 0, max_iter= 100;
+  status = gsl_root_fsolver_set (s, F, r_lo, r_hi);
+  if (status == GSL_EINVAL) return status;
+  do
+    {
+      iter++;
+      status = gsl_root_fsolver_iterate (s);
+      r_lo = gsl_root_fsolver_x_lower (s);
+      r_hi = gsl_root_fsolver_x_upper (s);
+      status = gsl_root_test_interval (r_lo, r_hi,
+				       1e-15,
+				       4.4408920985006262e-16);
+    }
+  while (status == GSL_CONTINUE && iter < max_iter);
+  *root= gsl_root_fsolver_root (s);
+  return status;
+}
+static int calcRperiRapSpherical(gsl_root_fsolver * s,gsl_function * F,
+				 double r,double vr,
+				 double * rperi,double * rap){
+  //Find pericenter and apocenter by stepping away from r by factors of 0.9
+  //and 1.1 until the orbit is bracketed and then using Brent's method;
+  //returns non-zero if the orbit is unbound or the solver fails
+  int status;
+  double r_lo, r_hi, f_hi;
+  //Pericenter
+  r_hi= r;
+  f_hi= vr * vr;
+  r_lo= 0.9 * r;
+  while ( GSL_FN_EVAL(F,r_lo) >= 0. && r_lo > 0.000000001){
+    r_hi= r_lo; //this makes sure that brent evaluates using previous
+    f_hi= 1.;
+    r_lo*= 0.9;
+  }
+  if ( r_lo <= 0.000000001 ) *rperi= 0.;
+  else if ( f_hi == 0. ) *rperi= r_hi;
+  else {
+    status= findRootSpherical(s,F,r_lo,r_hi,rperi);
+    if ( status != GSL_SUCCESS ) return status;
+  }
+  //Apocenter
+  r_lo= r;
+  f_hi= vr * vr;
+  r_hi= 1.1 * r;
+  while ( GSL_FN_EVAL(F,r_hi) >= 0. ){
+    if ( r_hi > 100. ) return -1; //unbound
+    r_lo= r_hi;
+    f_hi= 1.;
+    r_hi*= 1.1;
+  }
+  if ( f_hi == 0. ) *rap= r_lo;
+  else {
+    status= findRootSpherical(s,F,r_lo,r_hi,rap);
+    if ( status != GSL_SUCCESS ) return status;
+  }
+  return 0;
+}
+void actionAngleSpherical_actionsFreqsAngles(int ndata,
+					     double *R,
+					     double *vR,
+					     double *vT,
+					     double *z,
+					     double *vz,
+					     int npot,
+					     int * pot_type,
+					     double * pot_args,
+					     int freqsAngles,
+					     int order,
+					     double *jr,
+					     double *Tr,
+					     double *Iint,
+					     double *tr,
+					     double *Ir,
+					     double *rperi,
+					     double *rap,
+					     int * err){
+  //Set up the potentials
+  struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleSpherical_actionsFreqsAngles_pa(ndata,R,vR,vT,z,vz,npot,
+					     actionAngleArgs,freqsAngles,
+					     order,jr,Tr,Iint,tr,Ir,
+					     rperi,rap,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleSpherical_actionsFreqsAngles_pa(int ndata,
+						double *R,
+						double *vR,
+						double *vT,
+						double *z,
+						double *vz,
+						int npot,
+						struct potentialArg * actionAngleArgs,
+						int freqsAngles,
+						int order,
+						double *jr,
+						double *Tr,
+						double *Iint,
+						double *tr,
+						double *Ir,
+						double *rperi,
+						double *rap,
+						int * err){
+  //freqsAngles: 0 for actions only, 1 to also compute the radial period
+  //Tr and the full azimuthal integral Iint= 2 L int dr / r^2 / sqrt(...),
+  //2 to also compute the integrals tr and Ir from pericenter to the
+  //current radius; all integrals use Gauss-Legendre quadrature of the given
+  //order after substituting r= (rap+rperi)/2 + (rap-rperi)/2 sin(theta)
+  int ii, tid, nthreads;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+#else
+  nthreads = 1;
+#endif
+  gsl_function * JRRoot= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
+  struct JRSphericalArg * params= (struct JRSphericalArg *) malloc ( nthreads * sizeof (struct JRSphericalArg) );
+  struct pragmasolver *s= (struct pragmasolver *) malloc ( nthreads * sizeof (struct pragmasolver) );
+  for (tid=0; tid < nthreads; tid++){
+    (params+tid)->nargs= npot;
+    (params+tid)->actionAngleArgs= actionAngleArgs;
+    (JRRoot+tid)->function = &JRSphericalIntegrandSquared;
+    (JRRoot+tid)->params = params+tid;
+    (s+tid)->s= gsl_root_fsolver_alloc (gsl_root_fsolver_brent);
+  }
+  //Setup integrator
+  gsl_integration_glfixed_table * T= gsl_integration_glfixed_table_alloc (order);
+  *err= 0;
+  gsl_set_error_handler_off();
+  UNUSED int chunk= CHUNKSIZE;
+#pragma omp parallel for schedule(static,chunk)			\
+  private(tid,ii)						\
+  shared(JRRoot,params,s,T,jr,Tr,Iint,tr,Ir,rperi,rap,err)
+  for (ii=0; ii < ndata; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    int kk, status;
+    double r, vr, L2, mid, hw, th, w, x, fx, sj, st, sI, thr;
+    r= sqrt( *(R+ii) * *(R+ii) + *(z+ii) * *(z+ii) );
+    vr= ( *(R+ii) * *(vR+ii) + *(z+ii) * *(vz+ii) ) / r;
+    L2= *(vT+ii) * *(vT+ii) * r * r
+      + ( *(z+ii) * *(vR+ii) - *(R+ii) * *(vz+ii) )
+      * ( *(z+ii) * *(vR+ii) - *(R+ii) * *(vz+ii) );
+    (params+tid)->E= evaluatePotentials(r,0.,npot,actionAngleArgs)
+      + 0.5 * *(vR+ii) * *(vR+ii)
+      + 0.5 * *(vT+ii) * *(vT+ii)
+      + 0.5 * *(vz+ii) * *(vz+ii);
+    (params+tid)->L2= L2;
+    status= calcRperiRapSpherical((s+tid)->s,JRRoot+tid,r,vr,
+				  rperi+ii,rap+ii);
+    if ( status != 0 ) {
+#pragma omp critical
+      *err= status;
+      *(jr+ii)= 9999.99;
+      *(Tr+ii)= 9999.99;
+      *(Iint+ii)= 9999.99;
+      *(tr+ii)= 9999.99;
+      *(Ir+ii)= 9999.99;
+      continue;
+    }
+    mid= 0.5 * ( *(rap+ii) + *(rperi+ii) );
+    hw= 0.5 * ( *(rap+ii) - *(rperi+ii) );
+    sj= 0.;
+    st= 0.;
+    sI= 0.;
+    if ( hw > 0. ) {
+      for (kk=0; kk < order; kk++){
+	gsl_integration_glfixed_point(-0.5*M_PI,0.5*M_PI,kk,&th,&w,T);
+	x= mid + hw * sin(th);
+	fx= GSL_FN_EVAL(JRRoot+tid,x);
+	sj+= w * cos(th) * ( ( fx > 0. ) ? sqrt(fx) : 0. );
+	if ( freqsAngles > 0 ) {
+	  st+= w * cos(th) / sqrt(fx);
+	  sI+= w * cos(th) / sqrt(fx) / x / x;
+	}
+      }
+    }
+    *(jr+ii)= hw * sj / M_PI;
+    *(Tr+ii)= 2. * hw * st;
+    *(Iint+ii)= 2. * sqrt(L2) * hw * sI;
+    if ( freqsAngles < 2 ) continue;
+    //Integrals from pericenter to r
+    st= 0.;
+    sI= 0.;
+    if ( hw > 0. ) {
+      thr= ( r - mid ) / hw;
+      thr= asin( ( thr > 1. ) ? 1. : ( ( thr < -1. ) ? -1. : thr ) );
+      for (kk=0; kk < order; kk++){
+	gsl_integration_glfixed_point(-0.5*M_PI,thr,kk,&th,&w,T);
+	x= mid + hw * sin(th);
+	fx= GSL_FN_EVAL(JRRoot+tid,x);
+	st+= w * cos(th) / sqrt(fx);
+	sI+= w * cos(th) / sqrt(fx) / x / x;
+      }
+    }
+    *(tr+ii)= hw * st;
+    *(Ir+ii)= sqrt(L2) * hw * sI;
+  }
+  gsl_set_error_handler (NULL);
+  for (tid=0; tid < nthreads; tid++)
+    gsl_root_fsolver_free( (s+tid)->s);
+  free(s);
+  free(JRRoot);
+  free(params);
+  gsl_integration_glfixed_table_free ( T );
+}
+double JRSphericalIntegrandSquared(double r,
+				   void * p){
+  struct JRSphericalArg * params= (struct JRSphericalArg *) p;
+  return 2. * ( params->E - evaluatePotentials(r,0.,params->nargs,
+					       params->actionAngleArgs) )
+    - params->L2 / r / r;
+}
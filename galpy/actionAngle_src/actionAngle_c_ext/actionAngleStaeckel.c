@@ -87,9 +87,15 @@ struct u0EqArg{
   Function Declarations
 */
 void calcu0(int,double *,double *,int,int *,double *,double,double *,int *);
+void calcu0_phasespace(int,double *,double *,double *,double *,double *,
+		       int,int *,double *,double,double *,int *);
 void actionAngleStaeckel_actions(int,double *,double *,double *,double *,
 				 double *,double *,int,int *,double *,double,
 				 double *,double *,int *);
+void actionAngleStaeckel_actionsTimeSeries(int,int,double *,double *,
+					   double *,double *,double *,
+					   double *,int,int *,double *,double,
+					   double *,double *,int *);
 void actionAngleStaeckel_actionsFreqsAngles(int,double *,double *,double *,
 					    double *,double *,double *,
 					    int,int *,double *,
@@ -100,6 +106,31 @@ void actionAngleStaeckel_actionsFreqs(int,double *,double *,double *,double *,
 				      double *,double *,int,int *,double *,
 				      double,double *,double *,double *,
 				      double *,double *,int *);
+void calcu0_pa(int,double *,double *,int,struct potentialArg *,double,
+	       double *,int *);
+void calcu0_phasespace_pa(int,double *,double *,double *,double *,double *,
+			  int,struct potentialArg *,double,double *,int *);
+void actionAngleStaeckel_actions_pa(int,double *,double *,double *,double *,
+				    double *,double *,int,
+				    struct potentialArg *,double,
+				    double *,double *,int *);
+void actionAngleStaeckel_actionsTimeSeries_pa(int,int,double *,double *,
+					      double *,double *,double *,
+					      double *,int,
+					      struct potentialArg *,double,
+					      double *,double *,int *);
+void actionAngleStaeckel_actionsFreqsAngles_pa(int,double *,double *,double *,
+					       double *,double *,double *,
+					       int,struct potentialArg *,
+					       double,double *,double *,
+					       double *,double *,double *,
+					       double *,double *,double *,
+					       int *);
+void actionAngleStaeckel_actionsFreqs_pa(int,double *,double *,double *,
+					 double *,double *,double *,int,
+					 struct potentialArg *,double,
+					 double *,double *,double *,
+					 double *,double *,int *);
 void calcAnglesStaeckel(int,double *,double *,double *,double *,double *,
 			double *,double *,double *,double *,double *,double *,
 			double *,double *,double *,double *,double *,double *,
@@ -131,6 +162,13 @@ void calcUminUmax(int,double *,double *,double *,double *,double *,double *,
 		  int,struct potentialArg *);
 void calcVmin(int,double *,double *,double *,double *,double *,double *,double,
 	      double *,double *,double *,double *,int,struct potentialArg *);
+void calcUminUmaxTimeSeries(int,int,double *,double *,double *,double *,
+			    double *,double *,double *,double,double *,
+			    double *,double *,double *,double *,
+			    int,struct potentialArg *);
+void calcVminTimeSeries(int,int,double *,double *,double *,double *,double *,
+			double *,double,double *,double *,double *,double *,
+			int,struct potentialArg *);
 double JRStaeckelIntegrandSquared(double,void *);
 double JRStaeckelIntegrand(double,void *);
 double JzStaeckelIntegrandSquared(double,void *);
@@ -193,6 +231,8 @@ inline void calcEL(int ndata,
 		   int nargs,
 		   struct potentialArg * actionAngleArgs){
   int ii;
+  UNUSED int chunk= CHUNKSIZE;
+#pragma omp parallel for schedule(static,chunk) private(ii)
   for (ii=0; ii < ndata; ii++){
     *(E+ii)= evaluatePotentials(*(R+ii),*(z+ii),
 				nargs,actionAngleArgs)
@@ -214,70 +254,129 @@ void calcu0(int ndata,
 	    double delta,
 	    double *u0,
 	    int * err){
-  int ii;
   //Set up the potentials
   struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  calcu0_pa(ndata,E,Lz,npot,actionAngleArgs,delta,u0,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void calcu0_phasespace(int ndata,
+		       double *R,
+		       double *vR,
+		       double *vT,
+		       double *z,
+		       double *vz,
+		       int npot,
+		       int * pot_type,
+		       double * pot_args,
+		       double delta,
+		       double *u0,
+		       int * err){
+  //Set up the potentials
+  struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  calcu0_phasespace_pa(ndata,R,vR,vT,z,vz,npot,actionAngleArgs,delta,u0,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void calcu0_phasespace_pa(int ndata,
+			  double *R,
+			  double *vR,
+			  double *vT,
+			  double *z,
+			  double *vz,
+			  int npot,
+			  struct potentialArg * actionAngleArgs,
+			  double delta,
+			  double *u0,
+			  int * err){
+  //E,Lz
+  double *E= (double *) malloc ( ndata * sizeof(double) );
+  double *Lz= (double *) malloc ( ndata * sizeof(double) );
+  calcEL(ndata,R,vR,vT,z,vz,E,Lz,npot,actionAngleArgs);
+  calcu0_pa(ndata,E,Lz,npot,actionAngleArgs,delta,u0,err);
+  free(E);
+  free(Lz);
+}
+void calcu0_pa(int ndata,
+	       double *E,
+	       double *Lz,
+	       int npot,
+	       struct potentialArg * actionAngleArgs,
+	       double delta,
+	       double *u0,
+	       int * err){
+  int ii, tid, nthreads;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+#else
+  nthreads = 1;
+#endif
   //setup the function to be minimized
-  gsl_function u0Eq;
-  struct u0EqArg * params= (struct u0EqArg *) malloc ( sizeof (struct u0EqArg) );
-  params->delta= delta;
-  params->nargs= npot;
-  params->actionAngleArgs= actionAngleArgs;
+  gsl_function * u0Eq= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
+  struct u0EqArg * params= (struct u0EqArg *) malloc ( nthreads * sizeof (struct u0EqArg) );
   //Setup solver
   int status;
   int iter, max_iter = 100;
   const gsl_min_fminimizer_type *T;
-  gsl_min_fminimizer *s;
-  double u_guess, u_lo, u_hi;
   T = gsl_min_fminimizer_brent;
-  s = gsl_min_fminimizer_alloc (T);
-  u0Eq.function = &u0Equation;
+  gsl_min_fminimizer ** s= (gsl_min_fminimizer **) malloc ( nthreads * sizeof (gsl_min_fminimizer *) );
+  double u_guess, u_lo, u_hi;
+  for (tid=0; tid < nthreads; tid++){
+    (params+tid)->delta= delta;
+    (params+tid)->nargs= npot;
+    (params+tid)->actionAngleArgs= actionAngleArgs;
+    *(s+tid)= gsl_min_fminimizer_alloc (T);
+    (u0Eq+tid)->function = &u0Equation;
+  }
+  *err= 0;
+  gsl_set_error_handler_off();
+  UNUSED int chunk= CHUNKSIZE;
+#pragma omp parallel for schedule(static,chunk)				\
+  private(tid,ii,status,iter,u_guess,u_lo,u_hi)				\
+  shared(u0Eq,params,s,E,Lz,u0,delta,max_iter,err)
   for (ii=0; ii < ndata; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
     //Setup function
-    params->E= *(E+ii);
-    params->Lz22delta= 0.5 * *(Lz+ii) * *(Lz+ii) / delta / delta;
-    u0Eq.params = params;
+    (params+tid)->E= *(E+ii);
+    (params+tid)->Lz22delta= 0.5 * *(Lz+ii) * *(Lz+ii) / delta / delta;
+    (u0Eq+tid)->params = params+tid;
     //Find starting points for minimum
     u_guess= 1.;
     u_lo= 0.001;
     u_hi= 100.;
-    gsl_set_error_handler_off();
-    status = gsl_min_fminimizer_set (s, &u0Eq, u_guess, u_lo, u_hi);
+    status = gsl_min_fminimizer_set (*(s+tid), u0Eq+tid, u_guess, u_lo, u_hi);
     if (status == GSL_EINVAL) {
       *(u0+ii)= u_hi;
-      gsl_set_error_handler (NULL);
       continue;
     }
-    gsl_set_error_handler (NULL);
     iter= 0;
     do
       {
 	iter++;
-	status = gsl_min_fminimizer_iterate (s);
-	u_guess = gsl_min_fminimizer_x_minimum (s);
-	u_lo = gsl_min_fminimizer_x_lower (s);
-	u_hi = gsl_min_fminimizer_x_upper (s);
+	status = gsl_min_fminimizer_iterate (*(s+tid));
+	u_guess = gsl_min_fminimizer_x_minimum (*(s+tid));
+	u_lo = gsl_min_fminimizer_x_lower (*(s+tid));
+	u_hi = gsl_min_fminimizer_x_upper (*(s+tid));
 	status = gsl_min_test_interval (u_lo, u_hi,
 					 9.9999999999999998e-13,
 					 4.4408920985006262e-16);
       }
     while (status == GSL_CONTINUE && iter < max_iter);
-    *(u0+ii)= gsl_min_fminimizer_x_minimum (s);
+    *(u0+ii)= gsl_min_fminimizer_x_minimum (*(s+tid));
+    if ( status != GSL_SUCCESS )
+#pragma omp critical
+      *err= status;
   }
-  gsl_min_fminimizer_free (s);
+  gsl_set_error_handler (NULL);
+  for (tid=0; tid < nthreads; tid++)
+    gsl_min_fminimizer_free (*(s+tid));
+  free(s);
+  free(u0Eq);
   free(params);
-  for (ii=0; ii < npot; ii++) {
-    if ( (actionAngleArgs+ii)->i2d )
-      interp_2d_free((actionAngleArgs+ii)->i2d) ;
-    if ((actionAngleArgs+ii)->accx )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accx);
-    if ((actionAngleArgs+ii)->accy )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accy);
-    free((actionAngleArgs+ii)->args);
-  }
-  free(actionAngleArgs);
-  *err= status;
 }
 void actionAngleStaeckel_actions(int ndata,
 				 double *R,
@@ -293,10 +392,71 @@ void actionAngleStaeckel_actions(int ndata,
 				 double *jr,
 				 double *jz,
 				 int * err){
-  int ii;
   //Set up the potentials
   struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleStaeckel_actions_pa(ndata,R,vR,vT,z,vz,u0,npot,
+				 actionAngleArgs,delta,jr,jz,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleStaeckel_actions_pa(int ndata,
+				    double *R,
+				    double *vR,
+				    double *vT,
+				    double *z,
+				    double *vz,
+				    double *u0,
+				    int npot,
+				    struct potentialArg * actionAngleArgs,
+				    double delta,
+				    double *jr,
+				    double *jz,
+				    int * err){
+  actionAngleStaeckel_actionsTimeSeries_pa(ndata,1,R,vR,vT,z,vz,u0,npot,
+					   actionAngleArgs,delta,jr,jz,err);
+}
+void actionAngleStaeckel_actionsTimeSeries(int nobj,
+					   int nt,
+					   double *R,
+					   double *vR,
+					   double *vT,
+					   double *z,
+					   double *vz,
+					   double *u0,
+					   int npot,
+					   int * pot_type,
+					   double * pot_args,
+					   double delta,
+					   double *jr,
+					   double *jz,
+					   int * err){
+  //Set up the potentials
+  struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleStaeckel_actionsTimeSeries_pa(nobj,nt,R,vR,vT,z,vz,u0,npot,
+					   actionAngleArgs,delta,jr,jz,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleStaeckel_actionsTimeSeries_pa(int nobj,
+					      int nt,
+					      double *R,
+					      double *vR,
+					      double *vT,
+					      double *z,
+					      double *vz,
+					      double *u0,
+					      int npot,
+					      struct potentialArg * actionAngleArgs,
+					      double delta,
+					      double *jr,
+					      double *jz,
+					      int * err){
+  //Actions for nobj orbits each sampled at nt times (the nt samples of an
+  //orbit are consecutive), using the turning points of the previous time
+  //sample of the same orbit to start the root finding for the next one;
+  //nt=1 for unrelated phase-space points
+  int ii;
+  int ndata= nobj * nt;
   //E,Lz
   double *E= (double *) malloc ( ndata * sizeof(double) );
   double *Lz= (double *) malloc ( ndata * sizeof(double) );
@@ -357,26 +517,24 @@ void actionAngleStaeckel_actions(int ndata,
   double *umin= (double *) malloc ( ndata * sizeof(double) );
   double *umax= (double *) malloc ( ndata * sizeof(double) );
   double *vmin= (double *) malloc ( ndata * sizeof(double) );
-  calcUminUmax(ndata,umin,umax,ux,pux,E,Lz,I3U,delta,u0,sinh2u0,v0,sin2v0,
-	       potu0v0,npot,actionAngleArgs);
-  calcVmin(ndata,vmin,vx,pvx,E,Lz,I3V,delta,u0,cosh2u0,sinh2u0,potupi2,
-	   npot,actionAngleArgs);
+  if ( nt > 1 ) {
+    calcUminUmaxTimeSeries(nobj,nt,umin,umax,ux,pux,E,Lz,I3U,delta,u0,
+			   sinh2u0,v0,sin2v0,potu0v0,npot,actionAngleArgs);
+    calcVminTimeSeries(nobj,nt,vmin,vx,pvx,E,Lz,I3V,delta,u0,cosh2u0,sinh2u0,
+		       potupi2,npot,actionAngleArgs);
+  }
+  else {
+    calcUminUmax(ndata,umin,umax,ux,pux,E,Lz,I3U,delta,u0,sinh2u0,v0,sin2v0,
+		 potu0v0,npot,actionAngleArgs);
+    calcVmin(ndata,vmin,vx,pvx,E,Lz,I3V,delta,u0,cosh2u0,sinh2u0,potupi2,
+	     npot,actionAngleArgs);
+  }
   //Calculate the actions
   calcJRStaeckel(ndata,jr,umin,umax,E,Lz,I3U,delta,u0,sinh2u0,v0,sin2v0,
 		 potu0v0,npot,actionAngleArgs,10);
   calcJzStaeckel(ndata,jz,vmin,E,Lz,I3V,delta,u0,cosh2u0,sinh2u0,potupi2,
 		 npot,actionAngleArgs,10);
   //Free
-  for (ii=0; ii < npot; ii++) {
-    if ( (actionAngleArgs+ii)->i2d )
-      interp_2d_free((actionAngleArgs+ii)->i2d) ;
-    if ((actionAngleArgs+ii)->accx )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accx);
-    if ((actionAngleArgs+ii)->accy )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accy);
-    free((actionAngleArgs+ii)->args);
-  }
-  free(actionAngleArgs);
   free(E);
   free(Lz);
   free(ux);
@@ -549,10 +707,31 @@ void actionAngleStaeckel_actionsFreqs(int ndata,
 				      double *Omegaphi,
 				      double *Omegaz,
 				      int * err){
-  int ii;
   //Set up the potentials
   struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleStaeckel_actionsFreqs_pa(ndata,R,vR,vT,z,vz,u0,npot,
+				      actionAngleArgs,delta,jr,jz,
+				      Omegar,Omegaphi,Omegaz,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleStaeckel_actionsFreqs_pa(int ndata,
+					 double *R,
+					 double *vR,
+					 double *vT,
+					 double *z,
+					 double *vz,
+					 double *u0,
+					 int npot,
+					 struct potentialArg * actionAngleArgs,
+					 double delta,
+					 double *jr,
+					 double *jz,
+					 double *Omegar,
+					 double *Omegaphi,
+					 double *Omegaz,
+					 int * err){
+  int ii;
   //E,Lz
   double *E= (double *) malloc ( ndata * sizeof(double) );
   double *Lz= (double *) malloc ( ndata * sizeof(double) );
@@ -640,16 +819,6 @@ void actionAngleStaeckel_actionsFreqs(int ndata,
 			      dJRdE,dJRdLz,dJRdI3,
 			      dJzdE,dJzdLz,dJzdI3);		      
   //Free
-  for (ii=0; ii < npot; ii++) {
-    if ( (actionAngleArgs+ii)->i2d )
-      interp_2d_free((actionAngleArgs+ii)->i2d) ;
-    if ((actionAngleArgs+ii)->accx )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accx);
-    if ((actionAngleArgs+ii)->accy )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accy);
-    free((actionAngleArgs+ii)->args);
-  }
-  free(actionAngleArgs);
   free(E);
   free(Lz);
   free(ux);
@@ -699,10 +868,35 @@ void actionAngleStaeckel_actionsFreqsAngles(int ndata,
 					    double *Anglephi,
 					    double *Anglez,
 					    int * err){
-  int ii;
   //Set up the potentials
   struct potentialArg * actionAngleArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_actionAngleArgs(npot,actionAngleArgs,pot_type,pot_args);
+  actionAngleStaeckel_actionsFreqsAngles_pa(ndata,R,vR,vT,z,vz,u0,npot,
+					    actionAngleArgs,delta,jr,jz,
+					    Omegar,Omegaphi,Omegaz,
+					    Angler,Anglephi,Anglez,err);
+  delete_potentialArgs_actionAngle(npot,1,actionAngleArgs);
+}
+void actionAngleStaeckel_actionsFreqsAngles_pa(int ndata,
+					       double *R,
+					       double *vR,
+					       double *vT,
+					       double *z,
+					       double *vz,
+					       double *u0,
+					       int npot,
+					       struct potentialArg * actionAngleArgs,
+					       double delta,
+					       double *jr,
+					       double *jz,
+					       double *Omegar,
+					       double *Omegaphi,
+					       double *Omegaz,
+					       double *Angler,
+					       double *Anglephi,
+					       double *Anglez,
+					       int * err){
+  int ii;
   //E,Lz
   double *E= (double *) malloc ( ndata * sizeof(double) );
   double *Lz= (double *) malloc ( ndata * sizeof(double) );
@@ -804,16 +998,6 @@ void actionAngleStaeckel_actionsFreqsAngles(int ndata,
 		     vmin,I3V,cosh2u0,potupi2,
 		     npot,actionAngleArgs,10);
   //Free
-  for (ii=0; ii < npot; ii++) {
-    if ( (actionAngleArgs+ii)->i2d )
-      interp_2d_free((actionAngleArgs+ii)->i2d) ;
-    if ((actionAngleArgs+ii)->accx )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accx);
-    if ((actionAngleArgs+ii)->accy )
-      gsl_interp_accel_free ((actionAngleArgs+ii)->accy);
-    free((actionAngleArgs+ii)->args);
-  }
-  free(actionAngleArgs);
   free(E);
   free(Lz);
   free(ux);
@@ -1353,6 +1537,167 @@ void calcAnglesStaeckel(int ndata,
   free(paramsv);
   gsl_integration_glfixed_table_free ( T );
 }
+static void calcUminUmaxOne(gsl_root_fsolver * s,
+			    gsl_function * JRRoot,
+			    double ux,
+			    double delta,
+			    double * umin,
+			    double * umax){
+  //Find umin and umax for a single phase-space point, starting from ux
+  int status;
+  int iter, max_iter = 100;
+  double u_lo, u_hi, peps, meps;
+  //Find starting points for minimum
+  if ( fabs(GSL_FN_EVAL(JRRoot,ux)) < 0.0000001){ //we are at umin or umax
+    peps= GSL_FN_EVAL(JRRoot,ux+0.000001);
+    meps= GSL_FN_EVAL(JRRoot,ux-0.000001);
+    if ( fabs(peps) < 0.00000001 && fabs(meps) < 0.00000001 ) {//circular
+      *umin = ux;
+      *umax = ux;
+    }
+    else if ( peps < 0. && meps > 0. ) {//umax
+      *umax= ux;
+      u_lo= 0.9 * (ux - 0.000001);
+      u_hi= ux - 0.0000001;
+      while ( GSL_FN_EVAL(JRRoot,u_lo) >= 0. && u_lo > 0.000000001){
+	u_hi= u_lo; //this makes sure that brent evaluates using previous
+	u_lo*= 0.9;
+      }
+      //Find root
+      status = gsl_root_fsolver_set (s, JRRoot, u_lo, u_hi);
+      if (status == GSL_EINVAL) {
+	*umin = 0.;//Assume zero if below 0.000000001
+      } else {
+	iter= 0;
+	do
+	  {
+	    iter++;
+	    status = gsl_root_fsolver_iterate (s);
+	    u_lo = gsl_root_fsolver_x_lower (s);
+	    u_hi = gsl_root_fsolver_x_upper (s);
+	    status = gsl_root_test_interval (u_lo, u_hi,
+					     9.9999999999999998e-13,
+					     4.4408920985006262e-16);
+	  }
+	while (status == GSL_CONTINUE && iter < max_iter);
+	// LCOV_EXCL_START
+	if (status == GSL_EINVAL) {//Shouldn't ever get here
+	  *umin = -9999.99;
+	  *umax = -9999.99;
+	  return;
+	}
+	// LCOV_EXCL_STOP
+	*umin = gsl_root_fsolver_root (s);
+      }
+    }
+    else if ( peps > 0. && meps < 0. ){//umin
+      *umin= ux;
+      u_lo= ux + 0.000001;
+      u_hi= 1.1 * (ux + 0.000001);
+      while ( GSL_FN_EVAL(JRRoot,u_hi) >= 0. && u_hi < asinh(37.5/delta)) {
+	u_lo= u_hi; //this makes sure that brent evaluates using previous
+	u_hi*= 1.1;
+      }
+      //Find root
+      status = gsl_root_fsolver_set (s, JRRoot, u_lo, u_hi);
+      if (status == GSL_EINVAL) {
+	*umin = -9999.99;
+	*umax = -9999.99;
+	return;
+      }
+      iter= 0;
+      do
+	{
+	  iter++;
+	  status = gsl_root_fsolver_iterate (s);
+	  u_lo = gsl_root_fsolver_x_lower (s);
+	  u_hi = gsl_root_fsolver_x_upper (s);
+	  status = gsl_root_test_interval (u_lo, u_hi,
+					   9.9999999999999998e-13,
+					   4.4408920985006262e-16);
+	}
+      while (status == GSL_CONTINUE && iter < max_iter);
+      // LCOV_EXCL_START
+      if (status == GSL_EINVAL) {//Shouldn't ever get here
+	*umin = -9999.99;
+	*umax = -9999.99;
+	return;
+      }
+      // LCOV_EXCL_STOP
+      *umax = gsl_root_fsolver_root (s);
+    }
+  }
+  else {
+    u_lo= 0.9 * ux;
+    u_hi= ux;
+    while ( GSL_FN_EVAL(JRRoot,u_lo) >= 0. && u_lo > 0.000000001){
+      u_hi= u_lo; //this makes sure that brent evaluates using previous
+      u_lo*= 0.9;
+    }
+    u_hi= (u_lo < 0.9 * ux) ? u_lo / 0.9 / 0.9: ux;
+    //Find root
+    status = gsl_root_fsolver_set (s, JRRoot, u_lo, u_hi);
+    if (status == GSL_EINVAL) {
+      *umin = 0.;//Assume zero if below 0.000000001
+    } else {
+      iter= 0;
+      do
+	{
+	  iter++;
+	  status = gsl_root_fsolver_iterate (s);
+	  u_lo = gsl_root_fsolver_x_lower (s);
+	  u_hi = gsl_root_fsolver_x_upper (s);
+	  status = gsl_root_test_interval (u_lo, u_hi,
+					   9.9999999999999998e-13,
+					   4.4408920985006262e-16);
+	}
+      while (status == GSL_CONTINUE && iter < max_iter);
+      // LCOV_EXCL_START
+      if (status == GSL_EINVAL) {//Shouldn't ever get here
+	*umin = -9999.99;
+	*umax = -9999.99;
+	return;
+      }
+      // LCOV_EXCL_STOP
+      *umin = gsl_root_fsolver_root (s);
+    }
+    //Find starting points for maximum
+    u_lo= ux;
+    u_hi= 1.1 * ux;
+    while ( GSL_FN_EVAL(JRRoot,u_hi) > 0. && u_hi < asinh(37.5/delta)) {
+      u_lo= u_hi; //this makes sure that brent evaluates using previous
+      u_hi*= 1.1;
+    }
+    u_lo= (u_hi > 1.1 * ux) ? u_hi / 1.1 / 1.1: ux;
+    //Find root
+    status = gsl_root_fsolver_set (s, JRRoot, u_lo, u_hi);
+    if (status == GSL_EINVAL) {
+      *umin = -9999.99;
+      *umax = -9999.99;
+      return;
+    }
+    iter= 0;
+    do
+      {
+	iter++;
+	status = gsl_root_fsolver_iterate (s);
+	u_lo = gsl_root_fsolver_x_lower (s);
+	u_hi = gsl_root_fsolver_x_upper (s);
+	status = gsl_root_test_interval (u_lo, u_hi,
+					 9.9999999999999998e-13,
+					 4.4408920985006262e-16);
+      }
+    while (status == GSL_CONTINUE && iter < max_iter);
+    // LCOV_EXCL_START
+    if (status == GSL_EINVAL) {//Shouldn't ever get here
+      *umin = -9999.99;
+      *umax = -9999.99;
+      return;
+    }
+    // LCOV_EXCL_STOP
+    *umax = gsl_root_fsolver_root (s);
+  }
+}
 void calcUminUmax(int ndata,
 		  double * umin,
 		  double * umax,
@@ -1375,15 +1720,11 @@ void calcUminUmax(int ndata,
 #else
   nthreads = 1;
 #endif
-  double peps, meps;
   gsl_function * JRRoot= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
   struct JRStaeckelArg * params= (struct JRStaeckelArg *) malloc ( nthreads * sizeof (struct JRStaeckelArg) );
   //Setup solver
-  int status;
-  int iter, max_iter = 100;
   const gsl_root_fsolver_type *T;
   struct pragmasolver *s= (struct pragmasolver *) malloc ( nthreads * sizeof (struct pragmasolver) );;
-  double u_lo, u_hi;
   T = gsl_root_fsolver_brent;
   for (tid=0; tid < nthreads; tid++){
     (params+tid)->delta= delta;
@@ -1394,8 +1735,8 @@ void calcUminUmax(int ndata,
   UNUSED int chunk= CHUNKSIZE;
   gsl_set_error_handler_off();
 #pragma omp parallel for schedule(static,chunk)				\
-  private(tid,ii,iter,status,u_lo,u_hi,meps,peps)				\
-  shared(umin,umax,JRRoot,params,s,ux,delta,E,Lz,I3U,u0,sinh2u0,v0,sin2v0,potu0v0,max_iter)
+  private(tid,ii)						\
+  shared(umin,umax,JRRoot,params,s,ux,delta,E,Lz,I3U,u0,sinh2u0,v0,sin2v0,potu0v0)
   for (ii=0; ii < ndata; ii++){
 #ifdef _OPENMP
     tid= omp_get_thread_num();
@@ -1413,156 +1754,7 @@ void calcUminUmax(int ndata,
     (params+tid)->potu0v0= *(potu0v0+ii);
     (JRRoot+tid)->function = &JRStaeckelIntegrandSquared;
     (JRRoot+tid)->params = params+tid;
-    //Find starting points for minimum
-    if ( fabs(GSL_FN_EVAL(JRRoot+tid,*(ux+ii))) < 0.0000001){ //we are at umin or umax
-      peps= GSL_FN_EVAL(JRRoot+tid,*(ux+ii)+0.000001);
-      meps= GSL_FN_EVAL(JRRoot+tid,*(ux+ii)-0.000001);
-      if ( fabs(peps) < 0.00000001 && fabs(meps) < 0.00000001 ) {//circular
-	*(umin+ii) = *(ux+ii);
-	*(umax+ii) = *(ux+ii);
-      }
-      else if ( peps < 0. && meps > 0. ) {//umax
-	*(umax+ii)= *(ux+ii);
-	u_lo= 0.9 * (*(ux+ii) - 0.000001);
-	u_hi= *(ux+ii) - 0.0000001;
-	while ( GSL_FN_EVAL(JRRoot+tid,u_lo) >= 0. && u_lo > 0.000000001){
-	  u_hi= u_lo; //this makes sure that brent evaluates using previous
-	  u_lo*= 0.9;
-	}
-	//Find root
-	status = gsl_root_fsolver_set ((s+tid)->s, JRRoot+tid, u_lo, u_hi);
-	if (status == GSL_EINVAL) {
-	  *(umin+ii) = 0.;//Assume zero if below 0.000000001
-	} else {
-	  iter= 0;
-	  do
-	    {
-	      iter++;
-	      status = gsl_root_fsolver_iterate ((s+tid)->s);
-	      u_lo = gsl_root_fsolver_x_lower ((s+tid)->s);
-	      u_hi = gsl_root_fsolver_x_upper ((s+tid)->s);
-	      status = gsl_root_test_interval (u_lo, u_hi,
-					       9.9999999999999998e-13,
-					       4.4408920985006262e-16);
-	    }
-	  while (status == GSL_CONTINUE && iter < max_iter);
-	  // LCOV_EXCL_START
-	  if (status == GSL_EINVAL) {//Shouldn't ever get here
-	    *(umin+ii) = -9999.99;
-	    *(umax+ii) = -9999.99;
-	    continue;
-	  }
-	  // LCOV_EXCL_STOP
-	  *(umin+ii) = gsl_root_fsolver_root ((s+tid)->s);
-	}
-      }
-      else if ( peps > 0. && meps < 0. ){//umin
-	*(umin+ii)= *(ux+ii);
-	u_lo= *(ux+ii) + 0.000001;
-	u_hi= 1.1 * (*(ux+ii) + 0.000001);
-	while ( GSL_FN_EVAL(JRRoot+tid,u_hi) >= 0. && u_hi < asinh(37.5/delta)) {
-	  u_lo= u_hi; //this makes sure that brent evaluates using previous
-	  u_hi*= 1.1;
-	}
-	//Find root
-	status = gsl_root_fsolver_set ((s+tid)->s, JRRoot+tid, u_lo, u_hi);
-	if (status == GSL_EINVAL) {
-	  *(umin+ii) = -9999.99;
-	  *(umax+ii) = -9999.99;
-	  continue;
-	}
-	iter= 0;
-	do
-	  {
-	    iter++;
-	    status = gsl_root_fsolver_iterate ((s+tid)->s);
-	    u_lo = gsl_root_fsolver_x_lower ((s+tid)->s);
-	    u_hi = gsl_root_fsolver_x_upper ((s+tid)->s);
-	    status = gsl_root_test_interval (u_lo, u_hi,
-					     9.9999999999999998e-13,
-					     4.4408920985006262e-16);
-	  }
-	while (status == GSL_CONTINUE && iter < max_iter);
-	// LCOV_EXCL_START
-	if (status == GSL_EINVAL) {//Shouldn't ever get here
-	  *(umin+ii) = -9999.99;
-	  *(umax+ii) = -9999.99;
-	  continue;
-	}
-	// LCOV_EXCL_STOP
-	*(umax+ii) = gsl_root_fsolver_root ((s+tid)->s);
-      }
-    }
-    else {
-      u_lo= 0.9 * *(ux+ii);
-      u_hi= *(ux+ii);
-      while ( GSL_FN_EVAL(JRRoot+tid,u_lo) >= 0. && u_lo > 0.000000001){
-	u_hi= u_lo; //this makes sure that brent evaluates using previous
-	u_lo*= 0.9;
-      }
-      u_hi= (u_lo < 0.9 * *(ux+ii)) ? u_lo / 0.9 / 0.9: *(ux+ii);
-      //Find root
-      status = gsl_root_fsolver_set ((s+tid)->s, JRRoot+tid, u_lo, u_hi);
-      if (status == GSL_EINVAL) {
-	*(umin+ii) = 0.;//Assume zero if below 0.000000001
-      } else {
-	iter= 0;
-	do
-	  {
-	    iter++;
-	    status = gsl_root_fsolver_iterate ((s+tid)->s);
-	    u_lo = gsl_root_fsolver_x_lower ((s+tid)->s);
-	    u_hi = gsl_root_fsolver_x_upper ((s+tid)->s);
-	    status = gsl_root_test_interval (u_lo, u_hi,
-					     9.9999999999999998e-13,
-					     4.4408920985006262e-16);
-	  }
-	while (status == GSL_CONTINUE && iter < max_iter);
-	// LCOV_EXCL_START
-	if (status == GSL_EINVAL) {//Shouldn't ever get here
-	  *(umin+ii) = -9999.99;
-	  *(umax+ii) = -9999.99;
-	  continue;
-	}
-	// LCOV_EXCL_STOP
-	*(umin+ii) = gsl_root_fsolver_root ((s+tid)->s);
-      }
-      //Find starting points for maximum
-      u_lo= *(ux+ii);
-      u_hi= 1.1 * *(ux+ii);
-      while ( GSL_FN_EVAL(JRRoot+tid,u_hi) > 0. && u_hi < asinh(37.5/delta)) {
-	u_lo= u_hi; //this makes sure that brent evaluates using previous
-	u_hi*= 1.1;
-      }
-      u_lo= (u_hi > 1.1 * *(ux+ii)) ? u_hi / 1.1 / 1.1: *(ux+ii);
-      //Find root
-      status = gsl_root_fsolver_set ((s+tid)->s, JRRoot+tid, u_lo, u_hi);
-      if (status == GSL_EINVAL) {
-	*(umin+ii) = -9999.99;
-	*(umax+ii) = -9999.99;
-	continue;
-      }
-      iter= 0;
-      do
-	{
-	  iter++;
-	  status = gsl_root_fsolver_iterate ((s+tid)->s);
-	  u_lo = gsl_root_fsolver_x_lower ((s+tid)->s);
-	  u_hi = gsl_root_fsolver_x_upper ((s+tid)->s);
-	  status = gsl_root_test_interval (u_lo, u_hi,
-					   9.9999999999999998e-13,
-					   4.4408920985006262e-16);
-	}
-      while (status == GSL_CONTINUE && iter < max_iter);
-      // LCOV_EXCL_START
-      if (status == GSL_EINVAL) {//Shouldn't ever get here
-	*(umin+ii) = -9999.99;
-	*(umax+ii) = -9999.99;
-	continue;
-      }
-      // LCOV_EXCL_STOP
-      *(umax+ii) = gsl_root_fsolver_root ((s+tid)->s);
-    }
+    calcUminUmaxOne((s+tid)->s,JRRoot+tid,*(ux+ii),delta,umin+ii,umax+ii);
   }
   gsl_set_error_handler (NULL);
   for (tid=0; tid < nthreads; tid++)
@@ -1571,6 +1763,58 @@ void calcUminUmax(int ndata,
   free(JRRoot);
   free(params);
 }
+static void calcVminOne(gsl_root_fsolver * s,
+			gsl_function * JzRoot,
+			double vx,
+			double * vmin){
+  //Find vmin for a single phase-space point, starting from vx
+  int status;
+  int iter, max_iter = 100;
+  double v_lo, v_hi;
+  //Find starting points for minimum
+  if ( fabs(GSL_FN_EVAL(JzRoot,vx)) < 0.0000001) //we are at vmin
+    *vmin= ( vx > 0.5 * M_PI ) ? M_PI - vx: vx;
+  else {
+    if ( vx > 0.5 * M_PI ){
+      v_lo= 0.9 * ( M_PI - vx );
+      v_hi= M_PI - vx;
+    }
+    else {
+      v_lo= 0.9 * vx;
+      v_hi= vx;
+    }
+    while ( GSL_FN_EVAL(JzRoot,v_lo) >= 0. && v_lo > 0.000000001){
+      v_hi= v_lo; //this makes sure that brent evaluates using previous
+      v_lo*= 0.9;
+    }
+    //Find root
+    status = gsl_root_fsolver_set (s, JzRoot, v_lo, v_hi);
+    if (status == GSL_EINVAL) {
+      *vmin = -9999.99;
+      return;
+    }
+    iter= 0;
+    do
+      {
+	iter++;
+	status = gsl_root_fsolver_iterate (s);
+	v_lo = gsl_root_fsolver_x_lower (s);
+	v_hi = gsl_root_fsolver_x_upper (s);
+	status = gsl_root_test_interval (v_lo, v_hi,
+					 9.9999999999999998e-13,
+					 4.4408920985006262e-16);
+      }
+    while (status == GSL_CONTINUE && iter < max_iter);
+    // LCOV_EXCL_START
+    if (status == GSL_EINVAL) {//Shouldn't ever get here
+      *vmin = -9999.99;
+      return;
+    }
+    // LCOV_EXCL_STOP
+    *vmin = gsl_root_fsolver_root (s);
+    fflush(stdout);
+  }
+}
 void calcVmin(int ndata,
 	      double * vmin,
 	      double * vx,
@@ -1594,11 +1838,8 @@ void calcVmin(int ndata,
   gsl_function * JzRoot= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
   struct JzStaeckelArg * params= (struct JzStaeckelArg *) malloc ( nthreads * sizeof (struct JzStaeckelArg) );
   //Setup solver
-  int status;
-  int iter, max_iter = 100;
   const gsl_root_fsolver_type *T;
   struct pragmasolver *s= (struct pragmasolver *) malloc ( nthreads * sizeof (struct pragmasolver) );;
-  double v_lo, v_hi;
   T = gsl_root_fsolver_brent;
   for (tid=0; tid < nthreads; tid++){
     (params+tid)->delta= delta;
@@ -1609,8 +1850,8 @@ void calcVmin(int ndata,
   UNUSED int chunk= CHUNKSIZE;
   gsl_set_error_handler_off();
 #pragma omp parallel for schedule(static,chunk)				\
-  private(tid,ii,iter,status,v_lo,v_hi)				\
-  shared(vmin,JzRoot,params,s,vx,delta,E,Lz,I3V,u0,cosh2u0,sinh2u0,potupi2,max_iter)
+  private(tid,ii)						\
+  shared(vmin,JzRoot,params,s,vx,delta,E,Lz,I3V,u0,cosh2u0,sinh2u0,potupi2)
   for (ii=0; ii < ndata; ii++){
 #ifdef _OPENMP
     tid= omp_get_thread_num();
@@ -1627,48 +1868,230 @@ void calcVmin(int ndata,
     (params+tid)->potupi2= *(potupi2+ii);
     (JzRoot+tid)->function = &JzStaeckelIntegrandSquared;
     (JzRoot+tid)->params = params+tid;
-    //Find starting points for minimum
-    if ( fabs(GSL_FN_EVAL(JzRoot+tid,*(vx+ii))) < 0.0000001) //we are at vmin
-      *(vmin+ii)= ( *(vx+ii) > 0.5 * M_PI ) ? M_PI - *(vx+ii): *(vx+ii);
-    else {
-      if ( *(vx+ii) > 0.5 * M_PI ){
-	v_lo= 0.9 * ( M_PI - *(vx+ii) );
-	v_hi= M_PI - *(vx+ii);
-      }
-      else {
-	v_lo= 0.9 * *(vx+ii);
-	v_hi= *(vx+ii);
-      }
-      while ( GSL_FN_EVAL(JzRoot+tid,v_lo) >= 0. && v_lo > 0.000000001){
-	v_hi= v_lo; //this makes sure that brent evaluates using previous
-	v_lo*= 0.9;
-      }
-      //Find root
-      status = gsl_root_fsolver_set ((s+tid)->s, JzRoot+tid, v_lo, v_hi);
-      if (status == GSL_EINVAL) {
-	*(vmin+ii) = -9999.99;
+    calcVminOne((s+tid)->s,JzRoot+tid,*(vx+ii),vmin+ii);
+  }
+  gsl_set_error_handler (NULL);
+  for (tid=0; tid < nthreads; tid++)
+    gsl_root_fsolver_free( (s+tid)->s);
+  free(s);
+  free(JzRoot);
+  free(params);
+}static int calcRootWarm(gsl_function * F,
+			double * x,
+			int kk,
+			double x_min,
+			double x_max,
+			double * root){
+  //Find the root of F for time sample kk of an orbit, given the roots x[-1],
+  //x[-2],... for the previous samples: bracket the root around the linear
+  //extrapolation of the previous roots within [x_min,x_max] (widening the
+  //bracket a few times if necessary) and refine it using the Illinois
+  //variant of regula falsi, which converges quickly from a tight bracket;
+  //returns non-zero if the root could not be bracketed
+  int ii;
+  double guess, width, a, b, c, fa, fb, fc;
+  if ( kk > 2 ) {
+    guess= 2. * *(x-1) - *(x-2);
+    width= 2. * fabs( *(x-1) - 2. * *(x-2) + *(x-3) );
+  }
+  else if ( kk > 1 ) {
+    guess= 2. * *(x-1) - *(x-2);
+    width= fabs( *(x-1) - *(x-2) );
+  }
+  else {
+    guess= *(x-1);
+    width= 0.001 * *(x-1);
+  }
+  width+= 0.000001 * *(x-1);
+  for (ii=0; ii < 5; ii++){
+    a= ( guess - width > x_min ) ? guess - width : x_min;
+    b= ( guess + width < x_max ) ? guess + width : x_max;
+    fa= GSL_FN_EVAL(F,a);
+    fb= GSL_FN_EVAL(F,b);
+    if ( fa * fb <= 0. ) break;
+    width*= 10.;
+  }
+  if ( fa * fb > 0. ) return -1;
+  for (ii=0; ii < 100; ii++){
+    if ( fb == 0. || fabs(b-a) < 9.9999999999999998e-13 ) break;
+    if ( fa == 0. ) {
+      b= a;
+      break;
+    }
+    c= ( a * fb - b * fa ) / ( fb - fa );
+    //Converged when the step is tiny
+    if ( fabs(c-b) < 9.9999999999999998e-13 ) {
+      b= c;
+      break;
+    }
+    fc= GSL_FN_EVAL(F,c);
+    //Where the sign changes, b becomes the other end of the bracket,
+    //otherwise halve the function value at a to avoid stagnation
+    if ( fc * fb < 0. ) {
+      a= b;
+      fa= fb;
+    }
+    else
+      fa/= 2.;
+    b= c;
+    fb= fc;
+  }
+  *root= b;
+  return 0;
+}
+void calcUminUmaxTimeSeries(int nobj,
+			    int nt,
+			    double * umin,
+			    double * umax,
+			    double * ux,
+			    double * pux,
+			    double * E,
+			    double * Lz,
+			    double * I3U,
+			    double delta,
+			    double * u0,
+			    double * sinh2u0,
+			    double * v0,
+			    double * sin2v0,
+			    double * potu0v0,
+			    int nargs,
+			    struct potentialArg * actionAngleArgs){
+  //Same as calcUminUmax, but for nobj orbits each sampled at nt times (the
+  //nt samples of an orbit are consecutive); the solution for the previous
+  //time sample of the same orbit is used as the starting point
+  int ii, jj, kk, tid, nthreads;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+#else
+  nthreads = 1;
+#endif
+  double umaxmax= asinh(37.5/delta);
+  gsl_function * JRRoot= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
+  struct JRStaeckelArg * params= (struct JRStaeckelArg *) malloc ( nthreads * sizeof (struct JRStaeckelArg) );
+  //Setup solver
+  const gsl_root_fsolver_type *T;
+  struct pragmasolver *s= (struct pragmasolver *) malloc ( nthreads * sizeof (struct pragmasolver) );;
+  T = gsl_root_fsolver_brent;
+  for (tid=0; tid < nthreads; tid++){
+    (params+tid)->delta= delta;
+    (params+tid)->nargs= nargs;
+    (params+tid)->actionAngleArgs= actionAngleArgs;
+    (s+tid)->s= gsl_root_fsolver_alloc (T);
+  }
+  UNUSED int chunk= CHUNKSIZE;
+  gsl_set_error_handler_off();
+#pragma omp parallel for schedule(static,chunk)			\
+  private(tid,ii,jj,kk)						\
+  shared(umin,umax,JRRoot,params,s,ux,delta,E,Lz,I3U,u0,sinh2u0,v0,sin2v0,potu0v0,umaxmax)
+  for (jj=0; jj < nobj; jj++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    for (kk=0; kk < nt; kk++){
+      ii= jj * nt + kk;
+      //Setup function
+      (params+tid)->E= *(E+ii);
+      (params+tid)->Lz22delta= 0.5 * *(Lz+ii) * *(Lz+ii) / delta / delta;
+      (params+tid)->I3U= *(I3U+ii);
+      (params+tid)->u0= *(u0+ii);
+      (params+tid)->sinh2u0= *(sinh2u0+ii);
+      (params+tid)->v0= *(v0+ii);
+      (params+tid)->sin2v0= *(sin2v0+ii);
+      (params+tid)->potu0v0= *(potu0v0+ii);
+      (JRRoot+tid)->function = &JRStaeckelIntegrandSquared;
+      (JRRoot+tid)->params = params+tid;
+      //Warm start from the previous samples, unless this or the previous
+      //sample is (close to) a special case that calcUminUmaxOne handles;
+      //JRStaeckelIntegrandSquared at ux is pux^2/2/delta^2
+      if ( kk > 0
+	   && *(umin+ii-1) > 0.000000001
+	   && *(umax+ii-1) > *(umin+ii-1)
+	   && 0.5 * *(pux+ii) * *(pux+ii) / delta / delta >= 0.0000001
+	   && !calcRootWarm(JRRoot+tid,umin+ii,kk,0.000000001,*(ux+ii),
+			    umin+ii)
+	   && !calcRootWarm(JRRoot+tid,umax+ii,kk,*(ux+ii),umaxmax,
+			    umax+ii) )
 	continue;
-      }
-      iter= 0;
-      do
-	{
-	  iter++;
-	  status = gsl_root_fsolver_iterate ((s+tid)->s);
-	  v_lo = gsl_root_fsolver_x_lower ((s+tid)->s);
-	  v_hi = gsl_root_fsolver_x_upper ((s+tid)->s);
-	  status = gsl_root_test_interval (v_lo, v_hi,
-					   9.9999999999999998e-13,
-					   4.4408920985006262e-16);
-	}
-      while (status == GSL_CONTINUE && iter < max_iter);
-      // LCOV_EXCL_START
-      if (status == GSL_EINVAL) {//Shouldn't ever get here
-	*(vmin+ii) = -9999.99;
+      calcUminUmaxOne((s+tid)->s,JRRoot+tid,*(ux+ii),delta,umin+ii,umax+ii);
+    }
+  }
+  gsl_set_error_handler (NULL);
+  for (tid=0; tid < nthreads; tid++)
+    gsl_root_fsolver_free( (s+tid)->s);
+  free(s);
+  free(JRRoot);
+  free(params);
+}
+void calcVminTimeSeries(int nobj,
+			int nt,
+			double * vmin,
+			double * vx,
+			double * pvx,
+			double * E,
+			double * Lz,
+			double * I3V,
+			double delta,
+			double * u0,
+			double * cosh2u0,
+			double * sinh2u0,
+			double * potupi2,
+			int nargs,
+			struct potentialArg * actionAngleArgs){
+  //Same as calcVmin, but for nobj orbits each sampled at nt times, using
+  //the solution for the previous time sample as the starting point
+  int ii, jj, kk, tid, nthreads;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+#else
+  nthreads = 1;
+#endif
+  double vxf;
+  gsl_function * JzRoot= (gsl_function *) malloc ( nthreads * sizeof(gsl_function) );
+  struct JzStaeckelArg * params= (struct JzStaeckelArg *) malloc ( nthreads * sizeof (struct JzStaeckelArg) );
+  //Setup solver
+  const gsl_root_fsolver_type *T;
+  struct pragmasolver *s= (struct pragmasolver *) malloc ( nthreads * sizeof (struct pragmasolver) );;
+  T = gsl_root_fsolver_brent;
+  for (tid=0; tid < nthreads; tid++){
+    (params+tid)->delta= delta;
+    (params+tid)->nargs= nargs;
+    (params+tid)->actionAngleArgs= actionAngleArgs;
+    (s+tid)->s= gsl_root_fsolver_alloc (T);
+  }
+  UNUSED int chunk= CHUNKSIZE;
+  gsl_set_error_handler_off();
+#pragma omp parallel for schedule(static,chunk)			\
+  private(tid,ii,jj,kk,vxf)					\
+  shared(vmin,JzRoot,params,s,vx,delta,E,Lz,I3V,u0,cosh2u0,sinh2u0,potupi2)
+  for (jj=0; jj < nobj; jj++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    for (kk=0; kk < nt; kk++){
+      ii= jj * nt + kk;
+      //Setup function
+      (params+tid)->E= *(E+ii);
+      (params+tid)->Lz22delta= 0.5 * *(Lz+ii) * *(Lz+ii) / delta / delta;
+      (params+tid)->I3V= *(I3V+ii);
+      (params+tid)->u0= *(u0+ii);
+      (params+tid)->cosh2u0= *(cosh2u0+ii);
+      (params+tid)->sinh2u0= *(sinh2u0+ii);
+      (params+tid)->potupi2= *(potupi2+ii);
+      (JzRoot+tid)->function = &JzStaeckelIntegrandSquared;
+      (JzRoot+tid)->params = params+tid;
+      //Warm start from the previous samples, unless we are at vmin;
+      //JzStaeckelIntegrandSquared at vx is pvx^2/2/delta^2
+      vxf= ( *(vx+ii) > 0.5 * M_PI ) ? M_PI - *(vx+ii): *(vx+ii);
+      if ( kk > 0
+	   && *(vmin+ii-1) > 0.000000001
+	   && 0.5 * *(pvx+ii) * *(pvx+ii) / delta / delta >= 0.0000001
+	   && !calcRootWarm(JzRoot+tid,vmin+ii,kk,0.000000001,vxf,vmin+ii) )
 	continue;
-      }
-      // LCOV_EXCL_STOP
-      *(vmin+ii) = gsl_root_fsolver_root ((s+tid)->s);
-      fflush(stdout);
+      calcVminOne((s+tid)->s,JzRoot+tid,*(vx+ii),vmin+ii);
     }
   }
   gsl_set_error_handler (NULL);
@@ -1679,6 +2102,7 @@ void calcVmin(int ndata,
   free(params);
 }
 
+
 double JRStaeckelIntegrand(double u,
 			   void * p){
   double out= JRStaeckelIntegrandSquared(u,p);
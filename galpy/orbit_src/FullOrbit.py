@@ -8,13 +8,19 @@ if int(scipy.__version__.split('.')[1]) < 10: #pragma: no cover
 else:
     from scipy.misc import logsumexp
 from galpy.potential_src.Potential import _evaluateRforces, _evaluatezforces,\
-    evaluatePotentials, _evaluatephiforces, evaluateDensities
+    evaluatePotentials, _evaluatephiforces, evaluateDensities, \
+    _evaluatePotentials, evaluatez2derivs, evaluateRzderivs
+from galpy.potential_src.planarPotential import \
+    FullPotentialFromplanarPotential
 from galpy.util import galpyWarning
 import galpy.util.bovy_plot as plot
 import galpy.util.bovy_symplecticode as symplecticode
 import galpy.util.bovy_coords as coords
 #try:
-from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c, _ext_loaded
+from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c, \
+    integrateFullOrbit_dxdv_c, integrateFullOrbit_extrema_c, _ext_loaded
+from galpy.potential_src.CompiledPotential import CompiledPotential, \
+    _underlying_pot
 ext_loaded= _ext_loaded
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.orbit_src.OrbitTop import OrbitTop
@@ -22,6 +28,7 @@ _ORBFITNORMRADEC= 360.
 _ORBFITNORMDIST= 10.
 _ORBFITNORMPMRADEC= 4.
 _ORBFITNORMVLOS= 200.
+_CHUNKSIZE= 100000
 class FullOrbit(OrbitTop):
     """Class that holds and integrates orbits in full 3D potentials"""
     def __init__(self,vxvv=[1.,0.,0.9,0.,0.1],vo=220.,ro=8.0,zo=0.025,
@@ -62,7 +69,8 @@ class FullOrbit(OrbitTop):
                           ro=ro,zo=zo,vo=vo,solarmotion=solarmotion)
         return None
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  out_acc=None):
         """
         NAME:
            integrate
@@ -78,6 +86,8 @@ class FullOrbit(OrbitTop):
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           out= (None) if set, [len(t),6] C-contiguous float64 array (e.g., a numpy.memmap) to store the orbit in
+           out_acc= (None) if set, [len(t),3] C-contiguous float64 array to store the accelerations for the dense output in (C integrators only)
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
@@ -85,10 +95,94 @@ class FullOrbit(OrbitTop):
         """
         #Reset things that may have been defined by a previous integration
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'_extrema'): delattr(self,'_extrema')
         if hasattr(self,'rs'): delattr(self,'rs')
         self.t= nu.array(t)
-        self._pot= pot
-        self.orbit= _integrateFullOrbit(self.vxvv,pot,t,method,dt)
+        self._pot= _underlying_pot(pot)
+        self.orbit, acc= _integrateFullOrbit(self.vxvv,pot,t,method,dt,
+                                             dense=True,buf=out,
+                                             buf_acc=out_acc)
+        if not acc is None: self._dense_acc= acc
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=_CHUNKSIZE,dense=False):
+        """
+        NAME:
+           integrate_chunks
+        PURPOSE:
+           integrate the orbit, yielding the orbit in chunks of output times rather than storing it
+        INPUT:
+           t - list of times at which to output (0 has to be in this!)
+           pot - potential instance or list of instances
+           method= integration method (see integrate)
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           chunksize= (100000) number of output times in each chunk
+           dense= (False) if True, also yield the [len(chunk),3] rectangular acceleration from the C integrators (None for the Python integrators)
+        OUTPUT:
+           generator of (t[chunk],[len(chunk),6] array of [R,vR,vT,z,vz,phi](,acc[chunk]))
+        """
+        for chunk in _integrateFullOrbits_chunks(\
+            nu.reshape(self.vxvv,(6,1)),pot,t,method,dt,chunksize,
+            dense=dense):
+            if dense:
+                yield (chunk[0],chunk[1][0],
+                       None if chunk[2] is None else chunk[2][0])
+            else:
+                yield (chunk[0],chunk[1][0])
+
+    def integrate_extrema(self,t,pot,method='dopr54_c',dt=None):
+        """
+        NAME:
+           integrate_extrema
+        PURPOSE:
+           integrate the orbit, only keeping track of its pericenter, apocenter, and maximum height (returned by rperi, rap, zmax, and e afterwards) without storing the orbit
+        INPUT:
+           t - list of times at which the orbit is computed (0 has to be in this!); the extrema are located in between these
+           pot - potential instance or list of instances
+           method= integration method (see integrate)
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+        OUTPUT:
+           (none)
+        """
+        _reset_integration(self)
+        self._pot= _underlying_pot(pot)
+        self._extrema= _integrateFullOrbits_extrema(\
+            nu.reshape(self.vxvv,(6,1)),pot,t,method,dt)[0]
+
+    def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
+                       rectIn=False,rectOut=False):
+        """
+        NAME:
+           integrate_dxdv
+        PURPOSE:
+           integrate the orbit and a small volume of phase space
+        INPUT:
+           dxdv - [dR,dvR,dvT,dz,dvz,dphi]
+           t - list of times at which to output (0 has to be in this!)
+           pot - potential instance or list of instances
+           method= 'odeint' for scipy's odeint
+                   'rk4_c' for a 4th-order Runge-Kutta integrator in C
+                   'rk6_c' for a 6-th order Runge-Kutta integrator in C
+                   'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+           rectIn= (False) if True, input dxdv is in rectangular coordinates [dx,dy,dz,dvx,dvy,dvz]
+           rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
+        OUTPUT:
+           (none) (get the actual orbit using getOrbit_dxdv()
+        """
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'_extrema'): delattr(self,'_extrema')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        thispot= _underlying_pot(pot)
+        self.t= nu.array(t)
+        self._pot_dxdv= thispot
+        self._pot= thispot
+        self.orbit_dxdv, msg= _integrateFullOrbit_dxdv(self.vxvv,dxdv,thispot,
+                                                       t,method,
+                                                       rectIn,rectOut)
+        self.orbit= self.orbit_dxdv[:,:6]
+        return msg
 
     @physical_conversion('energy')
     def Jacobi(self,*args,**kwargs):
@@ -295,6 +389,9 @@ class FullOrbit(OrbitTop):
             self._setupaA(pot=pot,type='adiabatic')
             (rperi,rap)= self._aA.calcRapRperi(self)
             return (rap-rperi)/(rap+rperi)
+        if hasattr(self,'_extrema'):
+            return (self._extrema[1]-self._extrema[0])\
+                /(self._extrema[1]+self._extrema[0])
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
         if not hasattr(self,'rs'):
@@ -320,6 +417,8 @@ class FullOrbit(OrbitTop):
             self._setupaA(pot=pot,type='adiabatic')
             (rperi,rap)= self._aA.calcRapRperi(self)
             return rap
+        if hasattr(self,'_extrema'):
+            return self._extrema[1]
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
         if not hasattr(self,'rs'):
@@ -345,6 +444,8 @@ class FullOrbit(OrbitTop):
             self._setupaA(pot=pot,type='adiabatic')
             (rperi,rap)= self._aA.calcRapRperi(self)
             return rperi
+        if hasattr(self,'_extrema'):
+            return self._extrema[0]
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
         if not hasattr(self,'rs'):
@@ -371,6 +472,8 @@ class FullOrbit(OrbitTop):
             self._setupaA(pot=pot,type='adiabatic')
             zmax= self._aA.calczmax(self)
             return zmax
+        if hasattr(self,'_extrema'):
+            return self._extrema[2]
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
         return nu.amax(nu.fabs(self.orbit[:,3]))
@@ -542,7 +645,8 @@ class FullOrbit(OrbitTop):
             plot.bovy_plot(self.orbit[:,4],nu.array(self.EzJz)/self.EzJz[0],
                            *args,**kwargs)
 
-def _integrateFullOrbit(vxvv,pot,t,method,dt):
+def _integrateFullOrbit(vxvv,pot,t,method,dt,dense=False,buf=None,
+                        buf_acc=None):
     """
     NAME:
        _integrateFullOrbit
@@ -551,15 +655,22 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
     INPUT:
        vxvv - array with the initial conditions stacked like
               [R,vR,vT,z,vz,phi]; vR outward!
-       pot - Potential instance
+       pot - Potential instance (or CompiledPotential)
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the rectangular acceleration at each t from the C integrators (None for the Python integrators)
+       buf= (None) if set, [len(t),6] array to store the output in (the C integrators directly write into it)
+       buf_acc= (None) if set, [len(t),3] array to store the acceleration in when dense (the C integrators directly write into it)
     OUTPUT:
-       [:,5] array of [R,vR,vT,z,vz,phi] at each t
+       [:,5] array of [R,vR,vT,z,vz,phi] at each t (, [:,3] acceleration if dense)
     HISTORY:
        2010-08-01 - Written - Bovy (NYU)
     """
+    acc= None
+    # C integrators can use a CompiledPotential directly, Python ones cannot
+    cpot= pot
+    pot= _underlying_pot(pot)
     #First check that the potential has C
     if '_c' in method:
         if isinstance(pot,list):
@@ -606,22 +717,32 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
                              vxvv[1]*nu.cos(vxvv[5])-vxvv[2]*nu.sin(vxvv[5]),
                              vxvv[2]*nu.cos(vxvv[5])+vxvv[1]*nu.sin(vxvv[5]),
                              vxvv[4]])
-        #integrate
-        tmp_out, msg= integrateFullOrbit_c(pot,this_vxvv,
-                                           t,method,dt=dt)
-        #go back to the cylindrical frame
-        R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
-        phi= nu.arccos(tmp_out[:,0]/R)
-        phi[(tmp_out[:,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[:,1] < 0.)]
-        vR= tmp_out[:,3]*nu.cos(phi)+tmp_out[:,4]*nu.sin(phi)
-        vT= tmp_out[:,4]*nu.cos(phi)-tmp_out[:,3]*nu.sin(phi)
-        out= nu.zeros((len(t),6))
-        out[:,0]= R
-        out[:,1]= vR
-        out[:,2]= vT
-        out[:,5]= phi
-        out[:,3]= tmp_out[:,2]
-        out[:,4]= tmp_out[:,5]
+        if not buf is None:
+            #integrate directly into buf and go back to the cylindrical
+            #frame in place
+            acc, msg= integrateFullOrbit_c(cpot,this_vxvv,t,method,dt=dt,
+                                           dense=True,out=buf,
+                                           out_acc=buf_acc)[1:]
+            out= buf
+            _rectToCyl_inplace(out)
+        else:
+            #integrate
+            tmp_out, acc, msg= integrateFullOrbit_c(cpot,this_vxvv,
+                                                    t,method,dt=dt,
+                                                    dense=True)
+            #go back to the cylindrical frame
+            R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+            phi= nu.arccos(tmp_out[:,0]/R)
+            phi[(tmp_out[:,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[:,1] < 0.)]
+            vR= tmp_out[:,3]*nu.cos(phi)+tmp_out[:,4]*nu.sin(phi)
+            vT= tmp_out[:,4]*nu.cos(phi)-tmp_out[:,3]*nu.sin(phi)
+            out= nu.zeros((len(t),6))
+            out[:,0]= R
+            out[:,1]= vR
+            out[:,2]= vT
+            out[:,5]= phi
+            out[:,3]= tmp_out[:,2]
+            out[:,4]= tmp_out[:,5]
     elif method.lower() == 'odeint' or not ext_loaded:
         vphi= vxvv[2]/vxvv[0]
         init= [vxvv[0],vxvv[1],vxvv[5],vphi,vxvv[3],vxvv[4]]
@@ -634,12 +755,281 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
         out[:,3]= intOut[:,4]
         out[:,4]= intOut[:,5]
         out[:,5]= intOut[:,2]
+    if not buf is None and not out is buf:
+        buf[:]= out
+        out= buf
     #post-process to remove negative radii
     neg_radii= (out[:,0] < 0.)
     out[neg_radii,0]= -out[neg_radii,0]
     out[neg_radii,5]+= m.pi
+    if dense:
+        return (out,acc)
+    else:
+        return out
+
+def _integrateFullOrbits(vxvv,pot,t,method,dt,dense=False,buf=None,
+                         buf_acc=None):
+    """
+    NAME:
+       _integrateFullOrbits
+    PURPOSE:
+       integrate N orbits in a Phi(R,z,phi) potential
+    INPUT:
+       vxvv - [6,N] array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       pot - Potential instance (or CompiledPotential)
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint' or 'leapfrog' or any of the C methods
+       dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the rectangular acceleration at each t from the C integrators (None for the Python integrators)
+       buf= (None) if set, [N,nt,6] C-contiguous array to store the output in (the C integrators directly write into it)
+       buf_acc= (None) if set, [N,nt,3] C-contiguous array to store the acceleration in when dense (the C integrators directly write into it)
+    OUTPUT:
+       [N,nt,6] array of [R,vR,vT,z,vz,phi] at each t (, [N,nt,3] acceleration if dense)
+    """
+    vxvv= nu.array(vxvv)
+    cpot= pot
+    pot= _underlying_pot(pot)
+    if '_c' in method:
+        if isinstance(pot,list):
+            allHasC= nu.prod([p.hasC for p in pot])
+        else:
+            allHasC= pot.hasC
+    if not ext_loaded or not '_c' in method or not allHasC:
+        # Fall back onto the single-orbit integrators
+        if buf is None:
+            out= nu.array([_integrateFullOrbit(vxvv[:,ii],cpot,t,method,dt)
+                           for ii in range(vxvv.shape[1])])
+        else:
+            for ii in range(vxvv.shape[1]):
+                _integrateFullOrbit(vxvv[:,ii],cpot,t,method,dt,buf=buf[ii])
+            out= buf
+        if dense:
+            return (out,None)
+        else:
+            return out
+    warnings.warn("Using C implementation to integrate orbits",
+                  galpyWarning)
+    #go to the rectangular frame
+    this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[5]),
+                         vxvv[0]*nu.sin(vxvv[5]),
+                         vxvv[3],
+                         vxvv[1]*nu.cos(vxvv[5])-vxvv[2]*nu.sin(vxvv[5]),
+                         vxvv[2]*nu.cos(vxvv[5])+vxvv[1]*nu.sin(vxvv[5]),
+                         vxvv[4]]).T
+    if not buf is None:
+        #integrate all orbits directly into buf and go back to the
+        #cylindrical frame in place
+        acc, msg= integrateFullOrbit_c(cpot,this_vxvv,t,method,dt=dt,
+                                       dense=True,out=buf,
+                                       out_acc=buf_acc)[1:]
+        out= buf
+        _rectToCyl_inplace(out)
+        if dense:
+            return (out,acc)
+        else:
+            return out
+    #integrate all orbits in one go
+    tmp_out, acc, msg= integrateFullOrbit_c(cpot,this_vxvv,t,method,dt=dt,
+                                            dense=True)
+    #go back to the cylindrical frame
+    R= nu.sqrt(tmp_out[...,0]**2.+tmp_out[...,1]**2.)
+    phi= nu.arccos(tmp_out[...,0]/R)
+    phi[(tmp_out[...,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[...,1] < 0.)]
+    vR= tmp_out[...,3]*nu.cos(phi)+tmp_out[...,4]*nu.sin(phi)
+    vT= tmp_out[...,4]*nu.cos(phi)-tmp_out[...,3]*nu.sin(phi)
+    out= nu.zeros((vxvv.shape[1],len(t),6))
+    out[...,0]= R
+    out[...,1]= vR
+    out[...,2]= vT
+    out[...,5]= phi
+    out[...,3]= tmp_out[...,2]
+    out[...,4]= tmp_out[...,5]
+    if dense:
+        return (out,acc)
+    else:
+        return out
+
+def _integrateFullOrbits_chunks(vxvv,pot,t,method,dt,chunksize,dense=False):
+    """
+    NAME:
+       _integrateFullOrbits_chunks
+    PURPOSE:
+       integrate N orbits in a Phi(R,z,phi) potential, yielding the orbits in chunks of output times; each chunk is integrated starting from the last phase-space position of the previous chunk
+    INPUT:
+       vxvv - [6,N] array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       pot - Potential instance (or CompiledPotential)
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint' or 'leapfrog' or any of the C methods
+       dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       chunksize - number of output times in each chunk (>= 2)
+       dense= (False) if True, also yield the [N,len(chunk),3] rectangular acceleration at each t from the C integrators (None for the Python integrators)
+    OUTPUT:
+       generator of (t[chunk],[N,len(chunk),6] array of [R,vR,vT,z,vz,phi](,acc[chunk]))
+    """
+    if chunksize < 2:
+        raise ValueError("chunksize for chunked orbit integration must be at least 2")
+    # Set up the C potential only once
+    if '_c' in method and not isinstance(pot,CompiledPotential):
+        pot= CompiledPotential(pot)
+    t= nu.array(t)
+    vxvv= nu.array(vxvv)
+    ii= 0
+    while ii < len(t):
+        jj= min(ii+chunksize,len(t))
+        # Restart from the previous chunk's last time
+        out, acc= _integrateFullOrbits(vxvv,pot,t[max(ii-1,0):jj],method,dt,
+                                       dense=True)
+        vxvv= out[:,-1].T
+        if dense:
+            yield (t[ii:jj],out[:,-(jj-ii):],
+                   None if acc is None else acc[:,-(jj-ii):])
+        else:
+            yield (t[ii:jj],out[:,-(jj-ii):])
+        ii= jj
+
+def _rectToCyl_inplace(orbit,chunksize=_CHUNKSIZE):
+    """Convert a [...,6] orbit from rectangular [x,y,z,vx,vy,vz] to cylindrical [R,vR,vT,z,vz,phi] coordinates in place, in chunks to limit the size of temporary arrays"""
+    orbit= orbit.reshape((-1,6)) # view
+    for ii in range(0,len(orbit),chunksize):
+        tmp_out= orbit[ii:ii+chunksize]
+        R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+        phi= nu.arccos(tmp_out[:,0]/R)
+        phi[(tmp_out[:,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[:,1] < 0.)]
+        vR= tmp_out[:,3]*nu.cos(phi)+tmp_out[:,4]*nu.sin(phi)
+        vT= tmp_out[:,4]*nu.cos(phi)-tmp_out[:,3]*nu.sin(phi)
+        tmp_out[:,3]= tmp_out[:,2]
+        tmp_out[:,4]= tmp_out[:,5]
+        tmp_out[:,0]= R
+        tmp_out[:,1]= vR
+        tmp_out[:,2]= vT
+        tmp_out[:,5]= phi
+    return None
+
+def _integrateFullOrbits_extrema(vxvv,pot,t,method,dt):
+    """
+    NAME:
+       _integrateFullOrbits_extrema
+    PURPOSE:
+       integrate N orbits in a Phi(R,z,phi) potential, only returning their extrema
+    INPUT:
+       vxvv - [6,N] array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       pot - Potential instance (or CompiledPotential)
+       t - list of times at which the orbits are computed (0 has to be in this!)
+       method - 'odeint' or 'leapfrog' or any of the C methods
+       dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+    OUTPUT:
+       [N,3] array of [rperi,rap,zmax]
+    """
+    vxvv= nu.array(vxvv)
+    t= nu.array(t)
+    cpot= pot
+    pot= _underlying_pot(pot)
+    if '_c' in method:
+        if isinstance(pot,list):
+            allHasC= nu.prod([p.hasC for p in pot])
+        else:
+            allHasC= pot.hasC
+    if not ext_loaded or not '_c' in method or not allHasC:
+        # Fall back onto storing the orbits and refining their extrema
+        return nu.array([_orbitExtrema(t,_integrateFullOrbit(vxvv[:,ii],cpot,
+                                                             t,method,dt))
+                         for ii in range(vxvv.shape[1])])
+    warnings.warn("Using C implementation to integrate orbits",
+                  galpyWarning)
+    #go to the rectangular frame
+    this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[5]),
+                         vxvv[0]*nu.sin(vxvv[5]),
+                         vxvv[3],
+                         vxvv[1]*nu.cos(vxvv[5])-vxvv[2]*nu.sin(vxvv[5]),
+                         vxvv[2]*nu.cos(vxvv[5])+vxvv[1]*nu.sin(vxvv[5]),
+                         vxvv[4]]).T
+    extrema, msg= integrateFullOrbit_extrema_c(cpot,this_vxvv,t,method,dt=dt)
+    return extrema
+
+def _orbitExtrema(t,orbit,maxiter=60):
+    """
+    NAME:
+       _orbitExtrema
+    PURPOSE:
+       find the pericenter, apocenter, and maximum height of a stored orbit, locating all turning points in between the output times using the cubic-Hermite interpolation of the position (Python version of what the C extrema integration does)
+    INPUT:
+       t - [nt] times
+       orbit - [nt,6] orbit [R,vR,vT,z,vz,phi]
+       maxiter= (60) number of bisection iterations
+    OUTPUT:
+       [rperi,rap,zmax]
+    """
+    cosphi, sinphi= nu.cos(orbit[:,5]), nu.sin(orbit[:,5])
+    q= nu.array([orbit[:,0]*cosphi,orbit[:,0]*sinphi,orbit[:,3]]).T
+    v= nu.array([orbit[:,1]*cosphi-orbit[:,2]*sinphi,
+                 orbit[:,2]*cosphi+orbit[:,1]*sinphi,
+                 orbit[:,4]]).T
+    h= (t[1:]-t[:-1])[:,nu.newaxis]
+    q0, q1, hv0, hv1= q[:-1], q[1:], h*v[:-1], h*v[1:]
+    # Coefficients of the cubic-Hermite position in s=(t-t0)/h
+    a= [q0,hv0,3.*(q1-q0)-2.*hv0-hv1,2.*(q0-q1)+hv0+hv1]
+    def pos(s,indx):
+        return sum([a[ii][indx]*s[:,nu.newaxis]**ii for ii in range(4)])
+    rs= list(nu.sqrt(nu.sum(q**2.,axis=1)))
+    zs= list(nu.fabs(q[:,2]))
+    # Turning points in r: all roots of the (quintic) derivative of r^2/2
+    c= nu.zeros((len(h),6))
+    for jj in range(4):
+        for kk in range(3):
+            c[:,jj+kk]+= nu.sum(a[jj]*(kk+1)*a[kk+1],axis=1)
+    for s in _polyRoots01(c,maxiter=maxiter).T:
+        indx= ~nu.isnan(s)
+        p= pos(s[indx],indx)
+        rs.extend(nu.sqrt(nu.sum(p**2.,axis=1)))
+    # Turning points in z: all roots of the (quadratic) derivative of z
+    c= nu.array([(kk+1)*a[kk+1][:,2] for kk in range(3)]).T
+    for s in _polyRoots01(c,maxiter=maxiter).T:
+        indx= ~nu.isnan(s)
+        p= pos(s[indx],indx)
+        zs.extend(nu.fabs(p[:,2]))
+    return nu.array([nu.amin(rs),nu.amax(rs),nu.amax(zs)])
+
+def _polyRoots01(c,maxiter=60):
+    """All real roots in (0,1) of the polynomials with coefficients c [n,deg+1] (increasing powers), returned as [n,deg] in increasing order with NaN for missing roots; each root is bracketed in between two consecutive roots of the derivative, in between which the polynomial is monotonic, and found by bisection (Python version of poly_roots01 in the C code)"""
+    deg= c.shape[1]-1
+    if deg == 1:
+        with nu.errstate(divide='ignore',invalid='ignore'):
+            out= -c[:,0]/c[:,1]
+        out[~((out > 0.)*(out < 1.))]= nu.nan
+        return out[:,nu.newaxis]
+    def peval(s):
+        out= c[:,deg].copy()
+        for ii in range(deg-1,-1,-1):
+            out= out*s+c[:,ii]
+        return out
+    b= _polyRoots01(c[:,1:]*nu.arange(1,deg+1),maxiter=maxiter)
+    b[nu.isnan(b)]= 1.
+    b= nu.sort(nu.hstack((nu.zeros((len(c),1)),b,nu.ones((len(c),1)))),
+               axis=1)
+    out= nu.empty((len(c),deg))+nu.nan
+    for ii in range(deg):
+        slo, shi= b[:,ii].copy(), b[:,ii+1].copy()
+        flo= peval(slo)
+        indx= flo*peval(shi) < 0.
+        for jj in range(maxiter):
+            smid= 0.5*(slo+shi)
+            fmid= peval(smid)
+            lo= fmid*flo > 0.
+            slo[lo]= smid[lo]
+            flo[lo]= fmid[lo]
+            shi[~lo]= smid[~lo]
+        out[indx,ii]= 0.5*(slo+shi)[indx]
     return out
 
+def _reset_integration(orb):
+    """Remove a previously-integrated orbit and everything derived from it"""
+    for attr in ['_orbInterp','_dense_acc','_extrema','rs','orbit','t']:
+        if hasattr(orb,attr): delattr(orb,attr)
+    return None
+
 def _FullEOM(y,t,pot):
     """
     NAME:
@@ -665,6 +1055,166 @@ def _FullEOM(y,t,pot):
             y[5],
             _evaluatezforces(pot,y[0],y[4],phi=y[2],t=t)]
 
+def _integrateFullOrbit_dxdv(vxvv,dxdv,pot,t,method,rectIn,rectOut):
+    """
+    NAME:
+       _integrateFullOrbit_dxdv
+    PURPOSE:
+       integrate an orbit and a small volume of phase space in a 
+       Phi(R,z,phi) potential
+    INPUT:
+       vxvv - array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       dxdv - difference to integrate [dR,dvR,dvT,dz,dvz,dphi]
+       pot - Potential instance
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint' or one of the C Runge-Kutta integrators
+       rectIn= (False) if True, input dxdv is in rectangular coordinates
+       rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
+    OUTPUT:
+       [:,12] array of [R,vR,vT,z,vz,phi,dR,dvR,dvT,dz,dvz,dphi] at each t
+       error message from integrator
+    """
+    #First check that the potential has C
+    if '_c' in method:
+        if isinstance(pot,list):
+            allHasC= nu.prod([p.hasC and p.hasC_dxdv for p in pot])
+        else:
+            allHasC= pot.hasC and pot.hasC_dxdv
+        if not allHasC and not 'leapfrog' in method and not 'symplec' in method:
+            method= 'odeint'
+            warnings.warn("Using odeint because not all used potential have adequate C implementations to integrate phase-space volumes",galpyWarning)
+    #go to the rectangular frame
+    cp= nu.cos(vxvv[5])
+    sp= nu.sin(vxvv[5])
+    this_vxvv= nu.array([vxvv[0]*cp,
+                         vxvv[0]*sp,
+                         vxvv[3],
+                         vxvv[1]*cp-vxvv[2]*sp,
+                         vxvv[2]*cp+vxvv[1]*sp,
+                         vxvv[4]])
+    if not rectIn:
+        this_dxdv= nu.array([cp*dxdv[0]-vxvv[0]*sp*dxdv[5],
+                             sp*dxdv[0]+vxvv[0]*cp*dxdv[5],
+                             dxdv[3],
+                             -(vxvv[1]*sp+vxvv[2]*cp)*dxdv[5]
+                             +cp*dxdv[1]-sp*dxdv[2],
+                             (vxvv[1]*cp-vxvv[2]*sp)*dxdv[5]
+                             +sp*dxdv[1]+cp*dxdv[2],
+                             dxdv[4]])
+    else:
+        this_dxdv= nu.array(dxdv)
+    if 'leapfrog' in method.lower() or 'symplec' in method.lower():
+        raise TypeError('Symplectic integration for phase-space volume is not possible')
+    elif ext_loaded and \
+            (method.lower() == 'rk4_c' or method.lower() == 'rk6_c' \
+                 or method.lower() == 'dopr54_c'):
+        warnings.warn("Using C implementation to integrate orbits",galpyWarning)
+        #integrate
+        tmp_out, msg= integrateFullOrbit_dxdv_c(pot,this_vxvv,this_dxdv,
+                                                t,method)
+    elif method.lower() == 'odeint' or not ext_loaded:
+        # The Python EOM neglects d2Phi/dphi/dz
+        if isinstance(pot,list): tpot= pot
+        else: tpot= [pot]
+        if nu.any([p.isNonAxi and not isinstance(p,FullPotentialFromplanarPotential) for p in tpot]):
+            raise NotImplementedError("Integrating phase-space volumes in Python is not implemented for non-axisymmetric 3D potentials")
+        init= nu.concatenate((this_vxvv,this_dxdv))
+        #integrate
+        tmp_out= integrate.odeint(_FullEOM_dxdv,init,t,args=(pot,),
+                                  rtol=10.**-8.)#,mxstep=100000000)
+        msg= 0
+    else:
+        raise NotImplementedError("requested integration method does not exist")
+    #go back to the cylindrical frame
+    R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+    phi= nu.arccos(tmp_out[:,0]/R)
+    phi[(tmp_out[:,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[:,1] < 0.)]
+    cp= nu.cos(phi)
+    sp= nu.sin(phi)
+    vR= tmp_out[:,3]*cp+tmp_out[:,4]*sp
+    vT= tmp_out[:,4]*cp-tmp_out[:,3]*sp
+    out= nu.zeros((len(t),12))
+    out[:,0]= R
+    out[:,1]= vR
+    out[:,2]= vT
+    out[:,3]= tmp_out[:,2]
+    out[:,4]= tmp_out[:,5]
+    out[:,5]= phi
+    if rectOut:
+        out[:,6:]= tmp_out[:,6:]
+    else:
+        dR= cp*tmp_out[:,6]+sp*tmp_out[:,7]
+        dphi= (cp*tmp_out[:,7]-sp*tmp_out[:,6])/R
+        out[:,6]= dR
+        out[:,7]= cp*tmp_out[:,9]+sp*tmp_out[:,10]+vT*dphi
+        out[:,8]= cp*tmp_out[:,10]-sp*tmp_out[:,9]-vR*dphi
+        out[:,9]= tmp_out[:,8]
+        out[:,10]= tmp_out[:,11]
+        out[:,11]= dphi
+    return (out,msg)
+
+def _FullEOM_dxdv(x,t,pot):
+    """
+    NAME:
+       _FullEOM_dxdv
+    PURPOSE:
+       implements the EOM, i.e., the right-hand side of the differential 
+       equation, for integrating phase space differences, rectangular
+    INPUT:
+       x - current phase-space position
+       t - current time
+       pot - (list of) Potential instance(s)
+    OUTPUT:
+       dy/dt
+    """
+    #x is rectangular so calculate R and phi
+    R= nu.sqrt(x[0]**2.+x[1]**2.)
+    phi= nu.arccos(x[0]/R)
+    sinphi= x[1]/R
+    cosphi= x[0]/R
+    if x[1] < 0.: phi= 2.*nu.pi-phi
+    #calculate forces
+    Rforce= _evaluateRforces(pot,R,x[2],phi=phi,t=t)
+    zforce= _evaluatezforces(pot,R,x[2],phi=phi,t=t)
+    phiforce= _evaluatephiforces(pot,R,x[2],phi=phi,t=t)
+    R2deriv= _evaluatePotentials(pot,R,x[2],phi=phi,t=t,dR=2)
+    phi2deriv= _evaluatePotentials(pot,R,x[2],phi=phi,t=t,dphi=2)
+    Rphideriv= _evaluatePotentials(pot,R,x[2],phi=phi,t=t,dR=1,dphi=1)
+    z2deriv= evaluatez2derivs(pot,R,x[2],phi=phi,t=t,use_physical=False)
+    Rzderiv= evaluateRzderivs(pot,R,x[2],phi=phi,t=t,use_physical=False)
+    #Calculate derivatives and derivatives+time derivatives
+    dFxdx= -cosphi**2.*R2deriv\
+           +2.*cosphi*sinphi/R**2.*phiforce\
+           +sinphi**2./R*Rforce\
+           +2.*sinphi*cosphi/R*Rphideriv\
+           -sinphi**2./R**2.*phi2deriv
+    dFxdy= -sinphi*cosphi*R2deriv\
+           +(sinphi**2.-cosphi**2.)/R**2.*phiforce\
+           -cosphi*sinphi/R*Rforce\
+           -(cosphi**2.-sinphi**2.)/R*Rphideriv\
+           +cosphi*sinphi/R**2.*phi2deriv
+    dFydx= -cosphi*sinphi*R2deriv\
+           +(sinphi**2.-cosphi**2.)/R**2.*phiforce\
+           +(sinphi**2.-cosphi**2.)/R*Rphideriv\
+           -sinphi*cosphi/R*Rforce\
+           +sinphi*cosphi/R**2.*phi2deriv
+    dFydy= -sinphi**2.*R2deriv\
+           -2.*sinphi*cosphi/R**2.*phiforce\
+           -2.*sinphi*cosphi/R*Rphideriv\
+           +cosphi**2./R*Rforce\
+           -cosphi**2./R**2.*phi2deriv
+    dFxdz= -cosphi*Rzderiv
+    dFydz= -sinphi*Rzderiv
+    return nu.array([x[3],x[4],x[5],
+                     cosphi*Rforce-1./R*sinphi*phiforce,
+                     sinphi*Rforce+1./R*cosphi*phiforce,
+                     zforce,
+                     x[9],x[10],x[11],
+                     dFxdx*x[6]+dFxdy*x[7]+dFxdz*x[8],
+                     dFydx*x[6]+dFydy*x[7]+dFydz*x[8],
+                     dFxdz*x[6]+dFydz*x[7]-z2deriv*x[8]])
+
 def _rectForce(x,pot,t=0.):
     """
     NAME:
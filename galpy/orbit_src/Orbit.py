@@ -10,6 +10,7 @@ from galpy.util.bovy_conversion import physical_conversion
 from galpy.util import galpyWarning
 from galpy.util import bovy_conversion
 from galpy.util import config
+from galpy.potential_src.CompiledPotential import _underlying_pot
 _APY_UNITS= config.__config__.getboolean('astropy','astropy-units')
 from galpy.orbit_src.FullOrbit import FullOrbit
 from galpy.orbit_src.RZOrbit import RZOrbit
@@ -112,7 +113,7 @@ class Orbit(object):
                         vxvv[1].to(units.deg).value
                 else:
                     ra, dec= vxvv[0], vxvv[1]
-                l,b= coords.radec_to_lb(ra,dec,degree=True)
+                l,b= nu.array(coords.radec_to_lb(ra,dec,degree=True)).T
             elif len(vxvv) == 4:
                 l, b= vxvv[0], 0.
             else:
@@ -123,10 +124,11 @@ class Orbit(object):
                 b= b.to(units.deg).value
             if uvw:
                 if _APY_LOADED and isinstance(vxvv[2],units.Quantity):
-                    X,Y,Z= coords.lbd_to_XYZ(l,b,vxvv[2].to(units.kpc).value,
-                                             degree=True)
+                    X,Y,Z= nu.array(coords.lbd_to_XYZ(\
+                            l,b,vxvv[2].to(units.kpc).value,degree=True)).T
                 else:
-                    X,Y,Z= coords.lbd_to_XYZ(l,b,vxvv[2],degree=True)
+                    X,Y,Z= nu.array(coords.lbd_to_XYZ(l,b,vxvv[2],
+                                                      degree=True)).T
                 vx= vxvv[3]
                 vy= vxvv[4]
                 vz= vxvv[5]
@@ -143,8 +145,9 @@ class Orbit(object):
                             vxvv[4].to(units.mas/units.yr).value
                     else:
                         pmra, pmdec= vxvv[3], vxvv[4]
-                    pmll, pmbb= coords.pmrapmdec_to_pmllpmbb(pmra,pmdec,ra,dec,
-                                                             degree=True)
+                    pmll, pmbb= nu.array(\
+                        coords.pmrapmdec_to_pmllpmbb(pmra,pmdec,ra,dec,
+                                                     degree=True)).T
                     d, vlos= vxvv[2], vxvv[5]
                 elif len(vxvv) == 4:
                     pmll, pmbb= vxvv[2], 0.
@@ -160,9 +163,9 @@ class Orbit(object):
                     pmll= pmll.to(units.mas/units.yr).value
                 if _APY_LOADED and isinstance(pmbb,units.Quantity):
                     pmbb= pmbb.to(units.mas/units.yr).value
-                X,Y,Z,vx,vy,vz= coords.sphergal_to_rectgal(l,b,d,
-                                                           vlos,pmll, pmbb,
-                                                           degree=True)
+                X,Y,Z,vx,vy,vz= nu.array(\
+                    coords.sphergal_to_rectgal(l,b,d,vlos,pmll,pmbb,
+                                               degree=True)).T
             X/= ro
             Y/= ro
             Z/= ro
@@ -170,12 +173,15 @@ class Orbit(object):
             vy/= vo
             vz/= vo
             vsun= nu.array([0.,1.,0.,])+vsolar/vo
-            R, phi, z= coords.XYZ_to_galcencyl(X,Y,Z,Zsun=zo/ro)
-            vR, vT,vz= coords.vxvyvz_to_galcencyl(vx,vy,vz,
-                                                  R,phi,z,
-                                                  vsun=vsun,
-                                                  Xsun=1.,Zsun=zo/ro,
-                                                  galcen=True)
+            # (.T such that arrays of initial conditions work, see Orbits)
+            R, phi, z= nu.array(coords.XYZ_to_galcencyl(X,Y,Z,
+                                                        Zsun=zo/ro)).T
+            vR, vT,vz= nu.array(coords.vxvyvz_to_galcencyl(vx,vy,vz,
+                                                           R,phi,z,
+                                                           vsun=vsun,
+                                                           Xsun=1.,
+                                                           Zsun=zo/ro,
+                                                           galcen=True)).T
             if lb and len(vxvv) == 4: vxvv= [R,vR,vT,phi]
             else: vxvv= [R,vR,vT,z,vz,phi]
         # Parse vxvv if it consists of Quantities
@@ -365,7 +371,8 @@ class Orbit(object):
             self._vo= vo
         self._orb.turn_physical_on(ro=ro,vo=vo)
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  out_acc=None):
         """
         NAME:
 
@@ -379,7 +386,7 @@ class Orbit(object):
 
            t - list of times at which to output (0 has to be in this!) (can be Quantity)
 
-           pot - potential instance or list of instances
+           pot - potential instance or list of instances (or a CompiledPotential to avoid setting up the potential for C in every call)
 
            method= 'odeint' for scipy's odeint
                    'leapfrog' for a simple leapfrog implementation
@@ -392,6 +399,10 @@ class Orbit(object):
 
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
 
+           out= (None) if set, C-contiguous float64 array of shape [len(t),6] (e.g., a numpy.memmap) to store the orbit in; the C integrators directly write into this array, such that the orbit does not need to be held in memory when using a memmap (only for 3D orbits)
+
+           out_acc= (None) if set together with out, C-contiguous float64 array of shape [len(t),3] (e.g., a numpy.memmap) that the C integrators write the accelerations at the times t into, which are used to interpolate the orbit in between these times; if not set, these accelerations are held in memory
+
         OUTPUT:
 
            (none) (get the actual orbit using getOrbit()
@@ -403,7 +414,7 @@ class Orbit(object):
            2015-06-28 - Added dt keyword - Bovy (IAS)
 
         """
-        _check_potential_dim(self,pot)
+        _check_potential_dim(self,_underlying_pot(pot))
         _check_consistent_units(self,pot)
         # Parse t
         if _APY_LOADED and isinstance(t,units.Quantity):
@@ -419,7 +430,97 @@ class Orbit(object):
                           galpyWarning)
         if not _check_integrate_dt(t,dt):
             raise ValueError('dt input (integrator stepsize) for Orbit.integrate must be an integer divisor of the output stepsize')
-        self._orb.integrate(t,pot,method=method,dt=dt)
+        if out is None and not out_acc is None:
+            raise ValueError("out_acc= for Orbit.integrate can only be used together with out=")
+        if out is None:
+            self._orb.integrate(t,pot,method=method,dt=dt)
+        elif not isinstance(self._orb,FullOrbit):
+            raise NotImplementedError("Integrating into a given out= array is only implemented for 3D orbits (with phi)")
+        else:
+            self._orb.integrate(t,pot,method=method,dt=dt,out=out,
+                                out_acc=out_acc)
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=100000,dense=False):
+        """
+        NAME:
+
+           integrate_chunks
+
+        PURPOSE:
+
+           integrate the orbit and return a generator that yields the orbit in chunks of output times, such that long, finely-sampled orbits can be analyzed without holding the entire orbit in memory; the orbit is not stored in the Orbit instance; each chunk is integrated starting from the end of the previous chunk; only implemented for 3D orbits
+
+        INPUT:
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances (or a CompiledPotential)
+
+           method= see integrate
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           chunksize= (100000) number of output times in each chunk
+
+           dense= (False) if True, also yield the rectangular acceleration [ax,ay,az] at each output time returned by the C integrators (None for the Python integrators), which together with the orbit allows it to be interpolated in between the output times
+
+        OUTPUT:
+
+           generator of (t[chunk],orbit[chunk]) with orbit[chunk] a [len(chunk),6] array in the same format as getOrbit() (times in natural units); (t[chunk],orbit[chunk],acc[chunk]) with acc[chunk] a [len(chunk),3] array if dense
+
+        """
+        _check_potential_dim(self,_underlying_pot(pot))
+        _check_consistent_units(self,pot)
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbit.integrate_chunks must be an integer divisor of the output stepsize')
+        return self._orb.integrate_chunks(t,pot,method=method,dt=dt,
+                                          chunksize=chunksize,dense=dense)
+
+    def integrate_extrema(self,t,pot,method='dopr54_c',dt=None):
+        """
+        NAME:
+
+           integrate_extrema
+
+        PURPOSE:
+
+           integrate the orbit, only keeping track of its pericenter, apocenter, and maximum height, which are afterwards returned by rperi, rap, zmax, and e (numerical, not analytic); all turning points (also several in between two times) are located in between the times t using the cubic-Hermite interpolation of the orbit, and with a C integrator the orbit is never stored (O(1) memory); only implemented for 3D orbits (with phi), other orbits raise NotImplementedError
+
+        INPUT:
+
+           t - list of times at which the orbit is computed (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances (or a CompiledPotential)
+
+           method= see integrate
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+        OUTPUT:
+
+           (none) (any previous orbit integration is erased)
+
+        """
+        _check_potential_dim(self,_underlying_pot(pot))
+        _check_consistent_units(self,pot)
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbit.integrate_extrema must be an integer divisor of the output stepsize')
+        self._orb.integrate_extrema(t,pot,method=method,dt=dt)
 
     def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
                        rectIn=False,rectOut=False):
@@ -434,7 +535,7 @@ class Orbit(object):
 
         INPUT:
 
-           dxdv - [dR,dvR,dvT,dphi]
+           dxdv - [dR,dvR,dvT,dphi] for planar orbits or [dR,dvR,dvT,dz,dvz,dphi] for 3D orbits
 
            t - list of times at which to output (0 has to be in this!) (can be Quantity)
 
@@ -497,10 +598,14 @@ class Orbit(object):
         HISTORY:
            2011-04-13 - Written - Bovy (NYU)
         """
-        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
-        if hasattr(self,'rs'): delattr(self,'rs')
+        if hasattr(self._orb,'_orbInterp'): delattr(self._orb,'_orbInterp')
+        if hasattr(self._orb,'rs'): delattr(self._orb,'rs')
         sortindx = list(range(len(self._orb.t)))
         sortindx.sort(key=lambda x: self._orb.t[x],reverse=True)
+        if sortindx == list(range(len(self._orb.t))): return None
+        if hasattr(self._orb,'_dense_acc'): # accelerations for dense output
+            self._orb._dense_acc= self._orb._dense_acc[sortindx]
+        self._orb._dense_sign= -getattr(self._orb,'_dense_sign',1.)
         for ii in range(self._orb.orbit.shape[1]):
             self._orb.orbit[:,ii]= self._orb.orbit[sortindx,ii]
         return None
@@ -995,6 +1100,48 @@ class Orbit(object):
         else:
             return True
 
+    def _aAevalTimes(self,pot,t,indx,**kwargs):
+        """
+        NAME:
+
+           _aAevalTimes
+
+        PURPOSE:
+
+           calculate an action at times along the integrated orbit(s)
+
+        INPUT:
+
+           pot - potential
+
+           t - times
+
+           indx - 0, 1, or 2 for jr, jp, or jz
+
+           +actionAngle module setup kwargs
+
+        OUTPUT:
+
+           action [nt] (or [N,nt] for N orbits)
+
+        """
+        if len(self._orb.vxvv) < 5:
+            raise NotImplementedError("Actions at times t are only implemented for 3D orbits")
+        _check_consistent_units(self,pot)
+        self._orb._setupaA(pot=pot,**kwargs)
+        # Pass phi as well when the orbit has it (isochroneapprox needs it)
+        vxvv= nu.reshape(self._orb(t),(len(self._orb.vxvv),-1,nu.size(t)))
+        if self._orb._aAType.lower() == 'staeckel':
+            # (N,nt) input is calculated as N time series, which in C
+            # starts the root finding at each time from the previous one
+            out= self._orb._aA(*vxvv,use_physical=False)[indx]
+        else:
+            out= nu.reshape(self._orb._aA(*[x.flatten() for x in vxvv],
+                                          use_physical=False)[indx],
+                            vxvv.shape[1:])
+        if nu.ndim(self._orb.vxvv) == 1: return out[0]
+        else: return out
+
     @physical_conversion('action')
     def jr(self,pot=None,**kwargs):
         """
@@ -1020,6 +1167,8 @@ class Orbit(object):
 
               4) 'spherical'
               
+           t= (None) if given, calculate the action at these times along the integrated orbit (can be Quantity; 3D orbits only); with type='staeckel', the actions at all times are calculated as a time series, which in C starts the root finding at each time from the previous one
+
            +actionAngle module setup kwargs
 
            ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
@@ -1039,6 +1188,9 @@ class Orbit(object):
            2013-11-27 - Re-written using new actionAngle modules - Bovy (IAS)
 
         """
+        if not kwargs.get('t',None) is None:
+            return self._aAevalTimes(pot,kwargs.pop('t'),0,**kwargs)
+        kwargs.pop('t',None)
         _check_consistent_units(self,pot)
         self._orb._setupaA(pot=pot,**kwargs)
         if self._orb._aAType.lower() == 'isochroneapprox':
@@ -1071,6 +1223,8 @@ class Orbit(object):
 
               4) 'spherical'
               
+           t= (None) if given, calculate the action at these times along the integrated orbit (can be Quantity; 3D orbits only); with type='staeckel', the actions at all times are calculated as a time series, which in C starts the root finding at each time from the previous one
+
            +actionAngle module setup kwargs
 
            ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
@@ -1090,6 +1244,9 @@ class Orbit(object):
            2013-11-27 - Re-written using new actionAngle modules - Bovy (IAS)
 
         """
+        if not kwargs.get('t',None) is None:
+            return self._aAevalTimes(pot,kwargs.pop('t'),1,**kwargs)
+        kwargs.pop('t',None)
         _check_consistent_units(self,pot)
         self._orb._setupaA(pot=pot,**kwargs)
         if self._orb._aAType.lower() == 'isochroneapprox':
@@ -1122,6 +1279,8 @@ class Orbit(object):
 
               4) 'spherical'
               
+           t= (None) if given, calculate the action at these times along the integrated orbit (can be Quantity; 3D orbits only); with type='staeckel', the actions at all times are calculated as a time series, which in C starts the root finding at each time from the previous one
+
            +actionAngle module setup kwargs
 
            ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
@@ -1141,6 +1300,9 @@ class Orbit(object):
            2013-11-27 - Re-written using new actionAngle modules - Bovy (IAS)
 
         """
+        if not kwargs.get('t',None) is None:
+            return self._aAevalTimes(pot,kwargs.pop('t'),2,**kwargs)
+        kwargs.pop('t',None)
         _check_consistent_units(self,pot)
         self._orb._setupaA(pot=pot,**kwargs)
         if self._orb._aAType.lower() == 'isochroneapprox':
@@ -3526,10 +3688,11 @@ def _check_integrate_dt(t,dt):
 def _check_potential_dim(orb,pot):
     from galpy.potential import _dim
     # Don't deal with pot=None here, just dimensionality
-    assert pot is None or orb.dim() <= _dim(pot), 'Orbit dimensionality is %i, but potential dimensionality is %i < %i; orbit needs to be of equal or lower dimensionality as the potential; you can reduce the dimensionality---if appropriate---of your orbit with orbit.toPlanar or orbit.toLinear' % (orb.dim(),_dim(pot),orb.dim())
+    assert pot is None or orb.dim() <= _dim(pot), 'Orbit dimensionality is %i, but potential dimensionality is %i < %i; orbit needs to be of equal or lower dimensionality as the potential; you can reduce the dimensionality---if appropriate---of your orbit with orbit.toPlanar or orbit.toLinear (or convert non-axisymmetric planar potentials to 3D with galpy.potential.planarToFullPotential)' % (orb.dim(),_dim(pot),orb.dim())
 
 def _check_consistent_units(orb,pot):
     if pot is None: return None
+    pot= _underlying_pot(pot)
     if isinstance(pot,list):
         if orb._roSet and pot[0]._roSet:
             assert nu.fabs(orb._ro-pot[0]._ro) < 10.**-10., 'Physical conversion for the Orbit object is not consistent with that of the Potential given to it'
@@ -16,10 +16,8 @@ from galpy.util import bovy_conversion, galpyWarning
 from galpy.util import config
 if int(scipy.__version__.split('.')[0]) < 1 and \
         int(scipy.__version__.split('.')[1]) < 15: #pragma: no cover
-    _OLD_SCIPY= True
     _KWINTERP= {}  #for scipy version <1.15
 else:
-    _OLD_SCIPY= False
     _KWINTERP= {'ext':2}  #for scipy version >=1.15
 class OrbitTop(object):
     """General class that holds orbits and integrates them"""
@@ -129,6 +127,35 @@ class OrbitTop(object):
         """
         raise NotImplementedError
 
+    def integrate_extrema(self,t,pot,method='dopr54_c',dt=None):
+        """
+        NAME:
+           integrate_extrema
+        PURPOSE:
+           integrate the orbit, only keeping track of its extrema
+        INPUT:
+           t - list of times at which the orbit is computed (0 has to be in this!)
+           pot - Potential instance or list of instances
+        OUTPUT:
+           (none)
+        """
+        raise NotImplementedError("integrate_extrema is only implemented for 3D orbits (with phi)")
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=None,dense=False):
+        """
+        NAME:
+           integrate_chunks
+        PURPOSE:
+           integrate the orbit, yielding the orbit in chunks of output times
+        INPUT:
+           t - list of times at which to output (0 has to be in this!)
+           pot - Potential instance or list of instances
+        OUTPUT:
+           generator of (t[chunk],orbit[chunk](,acc[chunk]))
+        """
+        raise NotImplementedError("integrate_chunks is only implemented for 3D orbits (with phi)")
+
     def getOrbit(self):
         """
         NAME:
@@ -157,7 +184,7 @@ class OrbitTop(object):
         HISTORY:
            2010-07-10 - Written - Bovy (NYU)
         """
-        return self.orbit_dxdv[:,4:]
+        return self.orbit_dxdv[:,len(self.vxvv):]
 
     @physical_conversion('time')
     def time(self,*args,**kwargs):
@@ -1307,31 +1334,11 @@ class OrbitTop(object):
                     for ii in range(dim):
                         out[ii,jj]= self.orbit[indx,ii]
                 return out #should always have nt > 1, bc otherwise covered by above
-            out= []
-            if _OLD_SCIPY and not isinstance(self._orbInterp[0],_fakeInterp) \
-                    and nu.any((nu.array(t) < self._orbInterp[0]._data[3])\
-                               +(nu.array(t) > self._orbInterp[0]._data[4])): #pragma: no cover
-                raise ValueError("One or more requested time is not within the integrated range")
-            if dim == 4 or dim == 6:
-                #Unpack interpolated x and y to R and phi
-                x= self._orbInterp[0](t)
-                y= self._orbInterp[-1](t)
-                R= nu.sqrt(x*x+y*y)
-                phi= nu.arctan2(y,x) % (2.*nu.pi)
-                for ii in range(dim):
-                    if ii == 0:
-                        out.append(R) 
-                    elif ii == dim-1:
-                        out.append(phi) 
-                    else:
-                        out.append(self._orbInterp[ii](t))
-            else:
-                for ii in range(dim):
-                    out.append(self._orbInterp[ii](t))
+            out= self._orbInterp(t)
             if nt == 1:
-                return nu.array(out).reshape(dim)
+                return out.reshape(dim)
             else:
-                return nu.array(out).reshape((dim,nt))
+                return out.reshape((dim,nt))
 
     def plot(self,*args,**kwargs):
         """
@@ -2037,54 +2044,195 @@ class OrbitTop(object):
         
     def _setupOrbitInterp(self):
         if not hasattr(self,"_orbInterp"):
-            # First check that times increase
-            if hasattr(self,"t"): #Orbit has been integrated
-                if self.t[1] < self.t[0]: #must be backward
-                    sindx= nu.argsort(self.t)
-                    # sort
-                    self.t= self.t[sindx]
-                    self.orbit= self.orbit[sindx]
-                    usindx= nu.argsort(sindx) # to later unsort
-            orbInterp= []
-            for ii in range(len(self.vxvv)):
-                if (len(self.vxvv) == 4 or len(self.vxvv) == 6) and ii == 0:
-                   #Interpolate x and y rather than R and phi to avoid issues w/ phase wrapping
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[0]*nu.cos(self.vxvv[-1])))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,0]*nu.cos(self.orbit[:,-1]),
-                                **_KWINTERP))
-                elif (len(self.vxvv) == 4 or len(self.vxvv) == 6) and \
-                        ii == len(self.vxvv)-1:
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[0]*nu.sin(self.vxvv[-1])))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,0]*nu.sin(self.orbit[:,-1]),**_KWINTERP))
-                else:
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[ii]))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,ii],**_KWINTERP))
-            self._orbInterp= orbInterp
-            try: #unsort
-                self.t= self.t[usindx]
-                self.orbit= self.orbit[usindx]
-            except: pass
+            if not hasattr(self,"t"): #Orbit has not been integrated
+                self._orbInterp= _fakeInterp(self.vxvv)
+            elif hasattr(self,"_dense_acc"): #accelerations from C
+                self._orbInterp= _denseOrbitInterp(self.t,self.orbit,
+                                                   self._dense_acc,
+                                                   sign=getattr(self,
+                                                                '_dense_sign',
+                                                                1.))
+            else:
+                self._orbInterp= _splineOrbitInterp(self.t,self.orbit)
+        return None
+
+class _denseOrbitInterp(object):
+    """Dense output of an integrated orbit: piecewise cubic-Hermite 
+    interpolation between the output times, using the phase-space position 
+    and its time derivative (velocity and acceleration) at each output time"""
+    def __init__(self,t,orbit,acc,sign=1.):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           initialize the dense output
+        INPUT:
+           t - output times (increasing or decreasing)
+           orbit - [...,nt,dim] orbit at t
+           acc - [...,nt,nacc] accelerations at t from the C integrators (rectangular [ax,ay(,az)] for orbits with phi, [FR(,Fz)] for RZ orbits, [Fx] for linear orbits)
+           sign= (1.) multiply the time derivatives by this (-1 for orbits that were reversed)
+        OUTPUT:
+           (none)
+        """
+        # Keep references, no copies of the orbit are made
+        self._t= t
+        self._orbit= orbit
+        self._acc= acc
+        self._sign= sign
+        if len(t) < 4: # Like the cubic splines used previously
+            raise ValueError("Not enough output times to interpolate the orbit")
+        self._backward= t[1] < t[0]
         return None
 
+    def __call__(self,t):
+        """
+        NAME:
+           __call__
+        PURPOSE:
+           evaluate the orbit at arbitrary times
+        INPUT:
+           t - time or array of times
+        OUTPUT:
+           [dim,...,nt] array
+        """
+        t= nu.atleast_1d(t).astype('float')
+        nt= len(self._t)
+        if self._backward: ts= self._t[::-1]
+        else: ts= self._t
+        if nu.any(t < ts[0]) or nu.any(t > ts[-1]):
+            raise ValueError("One or more requested time is not within the integrated range")
+        lo= nu.searchsorted(ts,t,side='right')-1
+        lo[lo > nt-2]= nt-2
+        if self._backward:
+            lo= nt-1-lo
+            hi= lo-1
+        else:
+            hi= lo+1
+        t0= self._t[lo]
+        h= self._t[hi]-t0
+        s= ((t-t0)/h)[:,nu.newaxis]
+        q0, dq0= _denseState(self._orbit[...,lo,:],self._acc[...,lo,:])
+        q1, dq1= _denseState(self._orbit[...,hi,:],self._acc[...,hi,:])
+        hh= self._sign*h[:,nu.newaxis]
+        q= (1.+2.*s)*(1.-s)**2.*q0+s*(1.-s)**2.*hh*dq0\
+            +s**2.*(3.-2.*s)*q1+s**2.*(s-1.)*hh*dq1
+        return _denseToOrbit(q)
+
+def _denseState(orbit,acc):
+    """Convert [...,dim] orbit points and their accelerations to the state 
+    that is interpolated and its time derivative; rectangular coordinates 
+    are used for orbits with phi to avoid issues w/ phase wrapping"""
+    dim= orbit.shape[-1]
+    if dim == 4 or dim == 6:
+        cosphi= nu.cos(orbit[...,-1])
+        sinphi= nu.sin(orbit[...,-1])
+        R, vR, vT= orbit[...,0], orbit[...,1], orbit[...,2]
+        x, y= R*cosphi, R*sinphi
+        vx= vR*cosphi-vT*sinphi
+        vy= vT*cosphi+vR*sinphi
+        if dim == 4:
+            q= [x,y,vx,vy]
+            dq= [vx,vy,acc[...,0],acc[...,1]]
+        else:
+            q= [x,y,orbit[...,3],vx,vy,orbit[...,4]]
+            dq= [vx,vy,orbit[...,4],acc[...,0],acc[...,1],acc[...,2]]
+    elif dim == 3 or dim == 5:
+        R, vR, vT= orbit[...,0], orbit[...,1], orbit[...,2]
+        q= [orbit[...,ii] for ii in range(dim)]
+        dq= [vR,acc[...,0]+vT**2./R,-vR*vT/R]
+        if dim == 5:
+            dq.extend([orbit[...,4],acc[...,1]])
+    else: #dim == 2
+        q= [orbit[...,0],orbit[...,1]]
+        dq= [orbit[...,1],acc[...,0]]
+    return (nu.rollaxis(nu.array(q),0,orbit.ndim),
+            nu.rollaxis(nu.array(dq),0,orbit.ndim))
+
+def _denseToOrbit(q):
+    """Convert the interpolated [...,nt,dim] state back to [dim,...,nt] orbit 
+    coordinates"""
+    dim= q.shape[-1]
+    q= nu.rollaxis(q,q.ndim-1)
+    if dim == 4 or dim == 6:
+        x, y= q[0], q[1]
+        vx, vy= q[dim//2], q[dim//2+1]
+        R= nu.sqrt(x*x+y*y)
+        phi= nu.arctan2(y,x) % (2.*nu.pi)
+        cosphi, sinphi= x/R, y/R
+        out= [R,vx*cosphi+vy*sinphi,vy*cosphi-vx*sinphi]
+        if dim == 6:
+            out.extend([q[2],q[5]])
+        out.append(phi)
+        return nu.array(out)
+    else:
+        return q
+
+class _splineOrbitInterp(object):
+    """Interpolation of an integrated orbit between the output times using 
+    cubic splines, for orbits integrated without the accelerations needed for 
+    the dense output; x and y are interpolated rather than R and phi to avoid
+    issues w/ phase wrapping"""
+    def __init__(self,t,orbit):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           initialize the spline interpolation
+        INPUT:
+           t - output times (increasing or decreasing)
+           orbit - [...,nt,dim] orbit at t
+        OUTPUT:
+           (none)
+        """
+        sindx= nu.argsort(t)
+        self._t= t[sindx]
+        orbit= orbit[...,sindx,:]
+        self._dim= orbit.shape[-1]
+        self._shape= orbit.shape[:-2]
+        q= [orbit[...,ii] for ii in range(self._dim)]
+        if self._dim == 4 or self._dim == 6:
+            q[0]= orbit[...,0]*nu.cos(orbit[...,-1])
+            q[-1]= orbit[...,0]*nu.sin(orbit[...,-1])
+        q= nu.array(q).reshape((self._dim,-1,len(self._t)))
+        self._splines= [[interpolate.InterpolatedUnivariateSpline(\
+                    self._t,qq[jj],**_KWINTERP) for jj in range(qq.shape[0])]
+                        for qq in q]
+        return None
+
+    def __call__(self,t):
+        """
+        NAME:
+           __call__
+        PURPOSE:
+           evaluate the orbit at arbitrary times
+        INPUT:
+           t - time or array of times
+        OUTPUT:
+           [dim,...,nt] array
+        """
+        t= nu.atleast_1d(t).astype('float')
+        if nu.any(t < self._t[0]) or nu.any(t > self._t[-1]):
+            raise ValueError("One or more requested time is not within the integrated range")
+        out= nu.array([[s(t) for s in ss] for ss in self._splines])\
+            .reshape((self._dim,)+self._shape+(len(t),))
+        if self._dim == 4 or self._dim == 6:
+            #Unpack interpolated x and y to R and phi
+            x, y= out[0].copy(), out[-1].copy()
+            out[0]= nu.sqrt(x*x+y*y)
+            out[-1]= nu.arctan2(y,x) % (2.*nu.pi)
+        return out
 
 class _fakeInterp(object): 
     """Fake class to simulate interpolation when orbit was not integrated"""
-    def __init__(self,x):
-        self.x= x
+    def __init__(self,vxvv):
+        self.vxvv= nu.array(vxvv)
     def __call__(self,t):
-        if nu.any(nu.array(t) != 0.):
+        t= nu.atleast_1d(t)
+        if nu.any(t != 0.):
             raise ValueError("Integrate instance before evaluating it at non-zero time")
         else:
-            return nu.array([self.x for i in t])
+            return nu.tile(self.vxvv[...,nu.newaxis],
+                           (1,)*self.vxvv.ndim+(len(t),))
 
 def _check_roSet(orb,kwargs,funcName):
     """Function to check whether ro is set, because it's required for funcName"""
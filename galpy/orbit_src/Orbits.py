@@ -0,0 +1,866 @@
+###############################################################################
+#   Orbits: class that represents N orbits, stored as arrays, such that all
+#           of the Orbit methods are evaluated for all N orbits at once
+###############################################################################
+from functools import wraps
+import numpy as nu
+_APY_LOADED= True
+try:
+    from astropy import units
+except ImportError:
+    _APY_LOADED= False
+from galpy.util.bovy_conversion import physical_conversion
+from galpy.util import bovy_conversion
+from galpy.potential_src.Potential import evaluatePotentials, Potential
+from galpy.potential_src.Potential import _check_c
+from galpy.potential_src.planarPotential import RZToplanarPotential, \
+    _evaluateplanarPotentials, planarPotentialFromRZPotential
+from galpy.potential_src.linearPotential import evaluatelinearPotentials
+from galpy.potential_src.CompiledPotential import CompiledPotential, \
+    _underlying_pot
+from galpy.orbit_src.Orbit import Orbit, _check_consistent_units
+from galpy.orbit_src.FullOrbit import FullOrbit, _integrateFullOrbits, \
+    _integrateFullOrbits_extrema, _integrateFullOrbits_chunks, \
+    _reset_integration, ext_loaded
+from galpy.orbit_src.RZOrbit import RZOrbit
+from galpy.orbit_src.planarOrbit import planarOrbit, planarROrbit, \
+    _integratePlanarOrbits
+from galpy.orbit_src.linearOrbit import linearOrbit, _integrateLinearOrbits
+from galpy.actionAngle_src.actionAngleAdiabatic import actionAngleAdiabatic
+from galpy.actionAngle_src.actionAngleAdiabatic_c import _ext_loaded \
+    as aA_ext_loaded
+def _reshape_output(method):
+    """Decorator to reshape the flattened output for N orbits at nt times
+    to [N,nt]"""
+    @wraps(method)
+    def wrapped(self,*args,**kwargs):
+        out= method(self,*args,**kwargs)
+        if len(args) == 0 or nu.ndim(args[0]) == 0:
+            return out
+        return out.reshape((len(self),nu.size(args[0]))+out.shape[1:])
+    return wrapped
+
+class Orbits(Orbit):
+    """Class representing N orbits, stored as arrays"""
+    def __init__(self,vxvv,uvw=False,lb=False,
+                 radec=False,vo=None,ro=None,zo=0.025,
+                 solarmotion='hogg'):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           Initialize an Orbits instance, representing N orbits
+
+        INPUT:
+
+           vxvv - [N,dim] array (or list of N rows) of initial conditions, where each row is specified as for an Orbit instance:
+
+              1) in Galactocentric cylindrical coordinates [R,vR,vT(,z,vz,phi)]
+
+              2) [ra,dec,d,mu_ra, mu_dec,vlos] in [deg,deg,kpc,mas/yr,mas/yr,km/s] (all J2000.0; mu_ra = mu_ra * cos dec)
+
+              3) [ra,dec,d,U,V,W] in [deg,deg,kpc,km/s,km/s,kms]
+
+              4) (l,b,d,mu_l, mu_b, vlos) in [deg,deg,kpc,mas/yr,mas/yr,km/s) (all J2000.0; mu_l = mu_l * cos b)
+
+              5) [l,b,d,U,V,W] in [deg,deg,kpc,km/s,km/s,kms]
+
+           4) and 5) also work when leaving out b and mu_b/W; alternatively, vxvv can be a tuple of dim arrays, or a list or tuple of dim Quantities, one for each coordinate
+
+        OPTIONAL INPUTS:
+
+           radec, uvw, lb, ro, vo, zo, solarmotion: see Orbit.__init__
+
+        OUTPUT:
+
+           instance
+
+        """
+        if _APY_LOADED and not isinstance(vxvv,units.Quantity) \
+                and isinstance(vxvv[0],units.Quantity):
+            vxvv= [nu.atleast_1d(v.copy()) for v in vxvv]
+        elif isinstance(vxvv,tuple):
+            vxvv= [nu.atleast_1d(nu.array(v,dtype='float')) for v in vxvv]
+        else:
+            vxvv= list(nu.array(vxvv,dtype='float',ndmin=2).T.copy())
+        Orbit.__init__(self,vxvv=vxvv,uvw=uvw,lb=lb,radec=radec,
+                       vo=vo,ro=ro,zo=zo,solarmotion=solarmotion)
+        # Replace the single-orbit _orb with the corresponding N-orbit class
+        self._orb= _orbits_classes[self._orb.__class__](\
+            vxvv=nu.array(self._orb.vxvv),
+            ro=self._orb._ro if self._orb._roSet else None,
+            vo=self._orb._vo if self._orb._voSet else None,
+            zo=self._orb._zo,solarmotion=self._orb._solarmotion)
+        return None
+
+    def __len__(self):
+        return self._orb.vxvv.shape[1]
+
+    def __getitem__(self,key):
+        """
+        NAME:
+
+           __getitem__
+
+        PURPOSE:
+
+           return a single Orbit (integer key) or a subset as an Orbits instance (slice, array of indices, or boolean mask)
+
+        INPUT:
+
+           key - index
+
+        OUTPUT:
+
+           Orbit or Orbits instance; if the orbits were integrated, so is the returned instance
+
+        """
+        orbSetupKwargs= self._orbSetupKwargs()
+        if isinstance(key,(int,nu.integer)):
+            out= Orbit(vxvv=self._orb.vxvv[:,key],**orbSetupKwargs)
+        else:
+            out= Orbits(vxvv=self._orb.vxvv[:,key].T,**orbSetupKwargs)
+        if hasattr(self._orb,'orbit'):
+            out._orb.t= self._orb.t
+            out._orb.orbit= self._orb.orbit[key]
+            out._orb._pot= self._orb._pot
+            if hasattr(self._orb,'_dense_acc'):
+                out._orb._dense_acc= self._orb._dense_acc[key]
+            if hasattr(self._orb,'_dense_sign'):
+                out._orb._dense_sign= self._orb._dense_sign
+        if hasattr(self._orb,'_extrema'):
+            out._orb._extrema= self._orb._extrema[key]
+            out._orb._pot= self._orb._pot
+        return out
+
+    def _orbSetupKwargs(self):
+        orbSetupKwargs= {'ro':None,
+                         'vo':None,
+                         'zo':self._orb._zo,
+                         'solarmotion':self._orb._solarmotion}
+        if self._orb._roSet:
+            orbSetupKwargs['ro']= self._orb._ro
+        if self._orb._voSet:
+            orbSetupKwargs['vo']= self._orb._vo
+        return orbSetupKwargs
+
+    def _asOrbits(self,orb):
+        """Turn an Orbit instance with array initial conditions into Orbits"""
+        return Orbits(vxvv=tuple(orb._orb.vxvv),**self._orbSetupKwargs())
+
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  out_acc=None):
+        """
+        NAME:
+
+           integrate
+
+        PURPOSE:
+
+           integrate all N orbits; with a potential that has a C implementation and a C integrator, all orbits are integrated in a single (OpenMP-parallelized) C call
+
+        INPUT:
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= see Orbit.integrate
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           out= (None) if set, C-contiguous float64 array of shape [N,len(t),6] (e.g., a numpy.memmap) to store the orbits in (only for 3D orbits; see Orbit.integrate)
+
+           out_acc= (None) if set together with out, C-contiguous float64 array of shape [N,len(t),3] to store the accelerations used to interpolate the orbits in (see Orbit.integrate)
+
+        OUTPUT:
+
+           None (get the actual orbits using getOrbit(), which returns a [N,nt,dim] array)
+
+        """
+        Orbit.integrate(self,t,pot,method=method,dt=dt,out=out,
+                        out_acc=out_acc)
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=100000,dense=False):
+        """
+        NAME:
+
+           integrate_chunks
+
+        PURPOSE:
+
+           integrate all N (3D) orbits and return a generator that yields the orbits in chunks of output times (see Orbit.integrate_chunks)
+
+        INPUT:
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= see Orbit.integrate
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           chunksize= (100000) number of output times in each chunk
+
+           dense= (False) if True, also yield the accelerations at the output times (see Orbit.integrate_chunks)
+
+        OUTPUT:
+
+           generator of (t[chunk],orbits[chunk]) with orbits[chunk] a [N,len(chunk),6] array; (t[chunk],orbits[chunk],acc[chunk]) with acc[chunk] a [N,len(chunk),3] array if dense
+
+        """
+        return Orbit.integrate_chunks(self,t,pot,method=method,dt=dt,
+                                      chunksize=chunksize,dense=dense)
+
+    def integrate_extrema(self,t,pot,method='dopr54_c',dt=None):
+        """
+        NAME:
+
+           integrate_extrema
+
+        PURPOSE:
+
+           integrate all N (3D) orbits, only keeping track of their pericenter, apocenter, and maximum height (returned by rperi, rap, zmax, and e afterwards); uses O(1) memory per orbit in C and integrates all orbits in a single (OpenMP-parallelized) C call
+
+        INPUT:
+
+           t - list of times at which the orbits are computed (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= see Orbit.integrate
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+        OUTPUT:
+
+           None
+
+        """
+        Orbit.integrate_extrema(self,t,pot,method=method,dt=dt)
+
+    def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
+                       rectIn=False,rectOut=False):
+        """
+        NAME:
+
+           integrate_dxdv
+
+        PURPOSE:
+
+           integrate all N orbits and a small area of phase space around each of them
+
+        INPUT:
+
+           dxdv - [N,2*dim] array with the phase-space displacement for each orbit (or a single [2*dim] displacement used for all orbits; see Orbit.integrate_dxdv)
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= see Orbit.integrate_dxdv
+
+           rectIn= (False) if True, input dxdv is in rectangular coordinates
+
+           rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
+
+        OUTPUT:
+
+           (none) (get the actual orbits using getOrbit_dxdv(), which returns a [N,nt,dim] array)
+
+        """
+        Orbit.integrate_dxdv(self,dxdv,t,pot,method=method,
+                             rectIn=rectIn,rectOut=rectOut)
+
+    @property
+    def fit(self):
+        # Fitting is only defined for a single orbit
+        raise AttributeError("fit is not available for Orbits instances; use individual Orbit instances")
+
+    def reverse(self):
+        """
+        NAME:
+
+           reverse
+
+        PURPOSE:
+
+           reverse already integrated orbits (that is, make them go from end to beginning in t=0 to tend)
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        if hasattr(self._orb,'_orbInterp'): delattr(self._orb,'_orbInterp')
+        if hasattr(self._orb,'rs'): delattr(self._orb,'rs')
+        sortindx= nu.argsort(self._orb.t)[::-1]
+        if nu.all(sortindx == nu.arange(len(sortindx))): return None
+        if hasattr(self._orb,'_dense_acc'): # accelerations for dense output
+            self._orb._dense_acc= self._orb._dense_acc[:,sortindx]
+        self._orb._dense_sign= -getattr(self._orb,'_dense_sign',1.)
+        self._orb.orbit= self._orb.orbit[:,sortindx]
+        return None
+
+    def flip(self):
+        """
+        NAME:
+
+           flip
+
+        PURPOSE:
+
+           'flip' the orbits' initial conditions such that the velocities are minus the original velocities; returns a new Orbits instance
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           Orbits instance that has the velocities of the current orbits flipped
+
+        """
+        return self._asOrbits(Orbit.flip(self))
+
+    def toPlanar(self):
+        """
+        NAME:
+
+           toPlanar
+
+        PURPOSE:
+
+           convert 3D orbits into planar orbits
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           planar Orbits
+
+        """
+        return self._asOrbits(Orbit.toPlanar(self))
+
+    def toLinear(self):
+        """
+        NAME:
+
+           toLinear
+
+        PURPOSE:
+
+           convert 3D orbits into 1D orbits (z)
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           linear Orbits
+
+        """
+        return self._asOrbits(Orbit.toLinear(self))
+
+    def __call__(self,*args,**kwargs):
+        """
+        NAME:
+
+          __call__
+
+        PURPOSE:
+
+           return the orbits at time t
+
+        INPUT:
+
+           t - desired time (can be Quantity)
+
+        OUTPUT:
+
+           an Orbits instance with initial conditions set to the
+           phase-space at time t or list of Orbits instances if multiple
+           times are given
+
+        """
+        orbSetupKwargs= self._orbSetupKwargs()
+        thiso= self._orb(*args,**kwargs)
+        if len(args) == 0 or nu.ndim(args[0]) == 0:
+            return Orbits(vxvv=thiso.T,**orbSetupKwargs)
+        thiso= thiso.reshape((thiso.shape[0],len(self),nu.size(args[0])))
+        return [Orbits(vxvv=thiso[:,:,ii].T,**orbSetupKwargs)
+                for ii in range(thiso.shape[2])]
+
+    def __add__(self,linOrb):
+        """
+        NAME:
+
+           __add__
+
+        PURPOSE:
+
+           add N linear orbits and N planar orbits to make N 3D orbits
+
+        INPUT:
+
+           linear or planar Orbits instance with the same number of orbits
+
+        OUTPUT:
+
+           Orbits instance of 3D orbits
+
+        """
+        if not isinstance(linOrb,Orbits) or not len(linOrb) == len(self):
+            raise ValueError("Only Orbits instances with the same number of orbits can be added")
+        return self._asOrbits(Orbit.__add__(self,linOrb))
+
+    # Actions are computed for all N orbits at once by passing the arrays of
+    # initial conditions directly to the actionAngle instance
+    def _aAeval(self,pot,func,indx,**kwargs):
+        if func == 'call' and not kwargs.get('t',None) is None:
+            return self._aAevalTimes(pot,kwargs.pop('t'),indx,**kwargs)
+        kwargs.pop('t',None)
+        _check_consistent_units(self,pot)
+        self._orb._setupaA(pot=pot,**kwargs)
+        if func == 'call':
+            return self._orb._aA(*self._orb.vxvv,use_physical=False)[indx]
+        return getattr(self._orb._aA,func)(*self._orb.vxvv,
+                                            use_physical=False)[indx]
+
+    @physical_conversion('action')
+    def jr(self,pot=None,**kwargs):
+        """Radial action for all orbits; see Orbit.jr"""
+        return self._aAeval(pot,'call',0,**kwargs)
+
+    @physical_conversion('action')
+    def jp(self,pot=None,**kwargs):
+        """Azimuthal action for all orbits; see Orbit.jp"""
+        return self._aAeval(pot,'call',1,**kwargs)
+
+    @physical_conversion('action')
+    def jz(self,pot=None,**kwargs):
+        """Vertical action for all orbits; see Orbit.jz"""
+        return self._aAeval(pot,'call',2,**kwargs)
+
+    @physical_conversion('angle')
+    def wr(self,pot=None,**kwargs):
+        """Radial angle for all orbits; see Orbit.wr"""
+        return self._aAeval(pot,'actionsFreqsAngles',6,**kwargs)
+
+    @physical_conversion('angle')
+    def wp(self,pot=None,**kwargs):
+        """Azimuthal angle for all orbits; see Orbit.wp"""
+        return self._aAeval(pot,'actionsFreqsAngles',7,**kwargs)
+
+    @physical_conversion('angle')
+    def wz(self,pot=None,**kwargs):
+        """Vertical angle for all orbits; see Orbit.wz"""
+        return self._aAeval(pot,'actionsFreqsAngles',8,**kwargs)
+
+    @physical_conversion('time')
+    def Tr(self,pot=None,**kwargs):
+        """Radial period for all orbits; see Orbit.Tr"""
+        return 2.*nu.pi/self._aAeval(pot,'actionsFreqs',3,**kwargs)
+
+    @physical_conversion('time')
+    def Tp(self,pot=None,**kwargs):
+        """Azimuthal period for all orbits; see Orbit.Tp"""
+        return 2.*nu.pi/self._aAeval(pot,'actionsFreqs',4,**kwargs)
+
+    def TrTp(self,pot=None,**kwargs):
+        """Tr/Tp*pi for all orbits; see Orbit.TrTp"""
+        return self._aAeval(pot,'actionsFreqs',4,**kwargs)\
+            /self._aAeval(pot,'actionsFreqs',3,**kwargs)*nu.pi
+
+    @physical_conversion('time')
+    def Tz(self,pot=None,**kwargs):
+        """Vertical period for all orbits; see Orbit.Tz"""
+        return 2.*nu.pi/self._aAeval(pot,'actionsFreqs',5,**kwargs)
+
+    @physical_conversion('frequency')
+    def Or(self,pot=None,**kwargs):
+        """Radial frequency for all orbits; see Orbit.Or"""
+        return self._aAeval(pot,'actionsFreqs',3,**kwargs)
+
+    @physical_conversion('frequency')
+    def Op(self,pot=None,**kwargs):
+        """Azimuthal frequency for all orbits; see Orbit.Op"""
+        return self._aAeval(pot,'actionsFreqs',4,**kwargs)
+
+    @physical_conversion('frequency')
+    def Oz(self,pot=None,**kwargs):
+        """Vertical frequency for all orbits; see Orbit.Oz"""
+        return self._aAeval(pot,'actionsFreqs',5,**kwargs)
+
+# All of the Orbit methods that return quantities as a function of time return
+# [N,nt] arrays when evaluated at nt times
+for _name in ['E','L','ER','Ez','Jacobi','R','r','vR','vT','z','vz','phi',
+              'vphi','x','y','vx','vy','ra','dec','ll','bb','dist','pmra',
+              'pmdec','pmll','pmbb','vlos','vra','vdec','vll','vbb',
+              'helioX','helioY','helioZ','U','V','W']:
+    setattr(Orbits,_name,_reshape_output(getattr(Orbit,_name)))
+
+class _OrbitsTop(object):
+    """Mixin that turns the single-orbit classes into classes that hold N
+    orbits; vxvv is a [dim,N] array, the integrated orbits are stored as
+    [N,nt,dim], and __call__ returns [dim,N] for a single time and
+    [dim,N x nt] for multiple times, such that all of the OrbitTop methods
+    work as is"""
+    def __call__(self,*args,**kwargs):
+        if len(args) == 0:
+            return nu.array(self.vxvv)
+        else:
+            t= args[0]
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        onet= nu.ndim(t) == 0
+        t= nu.atleast_1d(t).astype('float')
+        dim= len(self.vxvv)
+        if not hasattr(self,'t'):
+            if nu.any(t != 0.):
+                raise ValueError("Integrate instance before evaluating it at non-zero time")
+            out= nu.tile(nu.array(self.vxvv)[:,:,nu.newaxis],(1,1,len(t)))
+        elif nu.all(nu.any(t[:,nu.newaxis] == self.t,axis=1)):
+            indx= nu.argmax(t[:,nu.newaxis] == self.t,axis=1)
+            out= nu.rollaxis(self.orbit[:,indx],2)
+        else:
+            self._setupOrbitInterp()
+            out= self._orbInterp(t)
+        if onet:
+            return out[:,:,0]
+        else:
+            return out.reshape((dim,-1))
+
+    def _single(self,ii):
+        """Return the single-orbit instance for orbit ii"""
+        return self._orbClass(vxvv=self.vxvv[:,ii])
+
+    def integrate(self,t,pot,method='symplec4_c',dt=None):
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        out= []
+        acc= []
+        for ii in range(self.vxvv.shape[1]):
+            orb= self._single(ii)
+            orb.integrate(t,pot,method=method,dt=dt)
+            out.append(orb.orbit)
+            acc.append(getattr(orb,'_dense_acc',None))
+        self.t= nu.array(t)
+        self._pot= orb._pot
+        self.orbit= nu.array(out)
+        if not any([a is None for a in acc]): self._dense_acc= nu.array(acc)
+
+    def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
+                       rectIn=False,rectOut=False):
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        dxdv= nu.array(dxdv,dtype='float')
+        if dxdv.ndim == 1:
+            dxdv= nu.tile(dxdv,(self.vxvv.shape[1],1))
+        out= []
+        msg= 0
+        for ii in range(self.vxvv.shape[1]):
+            orb= self._single(ii)
+            msg= max(msg,orb.integrate_dxdv(dxdv[ii],t,pot,method=method,
+                                            rectIn=rectIn,rectOut=rectOut))
+            out.append(orb.orbit_dxdv)
+        self.t= nu.array(t)
+        self._pot_dxdv= orb._pot_dxdv
+        self._pot= orb._pot
+        self.orbit_dxdv= nu.array(out)
+        self.orbit= self.orbit_dxdv[:,:,:len(self.vxvv)]
+        return msg
+
+    def getOrbit_dxdv(self):
+        return self.orbit_dxdv[:,:,len(self.vxvv):]
+
+    def _parse_pot(self,kwargs):
+        if not 'pot' in kwargs or kwargs['pot'] is None:
+            try:
+                pot= self._pot
+            except AttributeError:
+                raise AttributeError("Integrate orbit or specify pot=")
+            if 'pot' in kwargs and kwargs['pot'] is None:
+                kwargs.pop('pot')
+        else:
+            pot= kwargs.pop('pot')
+        return pot
+
+    def _evalPot(self,func,thiso,*args):
+        """Evaluate func(thiso,t) for all orbits, one time at a time"""
+        if len(args) == 0 or nu.ndim(args[0]) == 0:
+            t= 0. if len(args) == 0 else args[0]
+            if _APY_LOADED and isinstance(t,units.Quantity):
+                t= t.to(units.Gyr).value\
+                    /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+            return func(thiso,t)
+        t= args[0]
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        thiso= thiso.reshape((thiso.shape[0],self.vxvv.shape[1],len(t)))
+        out= nu.empty(thiso.shape[1:])
+        for jj in range(len(t)):
+            out[:,jj]= func(thiso[:,:,jj],t[jj])
+        return out.flatten()
+
+    @physical_conversion('energy')
+    def E(self,*args,**kwargs):
+        pot= self._parse_pot(kwargs)
+        thiso= self(*args,**kwargs)
+        return self._evalPot(lambda x,t: self._Phi(pot,x,t),thiso,*args)\
+            +nu.sum(thiso[self._vindx]**2.,axis=0)/2.
+
+    def e(self,analytic=False,pot=None):
+        if analytic:
+            rperi,rap= self._analyticRperiRap(pot)
+            return (rap-rperi)/(rap+rperi)
+        if hasattr(self,'_extrema'):
+            return (self._extrema[:,1]-self._extrema[:,0])\
+                /(self._extrema[:,1]+self._extrema[:,0])
+        rs= self._rs()
+        return (nu.amax(rs,axis=1)-nu.amin(rs,axis=1))\
+            /(nu.amax(rs,axis=1)+nu.amin(rs,axis=1))
+
+    @physical_conversion('position')
+    def rap(self,analytic=False,pot=None,**kwargs):
+        if analytic:
+            return self._analyticRperiRap(pot)[1]
+        if hasattr(self,'_extrema'):
+            return self._extrema[:,1]
+        return nu.amax(self._rs(),axis=1)
+
+    @physical_conversion('position')
+    def rperi(self,analytic=False,pot=None,**kwargs):
+        if analytic:
+            return self._analyticRperiRap(pot)[0]
+        if hasattr(self,'_extrema'):
+            return self._extrema[:,0]
+        return nu.amin(self._rs(),axis=1)
+
+    def _analyticaA(self,pot):
+        """Return an actionAngleAdiabatic instance that computes the analytic
+        rperi, rap, and zmax for all orbits at once in C, or None if the
+        potential does not allow this"""
+        if pot is None:
+            try:
+                pot= self._pot
+            except AttributeError:
+                raise AttributeError("Integrate orbit or specify pot=")
+        if isinstance(pot,planarPotentialFromRZPotential):
+            pot= pot._RZPot
+        elif isinstance(pot,list):
+            pot= [p._RZPot if isinstance(p,planarPotentialFromRZPotential)
+                  else p for p in pot]
+        thispot= _underlying_pot(pot)
+        if not aA_ext_loaded \
+                or not nu.all([isinstance(p,Potential) for p in
+                               (thispot if isinstance(thispot,list)
+                                else [thispot])]) \
+                or not _check_c(thispot):
+            return None
+        return actionAngleAdiabatic(pot=pot,c=True)
+
+    def _analyticRperiRap(self,pot):
+        aA= self._analyticaA(pot)
+        if aA is None:
+            orbs= [self._single(ii) for ii in range(self.vxvv.shape[1])]
+            return (nu.array([o.rperi(analytic=True,pot=pot,
+                                      use_physical=False) for o in orbs]),
+                    nu.array([o.rap(analytic=True,pot=pot,
+                                    use_physical=False) for o in orbs]))
+        return aA.calcRapRperi(*self._RvRvTzvz(),c=True)
+
+    def _RvRvTzvz(self):
+        """Return the initial R,vR,vT,z,vz of all orbits (z=vz=0 for 2D orbits)"""
+        if len(self.vxvv) > 4:
+            return tuple(self.vxvv[:5])
+        zero= nu.zeros(self.vxvv.shape[1])
+        return (self.vxvv[0],self.vxvv[1],self.vxvv[2],zero,zero)
+
+    def _rs(self):
+        if not hasattr(self,'orbit'):
+            raise AttributeError("Integrate the orbit first")
+        if not hasattr(self,'rs'):
+            if len(self.vxvv) > 4:
+                self.rs= nu.sqrt(self.orbit[:,:,0]**2.+self.orbit[:,:,3]**2.)
+            else:
+                self.rs= self.orbit[:,:,0]
+        return self.rs
+
+class _OrbitsTop3D(_OrbitsTop):
+    """Methods specific to N orbits in 3D"""
+    _vindx= [1,2,4]
+    @physical_conversion('energy')
+    def ER(self,*args,**kwargs):
+        pot= self._parse_pot(kwargs)
+        thiso= self(*args,**kwargs)
+        return self._evalPot(lambda x,t: self._Phi(pot,x,t,z=0.),thiso,*args)\
+            +thiso[1]**2./2.+thiso[2]**2./2.
+
+    @physical_conversion('energy')
+    def Ez(self,*args,**kwargs):
+        pot= self._parse_pot(kwargs)
+        thiso= self(*args,**kwargs)
+        return self._evalPot(lambda x,t: self._Phi(pot,x,t)
+                             -self._Phi(pot,x,t,z=0.),thiso,*args)\
+                             +thiso[4]**2./2.
+
+    @physical_conversion('position')
+    def zmax(self,analytic=False,pot=None,**kwargs):
+        if analytic:
+            aA= self._analyticaA(pot)
+            if aA is None:
+                return nu.array([self._single(ii).zmax(analytic=True,pot=pot,
+                                                       use_physical=False)
+                                 for ii in range(self.vxvv.shape[1])])
+            return aA.calczmax(*self._RvRvTzvz(),c=True)
+        if hasattr(self,'_extrema'):
+            return self._extrema[:,2]
+        if not hasattr(self,'orbit'):
+            raise AttributeError("Integrate the orbit first")
+        return nu.amax(nu.fabs(self.orbit[:,:,3]),axis=1)
+
+class _FullOrbits(_OrbitsTop3D,FullOrbit):
+    _orbClass= FullOrbit
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  out_acc=None):
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        if hasattr(self,'_extrema'): delattr(self,'_extrema')
+        self.t= nu.array(t)
+        self._pot= _underlying_pot(pot)
+        self.orbit, acc= _integrateFullOrbits(self.vxvv,pot,t,method,dt,
+                                              dense=True,buf=out,
+                                              buf_acc=out_acc)
+        if not acc is None: self._dense_acc= acc
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=100000,dense=False):
+        return _integrateFullOrbits_chunks(self.vxvv,pot,t,method,dt,
+                                           chunksize,dense=dense)
+
+    def integrate_extrema(self,t,pot,method='dopr54_c',dt=None):
+        _reset_integration(self)
+        self._pot= _underlying_pot(pot)
+        self._extrema= _integrateFullOrbits_extrema(self.vxvv,pot,t,method,dt)
+
+    def _Phi(self,pot,thiso,t,z=None):
+        return evaluatePotentials(pot,thiso[0],thiso[3] if z is None else z,
+                                  phi=thiso[5],t=t,use_physical=False)
+
+class _RZOrbits(_OrbitsTop3D,RZOrbit):
+    _orbClass= RZOrbit
+    def integrate(self,t,pot,method='symplec4_c',dt=None):
+        if not _use_c(pot,method):
+            return _OrbitsTop.integrate(self,t,pot,method=method,dt=dt)
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        self.t= nu.array(t)
+        self._pot= _underlying_pot(pot)
+        # Integrate as 3D orbits with phi=0 in a single C call
+        vxvv= nu.zeros((6,self.vxvv.shape[1]))
+        vxvv[:5]= self.vxvv
+        self.orbit= _integrateFullOrbits(vxvv,pot,t,method,dt)[:,:,:5]
+
+    def _Phi(self,pot,thiso,t,z=None):
+        return evaluatePotentials(pot,thiso[0],thiso[3] if z is None else z,
+                                  t=t,use_physical=False)
+
+class _planarOrbits(_OrbitsTop,planarOrbit):
+    _orbClass= planarOrbit
+    _vindx= [1,2]
+    def integrate(self,t,pot,method='symplec4_c',dt=None):
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        thispot= RZToplanarPotential(_underlying_pot(pot))
+        self.t= nu.array(t)
+        self._pot= thispot
+        # The C integrators can use a CompiledPotential directly
+        if isinstance(pot,CompiledPotential): thispot= pot
+        self.orbit, acc= _integratePlanarOrbits(self.vxvv,thispot,t,method,dt,
+                                                dense=True)
+        if not acc is None: self._dense_acc= acc
+
+    def _Phi(self,pot,thiso,t):
+        return _evaluateplanarPotentials(_toPlanar(pot),thiso[0],
+                                         phi=thiso[3],t=t)
+
+class _planarROrbits(_OrbitsTop,planarROrbit):
+    _orbClass= planarROrbit
+    _vindx= [1,2]
+    def integrate(self,t,pot,method='symplec4_c',dt=None):
+        thispot= RZToplanarPotential(_underlying_pot(pot))
+        if not _use_c(thispot,method):
+            return _OrbitsTop.integrate(self,t,pot,method=method,dt=dt)
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        self.t= nu.array(t)
+        self._pot= thispot
+        # The C integrators can use a CompiledPotential directly
+        if isinstance(pot,CompiledPotential): thispot= pot
+        # Integrate as planar orbits with phi=0 in a single C call
+        vxvv= nu.zeros((4,self.vxvv.shape[1]))
+        vxvv[:3]= self.vxvv
+        self.orbit= _integratePlanarOrbits(vxvv,thispot,t,method,dt)[:,:,:3]
+
+    def _Phi(self,pot,thiso,t):
+        return _evaluateplanarPotentials(_toPlanar(pot),thiso[0],t=t)
+
+class _linearOrbits(_OrbitsTop,linearOrbit):
+    _orbClass= linearOrbit
+    _vindx= [1]
+    def __init__(self,vxvv=None,vo=None,ro=None,zo=None,solarmotion=None):
+        linearOrbit.__init__(self,vxvv=vxvv,vo=vo,ro=ro)
+    def integrate(self,t,pot,method='symplec4_c',dt=None):
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
+        self.t= nu.array(t)
+        self._pot= _underlying_pot(pot)
+        self.orbit, acc= _integrateLinearOrbits(self.vxvv,pot,t,method,dt,
+                                                dense=True)
+        if not acc is None: self._dense_acc= acc
+    def _Phi(self,pot,thiso,t):
+        return evaluatelinearPotentials(pot,thiso[0],t=t,use_physical=False)
+
+def _use_c(pot,method):
+    """Whether all orbits can be integrated in a single C call"""
+    pot= _underlying_pot(pot)
+    if not '_c' in method or not ext_loaded: return False
+    if isinstance(pot,list):
+        return bool(nu.prod([p.hasC for p in pot]))
+    else:
+        return pot.hasC
+
+def _toPlanar(pot):
+    if isinstance(pot,Potential):
+        return RZToplanarPotential(pot)
+    elif isinstance(pot,list):
+        return [RZToplanarPotential(p) if isinstance(p,Potential) else p
+                for p in pot]
+    else:
+        return pot
+
+_orbits_classes= {FullOrbit: _FullOrbits,
+                  RZOrbit: _RZOrbits,
+                  planarOrbit: _planarOrbits,
+                  planarROrbit: _planarROrbits,
+                  linearOrbit: _linearOrbits}
@@ -6,6 +6,7 @@ from galpy.potential_src.Potential import _evaluateRforces, _evaluatezforces,\
 import galpy.util.bovy_plot as plot
 import galpy.util.bovy_symplecticode as symplecticode
 from galpy.orbit_src.FullOrbit import _integrateFullOrbit
+from galpy.potential_src.CompiledPotential import _underlying_pot
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.orbit_src.OrbitTop import OrbitTop
 class RZOrbit(OrbitTop):
@@ -71,9 +72,10 @@ class RZOrbit(OrbitTop):
            2010-07-10
         """
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
         if hasattr(self,'rs'): delattr(self,'rs')
         self.t= nu.array(t)
-        self._pot= pot
+        self._pot= _underlying_pot(pot)
         self.orbit= _integrateRZOrbit(self.vxvv,pot,t,method,dt)
 
     @physical_conversion('energy')
@@ -485,6 +487,7 @@ def _integrateRZOrbit(vxvv,pot,t,method,dt):
         #tmp_out is (nt,6)
         out= tmp_out[:,0:5]
     elif method.lower() == 'odeint':
+        pot= _underlying_pot(pot)
         l= vxvv[0]*vxvv[2]
         l2= l**2.
         init= [vxvv[0],vxvv[1],vxvv[3],vxvv[4]]
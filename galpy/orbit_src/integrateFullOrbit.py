@@ -8,7 +8,11 @@ from numpy.ctypeslib import ndpointer
 import os
 from galpy import potential
 from galpy.util import galpyWarning
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+from galpy.potential_src.planarPotential import \
+    FullPotentialFromplanarPotential
 from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol
+from galpy.orbit_src.integratePlanarOrbit import _parse_pot as _parse_planar_pot
 #Find and load the library
 _lib= None
 outerr= None
@@ -39,6 +43,7 @@ else:
 
 def _parse_pot(pot,potforactions=False):
     """Parse the potential so it can be fed to C"""
+    if isinstance(pot,potential.CompiledPotential): pot= pot.pot
     #Figure out what's in pot
     if not isinstance(pot,list):
         pot= [pot]
@@ -79,6 +84,19 @@ def _parse_pot(pot,potforactions=False):
         elif isinstance(p,potential.FlattenedPowerPotential):
             pot_type.append(12)
             pot_args.extend([p._amp,p.alpha,p.q2,p.core2])
+        elif isinstance(p,potential.interpRZPotential) and p._nonuniform:
+            pot_type.append(23)
+            if potforactions:
+                interps= [p._potInterp]
+            else:
+                interps= [p._rforceInterp,p._zforceInterp]
+            tR, tz= interps[0].get_knots()
+            pot_args.extend([p._amp,int(p._logR),int(p._zsym),
+                             len(tR),len(tz)])
+            pot_args.extend(tR)
+            pot_args.extend(tz)
+            for interp in interps:
+                pot_args.extend(interp.get_coeffs())
         elif isinstance(p,potential.interpRZPotential):
             pot_type.append(13)
             pot_args.extend([len(p._rgrid),len(p._zgrid)])
@@ -124,57 +142,110 @@ def _parse_pot(pot,potforactions=False):
         elif isinstance(p,potential.BurkertPotential):
             pot_type.append(20)
             pot_args.extend([p._amp,p.a])
+        elif isinstance(p,potential.MovingObjectPotential):
+            pot_type.append(21)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,potential.interp3DPotential):
+            pot_type.append(22)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,potential.SCFPotential):
+            pot_type.append(24)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,potential.DiskMultipolePotential):
+            pot_type.append(25)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,potential.interpRZTimeSeriesPotential):
+            pot_type.append(26)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,potential.interpSphericalPotential):
+            pot_type.append(27)
+            pot_args.extend(p._c_args())
+        elif isinstance(p,FullPotentialFromplanarPotential):
+            # z-independent planar potential, same arguments as when planar
+            pnpot, ptype, pargs= _parse_planar_pot(p._planarPot)
+            pot_type.extend(ptype)
+            pot_args.extend(pargs)
     pot_type= nu.array(pot_type,dtype=nu.int32,order='C')
     pot_args= nu.array(pot_args,dtype=nu.float64,order='C')
     return (npot,pot_type,pot_args)
 
-def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
+def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None,
+                         dense=False,out=None,out_acc=None):
     """
     NAME:
        integrateFullOrbit_c
     PURPOSE:
-       C integrate an ode for a FullOrbit
+       C integrate an ode for a FullOrbit, or for a batch of FullOrbits that share the same time grid
     INPUT:
-       pot - Potential or list of such instances
-       yo - initial condition [q,p]
+       pot - Potential or list of such instances, or a CompiledPotential
+       yo - initial condition [q,p], shape [6] or [N,6] for N orbits (integrated in parallel using OpenMP)
        t - set of times at which one wants the result
        int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
        rtol, atol
        dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       dense= (False) if True, also return the acceleration at each time in t (for dense output)
+       out= (None) if set, C-contiguous float64 array (e.g., a numpy.memmap) of shape (len(t),6) or (N,len(t),6) that the C code directly writes the result into and that is returned as y
+       out_acc= (None) if set and dense, C-contiguous float64 array (e.g., a numpy.memmap) of shape (len(t),3) or (N,len(t),3) that the C code directly writes the accelerations into and that is returned as acc
     OUTPUT:
-       (y,err)
-       y : array, shape (len(y0), len(t))
+       (y,err) or (y,acc,err) if dense
+       y : array, shape (len(t),6) or (N,len(t),6)
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
-       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators
+       acc : array, shape (len(t),3) or (N,len(t),3) of the rectangular acceleration at each time in t
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array of shape (N,) for [N,6] input
     HISTORY:
        2011-11-13 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
-    npot, pot_type, pot_args= _parse_pot(pot)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full',_parse_pot,ncopy=True)
     int_method_c= _parse_integrator(int_method)
     if dt is None: 
         dt= -9999.99
+    scalarOrbit= len(yo.shape) == 1
+    if scalarOrbit: yo= nu.reshape(yo,(1,6))
+    nobj= len(yo)
 
     #Set up result array
-    result= nu.empty((len(t),6))
-    err= ctypes.c_int(0)
+    if out is None:
+        result= nu.empty((nobj,len(t),6))
+    else:
+        if out.dtype != nu.float64 or not out.flags['C_CONTIGUOUS'] \
+                or not out.flags['WRITEABLE'] or out.size != nobj*len(t)*6:
+            raise ValueError("out= array for integrateFullOrbit_c must be a writeable, C-contiguous float64 array with shape (len(t),6) or (N,len(t),6)")
+        result= out.reshape((nobj,len(t),6)) # a view, no copy
+    err= nu.zeros(nobj,dtype=nu.int32)
+    if dense:
+        if out_acc is None:
+            acc= nu.empty((nobj,len(t),3))
+        else:
+            if out_acc.dtype != nu.float64 \
+                    or not out_acc.flags['C_CONTIGUOUS'] \
+                    or not out_acc.flags['WRITEABLE'] \
+                    or out_acc.size != nobj*len(t)*3:
+                raise ValueError("out_acc= array for integrateFullOrbit_c must be a writeable, C-contiguous float64 array with shape (len(t),3) or (N,len(t),3)")
+            acc= out_acc.reshape((nobj,len(t),3)) # a view, no copy
+        acc_argtype= ndpointer(dtype=nu.float64,flags=('C_CONTIGUOUS',
+                                                        'WRITEABLE'))
+    else: # NULL pointer
+        acc= None
+        acc_argtype= ctypes.c_void_p
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    integrationFunc= _lib.integrateFullOrbit
-    integrationFunc.argtypes= [ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_int,                             
+    integrationFunc= getattr(_lib,'integrateFullOrbit'+pot_suffix)
+    integrationFunc.argtypes= [ctypes.c_int,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ctypes.c_double,
-                               ctypes.c_double,
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ctypes.c_int,                             
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                                 acc_argtype,
+                                 ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                                 ctypes.c_int]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -182,51 +253,141 @@ def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
     yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
     t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
 
     #Run the C code
-    integrationFunc(yo,
+    integrationFunc(ctypes.c_int(nobj),
+                    yo,
                     ctypes.c_int(len(t)),
                     t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(dt),
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        acc,
+                        err,
+                        ctypes.c_int(int_method_c)]))
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
-    return (result,err.value)
+    if scalarOrbit and dense:
+        return (result[0],acc[0],err[0])
+    elif scalarOrbit:
+        return (result[0],err[0])
+    elif dense:
+        return (result,acc,err)
+    else:
+        return (result,err)
+
+def integrateFullOrbit_extrema_c(pot,yo,t,int_method,rtol=None,atol=None,
+                                 dt=None):
+    """
+    NAME:
+       integrateFullOrbit_extrema_c
+    PURPOSE:
+       C integrate one or more FullOrbits, only keeping track of their pericenter, apocenter, and maximum height (located by root finding on the cubic-Hermite interpolation between the output times), without storing the orbits
+    INPUT:
+       pot - Potential or list of such instances, or a CompiledPotential
+       yo - initial condition [q,p] in rectangular coordinates, shape [6] or [N,6] for N orbits (integrated in parallel using OpenMP)
+       t - set of times at which the orbit is computed (the extrema are found between these)
+       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
+       rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+    OUTPUT:
+       (extrema,err)
+       extrema : array, shape (3) or (N,3) of [rperi,rap,zmax]
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array of shape (N,) for [N,6] input
+    """
+    rtol, atol= _parse_tol(rtol,atol)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full',_parse_pot,ncopy=True)
+    int_method_c= _parse_integrator(int_method)
+    if dt is None: 
+        dt= -9999.99
+    scalarOrbit= len(yo.shape) == 1
+    if scalarOrbit: yo= nu.reshape(yo,(1,6))
+    nobj= len(yo)
+
+    #Set up result array
+    extrema= nu.empty((nobj,3))
+    err= nu.zeros(nobj,dtype=nu.int32)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    integrationFunc= getattr(_lib,'integrateFullOrbit_extrema'+pot_suffix)
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,                             
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                                 ctypes.c_int]
 
-def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pragma: no cover because not included in v1, uncover when included
+    #Array requirements, first store old order
+    f_cont= [yo.flags['F_CONTIGUOUS'],
+             t.flags['F_CONTIGUOUS']]
+    yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
+    t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
+    extrema= nu.require(extrema,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
+
+    #Run the C code
+    integrationFunc(ctypes.c_int(nobj),
+                    yo,
+                    ctypes.c_int(len(t)),
+                    t,
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        extrema,
+                        err,
+                        ctypes.c_int(int_method_c)]))
+
+    #Reset input arrays
+    if f_cont[0]: yo= nu.asfortranarray(yo)
+    if f_cont[1]: t= nu.asfortranarray(t)
+
+    if scalarOrbit:
+        return (extrema[0],err[0])
+    else:
+        return (extrema,err)
+
+def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
+                              dt=None):
     """
     NAME:
        integrateFullOrbit_dxdv_c
     PURPOSE:
-       C integrate an ode for a planarOrbit+phase space volume dxdv
+       C integrate an ode for a FullOrbit+phase space volume dxdv
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        yo - initial condition [q,p]
        dyo - initial condition [dq,dp]
        t - set of times at which one wants the result
-       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
+       int_method= 'rk4_c', 'rk6_c', 'dopr54_c'
        rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
     OUTPUT:
        (y,err)
-       y : array, shape (len(y0), len(t))
+       y : array, shape (len(t),12)
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
-       err: error message if not zero, 1: maximum step reduction happened for adaptive integrators
+       err: error message if not zero, 1: maximum step reduction happened for adaptive integrators (raises NotImplementedError if a potential does not have second derivatives in C)
     HISTORY:
        2011-11-13 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
-    npot, pot_type, pot_args= _parse_pot(pot)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full',_parse_pot,ncopy=True)
     int_method_c= _parse_integrator(int_method)
+    if dt is None: 
+        dt= -9999.99
     yo= nu.concatenate((yo,dyo))
 
     #Set up result array
@@ -235,18 +396,17 @@ def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pra
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    integrationFunc= _lib.integrateFullOrbit_dxdv
+    integrationFunc= getattr(_lib,'integrateFullOrbit_dxdv'+pot_suffix)
     integrationFunc.argtypes= [ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_int,                             
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ctypes.c_double,
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int),
+                                 ctypes.c_int]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -259,16 +419,17 @@ def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pra
     integrationFunc(yo,
                     ctypes.c_int(len(t)),
                     t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        ctypes.byref(err),
+                        ctypes.c_int(int_method_c)]))
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
+    if err.value == -2:
+        raise NotImplementedError("Not all potentials have second derivatives implemented in C, which are necessary to integrate a phase-space volume")
     return (result,err.value)
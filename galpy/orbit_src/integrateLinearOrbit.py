@@ -0,0 +1,161 @@
+import sys
+import sysconfig
+import warnings
+import numpy as nu
+import ctypes
+import ctypes.util
+from numpy.ctypeslib import ndpointer
+import os
+from galpy import potential
+from galpy.util import galpyWarning
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+from galpy.potential_src.Potential import PotentialError
+from galpy.potential_src.verticalPotential import verticalPotential
+from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol
+from galpy.orbit_src.integrateFullOrbit import _parse_pot as _parse_full_pot
+#Find and load the library
+_lib= None
+outerr= None
+PY3= sys.version > '3'
+if PY3: #pragma: no cover
+    _ext_suffix= sysconfig.get_config_var('EXT_SUFFIX')
+else:
+    _ext_suffix= '.so'
+for path in sys.path:
+    try:
+        _lib = ctypes.CDLL(os.path.join(path,'galpy_integrate_c%s' % _ext_suffix))
+    except OSError as e:
+        if os.path.exists(os.path.join(path,'galpy_integrate_c%s' % _ext_suffix)): #pragma: no cover
+            outerr= e
+        _lib = None
+    else:
+        break
+if _lib is None: #pragma: no cover
+    if not outerr is None:
+        warnings.warn("integrateLinearOrbit_c extension module not loaded, because of error '%s' " % outerr,
+                      galpyWarning)
+    else:
+        warnings.warn("integrateLinearOrbit_c extension module not loaded, because galpy_integrate_c%s image was not found" % _ext_suffix,
+                      galpyWarning)
+    _ext_loaded= False
+else:
+    _ext_loaded= True
+
+def _parse_pot(pot):
+    """Parse the potential so it can be fed to C"""
+    if isinstance(pot,potential.CompiledPotential):
+        pot= pot.pot
+    #Figure out what's in pot
+    if not isinstance(pot,list):
+        pot= [pot]
+    #Initialize everything
+    pot_type= []
+    pot_args= []
+    npot= len(pot)
+    for p in pot:
+        if isinstance(p,potential.KGPotential):
+            pot_type.append(31)
+            pot_args.extend([p._amp,p._K,p._D2,2.*p._F])
+        elif isinstance(p,verticalPotential):
+            pot_type.append(32)
+            # The 3D potential is passed as (npot,nargs,pot_type,pot_args)
+            wrap_npot, wrap_pot_type, wrap_pot_args= \
+                _parse_full_pot(p._RZPot)
+            pot_args.extend([wrap_npot,len(wrap_pot_args)])
+            pot_args.extend(wrap_pot_type)
+            pot_args.extend(wrap_pot_args)
+            pot_args.append(p._R)
+        else:
+            raise PotentialError("Potential %s is not a linearPotential with a C implementation; C integration of linearOrbits requires KGPotential or verticalPotential instances" % p.__class__.__name__)
+    pot_type= nu.array(pot_type,dtype=nu.int32,order='C')
+    pot_args= nu.array(pot_args,dtype=nu.float64,order='C')
+    return (npot,pot_type,pot_args)
+
+def integrateLinearOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None,
+                           dense=False):
+    """
+    NAME:
+       integrateLinearOrbit_c
+    PURPOSE:
+       C integrate an ode for a linearOrbit, or for a batch of linearOrbits that share the same time grid
+    INPUT:
+       pot - linearPotential or list of such instances, or a CompiledPotential of such instances
+       yo - initial condition [q,p], shape [2] or [N,2] for N orbits (integrated in parallel using OpenMP)
+       t - set of times at which one wants the result
+       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c', 'symplec6_c', 'dopr54_c'
+       rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       dense= (False) if True, also return the acceleration at each time in t (for dense output)
+    OUTPUT:
+       (y,err) or (y,acc,err) if dense
+       y : array, shape (len(t),2) or (N,len(t),2)
+       Array containing the value of y for each desired time in t, \
+       with the initial value y0 in the first row.
+       acc : array, shape (len(t),1) or (N,len(t),1) of the acceleration at each time in t
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array of shape (N,) for [N,2] input
+    """
+    rtol, atol= _parse_tol(rtol,atol)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'linear',_parse_pot,ncopy=True)
+    int_method_c= _parse_integrator(int_method)
+    if dt is None:
+        dt= -9999.99
+    yo= nu.array(yo,dtype=nu.float64)
+    scalarOrbit= len(yo.shape) == 1
+    if scalarOrbit: yo= nu.reshape(yo,(1,2))
+    nobj= len(yo)
+
+    #Set up result array
+    result= nu.empty((nobj,len(t),2))
+    err= nu.zeros(nobj,dtype=nu.int32)
+    if dense:
+        acc= nu.empty((nobj,len(t),1))
+        acc_argtype= ndpointer(dtype=nu.float64,flags=('C_CONTIGUOUS',
+                                                        'WRITEABLE'))
+    else: # NULL pointer
+        acc= None
+        acc_argtype= ctypes.c_void_p
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    integrationFunc= getattr(_lib,'integrateLinearOrbit'+pot_suffix)
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                                 acc_argtype,
+                                 ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                                 ctypes.c_int]
+
+    #Array requirements
+    yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
+    t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
+    result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
+
+    #Run the C code
+    integrationFunc(ctypes.c_int(nobj),
+                    yo,
+                    ctypes.c_int(len(t)),
+                    t,
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        acc,
+                        err,
+                        ctypes.c_int(int_method_c)]))
+
+    if scalarOrbit and dense:
+        return (result[0],acc[0],err[0])
+    elif scalarOrbit:
+        return (result[0],err[0])
+    elif dense:
+        return (result,acc,err)
+    else:
+        return (result,err)
@@ -8,6 +8,7 @@ from numpy.ctypeslib import ndpointer
 import os
 from galpy import potential, potential_src
 from galpy.util import galpyWarning
+from galpy.potential_src.CompiledPotential import _parse_pot_cargs
 #Find and load the library
 _lib= None
 outerr= None
@@ -38,6 +39,8 @@ else:
 
 def _parse_pot(pot):
     """Parse the potential so it can be fed to C"""
+    if isinstance(pot,potential.CompiledPotential):
+        pot= potential.RZToplanarPotential(pot.pot)
     #Figure out what's in pot
     if not isinstance(pot,list):
         pot= [pot]
@@ -159,6 +162,34 @@ def _parse_pot(pot):
                  and isinstance(p._RZPot,potential.BurkertPotential):
             pot_type.append(20)
             pot_args.extend([p._RZPot._amp,p._RZPot.a])
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) \
+                 and isinstance(p._Pot,potential.MovingObjectPotential):
+            pot_type.append(21)
+            pot_args.extend(p._Pot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) \
+                 and isinstance(p._Pot,potential.interp3DPotential):
+            pot_type.append(22)
+            pot_args.extend(p._Pot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential) \
+                 and isinstance(p._RZPot,potential.SCFPotential):
+            pot_type.append(24)
+            pot_args.extend(p._RZPot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) \
+                 and isinstance(p._Pot,potential.SCFPotential):
+            pot_type.append(24)
+            pot_args.extend(p._Pot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential) \
+                 and isinstance(p._RZPot,potential.DiskMultipolePotential):
+            pot_type.append(25)
+            pot_args.extend(p._RZPot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential) \
+                 and isinstance(p._RZPot,potential.interpRZTimeSeriesPotential):
+            pot_type.append(26)
+            pot_args.extend(p._RZPot._c_args())
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential) \
+                 and isinstance(p._RZPot,potential.interpSphericalPotential):
+            pot_type.append(27)
+            pot_args.extend(p._RZPot._c_args())
     pot_type= nu.array(pot_type,dtype=nu.int32,order='C')
     pot_args= nu.array(pot_args,dtype=nu.float64,order='C')
     return (npot,pot_type,pot_args)
@@ -194,53 +225,66 @@ def _parse_tol(rtol,atol):
     return (rtol,atol)
 
 def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
-                           dt=None):
+                           dt=None,dense=False):
     """
     NAME:
        integratePlanarOrbit_c
     PURPOSE:
-       C integrate an ode for a planarOrbit
+       C integrate an ode for a planarOrbit, or for a batch of planarOrbits that share the same time grid
     INPUT:
-       pot - Potential or list of such instances
-       yo - initial condition [q,p]
+       pot - Potential or list of such instances, or a CompiledPotential
+       yo - initial condition [q,p], shape [4] or [N,4] for N orbits (integrated in parallel using OpenMP)
        t - set of times at which one wants the result
        int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
        rtol, atol
        dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       dense= (False) if True, also return the acceleration at each time in t (for dense output)
     OUTPUT:
-       (y,err)
-       y : array, shape (len(y0), len(t))
+       (y,err) or (y,acc,err) if dense
+       y : array, shape (len(t),4) or (N,len(t),4)
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
-       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators
+       acc : array, shape (len(t),2) or (N,len(t),2) of the rectangular acceleration at each time in t
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array of shape (N,) for [N,4] input
     HISTORY:
        2011-10-03 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
-    npot, pot_type, pot_args= _parse_pot(pot)
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'planar',_parse_pot,ncopy=True)
     int_method_c= _parse_integrator(int_method)
     if dt is None: 
         dt= -9999.99
+    scalarOrbit= len(yo.shape) == 1
+    if scalarOrbit: yo= nu.reshape(yo,(1,4))
+    nobj= len(yo)
 
     #Set up result array
-    result= nu.empty((len(t),4))
-    err= ctypes.c_int(0)
+    result= nu.empty((nobj,len(t),4))
+    err= nu.zeros(nobj,dtype=nu.int32)
+    if dense:
+        acc= nu.empty((nobj,len(t),2))
+        acc_argtype= ndpointer(dtype=nu.float64,flags=('C_CONTIGUOUS',
+                                                        'WRITEABLE'))
+    else: # NULL pointer
+        acc= None
+        acc_argtype= ctypes.c_void_p
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
-    integrationFunc= _lib.integratePlanarOrbit
-    integrationFunc.argtypes= [ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_int,                             
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_int,
-                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+    integrationFunc= getattr(_lib,'integratePlanarOrbit'+pot_suffix)
+    integrationFunc.argtypes= [ctypes.c_int,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.c_double,
-                               ctypes.c_double,
-                               ctypes.c_double,
-                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ctypes.c_int,                             
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags)]\
+                               +pot_argtypes\
+                               +[ctypes.c_double,
+                                 ctypes.c_double,
+                                 ctypes.c_double,
+                                 ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                                 acc_argtype,
+                                 ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                                 ctypes.c_int]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -248,25 +292,33 @@ def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
     yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
     t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
 
     #Run the C code
-    integrationFunc(yo,
+    integrationFunc(ctypes.c_int(nobj),
+                    yo,
                     ctypes.c_int(len(t)),
                     t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(dt),                    
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
+                    *(pot_cargs
+                      +[ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        acc,
+                        err,
+                        ctypes.c_int(int_method_c)]))
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
-    return (result,err.value)
+    if scalarOrbit and dense:
+        return (result[0],acc[0],err[0])
+    elif scalarOrbit:
+        return (result[0],err[0])
+    elif dense:
+        return (result,acc,err)
+    else:
+        return (result,err)
 
 
 def integratePlanarOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
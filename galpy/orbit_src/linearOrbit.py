@@ -1,8 +1,12 @@
 import numpy as nu
 from scipy import integrate
 from galpy.orbit_src.OrbitTop import OrbitTop
-from galpy.potential_src.linearPotential import _evaluatelinearForces,\
-    evaluatelinearPotentials
+from galpy.orbit_src.integrateLinearOrbit import integrateLinearOrbit_c, \
+    _ext_loaded
+from galpy.potential_src.CompiledPotential import _underlying_pot
+from galpy.potential_src.Potential import PotentialError
+from galpy.potential_src.linearPotential import linearPotential, \
+    _evaluatelinearForces, evaluatelinearPotentials
 import galpy.util.bovy_plot as plot
 import galpy.util.bovy_symplecticode as symplecticode
 from galpy.util.bovy_conversion import physical_conversion
@@ -48,17 +52,20 @@ class linearOrbit(OrbitTop):
         INPUT:
            t - list of times at which to output (0 has to be in this!)
            pot - potential instance or list of instances
-           method= 'odeint'= scipy's odeint, or 'leapfrog'
-           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (NOT USED FOR LINEAR ORBIT SO FAR)
+           method= 'odeint'= scipy's odeint, 'leapfrog', or any of the C integrators ('leapfrog_c', 'symplec4_c', 'symplec6_c', 'rk4_c', 'rk6_c', 'dopr54_c'; only for potentials with a C implementation)
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only for the C integrators)
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
            2010-07-13 - Written - Bovy (NYU)
         """
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
         self.t= nu.array(t)
-        self._pot= pot
-        self.orbit= _integrateLinearOrbit(self.vxvv,pot,t,method)
+        self._pot= _underlying_pot(pot)
+        self.orbit, acc= _integrateLinearOrbit(self.vxvv,pot,t,method,dt,
+                                               dense=True)
+        if not acc is None: self._dense_acc= acc
 
     @physical_conversion('energy')
     def E(self,*args,**kwargs):
@@ -125,7 +132,7 @@ class linearOrbit(OrbitTop):
     def zmax(self): #pragma: no cover
         raise AttributeError("linearOrbit does not have a zmax")
 
-def _integrateLinearOrbit(vxvv,pot,t,method):
+def _integrateLinearOrbit(vxvv,pot,t,method,dt=None,dense=False):
     """
     NAME:
        integrateLinearOrbit
@@ -133,26 +140,74 @@ def _integrateLinearOrbit(vxvv,pot,t,method):
        integrate a one-dimensional orbit
     INPUT:
        vxvv - initial condition [x,vx]
-       pot - linearPotential or list of linearPotentials
+       pot - linearPotential or list of linearPotentials (or CompiledPotential)
        t - list of times at which to output (0 has to be in this!)
-       method - 'odeint' or 'leapfrog'
+       method - 'odeint', 'leapfrog', or any of the C integrators
+       dt= (None) if set, force the C integrators to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the acceleration at each t from the C integrators (None for the Python integrators)
     OUTPUT:
-       [:,2] array of [x,vx] at each t
+       [:,2] array of [x,vx] at each t (, [:,1] acceleration if dense)
     HISTORY:
        2010-07-13- Written - Bovy (NYU)
     """
+    out= _integrateLinearOrbits(nu.reshape(vxvv,(2,1)),pot,t,method,dt,
+                                dense=dense)
+    if dense:
+        return (out[0][0],None if out[1] is None else out[1][0])
+    else:
+        return out[0]
+
+def _integrateLinearOrbits(vxvv,pot,t,method,dt=None,dense=False):
+    """
+    NAME:
+       _integrateLinearOrbits
+    PURPOSE:
+       integrate N one-dimensional orbits
+    INPUT:
+       vxvv - [2,N] array of initial conditions [x,vx]
+       pot - linearPotential or list of linearPotentials (or CompiledPotential)
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint', 'leapfrog', or any of the C integrators (all orbits are then integrated in a single, OpenMP-parallelized C call)
+       dt= (None) if set, force the C integrators to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the acceleration at each t from the C integrators (None for the Python integrators)
+    OUTPUT:
+       [N,nt,2] array of [x,vx] at each t (, [N,nt,1] acceleration if dense)
+    """
+    vxvv= nu.array(vxvv)
+    # C integrators can use a CompiledPotential directly, Python ones cannot
+    cpot= pot
+    pot= _underlying_pot(pot)
+    acc= None
+    if not nu.all([isinstance(p,linearPotential)
+                   for p in (pot if isinstance(pot,list) else [pot])]):
+        raise PotentialError("Potential given to integrate a linearOrbit is neither a linearPotential-instance or a list of such instances; convert 3D potentials with galpy.potential.RZToverticalPotential")
+    #First check that the potential has C
     if '_c' in method:
-        if 'leapfrog' in method or 'symplec' in method:
-            method= 'leapfrog'
+        if isinstance(pot,list):
+            allHasC= nu.prod([p.hasC for p in pot])
         else:
-            method= 'odeint'
+            allHasC= pot.hasC
+        if not allHasC or not _ext_loaded:
+            if 'leapfrog' in method or 'symplec' in method:
+                method= 'leapfrog'
+            else:
+                method= 'odeint'
     if method.lower() == 'leapfrog':
-        return symplecticode.leapfrog(lambda x,t=t: _evaluatelinearForces(pot,x,
-                                                                         t=t),
-                                      nu.array(vxvv),
-                                      t,rtol=10.**-8)
+        out= nu.array([symplecticode.leapfrog(\
+                    lambda x,t=t: _evaluatelinearForces(pot,x,t=t),
+                    nu.array(vxvv[:,ii]),t,rtol=10.**-8)
+                       for ii in range(vxvv.shape[1])])
     elif method.lower() == 'odeint':
-        return integrate.odeint(_linearEOM,vxvv,t,args=(pot,),rtol=10.**-8.)
+        out= nu.array([integrate.odeint(_linearEOM,vxvv[:,ii],t,args=(pot,),
+                                        rtol=10.**-8.)
+                       for ii in range(vxvv.shape[1])])
+    else:
+        out, acc, msg= integrateLinearOrbit_c(cpot,vxvv.T,t,method,dt=dt,
+                                              dense=True)
+    if dense:
+        return (out,acc)
+    else:
+        return out
 
 def _linearEOM(y,t,pot):
     """
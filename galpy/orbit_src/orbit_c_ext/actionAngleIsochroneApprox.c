@@ -0,0 +1,443 @@
+/*
+  C implementation of actionAngleIsochroneApprox: integrate the orbits and
+  compute the isochrone actions and angles along them, accumulating the
+  angle-weighted average actions and the angle-fit for the frequencies and
+  angles without storing the orbits
+*/
+#include <stdlib.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include <bovy_symplecticode.h>
+#include <bovy_rk.h>
+#include <galpy_potentials.h>
+#include <integrateFullOrbit.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+#define ORBITS_CHUNKSIZE 1
+#define ISOAPPROX_CHUNKSIZE 128
+#define ISOAPPROX_NOUT 12
+/*
+  Function Declarations
+*/
+void evalRectForce(double, double *, double *,
+		   int, struct potentialArg *);
+void evalRectDeriv(double, double *, double *,
+		   int, struct potentialArg *);
+void actionAngleIsochroneApprox_pa(int,double *,int,double *,int,int,
+				   struct potentialArg *,double,double,double,
+				   int,double,double,int,int,int *,int *,
+				   double *,int *);
+/*
+  Actions and angles along the orbit
+*/
+struct isoApproxPoint {
+  double jr;
+  double jz;
+  double ar;
+  double ap;
+  double az;
+};
+static inline double clip_unity(double x){
+  //Deal with round-off just outside of [-1,1]
+  if ( x > 1. && x < 1.+1e-7 ) return 1.;
+  if ( x < -1. && x > -1.-1e-7 ) return -1.;
+  return x;
+}
+static inline double mod_twopi(double x){
+  x= fmod(x,2.*M_PI);
+  return ( x < 0. ) ? x + 2.*M_PI : x;
+}
+static void isochrone_actionsAngles(double *y,double amp,double b,
+				    struct isoApproxPoint * p){
+  //Actions and angles in the isochrone potential (see
+  //actionAngleIsochrone._actionsFreqsAngles) for y= rectangular [q,p]
+  double R, z, phi, vR, vT, vz;
+  double Lz, Lx, Ly, L2, L, E, Or, Oz, c, e, s, coseta, eta;
+  double costheta, sintheta, angler, tan11, tan12, i, psi, u, anglez;
+  int vzindx;
+  R= sqrt( *y * *y + *(y+1) * *(y+1) );
+  z= *(y+2);
+  phi= atan2(*(y+1),*y);
+  vR= ( *y * *(y+3) + *(y+1) * *(y+4) ) / R;
+  vT= ( *y * *(y+4) - *(y+1) * *(y+3) ) / R;
+  vz= *(y+5);
+  Lz= R * vT;
+  Lx= -z * vT;
+  Ly= z * vR - R * vz;
+  L2= Lx * Lx + Ly * Ly + Lz * Lz;
+  L= sqrt(L2);
+  E= -amp / ( b + sqrt( R * R + z * z + b * b ) )
+    + 0.5 * ( vR * vR + vT * vT + vz * vz );
+  //Actions
+  p->jz= L - fabs(Lz);
+  p->jr= amp / sqrt(-2. * E) - 0.5 * ( L + sqrt( L2 + 4. * amp * b ) );
+  //Frequencies
+  Or= pow(-2. * E,1.5) / amp;
+  Oz= 0.5 * ( 1. + L / sqrt( L2 + 4. * amp * b ) ) * Or;
+  //Angles
+  c= -0.5 * amp / E - b;
+  e= sqrt( 1. - L2 / amp / c * ( 1. + b / c ) );
+  s= 1. + sqrt( 1. + ( R * R + z * z ) / b / b );
+  coseta= clip_unity(1. / e * ( 1. - b / c * ( s - 2. ) ));
+  eta= acos(coseta);
+  costheta= z / sqrt( R * R + z * z );
+  sintheta= R / sqrt( R * R + z * z );
+  if ( vR * sintheta + vz * costheta < 0. ) eta= 2. * M_PI - eta;
+  angler= eta - e * c / ( c + b ) * sin(eta);
+  tan11= atan( sqrt( ( 1. + e ) / ( 1. - e ) ) * tan( 0.5 * eta ) );
+  tan12= atan( sqrt( ( 1. + e + 2. * b / c ) / ( 1. - e + 2. * b / c ) )
+	       * tan( 0.5 * eta ) );
+  vzindx= ( -vz * sintheta + vR * costheta ) > 0.;
+  if ( tan11 < 0. ) tan11+= M_PI;
+  if ( tan12 < 0. ) tan12+= M_PI;
+  i= acos(clip_unity(Lz / L));
+  psi= asin(clip_unity(costheta / sin(i)));
+  if ( vzindx ) psi= M_PI - psi;
+  psi= mod_twopi(psi);
+  anglez= psi + Oz / Or * angler - tan11
+    - 1. / sqrt( 1. + 4. * amp * b / L2 ) * tan12;
+  u= asin(clip_unity(z / R / tan(i)));
+  if ( vzindx ) u= M_PI - u;
+  p->ar= mod_twopi(angler);
+  p->ap= mod_twopi(( Lz < 0. ) ? phi - u - anglez : phi - u + anglez);
+  p->az= mod_twopi(anglez);
+}
+/*
+  Running sums
+*/
+struct isoApproxSums {
+  //Angle-weighted actions
+  double sjr;
+  double sdr;
+  double sjz;
+  double sdz;
+  //Range of the angles
+  double armin;
+  double armax;
+  double azmin;
+  double azmax;
+  //Number of times the angles wrapped around (ar, increasing aphi,
+  //decreasing aphi, az) with respect to the initial point
+  int wrap[4];
+  //Median of the azimuthal-angle differences: count and extremes
+  long ndphi;
+  long nnegdphi;
+  double maxnegdphi;
+  double minposdphi;
+  //Angle-fit: A^T A and A^T Y for Y= ar, increasing aphi, decreasing aphi, az
+  int npar;
+  double * row;
+  double * ata;
+  double * aty;
+};
+static void isoApprox_dphi(double dphi,struct isoApproxSums * s){
+  s->ndphi+= 1;
+  if ( dphi < 0. ) {
+    s->nnegdphi+= 1;
+    if ( dphi > s->maxnegdphi ) s->maxnegdphi= dphi;
+  }
+  else if ( dphi < s->minposdphi ) s->minposdphi= dphi;
+}
+static void isoApprox_fit(double t,struct isoApproxPoint * p,int nn,
+			  int * gridR,int * gridZ,struct isoApproxSums * s){
+  //Add the point at time t to the angle-fit
+  int ii, jj;
+  int npar= s->npar;
+  double Y[4];
+  *(s->row)= 1.;
+  *(s->row+1)= t;
+  for (ii=0; ii < nn; ii++)
+    *(s->row+2+ii)= sin( *(gridR+ii) * p->ar + *(gridZ+ii) * p->az);
+  *Y= p->ar + 2. * M_PI * *(s->wrap);
+  *(Y+1)= p->ap + 2. * M_PI * *(s->wrap+1);
+  *(Y+2)= 2. * M_PI - p->ap + 2. * M_PI * *(s->wrap+2);
+  *(Y+3)= p->az + 2. * M_PI * *(s->wrap+3);
+  for (ii=0; ii < npar; ii++) {
+    for (jj=0; jj <= ii; jj++)
+      *(s->ata+ii*npar+jj)+= *(s->row+ii) * *(s->row+jj);
+    for (jj=0; jj < 4; jj++)
+      *(s->aty+jj*npar+ii)+= *(s->row+ii) * *(Y+jj);
+  }
+}
+static inline void isoApprox_unwrap(double d,int backward,int * wrap){
+  //Python's dePeriod for going forward in time and its mirror image for
+  //going backward
+  if ( !backward && d < -6. ) *wrap+= 1;
+  else if ( backward && d > 6. ) *wrap-= 1;
+}
+static void isoApprox_update(double t,struct isoApproxPoint * prev,
+			     struct isoApproxPoint * cur,int backward,
+			     int freqsAngles,int nn,int * gridR,int * gridZ,
+			     struct isoApproxSums * s){
+  //Add the interval between the previous and the current point; when
+  //going backward in time, the current point is the earlier one
+  struct isoApproxPoint * early= backward ? cur : prev;
+  struct isoApproxPoint * late= backward ? prev : cur;
+  double dr= mod_twopi(late->ar - early->ar);
+  double dz= mod_twopi(late->az - early->az);
+  s->sjr+= early->jr * dr;
+  s->sdr+= dr;
+  s->sjz+= early->jz * dz;
+  s->sdz+= dz;
+  if ( cur->ar < s->armin ) s->armin= cur->ar;
+  if ( cur->ar > s->armax ) s->armax= cur->ar;
+  if ( cur->az < s->azmin ) s->azmin= cur->az;
+  if ( cur->az > s->azmax ) s->azmax= cur->az;
+  if ( ! freqsAngles ) return;
+  isoApprox_unwrap(cur->ar - prev->ar,backward,s->wrap);
+  isoApprox_unwrap(cur->ap - prev->ap,backward,s->wrap+1);
+  isoApprox_unwrap(prev->ap - cur->ap,backward,s->wrap+2);
+  isoApprox_unwrap(cur->az - prev->az,backward,s->wrap+3);
+  isoApprox_dphi(late->ap - early->ap,s);
+  isoApprox_fit(t,cur,nn,gridR,gridZ,s);
+}
+static int cholesky_solve(int n,double * a,int nrhs,double * b){
+  //Solve a x = b for symmetric positive-definite a (lower triangle used
+  //and overwritten), with the nrhs right-hand sides stored consecutively in
+  //b and overwritten with the solutions
+  int ii, jj, kk, ll;
+  double sum;
+  for (ii=0; ii < n; ii++) {
+    for (jj=0; jj <= ii; jj++) {
+      sum= *(a+ii*n+jj);
+      for (kk=0; kk < jj; kk++) sum-= *(a+ii*n+kk) * *(a+jj*n+kk);
+      if ( ii == jj ) {
+	if ( sum <= 0. ) return 1;
+	*(a+ii*n+ii)= sqrt(sum);
+      }
+      else
+	*(a+ii*n+jj)= sum / *(a+jj*n+jj);
+    }
+  }
+  for (ll=0; ll < nrhs; ll++) {
+    double * x= b+ll*n;
+    for (ii=0; ii < n; ii++) {
+      sum= *(x+ii);
+      for (kk=0; kk < ii; kk++) sum-= *(a+ii*n+kk) * *(x+kk);
+      *(x+ii)= sum / *(a+ii*n+ii);
+    }
+    for (ii=n-1; ii >= 0; ii--) {
+      sum= *(x+ii);
+      for (kk=ii+1; kk < n; kk++) sum-= *(a+kk*n+ii) * *(x+kk);
+      *(x+ii)= sum / *(a+ii*n+ii);
+    }
+  }
+  return 0;
+}
+/*
+  Main functions
+*/
+void actionAngleIsochroneApprox(int nobj,
+				double *yo,
+				int nt,
+				double *t,
+				int npot,
+				int * pot_type,
+				double * pot_args,
+				double dt,
+				double rtol,
+				double atol,
+				int odeint_type,
+				double amp,
+				double b,
+				int freqsAngles,
+				int nn,
+				int * gridR,
+				int * gridZ,
+				double *out,
+				int * err){
+  int ii;
+  int max_threads;
+#ifdef _OPENMP
+  max_threads= ( nobj < omp_get_max_threads() ) ? nobj : omp_get_max_threads();
+#else
+  max_threads= 1;
+#endif
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( max_threads * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < max_threads; ii++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  actionAngleIsochroneApprox_pa(nobj,yo,nt,t,npot,max_threads,potentialArgs,
+				dt,rtol,atol,odeint_type,amp,b,freqsAngles,
+				nn,gridR,gridZ,out,err);
+  delete_potentialArgs_Full(npot,max_threads,potentialArgs);
+}
+void actionAngleIsochroneApprox_pa(int nobj,
+				   double *yo,
+				   int nt,
+				   double *t,
+				   int npot,
+				   int ncopy,
+				   struct potentialArg * potentialArgs,
+				   double dt,
+				   double rtol,
+				   double atol,
+				   int odeint_type,
+				   double amp,
+				   double b,
+				   int freqsAngles,
+				   int nn,
+				   int * gridR,
+				   int * gridZ,
+				   double *out,
+				   int * err){
+  //yo is [nobj,6] rectangular phase-space positions, t are the (increasing)
+  //integration times starting at zero; orbits are integrated forward (and,
+  //for freqsAngles, backward) in chunks of ISOAPPROX_CHUNKSIZE output times
+  //out is [nobj,12]: jr,jz,Or,Op,Oz,ar,ap,az,armin,armax,azmin,azmax
+  int ii;
+  int dim;
+  int max_threads= ( nobj < ncopy ) ? nobj : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
+  void (*odeint_func)(void (*func)(double, double *, double *,
+			   int, struct potentialArg *),
+		      int,
+		      double *,
+		      int, double, double *,
+		      int, struct potentialArg *,
+		      double, double,
+		      double *,int *);
+  void (*odeint_deriv_func)(double, double *, double *,
+			    int,struct potentialArg *);
+  switch ( odeint_type ) {
+  case 0: //leapfrog
+    odeint_func= &leapfrog;
+    odeint_deriv_func= &evalRectForce;
+    dim= 3;
+    break;
+  case 1: //RK4
+    odeint_func= &bovy_rk4;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
+    break;
+  case 2: //RK6
+    odeint_func= &bovy_rk6;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
+    break;
+  case 3: //symplec4
+    odeint_func= &symplec4;
+    odeint_deriv_func= &evalRectForce;
+    dim= 3;
+    break;
+  case 4: //symplec6
+    odeint_func= &symplec6;
+    odeint_deriv_func= &evalRectForce;
+    dim= 3;
+    break;
+  case 5: //DOPR54
+    odeint_func= &bovy_dopr54;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
+    break;
+  default: //unknown integrator
+    for (ii=0; ii < nobj; ii++) *(err+ii)= -1;
+    return;
+  }
+  UNUSED int chunk= ORBITS_CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii)	\
+  num_threads(max_threads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int jj, kk, start, nchunk, thiserr, backward, negFreq;
+    int npar= 2+nn;
+    double y[6];
+    double result[6*ISOAPPROX_CHUNKSIZE];
+    double * thisout= out+ISOAPPROX_NOUT*ii;
+    double medsum;
+    struct isoApproxPoint p0, prev, cur;
+    struct isoApproxSums s;
+    //Initialize
+    s.sjr= 0.;
+    s.sdr= 0.;
+    s.sjz= 0.;
+    s.sdz= 0.;
+    s.ndphi= 0;
+    s.nnegdphi= 0;
+    s.maxnegdphi= -INFINITY;
+    s.minposdphi= INFINITY;
+    s.npar= npar;
+    s.row= (double *) malloc ( npar * sizeof(double) );
+    s.ata= (double *) calloc ( npar * npar , sizeof(double) );
+    s.aty= (double *) calloc ( 4 * npar , sizeof(double) );
+    for (kk=0; kk < 4; kk++) *(s.wrap+kk)= 0;
+    isochrone_actionsAngles(yo+6*ii,amp,b,&p0);
+    s.armin= p0.ar;
+    s.armax= p0.ar;
+    s.azmin= p0.az;
+    s.azmax= p0.az;
+    if ( freqsAngles ) isoApprox_fit(0.,&p0,nn,gridR,gridZ,&s);
+    *(err+ii)= 0;
+    for (backward=0; backward < 1+freqsAngles; backward++) {
+      for (kk=0; kk < 4; kk++) *(s.wrap+kk)= 0;
+      for (kk=0; kk < 6; kk++)
+	*(y+kk)= ( backward && kk > 2 ) ? -*(yo+6*ii+kk) : *(yo+6*ii+kk);
+      prev= p0;
+      for (start=0; start < nt-1; start+= nchunk-1){
+	nchunk= ( nt-start < ISOAPPROX_CHUNKSIZE ) ? nt-start \
+	  : ISOAPPROX_CHUNKSIZE;
+	thiserr= 0;
+	odeint_func(odeint_deriv_func,dim,y,nchunk,dt,t+start,npot,
+		    potentialArgs+tid*npot,rtol,atol,result,&thiserr);
+	if ( thiserr > *(err+ii) ) *(err+ii)= thiserr;
+	for (kk=0; kk < 6; kk++) *(y+kk)= *(result+6*(nchunk-1)+kk);
+	for (jj=1; jj < nchunk; jj++) {
+	  if ( backward )
+	    for (kk=3; kk < 6; kk++) *(result+6*jj+kk)*= -1.;
+	  isochrone_actionsAngles(result+6*jj,amp,b,&cur);
+	  isoApprox_update(backward ? -*(t+start+jj) : *(t+start+jj),
+			   &prev,&cur,backward,freqsAngles,nn,gridR,gridZ,&s);
+	  prev= cur;
+	}
+      }
+      //Python's median also includes the difference between the first and
+      //the last point
+      if ( freqsAngles && backward )
+	isoApprox_dphi(prev.ap - *(thisout+6),&s);
+      else if ( freqsAngles )
+	*(thisout+6)= prev.ap;
+    }
+    //Actions
+    *thisout= s.sjr / s.sdr;
+    *(thisout+1)= s.sjz / s.sdz;
+    *(thisout+8)= s.armin;
+    *(thisout+9)= s.armax;
+    *(thisout+10)= s.azmin;
+    *(thisout+11)= s.azmax;
+    if ( freqsAngles ) {
+      //Is aphi decreasing? (median of the differences < 0)
+      if ( 2 * s.nnegdphi > s.ndphi ) negFreq= 1;
+      else if ( 2 * s.nnegdphi < s.ndphi ) negFreq= 0;
+      else {
+	medsum= s.maxnegdphi + s.minposdphi;
+	negFreq= medsum < 0.;
+      }
+      if ( cholesky_solve(npar,s.ata,4,s.aty) ) {
+	for (kk=2; kk < 8; kk++) *(thisout+kk)= NAN;
+      }
+      else {
+	*(thisout+2)= *(s.aty+1);
+	*(thisout+4)= *(s.aty+3*npar+1);
+	*(thisout+5)= mod_twopi(*s.aty);
+	*(thisout+7)= mod_twopi(*(s.aty+3*npar));
+	if ( negFreq ) {
+	  *(thisout+3)= -*(s.aty+2*npar+1);
+	  *(thisout+6)= mod_twopi(2. * M_PI - *(s.aty+2*npar));
+	}
+	else {
+	  *(thisout+3)= *(s.aty+npar+1);
+	  *(thisout+6)= mod_twopi(*(s.aty+npar));
+	}
+      }
+    }
+    free(s.row);
+    free(s.ata);
+    free(s.aty);
+  }
+}
@@ -5,13 +5,18 @@
 #include <stdlib.h>
 #include <stdbool.h>
 #include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include <bovy_symplecticode.h>
 #include <bovy_rk.h>
 //Potentials
 #include <galpy_potentials.h>
+#include <integrateFullOrbit.h>
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
 #endif
+#define ORBITS_CHUNKSIZE 1
 /*
   Function Declarations
 */
@@ -33,6 +38,12 @@ double calcphi2deriv(double, double, double,double,
 			   int, struct potentialArg *);
 double calcRphideriv(double, double, double,double, 
 			   int, struct potentialArg *);
+double calcz2deriv(double, double, double,double, 
+		   int, struct potentialArg *);
+double calcRzderiv(double, double, double,double, 
+		   int, struct potentialArg *);
+double calcphizderiv(double, double, double,double, 
+		     int, struct potentialArg *);
 /*
   Actual functions
 */
@@ -44,6 +55,15 @@ void parse_leapFuncArgs_Full(int npot,
   int nR, nz;
   double * Rgrid, * zgrid, * potGrid_splinecoeffs;
   for (ii=0; ii < npot; ii++){
+    //Not all potentials have all of these implemented
+    potentialArgs->potentialEval= NULL;
+    potentialArgs->R2deriv= NULL;
+    potentialArgs->z2deriv= NULL;
+    potentialArgs->Rzderiv= NULL;
+    potentialArgs->phi2deriv= NULL;
+    potentialArgs->Rphideriv= NULL;
+    potentialArgs->phizderiv= NULL;
+    potentialArgs->dens= NULL;
     potentialArgs->i2drforce= NULL;
     potentialArgs->accxrforce= NULL;
     potentialArgs->accyrforce= NULL;
@@ -52,60 +72,155 @@ void parse_leapFuncArgs_Full(int npot,
     potentialArgs->accyzforce= NULL;
     switch ( *pot_type++ ) {
     case 0: //LogarithmicHaloPotential, 2 arguments
+      potentialArgs->potentialEval= &LogarithmicHaloPotentialEval;
       potentialArgs->Rforce= &LogarithmicHaloPotentialRforce;
       potentialArgs->zforce= &LogarithmicHaloPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &LogarithmicHaloPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->R2deriv= &LogarithmicHaloPotentialR2deriv;
+      potentialArgs->z2deriv= &LogarithmicHaloPotentialz2deriv;
+      potentialArgs->Rzderiv= &LogarithmicHaloPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 3;
       break;
+    case 1: //DehnenBarPotential (z-independent), 7 arguments
+      potentialArgs->Rforce= &FullPotentialFromplanarPotentialRforce;
+      potentialArgs->zforce= &ZeroForce;
+      potentialArgs->phiforce= &FullPotentialFromplanarPotentialphiforce;
+      potentialArgs->planarRforce= &DehnenBarPotentialRforce;
+      potentialArgs->planarphiforce= &DehnenBarPotentialphiforce;
+      potentialArgs->planarR2deriv= &DehnenBarPotentialR2deriv;
+      potentialArgs->planarphi2deriv= &DehnenBarPotentialphi2deriv;
+      potentialArgs->planarRphideriv= &DehnenBarPotentialRphideriv;
+      potentialArgs->R2deriv= &FullPotentialFromplanarPotentialR2deriv;
+      potentialArgs->z2deriv= &ZeroForce;
+      potentialArgs->Rzderiv= &ZeroForce;
+      potentialArgs->phi2deriv= &FullPotentialFromplanarPotentialphi2deriv;
+      potentialArgs->Rphideriv= &FullPotentialFromplanarPotentialRphideriv;
+      potentialArgs->nargs= 7;
+      break;
+    case 2: //TransientLogSpiralPotential (z-independent), 8 arguments
+      potentialArgs->Rforce= &FullPotentialFromplanarPotentialRforce;
+      potentialArgs->zforce= &ZeroForce;
+      potentialArgs->phiforce= &FullPotentialFromplanarPotentialphiforce;
+      potentialArgs->planarRforce= &TransientLogSpiralPotentialRforce;
+      potentialArgs->planarphiforce= &TransientLogSpiralPotentialphiforce;
+      //No second derivatives: R2deriv etc. stay NULL, such that
+      //integrateFullOrbit_dxdv fails with err= -2
+      potentialArgs->nargs= 8;
+      break;
+    case 3: //SteadyLogSpiralPotential (z-independent), 8 arguments
+      potentialArgs->Rforce= &FullPotentialFromplanarPotentialRforce;
+      potentialArgs->zforce= &ZeroForce;
+      potentialArgs->phiforce= &FullPotentialFromplanarPotentialphiforce;
+      potentialArgs->planarRforce= &SteadyLogSpiralPotentialRforce;
+      potentialArgs->planarphiforce= &SteadyLogSpiralPotentialphiforce;
+      //No second derivatives: R2deriv etc. stay NULL, such that
+      //integrateFullOrbit_dxdv fails with err= -2
+      potentialArgs->nargs= 8;
+      break;
+    case 4: //EllipticalDiskPotential (z-independent), 6 arguments
+      potentialArgs->Rforce= &FullPotentialFromplanarPotentialRforce;
+      potentialArgs->zforce= &ZeroForce;
+      potentialArgs->phiforce= &FullPotentialFromplanarPotentialphiforce;
+      potentialArgs->planarRforce= &EllipticalDiskPotentialRforce;
+      potentialArgs->planarphiforce= &EllipticalDiskPotentialphiforce;
+      potentialArgs->planarR2deriv= &EllipticalDiskPotentialR2deriv;
+      potentialArgs->planarphi2deriv= &EllipticalDiskPotentialphi2deriv;
+      potentialArgs->planarRphideriv= &EllipticalDiskPotentialRphideriv;
+      potentialArgs->R2deriv= &FullPotentialFromplanarPotentialR2deriv;
+      potentialArgs->z2deriv= &ZeroForce;
+      potentialArgs->Rzderiv= &ZeroForce;
+      potentialArgs->phi2deriv= &FullPotentialFromplanarPotentialphi2deriv;
+      potentialArgs->Rphideriv= &FullPotentialFromplanarPotentialRphideriv;
+      potentialArgs->nargs= 6;
+      break;
     case 5: //MiyamotoNagaiPotential, 3 arguments
+      potentialArgs->potentialEval= &MiyamotoNagaiPotentialEval;
       potentialArgs->Rforce= &MiyamotoNagaiPotentialRforce;
       potentialArgs->zforce= &MiyamotoNagaiPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &MiyamotoNagaiPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->R2deriv= &MiyamotoNagaiPotentialR2deriv;
+      potentialArgs->z2deriv= &MiyamotoNagaiPotentialz2deriv;
+      potentialArgs->Rzderiv= &MiyamotoNagaiPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 3;
       break;
+    case 6: //LopsidedDiskPotential (z-independent), 6 arguments
+      potentialArgs->Rforce= &FullPotentialFromplanarPotentialRforce;
+      potentialArgs->zforce= &ZeroForce;
+      potentialArgs->phiforce= &FullPotentialFromplanarPotentialphiforce;
+      potentialArgs->planarRforce= &LopsidedDiskPotentialRforce;
+      potentialArgs->planarphiforce= &LopsidedDiskPotentialphiforce;
+      potentialArgs->planarR2deriv= &LopsidedDiskPotentialR2deriv;
+      potentialArgs->planarphi2deriv= &LopsidedDiskPotentialphi2deriv;
+      potentialArgs->planarRphideriv= &LopsidedDiskPotentialRphideriv;
+      potentialArgs->R2deriv= &FullPotentialFromplanarPotentialR2deriv;
+      potentialArgs->z2deriv= &ZeroForce;
+      potentialArgs->Rzderiv= &ZeroForce;
+      potentialArgs->phi2deriv= &FullPotentialFromplanarPotentialphi2deriv;
+      potentialArgs->Rphideriv= &FullPotentialFromplanarPotentialRphideriv;
+      potentialArgs->nargs= 6;
+      break;
     case 7: //PowerSphericalPotential, 2 arguments
+      potentialArgs->potentialEval= &PowerSphericalPotentialEval;
       potentialArgs->Rforce= &PowerSphericalPotentialRforce;
       potentialArgs->zforce= &PowerSphericalPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &PowerSphericalPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->planarRforce= &PowerSphericalPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &PowerSphericalPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 8: //HernquistPotential, 2 arguments
+      potentialArgs->potentialEval= &HernquistPotentialEval;
       potentialArgs->Rforce= &HernquistPotentialRforce;
       potentialArgs->zforce= &HernquistPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &HernquistPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->planarRforce= &HernquistPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &HernquistPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 9: //NFWPotential, 2 arguments
+      potentialArgs->potentialEval= &NFWPotentialEval;
       potentialArgs->Rforce= &NFWPotentialRforce;
       potentialArgs->zforce= &NFWPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &NFWPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->planarRforce= &NFWPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &NFWPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 10: //JaffePotential, 2 arguments
+      potentialArgs->potentialEval= &JaffePotentialEval;
       potentialArgs->Rforce= &JaffePotentialRforce;
       potentialArgs->zforce= &JaffePotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &JaffePotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->planarRforce= &JaffePotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &JaffePotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 11: //DoubleExponentialDiskPotential, XX arguments
+      potentialArgs->potentialEval= &DoubleExponentialDiskPotentialEval;
       potentialArgs->Rforce= &DoubleExponentialDiskPotentialRforce;
       potentialArgs->zforce= &DoubleExponentialDiskPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
@@ -113,9 +228,15 @@ void parse_leapFuncArgs_Full(int npot,
       potentialArgs->nargs= (int) (8 + 2 * *(pot_args+5) + 4 * ( *(pot_args+4) + 1 ));
       break;
     case 12: //FlattenedPowerPotential, 4 arguments
+      potentialArgs->potentialEval= &FlattenedPowerPotentialEval;
       potentialArgs->Rforce= &FlattenedPowerPotentialRforce;
       potentialArgs->zforce= &FlattenedPowerPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->R2deriv= &FlattenedPowerPotentialR2deriv;
+      potentialArgs->z2deriv= &FlattenedPowerPotentialz2deriv;
+      potentialArgs->Rzderiv= &FlattenedPowerPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 4;
       break;
     case 13: //interpRZPotential, XX arguments
@@ -155,53 +276,182 @@ void parse_leapFuncArgs_Full(int npot,
       free(potGrid_splinecoeffs);
       break;
     case 14: //IsochronePotential, 2 arguments
+      potentialArgs->potentialEval= &IsochronePotentialEval;
       potentialArgs->Rforce= &IsochronePotentialRforce;
       potentialArgs->zforce= &IsochronePotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->planarRforce= &IsochronePotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &IsochronePotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 15: //PowerSphericalwCutoffPotential, 3 arguments
+      potentialArgs->potentialEval= &PowerSphericalPotentialwCutoffEval;
       potentialArgs->Rforce= &PowerSphericalPotentialwCutoffRforce;
       potentialArgs->zforce= &PowerSphericalPotentialwCutoffzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &PowerSphericalPotentialR2deriv;
-      //potentialArgs->planarphi2deriv= &ZeroForce;
-      //potentialArgs->planarRphideriv= &ZeroForce;
+      potentialArgs->planarRforce= &PowerSphericalPotentialwCutoffPlanarRforce;
+      potentialArgs->planarR2deriv= &PowerSphericalPotentialwCutoffPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 3;
       break;
     case 16: //KuzminKutuzovStaeckelPotential, 3 arguments
+      potentialArgs->potentialEval= &KuzminKutuzovStaeckelPotentialEval;
       potentialArgs->Rforce= &KuzminKutuzovStaeckelPotentialRforce;
       potentialArgs->zforce= &KuzminKutuzovStaeckelPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &KuzminKutuzovStaeckelPotentialR2deriv;
+      potentialArgs->R2deriv= &KuzminKutuzovStaeckelPotentialR2deriv;
+      potentialArgs->z2deriv= &KuzminKutuzovStaeckelPotentialz2deriv;
+      potentialArgs->Rzderiv= &KuzminKutuzovStaeckelPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 3;
       break;
     case 17: //PlummerPotential, 2 arguments
+      potentialArgs->potentialEval= &PlummerPotentialEval;
       potentialArgs->Rforce= &PlummerPotentialRforce;
       potentialArgs->zforce= &PlummerPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &PlummerPotentialR2deriv;
+      potentialArgs->planarRforce= &PlummerPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &PlummerPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 18: //PseudoIsothermalPotential, 2 arguments
+      potentialArgs->potentialEval= &PseudoIsothermalPotentialEval;
       potentialArgs->Rforce= &PseudoIsothermalPotentialRforce;
       potentialArgs->zforce= &PseudoIsothermalPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
-      //potentialArgs->R2deriv= &PseudoIsothermalPotentialR2deriv;
+      potentialArgs->planarRforce= &PseudoIsothermalPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &PseudoIsothermalPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 19: //KuzminDiskPotential, 2 arguments
+      potentialArgs->potentialEval= &KuzminDiskPotentialEval;
       potentialArgs->Rforce= &KuzminDiskPotentialRforce;
       potentialArgs->zforce= &KuzminDiskPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->R2deriv= &KuzminDiskPotentialR2deriv;
+      potentialArgs->z2deriv= &KuzminDiskPotentialz2deriv;
+      potentialArgs->Rzderiv= &KuzminDiskPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
     case 20: //BurkertPotential, 2 arguments
+      potentialArgs->potentialEval= &BurkertPotentialEval;
       potentialArgs->Rforce= &BurkertPotentialRforce;
       potentialArgs->zforce= &BurkertPotentialzforce;
       potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->planarRforce= &BurkertPotentialPlanarRforce;
+      potentialArgs->planarR2deriv= &BurkertPotentialPlanarR2deriv;
+      potentialArgs->R2deriv= &SphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &SphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &SphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
       potentialArgs->nargs= 2;
       break;
+    case 21: //MovingObjectPotential, XX arguments
+      potentialArgs->Rforce= &MovingObjectPotentialRforce;
+      potentialArgs->zforce= &MovingObjectPotentialzforce;
+      potentialArgs->phiforce= &MovingObjectPotentialphiforce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (4 + *(pot_args+3)
+				   + 12 * ( *(pot_args+3) - 1 ));
+      break;
+    case 22: //interp3DPotential, XX arguments
+      potentialArgs->potentialEval= &interp3DPotentialEval;
+      potentialArgs->Rforce= &interp3DPotentialRforce;
+      potentialArgs->zforce= &interp3DPotentialzforce;
+      potentialArgs->phiforce= &interp3DPotentialphiforce;
+      potentialArgs->R2deriv= &interp3DPotentialR2deriv;
+      potentialArgs->z2deriv= &interp3DPotentialz2deriv;
+      potentialArgs->Rzderiv= &interp3DPotentialRzderiv;
+      potentialArgs->phi2deriv= &interp3DPotentialphi2deriv;
+      potentialArgs->Rphideriv= &interp3DPotentialRphideriv;
+      potentialArgs->phizderiv= &interp3DPotentialphizderiv;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (13 + ( *(pot_args+3) + 2 )
+				   * *(pot_args+4) * ( *(pot_args+5) + 2 )
+				   * *(pot_args+6));
+      break;
+    case 23: //interpRZPotential on a non-uniform grid, XX arguments
+      potentialArgs->Rforce= &interpRZPotentialKnotsRforce;
+      potentialArgs->zforce= &interpRZPotentialKnotszforce;
+      potentialArgs->phiforce= &ZeroForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (5 + *(pot_args+3) + *(pot_args+4)
+				   + 2 * ( *(pot_args+3) - 4 )
+				   * ( *(pot_args+4) - 4 ));
+      break;
+    case 24: //SCFPotential, XX arguments
+      potentialArgs->potentialEval= &SCFPotentialEval;
+      potentialArgs->Rforce= &SCFPotentialRforce;
+      potentialArgs->zforce= &SCFPotentialzforce;
+      potentialArgs->phiforce= &SCFPotentialphiforce;
+      potentialArgs->dens= &SCFPotentialDens;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (5 + ( 1 + *(pot_args+4) )
+				   * *(pot_args+2) * *(pot_args+3)
+				   * *(pot_args+3));
+      break;
+    case 25: //DiskMultipolePotential, XX arguments
+      potentialArgs->potentialEval= &DiskMultipolePotentialEval;
+      potentialArgs->Rforce= &DiskMultipolePotentialRforce;
+      potentialArgs->zforce= &DiskMultipolePotentialzforce;
+      potentialArgs->phiforce= &ZeroForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (6 + 6 * *(pot_args+1)
+				   + 3 * *(pot_args+2+6 * (int) *(pot_args+1))
+				   * *(pot_args+3+6 * (int) *(pot_args+1)));
+      break;
+    case 26: //interpRZTimeSeriesPotential, XX arguments
+      potentialArgs->potentialEval= &interpRZTimeSeriesPotentialEval;
+      potentialArgs->Rforce= &interpRZTimeSeriesPotentialRforce;
+      potentialArgs->zforce= &interpRZTimeSeriesPotentialzforce;
+      potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->R2deriv= &interpRZTimeSeriesPotentialR2deriv;
+      potentialArgs->z2deriv= &interpRZTimeSeriesPotentialz2deriv;
+      potentialArgs->Rzderiv= &interpRZTimeSeriesPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (11 + *(pot_args+5)
+				   + ( *(pot_args+3) + 2 ) * ( *(pot_args+4) + 2 )
+				   * *(pot_args+5));
+      break;
+    case 27: //interpSphericalPotential, XX arguments
+      potentialArgs->potentialEval= &interpSphericalPotentialEval;
+      potentialArgs->Rforce= &interpSphericalPotentialRforce;
+      potentialArgs->zforce= &interpSphericalPotentialzforce;
+      potentialArgs->phiforce= &ZeroForce;
+      potentialArgs->R2deriv= &interpSphericalPotentialR2deriv;
+      potentialArgs->z2deriv= &interpSphericalPotentialz2deriv;
+      potentialArgs->Rzderiv= &interpSphericalPotentialRzderiv;
+      potentialArgs->phi2deriv= &ZeroForce;
+      potentialArgs->Rphideriv= &ZeroForce;
+      potentialArgs->dens= &interpSphericalPotentialDens;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (8 + 6 * ( *(pot_args+1) - 1 ));
+      break;
     }
     potentialArgs->args= (double *) malloc( potentialArgs->nargs * sizeof(double));
     for (jj=0; jj < potentialArgs->nargs; jj++){
@@ -213,7 +463,50 @@ void parse_leapFuncArgs_Full(int npot,
   }
   potentialArgs-= npot;
 }
-void integrateFullOrbit(double *yo,
+void free_potentialArgs(int npot, struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < npot; ii++) {
+    if ( (potentialArgs+ii)->i2drforce )
+      interp_2d_free((potentialArgs+ii)->i2drforce) ;
+    if ((potentialArgs+ii)->accxrforce )
+      gsl_interp_accel_free ((potentialArgs+ii)->accxrforce );
+    if ((potentialArgs+ii)->accyrforce )
+      gsl_interp_accel_free ((potentialArgs+ii)->accyrforce );
+    if ( (potentialArgs+ii)->i2dzforce )
+      interp_2d_free((potentialArgs+ii)->i2dzforce) ;
+    if ((potentialArgs+ii)->accxzforce )
+      gsl_interp_accel_free ((potentialArgs+ii)->accxzforce );
+    if ((potentialArgs+ii)->accyzforce )
+      gsl_interp_accel_free ((potentialArgs+ii)->accyzforce );
+    free((potentialArgs+ii)->args);
+  }
+}
+struct potentialArg * new_potentialArgs_Full(int npot,
+					      int * pot_type,
+					      double * pot_args,
+					      int * ncopy){
+  //Parse the potential once per thread, such that the result can be 
+  //re-used in many calls to integrateFullOrbit_pa
+  int ii;
+#ifdef _OPENMP
+  *ncopy= omp_get_max_threads();
+#else
+  *ncopy= 1;
+#endif
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( *ncopy * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < *ncopy; ii++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  return potentialArgs;
+}
+void delete_potentialArgs_Full(int npot,int ncopy,
+			       struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < ncopy; ii++)
+    free_potentialArgs(npot,potentialArgs+ii*npot);
+  free(potentialArgs);
+}
+void integrateFullOrbit(int nobj,
+			double *yo,
 			int nt, 
 			double *t,
 			int npot,
@@ -223,13 +516,50 @@ void integrateFullOrbit(double *yo,
 			double rtol,
 			double atol,
 			double *result,
+			double *acc,
 			int * err,
 			int odeint_type){
   //Set up the forces, first count
   int ii;
+  int max_threads;
+#ifdef _OPENMP
+  max_threads= ( nobj < omp_get_max_threads() ) ? nobj : omp_get_max_threads();
+#else
+  max_threads= 1;
+#endif
+  //One copy of the potential per thread, because the interpolated 
+  //potentials carry (non-thread-safe) GSL accelerators
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( max_threads * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < max_threads; ii++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  integrateFullOrbit_pa(nobj,yo,nt,t,npot,max_threads,potentialArgs,
+			dt,rtol,atol,result,acc,err,odeint_type);
+  //Free allocated memory
+  delete_potentialArgs_Full(npot,max_threads,potentialArgs);
+  //Done!
+}
+void integrateFullOrbit_pa(int nobj,
+			   double *yo,
+			   int nt, 
+			   double *t,
+			   int npot,
+			   int ncopy,
+			   struct potentialArg * potentialArgs,
+			   double dt,
+			   double rtol,
+			   double atol,
+			   double *result,
+			   double *acc,
+			   int * err,
+			   int odeint_type){
+  //Integrate using ncopy pre-parsed copies of the potential (one per thread)
+  //If acc is not NULL, also return the (rectangular) acceleration at each 
+  //output time, which together with result gives a cubic-Hermite dense 
+  //output of the orbit
+  int ii;
   int dim;
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+  int max_threads= ( nobj < ncopy ) ? nobj : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
   //Integrate
   void (*odeint_func)(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
@@ -272,36 +602,185 @@ void integrateFullOrbit(double *yo,
     odeint_deriv_func= &evalRectDeriv;
     dim= 6;
     break;
+  default: //unknown integrator
+    for (ii=0; ii < nobj; ii++) *(err+ii)= -1;
+    return;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
-	      result,err);
-  //Free allocated memory
-  for (ii=0; ii < npot; ii++) {
-    free(potentialArgs->args);
-    potentialArgs++;
+  UNUSED int chunk= ORBITS_CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii)	\
+  num_threads(max_threads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int jj;
+    odeint_func(odeint_deriv_func,dim,yo+6*ii,nt,dt,t,npot,
+		potentialArgs+tid*npot,rtol,atol,result+6*nt*ii,err+ii);
+    if ( acc )
+      for (jj=0; jj < nt; jj++)
+	evalRectForce(*(t+jj),result+6*(nt*ii+jj),acc+3*(nt*ii+jj),
+		      npot,potentialArgs+tid*npot);
   }
-  potentialArgs-= npot;
-  free(potentialArgs);
-  //Done!
 }
-// LCOV_EXCL_START
-void integrateOrbit_dxdv(double *yo,
-			 int nt, 
-			 double *t,
-			 int npot,
-			 int * pot_type,
-			 double * pot_args,
-			 double rtol,
-			 double atol,
-			 double *result,
-			 int * err,
-			 int odeint_type){
-  //Set up the forces, first count
+/*
+  Integration that only keeps track of the orbit's extrema: the pericenter, 
+  the apocenter, and the maximum height, located using the cubic-Hermite 
+  interpolation of the position between output times
+*/
+#define EXTREMA_CHUNKSIZE 128
+#define EXTREMA_MAXITER 60
+#define EXTREMA_MAXDEG 5
+static void hermite_position(double s,double h,double *q0,double *q1,
+			     double *p,double *dp){
+  //Position and its derivative wrt s at s=(t-t0)/h, q0/1 rectangular
+  int ii;
+  double h00= (1.+2.*s)*(1.-s)*(1.-s);
+  double h10= s*(1.-s)*(1.-s);
+  double h01= s*s*(3.-2.*s);
+  double h11= s*s*(s-1.);
+  double d00= 6.*s*(s-1.);
+  double d10= (1.-s)*(1.-3.*s);
+  double d11= s*(3.*s-2.);
+  for (ii=0; ii < 3; ii++){
+    *(p+ii)= h00 * *(q0+ii) + h10 * h * *(q0+ii+3)
+      + h01 * *(q1+ii) + h11 * h * *(q1+ii+3);
+    *(dp+ii)= d00 * ( *(q0+ii) - *(q1+ii) ) + d10 * h * *(q0+ii+3)
+      + d11 * h * *(q1+ii+3);
+  }
+}
+static double poly_eval(int deg,double *c,double s){
+  //Evaluate the polynomial with coefficients c (increasing powers) at s
+  int ii;
+  double out= *(c+deg);
+  for (ii=deg-1; ii >= 0; ii--) out= out * s + *(c+ii);
+  return out;
+}
+static int poly_roots01(int deg,double *c,double *roots){
+  //All real roots in (0,1) of the polynomial with coefficients c
+  //(increasing powers), in increasing order; each root is bracketed in 
+  //between two consecutive roots of the derivative, in between which the 
+  //polynomial is monotonic, and found by bisection; returns the number 
+  //of roots
+  int ii, jj, nb, nroot= 0;
+  double dc[EXTREMA_MAXDEG], b[EXTREMA_MAXDEG+1], slo, shi, smid, flo, fmid;
+  if ( deg == 1 ) {
+    if ( *(c+1) == 0. ) return 0;
+    smid= - *c / *(c+1);
+    if ( smid <= 0. || smid >= 1. ) return 0;
+    *roots= smid;
+    return 1;
+  }
+  for (ii=0; ii < deg; ii++) dc[ii]= (ii+1) * *(c+ii+1);
+  b[0]= 0.;
+  nb= 1+poly_roots01(deg-1,dc,b+1);
+  b[nb++]= 1.;
+  for (ii=0; ii < nb-1; ii++){
+    slo= b[ii];
+    shi= b[ii+1];
+    flo= poly_eval(deg,c,slo);
+    if ( flo * poly_eval(deg,c,shi) >= 0. ) continue;
+    for (jj=0; jj < EXTREMA_MAXITER; jj++){
+      smid= 0.5*(slo+shi);
+      fmid= poly_eval(deg,c,smid);
+      if ( fmid * flo > 0. ) {
+	slo= smid;
+	flo= fmid;
+      }
+      else
+	shi= smid;
+    }
+    *(roots+nroot++)= 0.5*(slo+shi);
+  }
+  return nroot;
+}
+static void update_extrema(double h,double *q0,double *q1,double *extrema){
+  //Update extrema=[rperi,rap,zmax] with the interval between q0 and q1
+  int ii, jj, kk, nroot;
+  double a[4][3], c[EXTREMA_MAXDEG+1], roots[EXTREMA_MAXDEG];
+  double p[3], dp[3], r;
+  //End point
+  r= sqrt( *q1 * *q1 + *(q1+1) * *(q1+1) + *(q1+2) * *(q1+2) );
+  if ( r < *extrema ) *extrema= r;
+  if ( r > *(extrema+1) ) *(extrema+1)= r;
+  if ( fabs(*(q1+2)) > *(extrema+2) ) *(extrema+2)= fabs(*(q1+2));
+  //Coefficients of the cubic-Hermite position in s
+  for (ii=0; ii < 3; ii++){
+    a[0][ii]= *(q0+ii);
+    a[1][ii]= h * *(q0+ii+3);
+    a[2][ii]= 3. * ( *(q1+ii) - *(q0+ii) ) - 2. * h * *(q0+ii+3)
+      - h * *(q1+ii+3);
+    a[3][ii]= 2. * ( *(q0+ii) - *(q1+ii) ) + h * *(q0+ii+3)
+      + h * *(q1+ii+3);
+  }
+  //Turning points in r: all roots of the (quintic) derivative of r^2/2
+  for (kk=0; kk <= EXTREMA_MAXDEG; kk++) c[kk]= 0.;
+  for (ii=0; ii < 3; ii++)
+    for (jj=0; jj < 4; jj++)
+      for (kk=0; kk < 3; kk++)
+	c[jj+kk]+= a[jj][ii] * (kk+1) * a[kk+1][ii];
+  nroot= poly_roots01(EXTREMA_MAXDEG,c,roots);
+  for (ii=0; ii < nroot; ii++){
+    hermite_position(roots[ii],h,q0,q1,p,dp);
+    r= sqrt( *p * *p + *(p+1) * *(p+1) + *(p+2) * *(p+2) );
+    if ( r < *extrema ) *extrema= r;
+    if ( r > *(extrema+1) ) *(extrema+1)= r;
+  }
+  //Turning points in z: all roots of the (quadratic) derivative of z
+  for (kk=0; kk < 3; kk++) c[kk]= (kk+1) * a[kk+1][2];
+  nroot= poly_roots01(2,c,roots);
+  for (ii=0; ii < nroot; ii++){
+    hermite_position(roots[ii],h,q0,q1,p,dp);
+    if ( fabs(*(p+2)) > *(extrema+2) ) *(extrema+2)= fabs(*(p+2));
+  }
+}
+void integrateFullOrbit_extrema(int nobj,
+				double *yo,
+				int nt, 
+				double *t,
+				int npot,
+				int * pot_type,
+				double * pot_args,
+				double dt,
+				double rtol,
+				double atol,
+				double *extrema,
+				int * err,
+				int odeint_type){
+  int ii;
+  int max_threads;
+#ifdef _OPENMP
+  max_threads= ( nobj < omp_get_max_threads() ) ? nobj : omp_get_max_threads();
+#else
+  max_threads= 1;
+#endif
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( max_threads * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < max_threads; ii++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  integrateFullOrbit_extrema_pa(nobj,yo,nt,t,npot,max_threads,potentialArgs,
+				dt,rtol,atol,extrema,err,odeint_type);
+  delete_potentialArgs_Full(npot,max_threads,potentialArgs);
+}
+void integrateFullOrbit_extrema_pa(int nobj,
+				   double *yo,
+				   int nt, 
+				   double *t,
+				   int npot,
+				   int ncopy,
+				   struct potentialArg * potentialArgs,
+				   double dt,
+				   double rtol,
+				   double atol,
+				   double *extrema,
+				   int * err,
+				   int odeint_type){
+  //Integrate in chunks of EXTREMA_CHUNKSIZE output times, such that the 
+  //memory use per orbit does not depend on nt; extrema is [nobj,3]
   int ii;
   int dim;
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
-  //Integrate
+  int max_threads= ( nobj < ncopy ) ? nobj : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
   void (*odeint_func)(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
 		      int,
@@ -316,46 +795,147 @@ void integrateOrbit_dxdv(double *yo,
   case 0: //leapfrog
     odeint_func= &leapfrog;
     odeint_deriv_func= &evalRectForce;
-    dim= 6;
+    dim= 3;
     break;
   case 1: //RK4
     odeint_func= &bovy_rk4;
-    odeint_deriv_func= &evalRectDeriv_dxdv;
-    dim= 12;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
     break;
   case 2: //RK6
     odeint_func= &bovy_rk6;
-    odeint_deriv_func= &evalRectDeriv_dxdv;
-    dim= 12;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
     break;
   case 3: //symplec4
     odeint_func= &symplec4;
     odeint_deriv_func= &evalRectForce;
-    dim= 6;
+    dim= 3;
     break;
   case 4: //symplec6
     odeint_func= &symplec6;
     odeint_deriv_func= &evalRectForce;
+    dim= 3;
+    break;
+  case 5: //DOPR54
+    odeint_func= &bovy_dopr54;
+    odeint_deriv_func= &evalRectDeriv;
     dim= 6;
     break;
+  default: //unknown integrator
+    for (ii=0; ii < nobj; ii++) *(err+ii)= -1;
+    return;
+  }
+  UNUSED int chunk= ORBITS_CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii)	\
+  num_threads(max_threads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int jj, start, nchunk, thiserr;
+    double y[6];
+    double result[6*EXTREMA_CHUNKSIZE];
+    double * thisextrema= extrema+3*ii;
+    for (jj=0; jj < 6; jj++) *(y+jj)= *(yo+6*ii+jj);
+    *thisextrema= sqrt( *y * *y + *(y+1) * *(y+1) + *(y+2) * *(y+2) );
+    *(thisextrema+1)= *thisextrema;
+    *(thisextrema+2)= fabs(*(y+2));
+    *(err+ii)= 0;
+    for (start=0; start < nt-1; start+= nchunk-1){
+      nchunk= ( nt-start < EXTREMA_CHUNKSIZE ) ? nt-start : EXTREMA_CHUNKSIZE;
+      thiserr= 0;
+      odeint_func(odeint_deriv_func,dim,y,nchunk,dt,t+start,npot,
+		  potentialArgs+tid*npot,rtol,atol,result,&thiserr);
+      if ( thiserr > *(err+ii) ) *(err+ii)= thiserr;
+      for (jj=0; jj < nchunk-1; jj++)
+	update_extrema(*(t+start+jj+1)-*(t+start+jj),
+		       result+6*jj,result+6*(jj+1),thisextrema);
+      for (jj=0; jj < 6; jj++) *(y+jj)= *(result+6*(nchunk-1)+jj);
+    }
+  }
+}
+void integrateFullOrbit_dxdv(double *yo,
+			     int nt, 
+			     double *t,
+			     int npot,
+			     int * pot_type,
+			     double * pot_args,
+			     double dt,
+			     double rtol,
+			     double atol,
+			     double *result,
+			     int * err,
+			     int odeint_type){
+  //Set up the forces, first count
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+  integrateFullOrbit_dxdv_pa(yo,nt,t,npot,1,potentialArgs,dt,rtol,atol,
+			     result,err,odeint_type);
+  //Free allocated memory
+  delete_potentialArgs_Full(npot,1,potentialArgs);
+  //Done!
+}
+void integrateFullOrbit_dxdv_pa(double *yo,
+				int nt, 
+				double *t,
+				int npot,
+				int ncopy,
+				struct potentialArg * potentialArgs,
+				double dt,
+				double rtol,
+				double atol,
+				double *result,
+				int * err,
+				int odeint_type){
+  //Integrate a single orbit and phase-space volume using the first of the
+  //ncopy pre-parsed copies of the potential
+  int ii, dim;
+  //All potentials need to have second derivatives
+  for (ii=0; ii < npot; ii++)
+    if ( (potentialArgs+ii)->R2deriv == NULL
+	 || (potentialArgs+ii)->z2deriv == NULL
+	 || (potentialArgs+ii)->Rzderiv == NULL
+	 || (potentialArgs+ii)->phi2deriv == NULL
+	 || (potentialArgs+ii)->Rphideriv == NULL ) {
+      *err= -2;
+      return;
+    }
+  void (*odeint_func)(void (*func)(double, double *, double *,
+			   int, struct potentialArg *),
+		      int,
+		      double *,
+		      int, double, double *,
+		      int, struct potentialArg *,
+		      double, double,
+		      double *,int *);
+  void (*odeint_deriv_func)(double, double *, double *,
+			    int,struct potentialArg *);
+  switch ( odeint_type ) {
+  case 1: //RK4
+    odeint_func= &bovy_rk4;
+    odeint_deriv_func= &evalRectDeriv_dxdv;
+    dim= 12;
+    break;
+  case 2: //RK6
+    odeint_func= &bovy_rk6;
+    odeint_deriv_func= &evalRectDeriv_dxdv;
+    dim= 12;
+    break;
   case 5: //DOPR54
     odeint_func= &bovy_dopr54;
     odeint_deriv_func= &evalRectDeriv_dxdv;
     dim= 12;
     break;
+  default: //unknown integrator
+    *err= -1;
+    return;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,-9999.99,t,npot,potentialArgs,
+  odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,
 	      rtol,atol,result,err);
-  //Free allocated memory
-  for (ii=0; ii < npot; ii++) {
-    free(potentialArgs->args);
-    potentialArgs++;
-  }
-  potentialArgs-= npot;
-  free(potentialArgs);
-  //Done!
 }
-// LCOV_EXCL_STOP
 void evalRectForce(double t, double *q, double *a,
 		   int nargs, struct potentialArg * potentialArgs){
   double sinphi, cosphi, x, y, phi,R,Rforce,phiforce, z, zforce;
@@ -438,11 +1018,11 @@ double calcPhiforce(double R, double Z, double phi, double t,
   potentialArgs-= nargs;
   return phiforce;
 }
-// LCOV_EXCL_START
 void evalRectDeriv_dxdv(double t, double *q, double *a,
 			int nargs, struct potentialArg * potentialArgs){
   double sinphi, cosphi, x, y, phi,R,Rforce,phiforce,z,zforce;
-  double R2deriv, phi2deriv, Rphideriv, dFxdx, dFxdy, dFydx, dFydy;
+  double R2deriv, phi2deriv, Rphideriv, z2deriv, Rzderiv, phizderiv;
+  double dFxdx, dFxdy, dFxdz, dFydx, dFydy, dFydz, dFzdx, dFzdy, dFzdz;
   //first three derivatives are just the velocities
   *a++= *(q+3);
   *a++= *(q+4);
@@ -468,11 +1048,14 @@ void evalRectDeriv_dxdv(double t, double *q, double *a,
   *a++= *(q+9);
   *a++= *(q+10);
   *a++= *(q+11);
-  //for the dv derivatives we need also R2deriv, phi2deriv, and Rphideriv
+  //for the dv derivatives we need also the second derivatives
   R2deriv= calcR2deriv(R,z,phi,t,nargs,potentialArgs);
   phi2deriv= calcphi2deriv(R,z,phi,t,nargs,potentialArgs);
   Rphideriv= calcRphideriv(R,z,phi,t,nargs,potentialArgs);
-  //..and dFxdx, dFxdy, dFydx, dFydy
+  z2deriv= calcz2deriv(R,z,phi,t,nargs,potentialArgs);
+  Rzderiv= calcRzderiv(R,z,phi,t,nargs,potentialArgs);
+  phizderiv= calcphizderiv(R,z,phi,t,nargs,potentialArgs);
+  //..and the derivatives of the rectangular forces
   dFxdx= -cosphi*cosphi*R2deriv
     +2.*cosphi*sinphi/R/R*phiforce
     +sinphi*sinphi/R*Rforce
@@ -493,9 +1076,14 @@ void evalRectDeriv_dxdv(double t, double *q, double *a,
     -2.*sinphi*cosphi/R*Rphideriv
     +cosphi*cosphi/R*Rforce
     -cosphi*cosphi/R/R*phi2deriv;
-  *a++= dFxdx * *(q+4) + dFxdy * *(q+5);
-  *a++= dFydx * *(q+4) + dFydy * *(q+5);
-  *a= 0; //BOVY: PUT IN Z2DERIVS
+  dFxdz= -cosphi*Rzderiv+sinphi/R*phizderiv;
+  dFydz= -sinphi*Rzderiv-cosphi/R*phizderiv;
+  dFzdx= dFxdz;
+  dFzdy= dFydz;
+  dFzdz= -z2deriv;
+  *a++= dFxdx * *(q+6) + dFxdy * *(q+7) + dFxdz * *(q+8);
+  *a++= dFydx * *(q+6) + dFydy * *(q+7) + dFydz * *(q+8);
+  *a= dFzdx * *(q+6) + dFzdy * *(q+7) + dFzdz * *(q+8);
 }
 
 double calcR2deriv(double R, double Z, double phi, double t, 
@@ -535,4 +1123,41 @@ double calcRphideriv(double R, double Z, double phi, double t,
   potentialArgs-= nargs;
   return Rphideriv;
 }
-// LCOV_EXCL_STOP
+double calcz2deriv(double R, double Z, double phi, double t, 
+		   int nargs, struct potentialArg * potentialArgs){
+  int ii;
+  double z2deriv= 0.;
+  for (ii=0; ii < nargs; ii++){
+    z2deriv+= potentialArgs->z2deriv(R,Z,phi,t,
+				     potentialArgs);
+    potentialArgs++;
+  }
+  potentialArgs-= nargs;
+  return z2deriv;
+}
+double calcRzderiv(double R, double Z, double phi, double t, 
+		   int nargs, struct potentialArg * potentialArgs){
+  int ii;
+  double Rzderiv= 0.;
+  for (ii=0; ii < nargs; ii++){
+    Rzderiv+= potentialArgs->Rzderiv(R,Z,phi,t,
+				     potentialArgs);
+    potentialArgs++;
+  }
+  potentialArgs-= nargs;
+  return Rzderiv;
+}
+double calcphizderiv(double R, double Z, double phi, double t, 
+		     int nargs, struct potentialArg * potentialArgs){
+  //d2Phi/dphi/dz vanishes for potentials that do not set phizderiv
+  int ii;
+  double phizderiv= 0.;
+  for (ii=0; ii < nargs; ii++){
+    if ( potentialArgs->phizderiv != NULL )
+      phizderiv+= potentialArgs->phizderiv(R,Z,phi,t,
+					   potentialArgs);
+    potentialArgs++;
+  }
+  potentialArgs-= nargs;
+  return phizderiv;
+}
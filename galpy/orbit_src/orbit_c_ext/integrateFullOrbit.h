@@ -1,7 +1,38 @@
 #ifndef __INTEGRATEFULLORBIT_H__
 #define __INTEGRATEFULLORBIT_H__
 #include <galpy_potentials.h>
+/*
+  Macro for dealing with potentially unused variables due to OpenMP
+ */
+/* If we're not using GNU C, elide __attribute__ if it doesn't exist*/
+#ifndef __has_attribute      // Compatibility with non-clang compilers. 
+#define __has_attribute(x) 0  
+#endif
+#if defined(__GNUC__) || __has_attribute(unused)
+#  define UNUSED __attribute__((unused))
+#else
+#  define UNUSED /*NOTHING*/
+#endif
 void parse_leapFuncArgs_Full(int, struct potentialArg *,int *,double *);
+void free_potentialArgs(int, struct potentialArg *);
+struct potentialArg * new_potentialArgs_Full(int,int *,double *,int *);
+void delete_potentialArgs_Full(int,int,struct potentialArg *);
+void integrateFullOrbit_pa(int,double *,int,double *,int,int,
+			   struct potentialArg *,double,double,double,
+			   double *,double *,int *,int);
+void integrateFullOrbit_extrema_pa(int,double *,int,double *,int,int,
+				   struct potentialArg *,double,double,double,
+				   double *,int *,int);
+void integrateFullOrbit_dxdv_pa(double *,int,double *,int,int,
+				struct potentialArg *,double,double,double,
+				double *,int *,int);
 double calcRforce(double,double,double,double,int,struct potentialArg *);
 double calczforce(double,double,double,double,int,struct potentialArg *);
+double calcPhiforce(double,double,double,double,int,struct potentialArg *);
+double calcR2deriv(double,double,double,double,int,struct potentialArg *);
+double calcphi2deriv(double,double,double,double,int,struct potentialArg *);
+double calcRphideriv(double,double,double,double,int,struct potentialArg *);
+double calcz2deriv(double,double,double,double,int,struct potentialArg *);
+double calcRzderiv(double,double,double,double,int,struct potentialArg *);
+double calcphizderiv(double,double,double,double,int,struct potentialArg *);
 #endif /* integrateFullOrbit.h */
@@ -0,0 +1,250 @@
+/*
+  Wrappers around the C integration code for linear Orbits
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include <bovy_symplecticode.h>
+#include <bovy_rk.h>
+//Potentials
+#include <galpy_potentials.h>
+#include <integrateFullOrbit.h>
+#define ORBITS_CHUNKSIZE 1
+/*
+  Function Declarations
+*/
+void evalLinearForce(double, double *, double *,
+		     int, struct potentialArg *);
+void evalLinearDeriv(double, double *, double *,
+		     int, struct potentialArg *);
+double verticalPotentialLinearForce(double,double,struct potentialArg *);
+void integrateLinearOrbit_pa(int,double *,int,double *,int,int,
+			     struct potentialArg *,double,double,double,
+			     double *,double *,int *,int);
+/*
+  Actual functions
+*/
+void parse_leapFuncArgs_Linear(int npot,struct potentialArg * potentialArgs,
+			       int * pot_type,
+			       double * pot_args){
+  int ii,jj;
+  int nfullargs;
+  int * wrapped_pot_type;
+  for (ii=0; ii < npot; ii++){
+    potentialArgs->nwrapped= 0;
+    switch ( *pot_type++ ) {
+    case 31: //KGPotential, 4 arguments
+      potentialArgs->linearForce= &KGPotentialLinearForce;
+      potentialArgs->nargs= 4;
+      break;
+    case 32: //verticalPotential, 1 argument (R) + the 3D potential(s),
+             //given as (npot,nargs,pot_type,pot_args) of the 3D potential(s)
+      potentialArgs->linearForce= &verticalPotentialLinearForce;
+      potentialArgs->nargs= 1;
+      potentialArgs->nwrapped= (int) *pot_args++;
+      nfullargs= (int) *pot_args++;
+      wrapped_pot_type= (int *) malloc ( potentialArgs->nwrapped
+					       * sizeof (int) );
+      for (jj=0; jj < potentialArgs->nwrapped; jj++)
+	*(wrapped_pot_type+jj)= (int) *pot_args++;
+      potentialArgs->wrappedPotentialArg= (struct potentialArg *) malloc ( potentialArgs->nwrapped * sizeof (struct potentialArg) );
+      parse_leapFuncArgs_Full(potentialArgs->nwrapped,
+			      potentialArgs->wrappedPotentialArg,
+			      wrapped_pot_type,pot_args);
+      free(wrapped_pot_type);
+      pot_args+= nfullargs;
+      break;
+    }
+    potentialArgs->args= (double *) malloc( potentialArgs->nargs * sizeof(double));
+    for (jj=0; jj < potentialArgs->nargs; jj++){
+      *(potentialArgs->args)= *pot_args++;
+      potentialArgs->args++;
+    }
+    potentialArgs->args-= potentialArgs->nargs;
+    potentialArgs++;
+  }
+  potentialArgs-= npot;
+}
+void free_potentialArgs_Linear(int npot, struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < npot; ii++) {
+    if ( (potentialArgs+ii)->nwrapped > 0 ) {
+      free_potentialArgs((potentialArgs+ii)->nwrapped,
+			 (potentialArgs+ii)->wrappedPotentialArg);
+      free((potentialArgs+ii)->wrappedPotentialArg);
+    }
+    free((potentialArgs+ii)->args);
+  }
+}
+struct potentialArg * new_potentialArgs_linear(int npot,
+					       int * pot_type,
+					       double * pot_args,
+					       int * ncopy){
+  //Parse the potential once per thread, such that the result can be
+  //re-used in many calls to integrateLinearOrbit_pa
+  int ii;
+#ifdef _OPENMP
+  *ncopy= omp_get_max_threads();
+#else
+  *ncopy= 1;
+#endif
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( *ncopy * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < *ncopy; ii++)
+    parse_leapFuncArgs_Linear(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  return potentialArgs;
+}
+void delete_potentialArgs_linear(int npot,int ncopy,
+				 struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < ncopy; ii++)
+    free_potentialArgs_Linear(npot,potentialArgs+ii*npot);
+  free(potentialArgs);
+}
+void integrateLinearOrbit(int nobj,
+			  double *yo,
+			  int nt,
+			  double *t,
+			  int npot,
+			  int * pot_type,
+			  double * pot_args,
+			  double dt,
+			  double rtol,
+			  double atol,
+			  double *result,
+			  double *acc,
+			  int * err,
+			  int odeint_type){
+  //Set up the forces, first count
+  int ii;
+  int max_threads;
+#ifdef _OPENMP
+  max_threads= ( nobj < omp_get_max_threads() ) ? nobj : omp_get_max_threads();
+#else
+  max_threads= 1;
+#endif
+  //One copy of the potential per thread, because the wrapped interpolated
+  //potentials carry (non-thread-safe) GSL accelerators
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( max_threads * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < max_threads; ii++)
+    parse_leapFuncArgs_Linear(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  integrateLinearOrbit_pa(nobj,yo,nt,t,npot,max_threads,potentialArgs,
+			  dt,rtol,atol,result,acc,err,odeint_type);
+  //Free allocated memory
+  delete_potentialArgs_linear(npot,max_threads,potentialArgs);
+  //Done!
+}
+void integrateLinearOrbit_pa(int nobj,
+			     double *yo,
+			     int nt,
+			     double *t,
+			     int npot,
+			     int ncopy,
+			     struct potentialArg * potentialArgs,
+			     double dt,
+			     double rtol,
+			     double atol,
+			     double *result,
+			     double *acc,
+			     int * err,
+			     int odeint_type){
+  //Integrate nobj orbits using ncopy pre-parsed copies of the potential
+  //(one per thread); if acc is not NULL, also return the acceleration at
+  //each output time for dense output
+  int ii;
+  int dim;
+  int max_threads= ( nobj < ncopy ) ? nobj : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
+  //Integrate
+  void (*odeint_func)(void (*func)(double, double *, double *,
+			   int, struct potentialArg *),
+		      int,
+		      double *,
+		      int, double, double *,
+		      int, struct potentialArg *,
+		      double, double,
+		      double *,int *);
+  void (*odeint_deriv_func)(double, double *, double *,
+			    int,struct potentialArg *);
+  switch ( odeint_type ) {
+  case 0: //leapfrog
+    odeint_func= &leapfrog;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 1: //RK4
+    odeint_func= &bovy_rk4;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 2: //RK6
+    odeint_func= &bovy_rk6;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 3: //symplec4
+    odeint_func= &symplec4;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 4: //symplec6
+    odeint_func= &symplec6;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 5: //DOPR54
+    odeint_func= &bovy_dopr54;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  default: //unknown integrator
+    for (ii=0; ii < nobj; ii++) *(err+ii)= -1;
+    return;
+  }
+  UNUSED int chunk= ORBITS_CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii)	\
+  num_threads(max_threads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int jj;
+    odeint_func(odeint_deriv_func,dim,yo+2*ii,nt,dt,t,npot,
+		potentialArgs+tid*npot,rtol,atol,result+2*nt*ii,err+ii);
+    if ( acc )
+      for (jj=0; jj < nt; jj++)
+	evalLinearForce(*(t+jj),result+2*(nt*ii+jj),acc+nt*ii+jj,
+			npot,potentialArgs+tid*npot);
+  }
+}
+void evalLinearForce(double t, double *q, double *a,
+		     int nargs, struct potentialArg * potentialArgs){
+  int ii;
+  *a= 0.;
+  for (ii=0; ii < nargs; ii++){
+    *a+= potentialArgs->linearForce(*q,t,potentialArgs);
+    potentialArgs++;
+  }
+  potentialArgs-= nargs;
+}
+void evalLinearDeriv(double t, double *q, double *a,
+		     int nargs, struct potentialArg * potentialArgs){
+  //first derivative is just the velocity
+  *a++= *(q+1);
+  //Second is the force
+  evalLinearForce(t,q,a,nargs,potentialArgs);
+}
+//verticalPotential: vertical force of a 3D potential at R,
+//F_z(R,x,phi=0) - F_z(R,0,phi=0)
+double verticalPotentialLinearForce(double x,double t,
+				    struct potentialArg * potentialArgs){
+  double R= *potentialArgs->args;
+  return calczforce(R,x,0.,t,potentialArgs->nwrapped,
+		    potentialArgs->wrappedPotentialArg)
+    -calczforce(R,0.,0.,t,potentialArgs->nwrapped,
+		potentialArgs->wrappedPotentialArg);
+}
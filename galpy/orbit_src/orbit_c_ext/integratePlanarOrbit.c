@@ -5,13 +5,18 @@
 #include <stdlib.h>
 #include <stdbool.h>
 #include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include <bovy_symplecticode.h>
 #include <bovy_rk.h>
 //Potentials
 #include <galpy_potentials.h>
+#include <integrateFullOrbit.h>
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
 #endif
+#define ORBITS_CHUNKSIZE 1
 /*
   Function Declarations
 */
@@ -31,6 +36,9 @@ double calcPlanarphi2deriv(double, double, double,
 			   int, struct potentialArg *);
 double calcPlanarRphideriv(double, double, double, 
 			   int, struct potentialArg *);
+void integratePlanarOrbit_pa(int,double *,int,double *,int,int,
+			     struct potentialArg *,double,double,double,
+			     double *,double *,int *,int);
 /*
   Actual functions
 */
@@ -195,6 +203,60 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
       potentialArgs->planarRphideriv= &ZeroPlanarForce;
       potentialArgs->nargs= 2;
       break;
+    case 21: //MovingObjectPotential, XX arguments
+      potentialArgs->planarRforce= &MovingObjectPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &MovingObjectPotentialPlanarphiforce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (4 + *(pot_args+3)
+				   + 12 * ( *(pot_args+3) - 1 ));
+      break;
+    case 22: //interp3DPotential, XX arguments
+      potentialArgs->planarRforce= &interp3DPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &interp3DPotentialPlanarphiforce;
+      potentialArgs->planarR2deriv= &interp3DPotentialPlanarR2deriv;
+      potentialArgs->planarphi2deriv= &interp3DPotentialPlanarphi2deriv;
+      potentialArgs->planarRphideriv= &interp3DPotentialPlanarRphideriv;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (13 + ( *(pot_args+3) + 2 )
+				   * *(pot_args+4) * ( *(pot_args+5) + 2 )
+				   * *(pot_args+6));
+      break;
+    case 24: //SCFPotential, XX arguments
+      potentialArgs->planarRforce= &SCFPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &SCFPotentialPlanarphiforce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (5 + ( 1 + *(pot_args+4) )
+				   * *(pot_args+2) * *(pot_args+3)
+				   * *(pot_args+3));
+      break;
+    case 25: //DiskMultipolePotential, XX arguments
+      potentialArgs->planarRforce= &DiskMultipolePotentialPlanarRforce;
+      potentialArgs->planarphiforce= &ZeroPlanarForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (6 + 6 * *(pot_args+1)
+				   + 3 * *(pot_args+2+6 * (int) *(pot_args+1))
+				   * *(pot_args+3+6 * (int) *(pot_args+1)));
+      break;
+    case 26: //interpRZTimeSeriesPotential, XX arguments
+      potentialArgs->planarRforce= &interpRZTimeSeriesPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &ZeroPlanarForce;
+      potentialArgs->planarR2deriv= &interpRZTimeSeriesPotentialPlanarR2deriv;
+      potentialArgs->planarphi2deriv= &ZeroPlanarForce;
+      potentialArgs->planarRphideriv= &ZeroPlanarForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (11 + *(pot_args+5)
+				   + ( *(pot_args+3) + 2 ) * ( *(pot_args+4) + 2 )
+				   * *(pot_args+5));
+      break;
+    case 27: //interpSphericalPotential, XX arguments
+      potentialArgs->planarRforce= &interpSphericalPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &ZeroPlanarForce;
+      potentialArgs->planarR2deriv= &interpSphericalPotentialPlanarR2deriv;
+      potentialArgs->planarphi2deriv= &ZeroPlanarForce;
+      potentialArgs->planarRphideriv= &ZeroPlanarForce;
+      //Look at pot_args to figure out the number of arguments
+      potentialArgs->nargs= (int) (8 + 6 * ( *(pot_args+1) - 1 ));
+      break;
     }
     potentialArgs->args= (double *) malloc( potentialArgs->nargs * sizeof(double));
     for (jj=0; jj < potentialArgs->nargs; jj++){
@@ -206,7 +268,32 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
   }
   potentialArgs-= npot;
 }
-void integratePlanarOrbit(double *yo,
+struct potentialArg * new_potentialArgs_planar(int npot,
+						int * pot_type,
+						double * pot_args,
+						int * ncopy){
+  //Parse the potential once per thread, such that the result can be 
+  //re-used in many calls to integratePlanarOrbit_pa
+  int ii;
+#ifdef _OPENMP
+  *ncopy= omp_get_max_threads();
+#else
+  *ncopy= 1;
+#endif
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( *ncopy * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < *ncopy; ii++)
+    parse_leapFuncArgs(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  return potentialArgs;
+}
+void delete_potentialArgs_planar(int npot,int ncopy,
+				 struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < ncopy * npot; ii++)
+    free((potentialArgs+ii)->args);
+  free(potentialArgs);
+}
+void integratePlanarOrbit(int nobj,
+			  double *yo,
 			  int nt, 
 			  double *t,
 			  int npot,
@@ -216,13 +303,50 @@ void integratePlanarOrbit(double *yo,
 			  double rtol,
 			  double atol,
 			  double *result,
+			  double *acc,
 			  int * err,
 			  int odeint_type){
   //Set up the forces, first count
   int ii;
+  int max_threads;
+#ifdef _OPENMP
+  max_threads= ( nobj < omp_get_max_threads() ) ? nobj : omp_get_max_threads();
+#else
+  max_threads= 1;
+#endif
+  if ( max_threads < 1 ) max_threads= 1;
+  //One copy of the potential per thread, because the interpolated 
+  //potentials carry (non-thread-safe) GSL accelerators
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( max_threads * npot * sizeof (struct potentialArg) );
+  for (ii=0; ii < max_threads; ii++)
+    parse_leapFuncArgs(npot,potentialArgs+ii*npot,pot_type,pot_args);
+  integratePlanarOrbit_pa(nobj,yo,nt,t,npot,max_threads,potentialArgs,
+			  dt,rtol,atol,result,acc,err,odeint_type);
+  //Free allocated memory
+  delete_potentialArgs_planar(npot,max_threads,potentialArgs);
+  //Done!
+}
+void integratePlanarOrbit_pa(int nobj,
+			     double *yo,
+			     int nt, 
+			     double *t,
+			     int npot,
+			     int ncopy,
+			     struct potentialArg * potentialArgs,
+			     double dt,
+			     double rtol,
+			     double atol,
+			     double *result,
+			     double *acc,
+			     int * err,
+			     int odeint_type){
+  //Integrate nobj orbits using ncopy pre-parsed copies of the potential
+  //(one per thread); if acc is not NULL, also return the (rectangular) 
+  //acceleration at each output time for dense output
+  int ii;
   int dim;
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs(npot,potentialArgs,pot_type,pot_args);
+  int max_threads= ( nobj < ncopy ) ? nobj : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
   //Integrate
   void (*odeint_func)(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
@@ -265,19 +389,28 @@ void integratePlanarOrbit(double *yo,
     odeint_deriv_func= &evalPlanarRectDeriv;
     dim= 4;
     break;
+  default: //unknown integrator
+    for (ii=0; ii < nobj; ii++) *(err+ii)= -1;
+    return;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
-	      result,err);
-  //Free allocated memory
-  for (ii=0; ii < npot; ii++) {
-    free(potentialArgs->args);
-    potentialArgs++;
+  UNUSED int chunk= ORBITS_CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii)	\
+  num_threads(max_threads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int jj;
+    odeint_func(odeint_deriv_func,dim,yo+4*ii,nt,dt,t,npot,
+		potentialArgs+tid*npot,rtol,atol,result+4*nt*ii,err+ii);
+    if ( acc )
+      for (jj=0; jj < nt; jj++)
+	evalPlanarRectForce(*(t+jj),result+4*(nt*ii+jj),acc+2*(nt*ii+jj),
+			    npot,potentialArgs+tid*npot);
   }
-  potentialArgs-= npot;
-  free(potentialArgs);
-  //Done!
 }
-
 void integratePlanarOrbit_dxdv(double *yo,
 			       int nt, 
 			       double *t,
@@ -322,6 +455,10 @@ void integratePlanarOrbit_dxdv(double *yo,
     odeint_deriv_func= &evalPlanarRectDeriv_dxdv;
     dim= 8;
     break;
+  default: //unknown integrator
+    *err= -1;
+    delete_potentialArgs_planar(npot,1,potentialArgs);
+    return;
   }
   odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
 	      result,err);
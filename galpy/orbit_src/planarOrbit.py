@@ -10,6 +10,8 @@ from galpy.potential_src.planarPotential import _evaluateplanarRforces,\
     RZToplanarPotential, _evaluateplanarphiforces,\
     _evaluateplanarPotentials
 from galpy.potential_src.Potential import Potential
+from galpy.potential_src.CompiledPotential import CompiledPotential, \
+    _underlying_pot
 from galpy.util import galpyWarning
 #try:
 from galpy.orbit_src.integratePlanarOrbit import integratePlanarOrbit_c,\
@@ -240,10 +242,13 @@ class planarROrbit(planarOrbitTop):
            2010-07-20
         """
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
         if hasattr(self,'rs'): delattr(self,'rs')
-        thispot= RZToplanarPotential(pot)
+        thispot= RZToplanarPotential(_underlying_pot(pot))
         self.t= nu.array(t)
         self._pot= thispot
+        # The C integrators can use a CompiledPotential directly
+        if isinstance(pot,CompiledPotential): thispot= pot
         self.orbit, msg= _integrateROrbit(self.vxvv,thispot,t,method,dt)
         return msg
 
@@ -361,11 +366,16 @@ class planarOrbit(planarOrbitTop):
            2010-07-20
         """
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
         if hasattr(self,'rs'): delattr(self,'rs')
-        thispot= RZToplanarPotential(pot)
+        thispot= RZToplanarPotential(_underlying_pot(pot))
         self.t= nu.array(t)
         self._pot= thispot
-        self.orbit, msg= _integrateOrbit(self.vxvv,thispot,t,method,dt)
+        # The C integrators can use a CompiledPotential directly
+        if isinstance(pot,CompiledPotential): thispot= pot
+        self.orbit, msg, acc= _integrateOrbit(self.vxvv,thispot,t,method,dt,
+                                              dense=True)
+        if not acc is None: self._dense_acc= acc
         return msg
 
     def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
@@ -392,8 +402,9 @@ class planarOrbit(planarOrbitTop):
            2014-06-29 - Added rectIn and rectOut - Bovy (IAS)
         """
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'_dense_acc'): delattr(self,'_dense_acc')
         if hasattr(self,'rs'): delattr(self,'rs')
-        thispot= RZToplanarPotential(pot)
+        thispot= RZToplanarPotential(_underlying_pot(pot))
         self.t= nu.array(t)
         self._pot_dxdv= thispot
         self._pot= thispot
@@ -496,6 +507,10 @@ def _integrateROrbit(vxvv,pot,t,method,dt):
     HISTORY:
        2010-07-20 - Written - Bovy (NYU)
     """
+    # C integrators can use a CompiledPotential directly, Python ones cannot
+    cpot= pot
+    if isinstance(pot,CompiledPotential):
+        pot= RZToplanarPotential(pot.pot)
     #First check that the potential has C
     if '_c' in method:
         if isinstance(pot,list):
@@ -519,7 +534,7 @@ def _integrateROrbit(vxvv,pot,t,method,dt):
         #We hack this by putting in a dummy phi
         this_vxvv= nu.zeros(len(vxvv)+1)
         this_vxvv[0:len(vxvv)]= vxvv
-        tmp_out, msg= _integrateOrbit(this_vxvv,pot,t,method,dt)
+        tmp_out, msg= _integrateOrbit(this_vxvv,cpot,t,method,dt)
         #tmp_out is (nt,4)
         out= tmp_out[:,0:3]
     elif method.lower() == 'odeint':
@@ -559,7 +574,7 @@ def _REOM(y,t,pot,l2):
     return [y[1],
             l2/y[0]**3.+_evaluateplanarRforces(pot,y[0],t=t)]
 
-def _integrateOrbit(vxvv,pot,t,method,dt):
+def _integrateOrbit(vxvv,pot,t,method,dt,dense=False):
     """
     NAME:
        _integrateOrbit
@@ -572,11 +587,17 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt- if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the rectangular acceleration at each t from the C integrators (None for the Python integrators)
     OUTPUT:
-       [:,4] array of [R,vR,vT,phi] at each t
+       ([:,4] array of [R,vR,vT,phi] at each t,error message(, [:,2] acceleration if dense))
     HISTORY:
        2010-07-20 - Written - Bovy (NYU)
     """
+    acc= None
+    # C integrators can use a CompiledPotential directly, Python ones cannot
+    cpot= pot
+    if isinstance(pot,CompiledPotential):
+        pot= RZToplanarPotential(pot.pot)
     #First check that the potential has C
     if '_c' in method:
         if isinstance(pot,list):
@@ -618,8 +639,8 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
                              vxvv[1]*nu.cos(vxvv[3])-vxvv[2]*nu.sin(vxvv[3]),
                              vxvv[2]*nu.cos(vxvv[3])+vxvv[1]*nu.sin(vxvv[3])])
         #integrate
-        tmp_out, msg= integratePlanarOrbit_c(pot,this_vxvv,
-                                             t,method,dt=dt)
+        tmp_out, acc, msg= integratePlanarOrbit_c(cpot,this_vxvv,
+                                                  t,method,dt=dt,dense=True)
         #go back to the cylindrical frame
         R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
         phi= nu.arccos(tmp_out[:,0]/R)
@@ -649,7 +670,69 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
     out[neg_radii,0]= -out[neg_radii,0]
     out[neg_radii,3]+= m.pi
     _parse_warnmessage(msg)
-    return (out,msg)
+    if dense:
+        return (out,msg,acc)
+    else:
+        return (out,msg)
+
+def _integratePlanarOrbits(vxvv,pot,t,method,dt,dense=False):
+    """
+    NAME:
+       _integratePlanarOrbits
+    PURPOSE:
+       integrate N orbits in a Phi(R,phi) potential in the (R,phi)-plane
+    INPUT:
+       vxvv - [4,N] array with the initial conditions stacked like
+              [R,vR,vT,phi]; vR outward!
+       pot - planarPotential instance or list of such instances (or CompiledPotential)
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint', 'leapfrog', or any of the C integrators (all orbits are then integrated in a single, OpenMP-parallelized C call)
+       dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the rectangular acceleration at each t from the C integrators (None for the Python integrators)
+    OUTPUT:
+       [N,nt,4] array of [R,vR,vT,phi] at each t (, [N,nt,2] acceleration if dense)
+    """
+    vxvv= nu.array(vxvv)
+    cpot= pot
+    if isinstance(pot,CompiledPotential):
+        pot= RZToplanarPotential(pot.pot)
+    if '_c' in method:
+        if isinstance(pot,list):
+            allHasC= nu.prod([p.hasC for p in pot])
+        else:
+            allHasC= pot.hasC
+    if not ext_loaded or not '_c' in method or not allHasC:
+        # Fall back onto the single-orbit integrators
+        out= nu.array([_integrateOrbit(vxvv[:,ii],cpot,t,method,dt)[0]
+                       for ii in range(vxvv.shape[1])])
+        if dense:
+            return (out,None)
+        else:
+            return out
+    #go to the rectangular frame
+    this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[3]),
+                         vxvv[0]*nu.sin(vxvv[3]),
+                         vxvv[1]*nu.cos(vxvv[3])-vxvv[2]*nu.sin(vxvv[3]),
+                         vxvv[2]*nu.cos(vxvv[3])+vxvv[1]*nu.sin(vxvv[3])]).T
+    #integrate all orbits in one go
+    tmp_out, acc, msg= integratePlanarOrbit_c(cpot,this_vxvv,t,method,dt=dt,
+                                              dense=True)
+    #go back to the cylindrical frame
+    R= nu.sqrt(tmp_out[...,0]**2.+tmp_out[...,1]**2.)
+    phi= nu.arccos(tmp_out[...,0]/R)
+    phi[(tmp_out[...,1] < 0.)]= 2.*nu.pi-phi[(tmp_out[...,1] < 0.)]
+    vR= tmp_out[...,2]*nu.cos(phi)+tmp_out[...,3]*nu.sin(phi)
+    vT= tmp_out[...,3]*nu.cos(phi)-tmp_out[...,2]*nu.sin(phi)
+    out= nu.zeros((vxvv.shape[1],len(t),4))
+    out[...,0]= R
+    out[...,1]= vR
+    out[...,2]= vT
+    out[...,3]= phi
+    _parse_warnmessage(nu.amax(msg))
+    if dense:
+        return (out,acc)
+    else:
+        return out
 
 def _integrateOrbit_dxdv(vxvv,dxdv,pot,t,method,rectIn,rectOut):
     """
@@ -16,6 +16,9 @@ from galpy.potential_src import plotRotcurve
 from galpy.potential_src import plotEscapecurve
 from galpy.potential_src import KGPotential
 from galpy.potential_src import interpRZPotential
+from galpy.potential_src import interp3DPotential
+from galpy.potential_src import interpRZTimeSeriesPotential
+from galpy.potential_src import interpSphericalPotential
 from galpy.potential_src import DehnenBarPotential
 from galpy.potential_src import SteadyLogSpiralPotential
 from galpy.potential_src import TransientLogSpiralPotential
@@ -32,6 +35,9 @@ from galpy.potential_src import KuzminKutuzovStaeckelPotential
 from galpy.potential_src import PlummerPotential
 from galpy.potential_src import PseudoIsothermalPotential
 from galpy.potential_src import KuzminDiskPotential
+from galpy.potential_src import SCFPotential
+from galpy.potential_src import DiskMultipolePotential
+from galpy.potential_src import CompiledPotential
 #
 # Functions
 #
@@ -43,7 +49,9 @@ evaluatezforces= Potential.evaluatezforces
 evaluateR2derivs= Potential.evaluateR2derivs
 evaluatez2derivs= Potential.evaluatez2derivs
 evaluateRzderivs= Potential.evaluateRzderivs
+evaluateBulk= Potential.evaluateBulk
 RZToplanarPotential= planarPotential.RZToplanarPotential
+planarToFullPotential= planarPotential.planarToFullPotential
 RZToverticalPotential= verticalPotential.RZToverticalPotential
 plotPotentials= Potential.plotPotentials
 plotDensities= Potential.plotDensities
@@ -75,6 +83,9 @@ nemo_accname= Potential.nemo_accname
 nemo_accpars= Potential.nemo_accpars
 turn_physical_off= Potential.turn_physical_off
 turn_physical_on= Potential.turn_physical_on
+scf_compute_coeffs_nbody= SCFPotential.scf_compute_coeffs_nbody
+scf_compute_coeffs= SCFPotential.scf_compute_coeffs
+scf_compute_coeffs_axi= SCFPotential.scf_compute_coeffs_axi
 _dim= Potential._dim
 #
 # Classes
@@ -96,6 +107,9 @@ HernquistPotential= TwoPowerSphericalPotential.HernquistPotential
 TwoPowerSphericalPotential= TwoPowerSphericalPotential.TwoPowerSphericalPotential
 KGPotential= KGPotential.KGPotential
 interpRZPotential= interpRZPotential.interpRZPotential
+interp3DPotential= interp3DPotential.interp3DPotential
+interpRZTimeSeriesPotential= interpRZTimeSeriesPotential.interpRZTimeSeriesPotential
+interpSphericalPotential= interpSphericalPotential.interpSphericalPotential
 DehnenBarPotential= DehnenBarPotential.DehnenBarPotential
 SteadyLogSpiralPotential= SteadyLogSpiralPotential.SteadyLogSpiralPotential
 TransientLogSpiralPotential= TransientLogSpiralPotential.TransientLogSpiralPotential
@@ -113,6 +127,9 @@ KuzminKutuzovStaeckelPotential = KuzminKutuzovStaeckelPotential.KuzminKutuzovSta
 PlummerPotential = PlummerPotential.PlummerPotential
 PseudoIsothermalPotential = PseudoIsothermalPotential.PseudoIsothermalPotential
 KuzminDiskPotential = KuzminDiskPotential.KuzminDiskPotential
+SCFPotential= SCFPotential.SCFPotential
+DiskMultipolePotential= DiskMultipolePotential.DiskMultipolePotential
+CompiledPotential= CompiledPotential.CompiledPotential
 #Softenings
 PlummerSoftening= ForceSoftening.PlummerSoftening
 
@@ -0,0 +1,113 @@
+###############################################################################
+#   CompiledPotential: a potential or list of potentials whose C
+#                      representation is set up once and re-used
+###############################################################################
+import ctypes
+import numpy as nu
+from numpy.ctypeslib import ndpointer
+class CompiledPotential(object):
+    """Class that holds a potential or list of potentials together with its parsed C representation, such that many calls to the C integrators and actionAngle routines do not have to set up the potential again"""
+    def __init__(self,pot):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           initialize a CompiledPotential
+        INPUT:
+           pot - Potential instance or list of such instances (planarPotential instances for planar orbit integration, linearPotential instances for linear orbit integration)
+        OUTPUT:
+           instance
+        NOTES:
+           The C representation of the potential is built lazily, the first time it is needed by a C routine (the orbit integrators, the Staeckel and adiabatic actionAngle code, and calc_potential_c), and is then kept until the instance is deleted; the potential parameters should therefore not be changed after a CompiledPotential has been used
+        """
+        from galpy.potential_src.Potential import _check_c
+        if isinstance(pot,CompiledPotential): pot= pot.pot
+        self.pot= pot
+        self.hasC= _check_c(pot)
+        self._handles= {}
+        return None
+
+    def __del__(self):
+        for lib, kind, npot, ncopy, pa in self._handles.values():
+            deleteFunc= getattr(lib,'delete_potentialArgs_%s' % kind)
+            deleteFunc.argtypes= [ctypes.c_int,ctypes.c_int,ctypes.c_void_p]
+            deleteFunc(ctypes.c_int(npot),ctypes.c_int(ncopy),
+                       ctypes.c_void_p(pa))
+        self._handles= {}
+        return None
+
+    def _handle(self,lib,kind):
+        """
+        NAME:
+           _handle
+        PURPOSE:
+           return the parsed C representation of the potential for a given C library, setting it up if necessary
+        INPUT:
+           lib - ctypes library that will use the potential
+           kind - 'Full' (3D orbit integration and forces), 'planar' (2D orbit integration), 'linear' (1D orbit integration), or 'actionAngle' (potential evaluations)
+        OUTPUT:
+           (npot,ncopy,pointer) - number of potentials, number of (per-thread) copies, and pointer to the C potentialArg array
+        """
+        key= (lib._name,kind)
+        if not key in self._handles:
+            if kind.lower() == 'planar':
+                from galpy.orbit_src.integratePlanarOrbit import _parse_pot
+                from galpy.potential_src.planarPotential import RZToplanarPotential
+                npot, pot_type, pot_args= \
+                    _parse_pot(RZToplanarPotential(self.pot))
+            elif kind.lower() == 'linear':
+                from galpy.orbit_src.integrateLinearOrbit import _parse_pot
+                npot, pot_type, pot_args= _parse_pot(self.pot)
+            else:
+                from galpy.orbit_src.integrateFullOrbit import _parse_pot
+                npot, pot_type, pot_args= \
+                    _parse_pot(self.pot,
+                               potforactions=kind.lower() == 'actionangle')
+            ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+            newFunc= getattr(lib,'new_potentialArgs_%s' % kind)
+            newFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.c_int)]
+            newFunc.restype= ctypes.c_void_p
+            ncopy= ctypes.c_int(0)
+            pa= newFunc(ctypes.c_int(npot),pot_type,pot_args,
+                        ctypes.byref(ncopy))
+            self._handles[key]= (lib,kind,npot,ncopy.value,pa)
+        return self._handles[key][2:]
+
+def _underlying_pot(pot):
+    """Return the Potential instance or list of instances held by a CompiledPotential, or pot itself for other input"""
+    if isinstance(pot,CompiledPotential): return pot.pot
+    else: return pot
+
+def _parse_pot_cargs(pot,lib,kind,parse_pot,ncopy=False,**kwargs):
+    """
+    NAME:
+       _parse_pot_cargs
+    PURPOSE:
+       set up the potential arguments of a C function that either takes (npot,pot_type,pot_args) or, for its '_pa' version, an already parsed (npot,[ncopy,]potentialArgs)
+    INPUT:
+       pot - Potential instance or list of such instances, or a CompiledPotential
+       lib - ctypes library with the C function
+       kind - kind of C representation ('Full', 'planar', 'linear', or 'actionAngle')
+       parse_pot - function to parse pot if it is not a CompiledPotential
+       ncopy= (False) if True, the '_pa' function also takes the number of per-thread copies
+       **kwargs - passed to parse_pot
+    OUTPUT:
+       (suffix,argtypes,args) - suffix of the C function ('' or '_pa'), the ctypes argtypes for the potential arguments, and the potential arguments themselves
+    """
+    if isinstance(pot,CompiledPotential):
+        npot, nc, pa= pot._handle(lib,kind)
+        if ncopy:
+            return ('_pa',[ctypes.c_int,ctypes.c_int,ctypes.c_void_p],
+                    [ctypes.c_int(npot),ctypes.c_int(nc),ctypes.c_void_p(pa)])
+        else:
+            return ('_pa',[ctypes.c_int,ctypes.c_void_p],
+                    [ctypes.c_int(npot),ctypes.c_void_p(pa)])
+    npot, pot_type, pot_args= parse_pot(pot,**kwargs)
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    return ('',[ctypes.c_int,
+                ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                ndpointer(dtype=nu.float64,flags=ndarrayFlags)],
+            [ctypes.c_int(npot),pot_type,pot_args])
@@ -85,6 +85,7 @@ class CosmphiDiskPotential(planarPotential):
         # Back to old definition
         self._amp/= r1**p
         self.hasC= False
+        self._vectorized= False
         self._m= m
         if cp is None or sp is None:
             self._phib= phib
@@ -111,6 +111,7 @@ class DehnenBarPotential(planarPotential):
             Af= Af.to(units.km**2/units.s**2).value/self._vo**2.
         self.hasC= True
         self.hasC_dxdv= True
+        self._vectorized= False
         self._barphi= barphi
         if omegab is None:
             self._rolr= rolr
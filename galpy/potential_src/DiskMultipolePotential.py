@@ -0,0 +1,374 @@
+###############################################################################
+#   DiskMultipolePotential.py: class that implements the potential of a
+#                              (flattened) disk density as an analytic disk
+#                              part plus a multipole expansion of the
+#                              residual density
+#
+#   Phi(R,z) = 4 pi Sum_i Sigma_i(r) H_i(z) + Sum_l Phi_l(r) P_l(cos theta)
+#
+#   with r the spherical radius, H_i''(z) = h_i(z) the vertical profile, and
+#   Phi_l the multipoles of the potential of the residual density
+#   (Kuijken & Dubinski 1995)
+###############################################################################
+import copy
+import numpy as nu
+from galpy.potential_src.Potential import Potential, PotentialError, \
+    _APY_LOADED
+if _APY_LOADED:
+    from astropy import units
+_SIGMATYPES= {'exp':0,'expwhole':1}
+_HZTYPES= {'exp':0,'sech2':1}
+class DiskMultipolePotential(Potential):
+    """Class that implements the potential of a flattened disk density :math:`\\rho(R,z)` by splitting it into disk components with surface densities :math:`\\Sigma_i` and vertical profiles :math:`h_i` and a residual that is solved using a multipole expansion (`Kuijken & Dubinski 1995 <http://adsabs.harvard.edu/abs/1995MNRAS.277.1341K>`_)
+
+    .. math::
+
+        \\Phi(R,z) = 4\\pi\\,\\mathrm{amp}\\,\\sum_i \\Sigma_i(r)\\,H_i(z) + \\mathrm{amp}\\,\\sum_{l=0}^{L-1}\\Phi_l(r)\\,P_l(\\cos\\theta)
+
+    where :math:`r` is the spherical radius, :math:`H_i''(z) = h_i(z)`, and :math:`\\Phi_l(r)` are the multipoles of the potential of the residual density :math:`\\rho(R,z)-\\nabla^2\\left[\\sum_i \\Sigma_i(r)\\,H_i(z)\\right]/(4\\pi)`, which are tabulated on a logarithmic grid in :math:`r`. The surface densities can be exponential (``{'type':'exp','h':hr,'amp':Sigma0}``, :math:`\\Sigma_0\\,e^{-r/h_r}`) or exponential with a central hole (``{'type':'expwhole','h':hr,'amp':Sigma0,'Rhole':Rhole}``, :math:`\\Sigma_0\\,e^{-R_{\\mathrm{hole}}/r-r/h_r}`) and the vertical profiles exponential (``{'type':'exp','h':hz}``, :math:`e^{-|z|/h_z}/(2h_z)`) or sech-squared (``{'type':'sech2','h':hz}``, :math:`\\mathrm{sech}^2(z/2h_z)/(4h_z)`).
+
+    """
+    def __init__(self,amp=1.,
+                 dens=lambda R,z: nu.exp(-3.*R-16.*nu.fabs(z)),
+                 Sigma={'type':'exp','h':1./3.,'amp':1./8.},
+                 hz={'type':'exp','h':1./16.},
+                 L=40,rgrid=(0.001,30.,1001),costheta_order=None,
+                 normalize=False,ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           initialize a disk-multipole potential
+
+        INPUT:
+
+           amp - amplitude to be applied to the potential (default: 1); can be a Quantity with units of mass density or Gxmass density
+
+           dens - function of (R,z) that gives the density in internal units, called with arrays of points; the default is the double-exponential disk with the default parameters of DoubleExponentialDiskPotential
+
+           Sigma - dictionary (or list of such dictionaries) describing the surface density of the disk component(s) (see the class documentation)
+
+           hz - dictionary (or list of such dictionaries, matching Sigma) describing the vertical profile of the disk component(s) (see the class documentation)
+
+           L= (40) number of multipoles (l=0,...,L-1) used for the residual density
+
+           rgrid= (0.001,30.,1001) (rmin,rmax,nr) of the logarithmic radial grid on which the multipoles are tabulated (rmin and rmax can be Quantity)
+
+           costheta_order= (max(80,2L)) order of the Gauss-Legendre quadrature in cos(theta) used to compute the multipoles of the residual density
+
+           normalize - if True, normalize such that vc(1.,0.)=1., or, if given as a number, such that the force is this fraction of the force necessary to make vc(1.,0.)=1.
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        Potential.__init__(self,amp=amp,ro=ro,vo=vo,amp_units='density')
+        if isinstance(Sigma,dict): Sigma= [Sigma]
+        if isinstance(hz,dict): hz= [hz]
+        if len(Sigma) != len(hz):
+            raise PotentialError('DiskMultipolePotential requires the same number of Sigma and hz components')
+        self._Sigma= [self._parse_component(s,_SIGMATYPES) for s in Sigma]
+        self._hz= [self._parse_component(h,_HZTYPES) for h in hz]
+        self._scale= self._Sigma[0]['h']
+        self._dens_func= dens
+        rmin, rmax, nr= rgrid
+        if _APY_LOADED and isinstance(rmin,units.Quantity):
+            rmin= rmin.to(units.kpc).value/self._ro
+        if _APY_LOADED and isinstance(rmax,units.Quantity):
+            rmax= rmax.to(units.kpc).value/self._ro
+        self._L= L
+        self._lnrmin= nu.log(rmin)
+        self._dlnr= (nu.log(rmax)-self._lnrmin)/(nr-1)
+        self._rgrid= nu.exp(self._lnrmin+self._dlnr*nu.arange(nr))
+        if costheta_order is None: costheta_order= max(80,2*L)
+        self._setup_multipoles(costheta_order)
+        if normalize or \
+                (isinstance(normalize,(int,float)) \
+                     and not isinstance(normalize,bool)):
+            self.normalize(normalize)
+        self.hasC= True
+        self.hasC_dxdv= False
+        return None
+
+    def _parse_component(self,comp,types):
+        """Convert the lengths in a Sigma or hz dictionary to internal units"""
+        comp= copy.copy(comp)
+        if not comp.get('type') in types:
+            raise PotentialError("DiskMultipolePotential component type %s not understood; should be one of %s" % (comp.get('type'),', '.join(types.keys())))
+        for key in ['h','Rhole']:
+            if _APY_LOADED and isinstance(comp.get(key),units.Quantity):
+                comp[key]= comp[key].to(units.kpc).value/self._ro
+        comp['amp']= comp.get('amp',1.)
+        comp['Rhole']= comp.get('Rhole',0.)
+        return comp
+
+    def _setup_multipoles(self,costheta_order):
+        """Compute the multipoles of the potential of the residual density on the radial grid"""
+        # Residual density on the grid and at the midpoints of the intervals
+        nr= len(self._rgrid)
+        rf= nu.exp(self._lnrmin+self._dlnr/2.*nu.arange(2*nr-1))
+        costheta, w= nu.polynomial.legendre.leggauss(costheta_order)
+        rr, ct= nu.meshgrid(rf,costheta,indexing='ij')
+        R= rr*nu.sqrt(1.-ct**2.)
+        z= rr*ct
+        resid= nu.reshape(self._dens_func(R.flatten(),z.flatten()),rr.shape)\
+            -self._disk_dens(rr,z)
+        l= nu.arange(self._L)[:,None]
+        # rho_l(r) = (2l+1)/2 int dcostheta rho P_l
+        rhol= (2.*l+1.)/2.*nu.dot(_legendre(costheta,self._L)*w,resid.T)
+        # J_in= r^(-l-1) int_0^r rho_l r'^(l+2) dr' (constant rho_l inside
+        # rmin) and J_out= r^l int_r^rmax rho_l r'^(1-l) dr', accumulated
+        # interval by interval with Simpson's rule in log r such that all
+        # powers of radius ratios stay <= 1
+        r= self._rgrid
+        Jin= nu.empty((self._L,nr))
+        Jout= nu.empty((self._L,nr))
+        Jin[:,0]= rhol[:,0]*r[0]**2./(l[:,0]+3.)
+        Jout[:,-1]= 0.
+        for kk in range(nr-1):
+            tr= rf[2*kk:2*kk+3]
+            g= rhol[:,2*kk:2*kk+3]*tr**2.*(tr/r[kk+1])**(l+1.)
+            Jin[:,kk+1]= (r[kk]/r[kk+1])**(l[:,0]+1.)*Jin[:,kk]\
+                +self._dlnr/6.*(g[:,0]+4.*g[:,1]+g[:,2])
+        for kk in range(nr-2,-1,-1):
+            tr= rf[2*kk:2*kk+3]
+            g= rhol[:,2*kk:2*kk+3]*tr**2.*(r[kk]/tr)**l
+            Jout[:,kk]= (r[kk]/r[kk+1])**l[:,0]*Jout[:,kk+1]\
+                +self._dlnr/6.*(g[:,0]+4.*g[:,1]+g[:,2])
+        self._rhol= rhol[:,::2]
+        self._phil= -4.*nu.pi/(2.*l+1.)*(Jin+Jout)
+        self._dphildr= -4.*nu.pi/(2.*l+1.)*(-(l+1.)*Jin+l*Jout)/r
+        # Second derivative from the Poisson equation
+        self._d2phildr2= 4.*nu.pi*self._rhol-2.*self._dphildr/r\
+            +l*(l+1.)*self._phil/r**2.
+        return None
+
+    def _components(self,r,z,sderiv,hderiv):
+        """Sum_i Sigma_i^(sderiv)(r) H_i^(hderiv)(z)"""
+        out= 0.
+        for sigma, hz in zip(self._Sigma,self._hz):
+            out+= _sigma(sigma,r,sderiv)*_vertical(hz,z,hderiv)
+        return out
+
+    def _disk_dens(self,r,z):
+        """Density of the analytic disk part, nabla^2 [Sum_i Sigma_i(r) H_i(z)]/(4 pi)"""
+        out= 0.
+        for sigma, hz in zip(self._Sigma,self._hz):
+            H= _vertical(hz,z,0)
+            out+= _sigma(sigma,r,0)*_vertical(hz,z,2)\
+                +(_sigma(sigma,r,2)+2.*_sigma(sigma,r,1)/r)*H\
+                +2.*_sigma(sigma,r,1)*_vertical(hz,z,1)*z/r
+        return out
+
+    def _multipoles(self,r,deriv=False):
+        """Interpolate the multipoles (or their radial derivatives) to r"""
+        r= nu.atleast_1d(r)
+        if deriv:
+            f, df= self._dphildr, self._d2phildr2
+        else:
+            f, df= self._phil, self._dphildr
+        x= nu.clip((nu.log(nu.clip(r,1e-300,None))-self._lnrmin)/self._dlnr,
+                   0.,len(self._rgrid)-1.)
+        ii= nu.minimum(nu.floor(x).astype(int),len(self._rgrid)-2)
+        r0= self._rgrid[ii]
+        dr= self._rgrid[ii+1]-r0
+        t= (nu.clip(r,r0,self._rgrid[ii+1])-r0)/dr
+        # Cubic Hermite interpolation using the tabulated derivatives
+        out= (2.*t**3.-3.*t**2.+1.)*f[:,ii]+(t**3.-2.*t**2.+t)*dr*df[:,ii]\
+            +(-2.*t**3.+3.*t**2.)*f[:,ii+1]+(t**3.-t**2.)*dr*df[:,ii+1]
+        # Extrapolation: uniform density inside, vacuum outside the grid
+        l= nu.arange(self._L)[:,None]
+        rmin, rmax= self._rgrid[0], self._rgrid[-1]
+        indx= r < rmin
+        if nu.any(indx):
+            if deriv:
+                with nu.errstate(divide='ignore'):
+                    out[:,indx]= nu.where(l == 0,f[:,:1]*r[indx]/rmin,
+                                          l*self._phil[:,:1]/rmin
+                                          *(r[indx]/rmin)**(l-1.))
+            else:
+                out[:,indx]= nu.where(l == 0,
+                                      f[:,:1]+df[:,:1]
+                                      *(r[indx]**2.-rmin**2.)/2./rmin,
+                                      f[:,:1]*(r[indx]/rmin)**l)
+        indx= r > rmax
+        if nu.any(indx):
+            out[:,indx]= self._phil[:,-1:]*(rmax/r[indx])**(l+1.)
+            if deriv:
+                out[:,indx]*= -(l+1.)/r[indx]
+        return out
+
+    def _expand(self,R,z,quantity):
+        """Evaluate the potential ('pot') or its derivatives ('dR', 'dz')"""
+        R= nu.array(R,dtype='float')
+        z= nu.array(z,dtype='float')
+        R, z= nu.broadcast_arrays(R,z)
+        shape= R.shape
+        R= R.flatten()
+        z= z.flatten()
+        r= nu.sqrt(R**2.+z**2.)
+        costheta= nu.ones_like(r)
+        sintheta= nu.zeros_like(r)
+        indx= r > 0.
+        costheta[indx]= z[indx]/r[indx]
+        sintheta[indx]= R[indx]/r[indx]
+        Pl= _legendre(costheta,self._L)
+        if quantity == 'pot':
+            out= 4.*nu.pi*self._components(r,z,0,0)\
+                +nu.sum(self._multipoles(r)*Pl,axis=0)
+            return nu.reshape(out,shape)
+        dPl= _legendre(costheta,self._L,deriv=True)
+        dphidr= nu.sum(self._multipoles(r,deriv=True)*Pl,axis=0)
+        # (1/r) dPhi/dtheta
+        dphidtheta= nu.zeros_like(r)
+        dphidtheta[indx]= -sintheta[indx]/r[indx]\
+            *nu.sum(self._multipoles(r[indx])*dPl[:,indx],axis=0)
+        dsigma= nu.zeros_like(r)
+        dsigma[indx]= self._components(r[indx],z[indx],1,0)
+        if quantity == 'dR':
+            out= 4.*nu.pi*dsigma*sintheta\
+                +sintheta*dphidr+costheta*dphidtheta
+        else:
+            out= 4.*nu.pi*(dsigma*costheta+self._components(r,z,0,1))\
+                +costheta*dphidr-sintheta*dphidtheta
+        return nu.reshape(out,shape)
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential at (R,z)
+        INPUT:
+           R - Cylindrical Galactocentric radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           potential at (R,z)
+        """
+        return self._expand(R,z,'pot')
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the radial force
+        """
+        return -self._expand(R,z,'dR')
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the vertical force
+        """
+        return -self._expand(R,z,'dz')
+
+    def _dens(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _dens
+        PURPOSE:
+           evaluate the density for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the density
+        """
+        return self._dens_func(R,z)
+
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: amp, number of disk components, (Sigma type, Sigma amp, hr, Rhole, hz type, hz) for each component, L, nr, log rmin, dlog r, and the tabulated multipoles and their first and second derivatives [L,nr]
+        """
+        out= [self._amp,len(self._Sigma)]
+        for sigma, hz in zip(self._Sigma,self._hz):
+            out.extend([_SIGMATYPES[sigma['type']],sigma['amp'],sigma['h'],
+                        sigma['Rhole'],_HZTYPES[hz['type']],hz['h']])
+        out.extend([self._L,len(self._rgrid),self._lnrmin,self._dlnr])
+        out.extend(self._phil.flatten())
+        out.extend(self._dphildr.flatten())
+        out.extend(self._d2phildr2.flatten())
+        return out
+
+def _sigma(sigma,r,deriv):
+    """Surface density (deriv=0) or its first or second derivative at r"""
+    s= sigma['amp']*nu.exp(-r/sigma['h'])
+    if sigma['type'] == 'exp':
+        return s*(-1./sigma['h'])**deriv
+    hole= sigma['Rhole']/r
+    s*= nu.exp(-hole)
+    dlns= hole/r-1./sigma['h']
+    if deriv == 0:
+        return s
+    elif deriv == 1:
+        return s*dlns
+    else:
+        return s*(dlns**2.-2.*hole/r**2.)
+
+def _vertical(hz,z,deriv):
+    """H(z) (deriv=0) and its first and second (= h(z)) derivatives"""
+    h= hz['h']
+    if hz['type'] == 'exp':
+        e= nu.exp(-nu.fabs(z)/h)
+        if deriv == 0:
+            return h/2.*(e-1.+nu.fabs(z)/h)
+        elif deriv == 1:
+            return nu.sign(z)*(1.-e)/2.
+        else:
+            return e/2./h
+    else:
+        x= z/2./h
+        if deriv == 0:
+            return h*(nu.fabs(x)+nu.log1p(nu.exp(-2.*nu.fabs(x)))-nu.log(2.))
+        elif deriv == 1:
+            return nu.tanh(x)/2.
+        else:
+            return 1./nu.cosh(x)**2./4./h
+
+def _legendre(x,L,deriv=False):
+    """Legendre polynomials P_l(x) (or their derivatives) for l < L, [L,len(x)]"""
+    x= nu.atleast_1d(x)
+    P= nu.empty((L,len(x)))
+    P[0]= 1.
+    if L > 1: P[1]= x
+    for l in range(2,L):
+        P[l]= ((2.*l-1.)*x*P[l-1]-(l-1.)*P[l-2])/l
+    if not deriv: return P
+    dP= nu.zeros((L,len(x)))
+    for l in range(1,L):
+        dP[l]= (dP[l-2] if l > 1 else 0.)+(2.*l-1.)*P[l-1]
+    return dP
@@ -4,7 +4,9 @@
 #
 #                                      rho(R,z) = rho_0 e^-R/h_R e^-|z|/h_z
 ###############################################################################
+import ctypes
 import numpy as nu
+from numpy.ctypeslib import ndpointer
 import warnings
 from scipy import special, integrate
 from galpy.util import galpyWarning
@@ -14,6 +16,18 @@ if _APY_LOADED:
     from astropy import units
 _TOL= 1.4899999999999999e-15
 _MAXITER= 20
+_MAXQUADSIZE= 2**20 # maximum number of (point,node) pairs evaluated at once
+# Hankel-transform integrals for the potential and its derivatives:
+# (C type, prefactor/pi/alpha, power of beta in the prefactor,
+#  kmax/(kmaxFac beta),
+#  [(Bessel order, power of k, form of the z factor, factor)],
+#  sign flip for z > 0 (1) or z >= 0 (2))
+_QUADTYPES= {'pot':(0,-2.,0,1.,[(0,0,0,1.)],0),
+             'Rforce':(1,-2.,0,2.,[(1,1,0,1.)],0),
+             'zforce':(2,2.,1,1.,[(0,1,1,1.)],1),
+             'R2deriv':(3,1.,0,2.,[(0,2,0,1.),(2,2,0,-1.)],0),
+             'z2deriv':(4,-2.,1,1.,[(0,1,2,1.)],0),
+             'Rzderiv':(5,2.,1,2.,[(1,2,1,1.)],2)}
 class DoubleExponentialDiskPotential(Potential):
     """Class that implements the double exponential disk potential
 
@@ -97,6 +111,9 @@ class DoubleExponentialDiskPotential(Potential):
         self._j2zeros[1:self._nzeros+1]= special.jn_zeros(2,self._nzeros)
         self._dj2zeros= self._j2zeros-nu.roll(self._j2zeros,1)
         self._dj2zeros[0]= self._j2zeros[0]
+        self._jzeros= {0:self._j0zeros,1:self._j1zeros,2:self._j2zeros}
+        self._djzeros= {0:self._dj0zeros,1:self._dj1zeros,2:self._dj2zeros}
+        self._quadnodes_cache= {}
         if normalize or \
                 (isinstance(normalize,(int,float)) \
                      and not isinstance(normalize,bool)): #pragma: no cover
@@ -126,28 +143,7 @@ class DoubleExponentialDiskPotential(Potential):
            ...
            >>> assert( r+1.89595350484)**2.< 10.**-6.
         """
-        if True:
-            if isinstance(R,float):
-                floatIn= True
-                R= nu.array([R])
-                z= nu.array([z])
-            else:
-                floatIn= False
-            out= nu.empty(len(R))
-            indx= (R <= 6.)
-            out[True-indx]= self._kp(R[True-indx],z[True-indx])
-            R4max= nu.copy(R)
-            R4max[(R < 1.)]= 1.
-            kmax= self._kmaxFac*self._beta
-            for jj in range(len(R)):
-                if not indx[jj]: continue
-                maxj0zeroIndx= nu.argmin((self._j0zeros-kmax*R4max[jj])**2.) #close enough
-                ks= nu.array([0.5*(self._glx+1.)*self._dj0zeros[ii+1] + self._j0zeros[ii] for ii in range(maxj0zeroIndx)]).flatten()
-                weights= nu.array([self._glw*self._dj0zeros[ii+1] for ii in range(maxj0zeroIndx)]).flatten()
-                evalInt= special.jn(0,ks*R[jj])*(self._alpha**2.+ks**2.)**-1.5*(self._beta*nu.exp(-ks*nu.fabs(z[jj]))-ks*nu.exp(-self._beta*nu.fabs(z[jj])))/(self._beta**2.-ks**2.)
-                out[jj]= -2.*nu.pi*self._alpha*nu.sum(weights*evalInt)
-            if floatIn: return out[0]
-            else: return out
+        return self._quad_or_kepler(R,z,'pot',self._kp,6.)
     
     def _Rforce(self,R,z,phi=0.,t=0.):
         """
@@ -166,21 +162,10 @@ class DoubleExponentialDiskPotential(Potential):
            2010-04-16 - Written - Bovy (NYU)
         DOCTEST:
         """
-        if True:
-            if isinstance(R,nu.ndarray):
-                if not isinstance(z,nu.ndarray): z= nu.ones_like(R)*z
-                out= nu.array([self._Rforce(rr,zz) for rr,zz in zip(R,z)])
-                return out
-            if (R > 16.*self._hr or R > 6.) and hasattr(self,'_kp'): return self._kp.Rforce(R,z)
-            if R < 1.: R4max= 1.
-            else: R4max= R
-            kmax= self._kmaxFac*self._beta
-            kmax= 2.*self._kmaxFac*self._beta
-            maxj1zeroIndx= nu.argmin((self._j1zeros-kmax*R4max)**2.) #close enough
-            ks= nu.array([0.5*(self._glx+1.)*self._dj1zeros[ii+1] + self._j1zeros[ii] for ii in range(maxj1zeroIndx)]).flatten()
-            weights= nu.array([self._glw*self._dj1zeros[ii+1] for ii in range(maxj1zeroIndx)]).flatten()
-            evalInt= ks*special.jn(1,ks*R)*(self._alpha**2.+ks**2.)**-1.5*(self._beta*nu.exp(-ks*nu.fabs(z))-ks*nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks**2.)
-            return -2.*nu.pi*self._alpha*nu.sum(weights*evalInt)
+        if not hasattr(self,'_kp'): # called by normalize in __init__
+            return self._quad_or_kepler(R,z,'Rforce',None,nu.inf)
+        return self._quad_or_kepler(R,z,'Rforce',self._kp.Rforce,
+                                    min(16.*self._hr,6.))
     
     def _zforce(self,R,z,phi=0.,t=0.):
         """
@@ -199,23 +184,8 @@ class DoubleExponentialDiskPotential(Potential):
            2010-04-16 - Written - Bovy (NYU)
         DOCTEST:
         """
-        if True:
-            if isinstance(R,nu.ndarray):
-                if not isinstance(z,nu.ndarray): z= nu.ones_like(R)*z
-                out= nu.array([self._zforce(rr,zz) for rr,zz in zip(R,z)])
-                return out
-            if R > 16.*self._hr or R > 6.: return self._kp.zforce(R,z)
-            if R < 1.: R4max= 1.
-            else: R4max= R
-            kmax= self._kmaxFac*self._beta
-            maxj0zeroIndx= nu.argmin((self._j0zeros-kmax*R4max)**2.) #close enough
-            ks= nu.array([0.5*(self._glx+1.)*self._dj0zeros[ii+1] + self._j0zeros[ii] for ii in range(maxj0zeroIndx)]).flatten()
-            weights= nu.array([self._glw*self._dj0zeros[ii+1] for ii in range(maxj0zeroIndx)]).flatten()
-            evalInt= ks*special.jn(0,ks*R)*(self._alpha**2.+ks**2.)**-1.5*(nu.exp(-ks*nu.fabs(z))-nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks**2.)
-            if z > 0.:
-                return -2.*nu.pi*self._alpha*self._beta*nu.sum(weights*evalInt)
-            else:
-                return 2.*nu.pi*self._alpha*self._beta*nu.sum(weights*evalInt)
+        return self._quad_or_kepler(R,z,'zforce',self._kp.zforce,
+                                    min(16.*self._hr,6.))
 
     def _R2deriv(self,R,z,phi=0.,t=0.):
         """
@@ -233,25 +203,8 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2012-12-27 - Written - Bovy (IAS)
         """
-        if True:
-            if isinstance(R,nu.ndarray):
-                if not isinstance(z,nu.ndarray): z= nu.ones_like(R)*z
-                out= nu.array([self._R2deriv(rr,zz) for rr,zz in zip(R,z)])
-                return out
-            if R > 16.*self._hr or R > 6.: return self._kp.R2deriv(R,z)
-            if R < 1.: R4max= 1.
-            else: R4max= R
-            kmax= 2.*self._kmaxFac*self._beta
-            maxj0zeroIndx= nu.argmin((self._j0zeros-kmax*R4max)**2.) #close enough
-            maxj2zeroIndx= nu.argmin((self._j2zeros-kmax*R4max)**2.) #close enough
-            ks0= nu.array([0.5*(self._glx+1.)*self._dj0zeros[ii+1] + self._j0zeros[ii] for ii in range(maxj0zeroIndx)]).flatten()
-            weights0= nu.array([self._glw*self._dj0zeros[ii+1] for ii in range(maxj0zeroIndx)]).flatten()
-            ks2= nu.array([0.5*(self._glx+1.)*self._dj2zeros[ii+1] + self._j2zeros[ii] for ii in range(maxj2zeroIndx)]).flatten()
-            weights2= nu.array([self._glw*self._dj2zeros[ii+1] for ii in range(maxj2zeroIndx)]).flatten()
-            evalInt0= ks0**2.*special.jn(0,ks0*R)*(self._alpha**2.+ks0**2.)**-1.5*(self._beta*nu.exp(-ks0*nu.fabs(z))-ks0*nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks0**2.)
-            evalInt2= ks2**2.*special.jn(2,ks2*R)*(self._alpha**2.+ks2**2.)**-1.5*(self._beta*nu.exp(-ks2*nu.fabs(z))-ks2*nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks2**2.)
-            return nu.pi*self._alpha*(nu.sum(weights0*evalInt0)
-                                      -nu.sum(weights2*evalInt2))
+        return self._quad_or_kepler(R,z,'R2deriv',self._kp.R2deriv,
+                                    min(16.*self._hr,6.))
     
     def _z2deriv(self,R,z,phi=0.,t=0.):
         """
@@ -269,20 +222,8 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2012-12-26 - Written - Bovy (IAS)
         """
-        if True:
-            if isinstance(R,nu.ndarray):
-                if not isinstance(z,nu.ndarray): z= nu.ones_like(R)*z
-                out= nu.array([self._z2deriv(rr,zz) for rr,zz in zip(R,z)])
-                return out
-            if R > 16.*self._hr or R > 6.: return self._kp.z2deriv(R,z)
-            if R < 1.: R4max= 1.
-            else: R4max= R
-            kmax= self._kmaxFac*self._beta
-            maxj0zeroIndx= nu.argmin((self._j0zeros-kmax*R4max)**2.) #close enough
-            ks= nu.array([0.5*(self._glx+1.)*self._dj0zeros[ii+1] + self._j0zeros[ii] for ii in range(maxj0zeroIndx)]).flatten()
-            weights= nu.array([self._glw*self._dj0zeros[ii+1] for ii in range(maxj0zeroIndx)]).flatten()
-            evalInt= ks*special.jn(0,ks*R)*(self._alpha**2.+ks**2.)**-1.5*(ks*nu.exp(-ks*nu.fabs(z))-self._beta*nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks**2.)
-            return -2.*nu.pi*self._alpha*self._beta*nu.sum(weights*evalInt)
+        return self._quad_or_kepler(R,z,'z2deriv',self._kp.z2deriv,
+                                    min(16.*self._hr,6.))
 
     def _Rzderiv(self,R,z,phi=0.,t=0.):
         """
@@ -300,23 +241,92 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2013-08-28 - Written - Bovy (IAS)
         """
-        if True:
-            if isinstance(R,nu.ndarray):
-                if not isinstance(z,nu.ndarray): z= nu.ones_like(R)*z
-                out= nu.array([self._Rzderiv(rr,zz) for rr,zz in zip(R,z)])
-                return out
-            if R > 6.: return self._kp.Rzderiv(R,z)
-            if R < 1.: R4max= 1.
-            else: R4max= R
-            kmax= 2.*self._kmaxFac*self._beta
-            maxj1zeroIndx= nu.argmin((self._j1zeros-kmax*R4max)**2.) #close enough
-            ks= nu.array([0.5*(self._glx+1.)*self._dj1zeros[ii+1] + self._j1zeros[ii] for ii in range(maxj1zeroIndx)]).flatten()
-            weights= nu.array([self._glw*self._dj1zeros[ii+1] for ii in range(maxj1zeroIndx)]).flatten()
-            evalInt= ks**2.*special.jn(1,ks*R)*(self._alpha**2.+ks**2.)**-1.5*(nu.exp(-ks*nu.fabs(z))-nu.exp(-self._beta*nu.fabs(z)))/(self._beta**2.-ks**2.)
-            if z >= 0.:
-                return -2.*nu.pi*self._alpha*self._beta*nu.sum(weights*evalInt)
-            else:
-                return 2.*nu.pi*self._alpha*self._beta*nu.sum(weights*evalInt)
+        return self._quad_or_kepler(R,z,'Rzderiv',self._kp.Rzderiv,6.)
+
+    def _quad_or_kepler(self,R,z,qtype,kepler,Rmax):
+        """Evaluate the quadrature of type qtype for R <= Rmax and the Keplerian approximation kepler elsewhere, for scalar or array R,z"""
+        floatIn= not isinstance(R,nu.ndarray) and not isinstance(z,nu.ndarray)
+        R, z= nu.broadcast_arrays(nu.atleast_1d(R).astype('float'),
+                                  nu.atleast_1d(z).astype('float'))
+        indx= R <= Rmax
+        out= nu.empty(R.shape)
+        if nu.any(~indx):
+            out[~indx]= kepler(R[~indx],z[~indx])
+        if nu.any(indx):
+            out[indx]= self._quad(R[indx],z[indx],qtype)
+        if floatIn: return out[0]
+        else: return out
+
+    def _quad(self,R,z,qtype,use_c=None):
+        """
+        NAME:
+           _quad
+        PURPOSE:
+           evaluate the Hankel-transform integral for the potential or one of its derivatives for arrays of points, using Gaussian quadrature between the zeros of the Bessel functions
+        INPUT:
+           R - Cylindrical Galactocentric radius (array)
+           z - vertical height (array)
+           qtype - 'pot', 'Rforce', 'zforce', 'R2deriv', 'z2deriv', or 'Rzderiv'
+           use_c= (None) if True, use the C kernel, if False use numpy; default: use C if it is available
+        OUTPUT:
+           integral (without the amplitude) at (R,z)
+        """
+        if use_c is None or use_c:
+            from galpy.orbit_src.integrateFullOrbit import _ext_loaded #here bc otherwise there is an infinite loop
+            if use_c is None: use_c= _ext_loaded
+        if use_c:
+            return _quad_c(self,R,z,qtype)
+        ctype, prefac, betapow, kmaxFac, terms, zsign= _QUADTYPES[qtype]
+        kmax= kmaxFac*self._kmaxFac*self._beta
+        out= nu.zeros(len(R))
+        for order,kpow,ztype,fac in terms:
+            out+= fac*self._quad_numpy(R,z,kmax,order,kpow,ztype)
+        out*= prefac*nu.pi*self._alpha*self._beta**betapow
+        if zsign == 1: out[z > 0.]*= -1.
+        elif zsign == 2: out[z >= 0.]*= -1.
+        return out
+
+    def _quad_numpy(self,R,z,kmax,order,kpow,ztype):
+        """Sum_k w k^kpow J_order(kR) (alpha^2+k^2)^-1.5 zfac(k) / (beta^2-k^2) for arrays R,z, grouping points that use the same number of nodes"""
+        out= nu.empty(len(R))
+        jzeros= self._jzeros[order]
+        R4max= nu.copy(R)
+        R4max[(R < 1.)]= 1.
+        maxzeroIndx= nu.argmin((jzeros[:,nu.newaxis]
+                                -kmax*R4max[nu.newaxis,:])**2.,axis=0) #close enough
+        absz= nu.fabs(z)
+        for nint in nu.unique(maxzeroIndx):
+            ks, weights= self._quadnodes(order,nint)
+            pindx= nu.arange(len(R))[maxzeroIndx == nint]
+            # Evaluate in chunks to limit the size of the [npts,nks] arrays
+            chunk= max(1,_MAXQUADSIZE//max(1,len(ks)))
+            for ii in range(0,len(pindx),chunk):
+                tindx= pindx[ii:ii+chunk]
+                tR= R[tindx,nu.newaxis]
+                tz= absz[tindx,nu.newaxis]
+                if ztype == 0:
+                    zfac= self._beta*nu.exp(-ks*tz)-ks*nu.exp(-self._beta*tz)
+                elif ztype == 1:
+                    zfac= nu.exp(-ks*tz)-nu.exp(-self._beta*tz)
+                else:
+                    zfac= ks*nu.exp(-ks*tz)-self._beta*nu.exp(-self._beta*tz)
+                evalInt= ks**kpow*special.jn(order,ks*tR)\
+                    *(self._alpha**2.+ks**2.)**-1.5*zfac/(self._beta**2.-ks**2.)
+                out[tindx]= nu.sum(weights*evalInt,axis=1)
+        return out
+
+    def _quadnodes(self,order,nint):
+        """Quadrature nodes and weights for the first nint intervals between the zeros of J_order, cached"""
+        try:
+            return self._quadnodes_cache[(order,nint)]
+        except KeyError:
+            jzeros= self._jzeros[order]
+            djzeros= self._djzeros[order]
+            ks= (0.5*(self._glx+1.)*djzeros[1:nint+1,nu.newaxis]
+                 +jzeros[:nint,nu.newaxis]).flatten()
+            weights= (self._glw*djzeros[1:nint+1,nu.newaxis]).flatten()
+            self._quadnodes_cache[(order,nint)]= (ks,weights)
+            return (ks,weights)
 
     def _dens(self,R,z,phi=0.,t=0.):
         """
@@ -335,3 +345,55 @@ class DoubleExponentialDiskPotential(Potential):
            2010-08-08 - Written - Bovy (NYU)
         """
         return nu.exp(-self._alpha*R-self._beta*nu.fabs(z))
+
+def _quad_c(pot,R,z,qtype):
+    """
+    NAME:
+       _quad_c
+    PURPOSE:
+       Use C to evaluate the Hankel-transform integral for the potential or one of its derivatives for arrays of points
+    INPUT:
+       pot - DoubleExponentialDiskPotential instance
+       R - Cylindrical Galactocentric radius (array)
+       z - vertical height (array)
+       qtype - 'pot', 'Rforce', 'zforce', 'R2deriv', 'z2deriv', or 'Rzderiv'
+    OUTPUT:
+       integral (without the amplitude) at (R,z)
+    """
+    from galpy.orbit_src.integrateFullOrbit import _lib #here bc otherwise there is an infinite loop
+    if not hasattr(pot,'_jzeros_c'):
+        pot._jzeros_c= nu.concatenate((pot._j0zeros,pot._dj0zeros,
+                                       pot._j1zeros,pot._dj1zeros,
+                                       pot._j2zeros,pot._dj2zeros))
+    #Array requirements
+    R= nu.require(R,dtype=nu.float64,requirements=['C','W'])
+    z= nu.require(z,dtype=nu.float64,requirements=['C','W'])
+    glx= nu.require(pot._glx,dtype=nu.float64,requirements=['C','W'])
+    glw= nu.require(pot._glw,dtype=nu.float64,requirements=['C','W'])
+    out= nu.empty(len(R))
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    quadFunc= _lib.DoubleExponentialDiskPotential_quad_array
+    quadFunc.argtypes= [ctypes.c_int,
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                        ctypes.c_int,
+                        ctypes.c_double,
+                        ctypes.c_double,
+                        ctypes.c_double,
+                        ctypes.c_int,
+                        ctypes.c_int,
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                        ndpointer(dtype=nu.float64,flags=ndarrayFlags)]
+
+    #Run the C code
+    quadFunc(ctypes.c_int(len(R)),R,z,
+             ctypes.c_int(_QUADTYPES[qtype][0]),
+             ctypes.c_double(pot._alpha),ctypes.c_double(pot._beta),
+             ctypes.c_double(pot._kmaxFac),
+             ctypes.c_int(pot._nzeros),ctypes.c_int(pot._glorder),
+             glx,glw,pot._jzeros_c,out)
+    return out
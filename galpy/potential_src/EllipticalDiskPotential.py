@@ -84,6 +84,7 @@ class EllipticalDiskPotential(planarPotential):
         self._amp/= r1**p
         self.hasC= True
         self.hasC_dxdv= True
+        self._vectorized= False
         if cp is None or sp is None:
             self._phib= phib
             self._twophio= twophio
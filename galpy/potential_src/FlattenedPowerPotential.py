@@ -189,6 +189,27 @@ class FlattenedPowerPotential(Potential):
             m2= self.core2+R**2.+z**2./self.q2
             return -1./self.q2*m2**(-self.alpha/2.-1.)*((self.alpha+2)*z**2./m2/self.q2-1.)
 
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rzderiv
+        PURPOSE:
+           evaluate the mixed R,z derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t- time
+        OUTPUT:
+           d2phi/dR/dz
+        """
+        if self.alpha == 0.:
+            denom= 1./(R**2.+z**2./self.q2+self.core2)
+            return -2.*R*z*denom**2./self.q2
+        else:
+            m2= self.core2+R**2.+z**2./self.q2
+            return -(self.alpha+2)*R*z/self.q2*m2**(-self.alpha/2.-2.)
+
     def _dens(self,R,z,phi=0.,t=0.):
         """
         NAME:
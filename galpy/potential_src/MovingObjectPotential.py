@@ -24,7 +24,7 @@ class MovingObjectPotential(Potential):
 
         S(d) = \\frac{1}{\\sqrt{d^2+\\mathrm{softening\_length}^2}}
 
-    Plummer is currently the only implemented softening.
+    Plummer is currently the only implemented softening. The C implementation (used to integrate orbits in C) requires Plummer softening and an integrated orbit for the object; with any other softening, orbits are integrated in Python.
 
     """
     def __init__(self,orbit,amp=1.,GM=.06,
@@ -50,7 +50,7 @@ class MovingObjectPotential(Potential):
 
            Softening: either provide
 
-              a) softening= with a ForceSoftening-type object
+              a) softening= with a ForceSoftening-type object (only PlummerSoftening is supported in C)
 
               b) softening_model=  type of softening to use ('plummer')
 
@@ -81,6 +81,18 @@ class MovingObjectPotential(Potential):
         self.isNonAxi= True
         return None
 
+    @property
+    def hasC(self):
+        # C implementation requires Plummer softening and an integrated orbit,
+        # so check this whenever it is needed
+        return type(self._softening) is PlummerSoftening \
+            and hasattr(self._orb._orb,'orbit')
+
+    @hasC.setter
+    def hasC(self,value):
+        # Potential.__init__ sets hasC, but it is determined by the above
+        pass
+
     def _evaluate(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -197,6 +209,39 @@ class MovingObjectPotential(Potential):
                        self._orb.R(t),self._orb.phi(t),self._orb.z(t))
         return self._softening.density(dist)
 
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation: the amplitude, the softening, and the object's orbit in rectangular coordinates as a table of piecewise-cubic coefficients (those of the Orbit's dense output)
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: [amp,softening_type,softening_length,nbreak,breakpoints (nbreak),x coefficients (4 x (nbreak-1)),y coefficients,z coefficients]
+        """
+        out= [self._amp,0,self._softening._softening_length]
+        orb= self._orb._orb
+        # Same cubic-Hermite dense output of the positions as Orbit.__call__
+        sindx= nu.argsort(orb.t)
+        breakpoints= orb.t[sindx]
+        R, vR, vT, z, vz, phi= orb.orbit[sindx].T
+        vel_sign= getattr(orb,'_dense_sign',1.)
+        cosphi, sinphi= nu.cos(phi), nu.sin(phi)
+        out.append(len(breakpoints))
+        out.extend(breakpoints)
+        # Coefficients of the cubic in (t-breakpoint) on each interval
+        h= breakpoints[1:]-breakpoints[:-1]
+        for q,v in [(R*cosphi,vel_sign*(vR*cosphi-vT*sinphi)),
+                    (R*sinphi,vel_sign*(vT*cosphi+vR*sinphi)),
+                    (z,vel_sign*vz)]:
+            dq= q[1:]-q[:-1]
+            out.extend(nu.array([(h*(v[:-1]+v[1:])-2.*dq)/h**3.,
+                                 (3.*dq-h*(2.*v[:-1]+v[1:]))/h**2.,
+                                 v[:-1],
+                                 q[:-1]]).T.flatten())
+        return out
+
 def _cyldist(R1,phi1,z1,R2,phi2,z2):
     return nu.sqrt( (R1*nu.cos(phi1)-R2*nu.cos(phi2))**2.
                     +(R1*nu.sin(phi1)-R2*nu.sin(phi2))**2.
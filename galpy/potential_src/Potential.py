@@ -44,7 +44,6 @@ class Potential(object):
            amp - amplitude to be applied when evaluating the potential and its forces
            amp_units - ('mass', 'velocity2', 'density') type of units that amp should have if it has units
         OUTPUT:
-        HISTORY:
         """
         self._amp= amp
         self.dim= 3
@@ -52,6 +51,7 @@ class Potential(object):
         self.isNonAxi= False
         self.hasC= False
         self.hasC_dxdv= False
+        self._vectorized= True # whether the methods take arrays of points
         # Parse ro and vo
         if ro is None:
             self._ro= config.__config__.getfloat('normalization','ro')
@@ -1850,6 +1850,95 @@ def evaluateRzderivs(Pot,R,z,phi=0.,t=0.):
     else: #pragma: no cover 
         raise PotentialError("Input to 'evaluateRzderivs' is neither a Potential-instance or a list of such instances")
 
+# Quantities that evaluateBulk can evaluate: (C code, physical unit, method)
+_BULK_QUANTITIES= {'potential':(0,'energy','__call__'),
+                   'Rforce':(1,'force','Rforce'),
+                   'zforce':(2,'force','zforce'),
+                   'phiforce':(3,'force','phiforce'),
+                   'R2deriv':(4,'forcederivative','R2deriv'),
+                   'z2deriv':(5,'forcederivative','z2deriv'),
+                   'Rzderiv':(6,'forcederivative','Rzderiv'),
+                   'phi2deriv':(7,'forcederivative','phi2deriv'),
+                   'Rphideriv':(8,'forcederivative','Rphideriv'),
+                   'dens':(9,'density','dens')}
+# To convert the output of evaluateBulk to physical units
+_bulk_physical= dict((unit,physical_conversion(unit,pop=True)(lambda Pot,out: out))
+                     for unit in ['energy','force','forcederivative','density'])
+
+@potential_physical_input
+def evaluateBulk(Pot,R,z,phi=0.,t=0.,quantities='potential',**kwargs):
+    """
+    NAME:
+
+       evaluateBulk
+
+    PURPOSE:
+
+       evaluate the potential, forces, second derivatives, and/or density of a possible sum of potentials for arrays of points at once, using C (parallelized with OpenMP) when all potentials have a C implementation
+
+    INPUT:
+
+       Pot - a potential or list of potentials, or a CompiledPotential
+
+       R - cylindrical Galactocentric distance (can be Quantity; array)
+
+       z - distance above the plane (can be Quantity; array broadcastable to R)
+
+       phi - azimuth (optional; can be Quantity; array broadcastable to R)
+
+       t - time (optional; can be Quantity; array broadcastable to R)
+
+       quantities= ('potential') quantity or list of quantities to evaluate: 'potential', 'Rforce', 'zforce', 'phiforce', 'R2deriv', 'z2deriv', 'Rzderiv', 'phi2deriv', 'Rphideriv', 'dens' (the density, evaluated directly when the potential implements it in C and from the Poisson equation otherwise)
+
+       use_physical=, ro=, vo= as for the other evaluate functions
+
+    OUTPUT:
+
+       array with the quantity at (R,z,phi,t) or tuple of such arrays when a list of quantities is given
+
+    """
+    from galpy.potential_src.CompiledPotential import CompiledPotential
+    from galpy.potential_src.interpRZPotential import eval_bulk_c, \
+        ext_loaded
+    singleQuantity= isinstance(quantities,str)
+    if singleQuantity: quantities= [quantities]
+    for quantity in quantities:
+        if not quantity in _BULK_QUANTITIES:
+            raise PotentialError("Quantity '%s' not understood by evaluateBulk" % quantity)
+    R, z, phi, t= nu.broadcast_arrays(nu.asarray(R,dtype='float'),
+                                      nu.asarray(z,dtype='float'),
+                                      nu.asarray(phi,dtype='float'),
+                                      nu.asarray(t,dtype='float'))
+    shape= R.shape
+    out= None
+    if ext_loaded and _check_c(Pot):
+        out, err= eval_bulk_c(Pot,R.flatten(),z.flatten(),phi.flatten(),
+                              t.flatten(),
+                              [_BULK_QUANTITIES[quantity][0]
+                               for quantity in quantities])
+        if err: out= None # fall back to Python below
+    if isinstance(Pot,CompiledPotential): Pot= Pot.pot
+    if not isinstance(Pot,list): Pot= [Pot]
+    if out is None:
+        out= nu.zeros((len(quantities),R.size))
+        for ii,quantity in enumerate(quantities):
+            for pot in Pot:
+                func= getattr(pot,_BULK_QUANTITIES[quantity][2])
+                if pot._vectorized:
+                    out[ii]+= func(R.flatten(),z.flatten(),phi=phi.flatten(),
+                                   t=t.flatten(),use_physical=False)
+                else: # loop over points
+                    out[ii]+= nu.array([func(RR,zz,phi=pp,t=tt,
+                                             use_physical=False)
+                                        for RR,zz,pp,tt in zip(R.flat,z.flat,
+                                                               phi.flat,
+                                                               t.flat)])
+    out= tuple(_bulk_physical[_BULK_QUANTITIES[quantity][1]]\
+                   (Pot,nu.reshape(out[ii],shape),**kwargs)
+               for ii,quantity in enumerate(quantities))
+    if singleQuantity: return out[0]
+    else: return out
+
 def plotPotentials(Pot,rmin=0.,rmax=1.5,nrs=21,zmin=-0.5,zmax=0.5,nzs=21,
                    ncontours=21,savefilename=None,aspect=None,
                    justcontours=False):
@@ -2514,8 +2603,8 @@ def _check_c(Pot):
     """
     if isinstance(Pot,list):
         return nu.all(nu.array([p.hasC for p in Pot],dtype='bool'))
-    elif isinstance(Pot,Potential):
-        return Pot.hasC
+    else: # Potential, planarPotential, or linearPotential
+        return getattr(Pot,'hasC',False)
 
 def _dim(Pot):
     """
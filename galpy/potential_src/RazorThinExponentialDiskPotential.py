@@ -68,6 +68,7 @@ class RazorThinExponentialDiskPotential(Potential):
         self._maxiter= maxiter
         self._tol= tol
         self._glx, self._glw= nu.polynomial.legendre.leggauss(self._glorder)
+        self._vectorized= False
         if normalize or \
                 (isinstance(normalize,(int,float)) \
                      and not isinstance(normalize,bool)): #pragma: no cover
@@ -0,0 +1,469 @@
+###############################################################################
+#   SCFPotential.py: class that implements the Hernquist & Ostriker (1992)
+#                    self-consistent-field (basis-function expansion)
+#                    potential
+#
+#   Phi(r,theta,phi) = sum_{n,l,m} Phi_nl(r) P_l^m(cos theta)
+#                                  [Acos_nlm cos(m phi) + Asin_nlm sin(m phi)]
+#
+#   with Phi_nl(r)= -1/a (r/a)^l/(1+r/a)^(2l+1) C_n^(2l+3/2)(xi),
+#   xi= (r-a)/(r+a), the C_n^alpha the Gegenbauer polynomials, and the
+#   P_l^m the associated Legendre functions (without the Condon-Shortley
+#   phase)
+###############################################################################
+import numpy as nu
+from scipy import special
+from galpy.potential_src.Potential import Potential, PotentialError, \
+    _APY_LOADED
+if _APY_LOADED:
+    from astropy import units
+class SCFPotential(Potential):
+    """Class that implements the `Hernquist & Ostriker (1992) <http://adsabs.harvard.edu/abs/1992ApJ...386..375H>`_ self-consistent-field (basis-function expansion) potential
+
+    .. math::
+
+        \\Phi(r,\\theta,\\phi) = \\mathrm{amp}\\,\\sum_{n=0}^{N-1}\\sum_{l=0}^{L-1}\\sum_{m=0}^{l}\\,\\Phi_{nl}(r)\\,P_l^m(\\cos\\theta)\\,\\left[A^{\\mathrm{cos}}_{nlm}\\,\\cos m\\phi+A^{\\mathrm{sin}}_{nlm}\\,\\sin m\\phi\\right]
+
+    with
+
+    .. math::
+
+        \\Phi_{nl}(r) = -\\frac{1}{a}\\,\\frac{(r/a)^l}{(1+r/a)^{2l+1}}\\,C_n^{(2l+3/2)}\\left(\\frac{r-a}{r+a}\\right)
+
+    where the :math:`C_n^{(\\alpha)}` are Gegenbauer polynomials and the :math:`P_l^m` are associated Legendre functions (without the Condon-Shortley phase). The coefficients can be computed for a given density using ``scf_compute_coeffs_axi`` and ``scf_compute_coeffs`` or for a set of particles using ``scf_compute_coeffs_nbody``.
+
+    """
+    def __init__(self,amp=1.,Acos=nu.ones((1,1,1)),Asin=None,a=1.,
+                 normalize=False,ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           initialize a SCF potential
+
+        INPUT:
+
+           amp - amplitude to be applied to the potential (default: 1); can be a Quantity with units of mass or Gxmass
+
+           Acos - cosine expansion coefficients [N,L,L] (entries with m > l are ignored); the default is a Hernquist potential with unit mass
+
+           Asin= (None) sine expansion coefficients [N,L,L]; if None, these are zero
+
+           a - scale radius (can be Quantity)
+
+           normalize - if True, normalize such that vc(1.,0.)=1., or, if given as a number, such that the force is this fraction of the force necessary to make vc(1.,0.)=1.
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        Potential.__init__(self,amp=amp,ro=ro,vo=vo,amp_units='mass')
+        if _APY_LOADED and isinstance(a,units.Quantity):
+            a= a.to(units.kpc).value/self._ro
+        self._a= a
+        self._scale= self._a
+        Acos= nu.array(Acos,dtype='float')
+        if Acos.ndim != 3 or Acos.shape[1] != Acos.shape[2]:
+            raise PotentialError('SCFPotential coefficients Acos must have shape [N,L,L]')
+        if Asin is None:
+            Asin= nu.zeros_like(Acos)
+        else:
+            Asin= nu.array(Asin,dtype='float')
+            if Asin.shape != Acos.shape:
+                raise PotentialError('SCFPotential coefficients Asin must have the same shape as Acos')
+        # Only m <= l contributes and sin(m phi) vanishes for m=0
+        mask= nu.tril(nu.ones(Acos.shape[1:],dtype='bool'))
+        self._Acos= Acos*mask
+        self._Asin= Asin*mask
+        self._Asin[:,:,0]= 0.
+        self._N, self._L= Acos.shape[:2]
+        self.isNonAxi= nu.any(self._Acos[:,:,1:] != 0.) \
+            or nu.any(self._Asin != 0.)
+        if normalize or \
+                (isinstance(normalize,(int,float)) \
+                     and not isinstance(normalize,bool)):
+            self.normalize(normalize)
+        self.hasC= True
+        self.hasC_dxdv= False
+        return None
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential at R,z,phi
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           Phi(R,z,phi)
+        """
+        return self._expand(R,z,phi,'potential')
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the radial force
+        """
+        return self._expand(R,z,phi,'Rforce')
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the vertical force
+        """
+        return self._expand(R,z,phi,'zforce')
+
+    def _phiforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phiforce
+        PURPOSE:
+           evaluate the azimuthal force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the azimuthal force
+        """
+        return self._expand(R,z,phi,'phiforce')
+
+    def _dens(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _dens
+        PURPOSE:
+           evaluate the density for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the density
+        """
+        return self._expand(R,z,phi,'dens')
+
+    def _expand(self,R,z,phi,quantity):
+        """
+        NAME:
+           _expand
+        PURPOSE:
+           evaluate the basis-function expansion of the potential, a force, or the density
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           quantity - 'potential', 'Rforce', 'zforce', 'phiforce', or 'dens'
+        OUTPUT:
+           quantity at (R,z,phi)
+        """
+        R,z,phi= nu.broadcast_arrays(nu.asarray(R,dtype='float'),
+                                     nu.asarray(z,dtype='float'),
+                                     nu.asarray(phi,dtype='float'))
+        shape= R.shape
+        R,z,phi= R.flatten(),z.flatten(),phi.flatten()
+        r= nu.sqrt(R**2.+z**2.)
+        costheta= nu.ones_like(r)
+        sintheta= nu.zeros_like(r)
+        indx= r > 0.
+        costheta[indx]= z[indx]/r[indx]
+        sintheta[indx]= R[indx]/r[indx]
+        m= nu.arange(self._L)
+        cosmphi= nu.cos(m[:,None]*phi)
+        sinmphi= nu.sin(m[:,None]*phi)
+        if quantity == 'dens':
+            radial= _scf_radial_dens(r,self._N,self._L,self._a)
+        else:
+            radial= _scf_radial(r,self._N,self._L,self._a)
+        # Sum over n first: [L,M,npts]
+        Bcos= nu.einsum('nlp,nlm->lmp',radial,self._Acos)
+        Bsin= nu.einsum('nlp,nlm->lmp',radial,self._Asin)
+        if quantity == 'potential' or quantity == 'dens':
+            Plm= _scf_legendre(costheta,sintheta,self._L)
+            out= nu.sum(Plm*(Bcos*cosmphi+Bsin*sinmphi),axis=(0,1))
+        elif quantity == 'phiforce':
+            Plm= _scf_legendre(costheta,sintheta,self._L)
+            out= -nu.sum(Plm*m[:,None]*(Bsin*cosmphi-Bcos*sinmphi),
+                         axis=(0,1))
+        else:
+            Plm, dPlmdtheta= _scf_legendre(costheta,sintheta,self._L,
+                                           deriv=True)
+            dradial= _scf_radial(r,self._N,self._L,self._a,deriv=True)
+            dBcos= nu.einsum('nlp,nlm->lmp',dradial,self._Acos)
+            dBsin= nu.einsum('nlp,nlm->lmp',dradial,self._Asin)
+            dPhidr= nu.sum(Plm*(dBcos*cosmphi+dBsin*sinmphi),axis=(0,1))
+            dPhidtheta= nu.sum(dPlmdtheta*(Bcos*cosmphi+Bsin*sinmphi),
+                               axis=(0,1))
+            dPhidtheta[indx]/= r[indx]
+            if quantity == 'Rforce':
+                out= -sintheta*dPhidr-costheta*dPhidtheta
+            else:
+                out= -costheta*dPhidr+sintheta*dPhidtheta
+        if shape == (): return out[0]
+        else: return nu.reshape(out,shape)
+
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: [amp,a,N,L,isNonAxi,Acos (N x L x L),Asin (N x L x L; only if isNonAxi)]
+        """
+        out= [self._amp,self._a,self._N,self._L,int(self.isNonAxi)]
+        out.extend(self._Acos.flatten(order='C'))
+        if self.isNonAxi:
+            out.extend(self._Asin.flatten(order='C'))
+        return out
+
+def _scf_gegenbauer(xi,N,L,deriv=False):
+    """Gegenbauer polynomials C_n^(2l+3/2)(xi) [N,L,len(xi)], or their derivative with respect to xi"""
+    xi= nu.atleast_1d(xi)
+    out= nu.zeros((N,L,len(xi)))
+    for l in range(L):
+        alpha= 2.*l+1.5
+        if deriv: # dC_n^alpha/dxi = 2 alpha C_{n-1}^{alpha+1}
+            out[1:,l]= 2.*alpha*special.eval_gegenbauer(\
+                nu.arange(N-1)[:,None],alpha+1.,xi)
+        else:
+            out[:,l]= special.eval_gegenbauer(nu.arange(N)[:,None],alpha,xi)
+    return out
+
+def _scf_radial(r,N,L,a,deriv=False):
+    """Radial basis functions Phi_nl(r) [N,L,len(r)], or their derivative with respect to r"""
+    s= nu.atleast_1d(r)/a
+    xi= (s-1.)/(s+1.)
+    l= nu.arange(L)[:,None]
+    f= s**l/(1.+s)**(2*l+1)
+    if not deriv:
+        return -f*_scf_gegenbauer(xi,N,L)/a
+    with nu.errstate(divide='ignore',invalid='ignore'):
+        dfds= s**(l-1.)*(l-(l+1.)*s)/(1.+s)**(2*l+2)
+    dfds[0]= -1./(1.+s)**2.
+    return -(dfds*_scf_gegenbauer(xi,N,L)
+             +f*_scf_gegenbauer(xi,N,L,deriv=True)*2./(1.+s)**2.)/a**2.
+
+def _scf_radial_dens(r,N,L,a):
+    """Radial density basis functions rho_nl(r) [N,L,len(r)]"""
+    s= nu.atleast_1d(r)/a
+    xi= (s-1.)/(s+1.)
+    n= nu.arange(N)[:,None,None]
+    l= nu.arange(L)[:,None]
+    Knl= 0.5*n*(n+4.*l+3.)+(l+1.)*(2.*l+1.)
+    with nu.errstate(divide='ignore'):
+        f= s**(l-1.)/(1.+s)**(2*l+3)
+    return Knl/2./nu.pi/a**3.*f*_scf_gegenbauer(xi,N,L)
+
+def _scf_legendre(costheta,sintheta,L,deriv=False):
+    """Associated Legendre functions P_l^m(cos theta) without the Condon-Shortley phase [L,L,len(costheta)] (zero for m > l), and, if deriv, their derivative with respect to theta"""
+    Plm= nu.zeros((L+1,L+1,len(costheta)))
+    Pmm= nu.ones_like(costheta)
+    for m in range(L+1):
+        if m > 0: Pmm= Pmm*(2.*m-1.)*sintheta
+        Plm[m,m]= Pmm
+        if m+1 <= L:
+            Plm[m+1,m]= (2.*m+1.)*costheta*Pmm
+        for l in range(m+2,L+1):
+            Plm[l,m]= ((2.*l-1.)*costheta*Plm[l-1,m]
+                       -(l+m-1.)*Plm[l-2,m])/(l-m)
+    if not deriv: return Plm[:L,:L]
+    dPlm= nu.zeros((L,L,len(costheta)))
+    for l in range(L):
+        dPlm[l,0]= -Plm[l,1]
+        for m in range(1,l+1):
+            dPlm[l,m]= 0.5*((l+m)*(l-m+1.)*Plm[l,m-1]-Plm[l,m+1])
+    return (Plm[:L,:L],dPlm)
+
+def _scf_norm(N,L,a):
+    """Normalization of the coefficients: inverse of the integral of (density basis function) x (potential basis function) over all space [N,L,L]"""
+    n= nu.arange(N)[:,None]
+    l= nu.arange(L)
+    Knl= 0.5*n*(n+4.*l+3.)+(l+1.)*(2.*l+1.)
+    Inl= -Knl*2.**(-8.*l-6.)*nu.exp(special.gammaln(n+4.*l+3.)
+                                    -special.gammaln(n+1.)
+                                    -2.*special.gammaln(2.*l+1.5))\
+                                    /(n+2.*l+1.5)/a
+    m= nu.arange(L)
+    with nu.errstate(divide='ignore',invalid='ignore'):
+        Nlm= 2./(2.*l[:,None]+1.)*nu.exp(special.gammaln(l[:,None]+m+1.)
+                                         -special.gammaln(l[:,None]-m+1.))
+    Nlm[m[None,:] > l[:,None]]= nu.inf
+    Nlm*= nu.where(m == 0,2.*nu.pi,nu.pi)
+    return 1./(Inl[:,:,None]*Nlm)
+
+def scf_compute_coeffs_nbody(pos,mass,N,L,a=1.):
+    """
+    NAME:
+
+       scf_compute_coeffs_nbody
+
+    PURPOSE:
+
+       compute the SCFPotential expansion coefficients for a set of particles
+
+    INPUT:
+
+       pos - positions of the particles in Galactocentric cylindrical coordinates [3,nparticles] with (R,z,phi)
+
+       mass - masses of the particles (array [nparticles] or scalar)
+
+       N - number of radial basis functions
+
+       L - number of spherical harmonics (l=0,...,L-1)
+
+       a= (1.) scale radius of the expansion
+
+    OUTPUT:
+
+       (Acos,Asin) - expansion coefficients [N,L,L] to be given to SCFPotential
+
+    """
+    R, z, phi= pos
+    mass= mass*nu.ones_like(R)
+    r= nu.sqrt(R**2.+z**2.)
+    costheta= nu.ones_like(r)
+    indx= r > 0.
+    costheta[indx]= z[indx]/r[indx]
+    sintheta= nu.zeros_like(r)
+    sintheta[indx]= R[indx]/r[indx]
+    radial= _scf_radial(r,N,L,a)*mass
+    Plm= _scf_legendre(costheta,sintheta,L)
+    m= nu.arange(L)
+    norm= _scf_norm(N,L,a)
+    Acos= norm*nu.einsum('nlp,lmp,mp->nlm',radial,Plm,
+                         nu.cos(m[:,None]*phi))
+    Asin= norm*nu.einsum('nlp,lmp,mp->nlm',radial,Plm,
+                         nu.sin(m[:,None]*phi))
+    return (Acos,Asin)
+
+def scf_compute_coeffs(dens,N,L,a=1.,radial_order=None,costheta_order=None,
+                       phi_order=None):
+    """
+    NAME:
+
+       scf_compute_coeffs
+
+    PURPOSE:
+
+       compute the SCFPotential expansion coefficients for a general density using Gauss-Legendre quadrature in (r-a)/(r+a) and cos(theta) and the trapezoidal rule in phi
+
+    INPUT:
+
+       dens - density function dens(R,z,phi) in internal units, called once with arrays of all quadrature points
+
+       N - number of radial basis functions
+
+       L - number of spherical harmonics (l=0,...,L-1)
+
+       a= (1.) scale radius of the expansion
+
+       radial_order= (max(20,N+1)) number of quadrature points in (r-a)/(r+a)
+
+       costheta_order= (max(20,L+1)) number of quadrature points in cos(theta)
+
+       phi_order= (max(20,2L-1)) number of quadrature points in phi
+
+    OUTPUT:
+
+       (Acos,Asin) - expansion coefficients [N,L,L] to be given to SCFPotential
+
+    """
+    if radial_order is None: radial_order= max(20,N+1)
+    if costheta_order is None: costheta_order= max(20,L+1)
+    if phi_order is None: phi_order= max(20,2*L-1)
+    xi, wxi= nu.polynomial.legendre.leggauss(radial_order)
+    costheta, wcostheta= nu.polynomial.legendre.leggauss(costheta_order)
+    phi= 2.*nu.pi*nu.arange(phi_order)/phi_order
+    # Quadrature points and weights, including the Jacobian
+    r= a*(1.+xi)/(1.-xi)
+    wr= wxi*2.*a/(1.-xi)**2.*r**2.
+    rr, ct, pp= nu.meshgrid(r,costheta,phi,indexing='ij')
+    st= nu.sqrt(1.-ct**2.)
+    w= wr[:,None,None]*wcostheta[None,:,None]*2.*nu.pi/phi_order
+    R= (rr*st).flatten()
+    z= (rr*ct).flatten()
+    return scf_compute_coeffs_nbody((R,z,pp.flatten()),
+                                    (w*nu.reshape(dens(R,z,pp.flatten()),
+                                                  rr.shape)).flatten(),
+                                    N,L,a=a)
+
+def scf_compute_coeffs_axi(dens,N,L,a=1.,radial_order=None,
+                           costheta_order=None):
+    """
+    NAME:
+
+       scf_compute_coeffs_axi
+
+    PURPOSE:
+
+       compute the SCFPotential expansion coefficients for an axisymmetric density using Gauss-Legendre quadrature in (r-a)/(r+a) and cos(theta)
+
+    INPUT:
+
+       dens - density function dens(R,z) in internal units, called once with arrays of all quadrature points
+
+       N - number of radial basis functions
+
+       L - number of spherical harmonics (l=0,...,L-1)
+
+       a= (1.) scale radius of the expansion
+
+       radial_order= (max(20,N+1)) number of quadrature points in (r-a)/(r+a)
+
+       costheta_order= (max(20,L+1)) number of quadrature points in cos(theta)
+
+    OUTPUT:
+
+       (Acos,Asin) - expansion coefficients [N,L,L] to be given to SCFPotential (only the m=0 coefficients are non-zero)
+
+    """
+    if radial_order is None: radial_order= max(20,N+1)
+    if costheta_order is None: costheta_order= max(20,L+1)
+    xi, wxi= nu.polynomial.legendre.leggauss(radial_order)
+    costheta, wcostheta= nu.polynomial.legendre.leggauss(costheta_order)
+    r= a*(1.+xi)/(1.-xi)
+    wr= wxi*2.*a/(1.-xi)**2.*r**2.
+    rr, ct= nu.meshgrid(r,costheta,indexing='ij')
+    st= nu.sqrt(1.-ct**2.)
+    w= wr[:,None]*wcostheta[None,:]*2.*nu.pi
+    R= (rr*st).flatten()
+    z= (rr*ct).flatten()
+    Acos, Asin= scf_compute_coeffs_nbody((R,z,nu.zeros_like(R)),
+                                         (w*nu.reshape(dens(R,z),rr.shape))\
+                                             .flatten(),
+                                         N,L,a=a)
+    Acos[:,:,1:]= 0.
+    return (Acos,nu.zeros_like(Asin))
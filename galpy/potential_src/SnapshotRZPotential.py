@@ -1,6 +1,8 @@
 from os import system
+import ctypes
 import hashlib
 import numpy as np
+from numpy.ctypeslib import ndpointer
 from scipy import interpolate 
 from galpy.potential_src.Potential import Potential
 from galpy.potential_src import interpRZPotential
@@ -15,7 +17,7 @@ except ImportError: #pragma: no cover
 else:
     _PYNBODY_LOADED= True    
 class SnapshotRZPotential(Potential):
-    """Class that implements an axisymmetrized version of the potential of an N-body snapshot (requires `pynbody <http://pynbody.github.io>`__)
+    """Class that implements an axisymmetrized version of the potential of an N-body snapshot (requires `pynbody <http://pynbody.github.io>`__, unless the snapshot is given as arrays of positions and masses and solver='multipole')
 
     `_evaluate`, `_Rforce`, and `_zforce` calculate a hash for the
     array of points that is passed in by the user. The hash and
@@ -24,6 +26,7 @@ class SnapshotRZPotential(Potential):
     are returned and not recalculated.
     """
     def __init__(self, s, num_threads=None,nazimuths=4,
+                 solver=None,L=30,
                  ro=None,vo=None):
         """
         NAME:
@@ -37,11 +40,15 @@ class SnapshotRZPotential(Potential):
 
         INPUT:
 
-           s - a simulation snapshot loaded with pynbody
+           s - a simulation snapshot loaded with pynbody or a tuple (pos,mass) of the particles' positions [N,3] and masses (in internal units, G=1)
 
            num_threads= (4) number of threads to use for calculation
 
-           nazimuths= (4) number of azimuths to average over
+           nazimuths= (4) number of azimuths to average over (solver='direct')
+
+           solver= ('direct' for pynbody snapshots, 'multipole' otherwise) 'direct' uses pynbody's direct summation at nazimuths azimuths, 'multipole' uses galpy's C multipole solver, which computes the exact azimuthal average of a multipole expansion of order L
+
+           L= (30) number of multipoles (l=0,...,L-1) for solver='multipole'
 
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
@@ -56,15 +63,18 @@ class SnapshotRZPotential(Potential):
            2014-11-24 - Edited for merging into main galpy - Bovy (IAS)
 
         """
-        if not _PYNBODY_LOADED:
-            raise ImportError("The SnapShotRZPotential class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io")
+        self._solver= _parse_solver(s,solver)
         Potential.__init__(self,amp=1.0,ro=ro,vo=vo)
+        self._vectorized= False
         self._s = s
         self._point_hash = {}
-        if num_threads is None:
+        if num_threads is None and _PYNBODY_LOADED:
             self._num_threads= pynbody.config['number_of_threads']
         else:
             self._num_threads = num_threads
+        if self._solver == 'multipole':
+            self._multipole= _SnapshotMultipole(s,L=L,
+                                                num_threads=self._num_threads)
         # Set up azimuthal averaging
         self._naz= nazimuths
         self._cosaz= np.cos(np.arange(self._naz,dtype='float')\
@@ -101,6 +111,11 @@ class SnapshotRZPotential(Potential):
 #        if use_pkdgrav :
             
 
+        elif self._solver == 'multipole':
+            pot, Rforce, zforce= self._multipole(R,z)
+            rz_acc= np.array([Rforce,zforce]).T
+            self._point_hash[new_hash] = [pot,rz_acc]
+
         else : 
             # set up the four points per R,z pair to mimic axisymmetry
             points = np.zeros((len(R),self._naz,3))
@@ -134,6 +149,123 @@ class SnapshotRZPotential(Potential):
         return pot, rz_acc
 
 
+def _parse_solver(s,solver):
+    """Determine the solver to use for snapshot s and check that it can be used"""
+    if solver is None:
+        solver= 'multipole' if isinstance(s,(tuple,list)) else 'direct'
+    if not solver in ['direct','multipole']:
+        raise ValueError("solver= should be 'direct' or 'multipole'")
+    if not _PYNBODY_LOADED and (solver == 'direct' \
+                                    or not isinstance(s,(tuple,list))):
+        raise ImportError("The SnapShotRZPotential class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io; alternatively, give the snapshot as a tuple (pos,mass) and use solver='multipole'")
+    if solver == 'direct' and isinstance(s,(tuple,list)):
+        raise ValueError("solver='direct' requires a pynbody snapshot")
+    return solver
+
+class _SnapshotMultipole(object):
+    """Azimuthally-averaged potential and forces of a set of particles, using a multipole expansion evaluated in C"""
+    def __init__(self,s,L=30,npb=64,num_threads=None):
+        if isinstance(s,(tuple,list)):
+            pos, mass= s
+            self._units= None
+        else:
+            pos, mass= s['pos'], s['mass']
+            potunits= pynbody.units.G*s['mass'].units/s['pos'].units
+            self._units= (potunits,potunits/s['pos'].units)
+        pos= np.array(pos,dtype='float')
+        mass= np.array(mass,dtype='float')*np.ones(len(pos))
+        r= np.sqrt(np.sum(pos**2.,axis=1))
+        # particles at the origin only contribute a point-mass potential
+        indx= r > 0.
+        self._mcen= np.sum(mass[~indx])
+        pos, mass, r= pos[indx], mass[indx], r[indx]
+        costheta= pos[:,2]/r
+        sindx= np.argsort(r)
+        self._r= np.require(r[sindx],dtype=np.float64,requirements=['C','W'])
+        self._costheta= np.require(costheta[sindx],dtype=np.float64,
+                                   requirements=['C','W'])
+        self._mass= np.require(mass[sindx],dtype=np.float64,
+                               requirements=['C','W'])
+        self._L= L
+        self._npb= npb
+        self._num_threads= 0 if num_threads is None else num_threads
+        nbin= (len(r)+npb-1)//npb
+        self._redge= np.empty(nbin+1)
+        self._inner= np.empty((nbin+1,L))
+        self._outer= np.empty((nbin+1,L))
+        if len(r) == 0: return None
+        ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+        setupFunc= _multipole_lib().snapshot_multipole_setup
+        setupFunc.argtypes= [ctypes.c_int,
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ctypes.c_int,
+                             ctypes.c_int,
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                             ctypes.c_int]
+        setupFunc(len(self._r),self._r,self._costheta,self._mass,
+                  ctypes.c_int(L),ctypes.c_int(npb),
+                  self._redge,self._inner,self._outer,
+                  ctypes.c_int(self._num_threads))
+        return None
+
+    def __call__(self,R,z):
+        """Return the potential, radial force, and vertical force at (R,z)"""
+        R= np.require(np.atleast_1d(R),dtype=np.float64,
+                      requirements=['C','W'])
+        z= np.require(np.atleast_1d(z)*np.ones_like(R),dtype=np.float64,
+                      requirements=['C','W'])
+        pot= np.zeros(len(R))
+        Rforce= np.zeros(len(R))
+        zforce= np.zeros(len(R))
+        if len(self._r) > 0:
+            self._eval_c(R,z,pot,Rforce,zforce)
+        if self._mcen > 0.:
+            r= np.sqrt(R**2.+z**2.)
+            pot-= self._mcen/r
+            Rforce-= self._mcen*R/r**3.
+            zforce-= self._mcen*z/r**3.
+        if not self._units is None:
+            pot= pynbody.array.SimArray(pot,units=self._units[0])
+            Rforce= pynbody.array.SimArray(Rforce,units=self._units[1])
+            zforce= pynbody.array.SimArray(zforce,units=self._units[1])
+        return (pot,Rforce,zforce)
+
+    def _eval_c(self,R,z,pot,Rforce,zforce):
+        """Add the potential and forces of the particles away from the origin, evaluated in C"""
+        ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+        evalFunc= _multipole_lib().snapshot_multipole_eval
+        evalFunc.argtypes= [ctypes.c_int,
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ctypes.c_int,
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ctypes.c_int,
+                            ctypes.c_int,
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ndpointer(dtype=np.float64,flags=ndarrayFlags),
+                            ctypes.c_int]
+        evalFunc(len(R),R,z,len(self._r),self._r,self._costheta,self._mass,
+                 ctypes.c_int(self._L),ctypes.c_int(self._npb),
+                 self._redge,self._inner,self._outer,pot,Rforce,zforce,
+                 ctypes.c_int(self._num_threads))
+        return None
+
+def _multipole_lib():
+    """Return the C library with the multipole solver"""
+    if not interpRZPotential.ext_loaded: #pragma: no cover
+        raise RuntimeError("solver='multipole' requires galpy's C extension galpy_interppotential_c, which could not be loaded")
+    return interpRZPotential._lib
+
 class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) : 
     """
     Interpolated axisymmetrized potential extracted from a simulation output (see ``interpRZPotential`` and ``SnapshotRZPotential``)
@@ -145,7 +277,8 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
                  interpepifreq = False, interpverticalfreq = False, 
                  interpPot = True,
                  enable_c = True, logR = True, zsym = True, 
-                 numcores=None,nazimuths=4,use_pkdgrav = False) : 
+                 numcores=None,nazimuths=4,use_pkdgrav = False,
+                 solver=None,L=30) : 
         """
         NAME:
 
@@ -157,7 +290,7 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
 
         INPUT:
 
-           s - a simulation snapshot loaded with pynbody
+           s - a simulation snapshot loaded with pynbody or a tuple (pos,mass) of the particles' positions [N,3] and masses (in internal units, G=1)
 
            rgrid - R grid to be given to linspace as in rs= linspace(*rgrid)
 
@@ -177,6 +310,10 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
 
            use_pkdgrav= (False) use PKDGRAV to calculate the snapshot's potential and forces (CURRENTLY NOT IMPLEMENTED)
 
+           solver= ('direct' for pynbody snapshots, 'multipole' otherwise) 'direct' uses pynbody's direct summation at nazimuths azimuths, 'multipole' uses galpy's C multipole solver, which computes the exact azimuthal average of a multipole expansion of order L
+
+           L= (30) number of multipoles (l=0,...,L-1) for solver='multipole'
+
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
         OUTPUT:
@@ -190,14 +327,13 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
            2014-11-24 - Edited for merging into main galpy - Bovy (IAS)
 
         """
-        if not _PYNBODY_LOADED:
-            raise ImportError("The InterpSnapRZShotPotential class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io")
+        self._solver= _parse_solver(s,solver)
         
         # inititalize using the base class
         Potential.__init__(self,amp=1.0,ro=ro,vo=vo)
 
         # other properties
-        if numcores is None:
+        if numcores is None and _PYNBODY_LOADED:
             self._numcores= pynbody.config['number_of_threads']
         else:
             self._numcores = numcores
@@ -230,7 +366,8 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
         self._interpverticalfreq = interpverticalfreq
 
         # make the potential accessible at points beyond the grid
-        self._origPot = SnapshotRZPotential(s, numcores)
+        self._origPot = SnapshotRZPotential(s, numcores, nazimuths=nazimuths,
+                                            solver=self._solver,L=L)
 
         # setup the grid
         self._zsym = zsym
@@ -245,6 +382,7 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
             rs = self._rgrid
 
         self._zgrid = np.linspace(*zgrid)
+        self._nonuniform = False
 
         # calculate the grids
         self._setup_potential(self._rgrid,self._zgrid,use_pkdgrav=use_pkdgrav)
@@ -292,7 +430,7 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
         
         if interpepifreq: 
             self._epifreqGrid = np.sqrt(self._R2derivGrid[:,0] - 3./self._rgrid*self._rforceGrid[:,0])
-            goodindx= True-np.isnan(self._epifreqGrid)
+            goodindx= ~np.isnan(self._epifreqGrid)
             self._epifreqInterp=\
                 interpolate.InterpolatedUnivariateSpline(rs[goodindx],
                                                          self._epifreqGrid[goodindx],
@@ -300,7 +438,7 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
             self._epigoodindx= goodindx
         if interpverticalfreq:
             self._verticalfreqGrid = np.sqrt(np.abs(self._z2derivGrid[:,0]))
-            goodindx= True-np.isnan(self._verticalfreqGrid)
+            goodindx= ~np.isnan(self._verticalfreqGrid)
             self._verticalfreqInterp=\
                 interpolate.InterpolatedUnivariateSpline(rs[goodindx],
                                                          self._verticalfreqGrid[goodindx],k=3)
@@ -328,6 +466,8 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
          points are positioned at +/- dr from the central point
          
         """
+        if self._solver == 'multipole':
+            return self._setup_potential_multipole(R,z,dr=dr)
         # set up the four points per R,z pair to mimic axisymmetry
         points = np.zeros((len(R),len(z),self._naz,3))
         
@@ -452,6 +592,38 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
                 # reshape the arrays
                 self._RzderivGrid = -Rzgrad.reshape((len(Rzgrad)/self._naz,self._naz)).mean(axis=1).reshape((len(R),len(z)))
        
+    def _setup_potential_multipole(self, R, z, dr = 0.0001) :
+        """
+        
+        Calculates the potential and force grids for the snapshot
+        using the multipole solver, which directly returns the
+        azimuthal averages (see _setup_potential)
+         
+        """
+        multipole= self._origPot._multipole
+        RR, zz= np.meshgrid(R,z,indexing='ij')
+        RR= RR.flatten()
+        zz= zz.flatten()
+        if self._interpPot:
+            pot, Rforce, zforce= multipole(RR,zz)
+            self._potGrid = pot.reshape((len(R),len(z)))
+            self._rforceGrid = Rforce.reshape((len(R),len(z)))
+            self._zforceGrid = zforce.reshape((len(R),len(z)))
+        if self._interpverticalfreq:
+            zforcem= multipole(RR,zz-dr)[2]
+            zforcep= multipole(RR,zz+dr)[2]
+            self._z2derivGrid = -((zforcep-zforcem)/(2.*dr))\
+                .reshape((len(R),len(z)))
+        if self._interpepifreq:
+            _, Rforcem, zforcem= multipole(RR-dr,zz)
+            _, Rforcep, zforcep= multipole(RR+dr,zz)
+            self._R2derivGrid = -((Rforcep-Rforcem)/(2.*dr))\
+                .reshape((len(R),len(z)))
+        if self._interpepifreq and self._interpverticalfreq:
+            self._RzderivGrid = -((zforcep-zforcem)/(2.*dr))\
+                .reshape((len(R),len(z)))
+        return None
+
     @scalarVectorDecorator
     @zsymDecorator(False)
     def _R2deriv(self,R,Z,phi=0.,t=0.): 
@@ -91,6 +91,7 @@ class SteadyLogSpiralPotential(planarPotential):
             if self._tform is None: self._tsteady= None
             else: self._tsteady= self._tform+2.*self._ts
         self.hasC= True
+        self._vectorized= False
 
     def _evaluate(self,R,phi=0.,t=0.):
         """
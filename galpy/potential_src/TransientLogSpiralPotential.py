@@ -93,6 +93,7 @@ class TransientLogSpiralPotential(planarPotential):
         else:
             self._alpha= alpha
         self.hasC= True
+        self._vectorized= False
 
     def _evaluate(self,R,phi=0.,t=0.):
         """
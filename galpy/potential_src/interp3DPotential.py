@@ -0,0 +1,280 @@
+###############################################################################
+#   interp3DPotential.py: class that interpolates a general, possibly
+#                         non-axisymmetric and time-dependent, potential on a
+#                         regular (R,phi,z) grid (and in time slices)
+###############################################################################
+import numpy as nu
+from scipy import linalg
+from galpy.potential_src.Potential import Potential, PotentialError, \
+    evaluateBulk
+# Order of the derivative with respect to (R,phi,z) and sign for each quantity
+_QUANTITIES= {'potential':(0,0,0,1.),
+              'Rforce':(1,0,0,-1.),
+              'phiforce':(0,1,0,-1.),
+              'zforce':(0,0,1,-1.),
+              'R2deriv':(2,0,0,1.),
+              'phi2deriv':(0,2,0,1.),
+              'z2deriv':(0,0,2,1.),
+              'Rphideriv':(1,1,0,1.),
+              'Rzderiv':(1,0,1,1.)}
+_MAXCHUNK= 2**16
+class interp3DPotential(Potential):
+    """Class that interpolates a general, possibly non-axisymmetric and time-dependent, potential on a regular (R,phi,z) grid using tricubic B-splines, for fast orbit integration"""
+    def __init__(self,Pot=None,rgrid=(nu.log(0.01),nu.log(20.),101),
+                 nphi=32,zgrid=(0.,1.,101),tgrid=None,logR=True,zsym=True,
+                 ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           Initialize an interp3DPotential instance
+
+        INPUT:
+
+           Pot - Potential instance or list thereof to be interpolated (can be non-axisymmetric and time-dependent)
+
+           rgrid - R grid to be given to linspace as in rs= linspace(*rgrid)
+
+           nphi= number of points in the periodic azimuth grid phi= 2 pi k / nphi
+
+           zgrid - z grid to be given to linspace as in zs= linspace(*zgrid)
+
+           tgrid= (None) if set, time grid to be given to linspace as in ts= linspace(*tgrid); the potential is tabulated at each of these times and linearly interpolated in between (and held constant outside of this time range); if None, the potential is tabulated at t=0 and assumed to be static
+
+           logR - if True, rgrid is in the log of R so logrs= linspace(*rgrid)
+
+           zsym= if True (default), the potential is assumed to be symmetric around z=0 (so you can use, e.g.,  zgrid=(0.,1.,101)).
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           instance
+
+        """
+        # Propagate ro and vo
+        roSet= True
+        voSet= True
+        if ro is None:
+            if isinstance(Pot,list):
+                ro= Pot[0]._ro
+                roSet= Pot[0]._roSet
+            else:
+                ro= Pot._ro
+                roSet= Pot._roSet
+        if vo is None:
+            if isinstance(Pot,list):
+                vo= Pot[0]._vo
+                voSet= Pot[0]._voSet
+            else:
+                vo= Pot._vo
+                voSet= Pot._voSet
+        Potential.__init__(self,amp=1.,ro=ro,vo=vo)
+        # Turn off physical if it hadn't been on
+        if not roSet: self._roSet= False
+        if not voSet: self._voSet= False
+        self._origPot= Pot
+        self._logR= logR
+        self._zsym= zsym
+        self._xrgrid= nu.linspace(*rgrid)
+        if self._logR:
+            self._rgrid= nu.exp(self._xrgrid)
+        else:
+            self._rgrid= self._xrgrid
+        self._phigrid= 2.*nu.pi*nu.arange(nphi)/nphi
+        self._zgrid= nu.linspace(*zgrid)
+        if len(self._rgrid) < 4 or len(self._zgrid) < 4:
+            raise PotentialError('interp3DPotential requires at least four grid points in R and z')
+        if tgrid is None:
+            self._tgrid= nu.array([0.])
+        else:
+            self._tgrid= nu.linspace(*tgrid)
+        # Tabulate the potential, using C when possible
+        t,R,phi,z= nu.meshgrid(self._tgrid,self._rgrid,self._phigrid,
+                               self._zgrid,indexing='ij')
+        self._potGrid= evaluateBulk(self._origPot,R,z,phi=phi,t=t,
+                                    quantities='potential',
+                                    use_physical=False)
+        # Pre-compute the B-spline coefficients; with zsym and a z grid
+        # starting at zero, the spline is even in z
+        coeffs= _bspline_coeffs_notaknot(self._potGrid,1)
+        coeffs= _bspline_coeffs_periodic(coeffs,2)
+        self._potGrid_splinecoeffs= _bspline_coeffs_notaknot(\
+            coeffs,3,mirror_start=self._zsym and self._zgrid[0] == 0.)
+        self.isNonAxi= True
+        self.hasC= True
+        self.hasC_dxdv= True
+        return None
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'potential')
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'Rforce')
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'zforce')
+
+    def _phiforce(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'phiforce')
+
+    def _R2deriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'R2deriv')
+
+    def _z2deriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'z2deriv')
+
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'Rzderiv')
+
+    def _phi2deriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'phi2deriv')
+
+    def _Rphideriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,phi,t,'Rphideriv')
+
+    def _interp(self,R,z,phi,t,quantity):
+        """
+        NAME:
+           _interp
+        PURPOSE:
+           evaluate the interpolated potential, a force, or a second derivative, falling back onto the original potential outside of the (R,z) grid
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+           quantity - quantity to evaluate (one of the keys of _QUANTITIES)
+        OUTPUT:
+           quantity at (R,z,phi,t)
+        """
+        oR, ophi, oz, sign= _QUANTITIES[quantity]
+        R,z,phi,t= nu.broadcast_arrays(nu.asarray(R,dtype='float'),
+                                       nu.asarray(z,dtype='float'),
+                                       nu.asarray(phi,dtype='float'),
+                                       nu.asarray(t,dtype='float'))
+        shape= R.shape
+        R,z,phi,t= R.flatten(),z.flatten(),phi.flatten(),t.flatten()
+        if self._zsym:
+            zz= nu.fabs(z)
+        else:
+            zz= z
+        out= nu.empty(R.shape)
+        indx= (R >= self._rgrid[0])*(R <= self._rgrid[-1])\
+            *(zz >= self._zgrid[0])*(zz <= self._zgrid[-1])
+        if nu.any(indx):
+            x= nu.log(R[indx]) if self._logR else R[indx]
+            out[indx]= self._spline(x,phi[indx],zz[indx],t[indx],oR,ophi,oz)
+            if self._logR and oR == 2:
+                out[indx]-= self._spline(x,phi[indx],zz[indx],t[indx],
+                                         1,ophi,oz)
+            if self._logR and oR > 0:
+                out[indx]/= R[indx]**oR
+            if self._zsym and oz == 1:
+                out[indx]*= nu.sign(z[indx])
+            out[indx]*= sign
+        if not nu.all(indx):
+            out[~indx]= evaluateBulk(self._origPot,R[~indx],z[~indx],
+                                     phi=phi[~indx],t=t[~indx],
+                                     quantities=quantity,use_physical=False)
+        if shape == (): return out[0]
+        else: return nu.reshape(out,shape)
+
+    def _spline(self,x,phi,z,t,oR,ophi,oz):
+        """Evaluate the derivative of order (oR,ophi,oz) of the spline with respect to (R or log R, phi, z)"""
+        nt, nR, nphi, nz= self._potGrid_splinecoeffs.shape
+        dR= self._xrgrid[1]-self._xrgrid[0]
+        dphi= 2.*nu.pi/nphi
+        dz= self._zgrid[1]-self._zgrid[0]
+        out= nu.empty(x.shape)
+        for ii in range(0,len(x),_MAXCHUNK):
+            sl= slice(ii,ii+_MAXCHUNK)
+            iR, wR= _bspline_weights((x[sl]-self._xrgrid[0])/dR,oR,dR,nR-4)
+            iphi, wphi= _bspline_weights(nu.mod(phi[sl],2.*nu.pi)/dphi,
+                                         ophi,dphi)
+            iphi= nu.mod(iphi-1,nphi)
+            iz, wz= _bspline_weights((z[sl]-self._zgrid[0])/dz,oz,dz,nz-4)
+            # Linear interpolation between time slices
+            if nt > 1:
+                xt= nu.clip((t[sl]-self._tgrid[0])\
+                                /(self._tgrid[1]-self._tgrid[0]),0.,nt-1.)
+                it= nu.minimum(nu.floor(xt).astype('int'),nt-2)
+                ft= xt-it
+                slices= [(it,1.-ft),(it+1,ft)]
+            else:
+                slices= [(nu.zeros(len(iR),dtype='int'),1.)]
+            out[sl]= 0.
+            for it,ft in slices:
+                out[sl]+= ft*nu.einsum('ijkl,ij,ik,il->i',
+                                       self._potGrid_splinecoeffs\
+                                           [it[:,None,None,None],
+                                            iR[:,:,None,None],
+                                            iphi[:,None,:,None],
+                                            iz[:,None,None,:]],
+                                       wR,wphi,wz)
+        return out
+
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: [amp,logR,zsym,nR,nphi,nz,nt,R0,dR,z0,dz,t0,dt,spline coefficients (nt x nR+2 x nphi x nz+2)]
+        """
+        nt, nR, nphi, nz= self._potGrid.shape
+        out= [self._amp,int(self._logR),int(self._zsym),nR,nphi,nz,nt,
+              self._xrgrid[0],self._xrgrid[1]-self._xrgrid[0],
+              self._zgrid[0],self._zgrid[1]-self._zgrid[0]]
+        if nt > 1:
+            out.extend([self._tgrid[0],self._tgrid[1]-self._tgrid[0]])
+        else:
+            out.extend([self._tgrid[0],1.])
+        out.extend(self._potGrid_splinecoeffs.flatten(order='C'))
+        return out
+
+def _bspline_weights(x,order,dx,nmax=None):
+    """Indices and weights of the four cubic B-spline coefficients that contribute at x (in units of the grid spacing dx), or the weights of the first or second derivative; if nmax is set, the interval is limited to [0,nmax]"""
+    i= nu.floor(x).astype('int')
+    if not nmax is None: i= nu.clip(i,0,nmax)
+    u= x-i
+    um= 1.-u
+    if order == 0:
+        w= nu.array([um**3./6.,(3.*u**3.-6.*u**2.+4.)/6.,
+                     (-3.*u**3.+3.*u**2.+3.*u+1.)/6.,u**3./6.])
+    elif order == 1:
+        w= nu.array([-0.5*um**2.,1.5*u**2.-2.*u,-1.5*u**2.+u+0.5,0.5*u**2.])
+    elif order == 2:
+        w= nu.array([um,3.*u-2.,1.-3.*u,u])
+    return (i[:,None]+nu.arange(4),w.T/dx**order)
+
+def _bspline_coeffs_notaknot(s,axis,mirror_start=False):
+    """Cubic B-spline coefficients along an axis with not-a-knot end conditions (or a mirror condition at the start); returns n+2 coefficients for n samples"""
+    n= s.shape[axis]
+    # Interpolation conditions (c[i]+4c[i+1]+c[i+2])/6 = s[i] plus end conditions
+    A= nu.zeros((n+2,n+2))
+    for ii in range(n):
+        A[ii+1,ii:ii+3]= [1./6.,4./6.,1./6.]
+    if mirror_start:
+        A[0,[0,2]]= [1.,-1.]
+    else:
+        A[0,:5]= [1.,-4.,6.,-4.,1.]
+    A[-1,-5:]= [1.,-4.,6.,-4.,1.]
+    Ainv= linalg.inv(A)[:,1:n+1]
+    return nu.moveaxis(nu.tensordot(Ainv,s,axes=(1,axis)),0,axis)
+
+def _bspline_coeffs_periodic(s,axis):
+    """Cubic B-spline coefficients along an axis with periodic boundary conditions"""
+    n= s.shape[axis]
+    # The (circulant) interpolation system is diagonal in Fourier space
+    eig= (4.+2.*nu.cos(2.*nu.pi*nu.arange(n//2+1)/n))/6.
+    shape= [1 for ii in range(s.ndim)]
+    shape[axis]= len(eig)
+    return nu.fft.irfft(nu.fft.rfft(s,axis=axis)/nu.reshape(eig,shape),
+                        n=n,axis=axis)
@@ -2,6 +2,8 @@ import os
 import sys
 import sysconfig
 import copy
+import hashlib
+import tempfile
 import ctypes
 import ctypes.util
 import warnings
@@ -110,7 +112,7 @@ class interpRZPotential(Potential):
                  interpepifreq=False,interpverticalfreq=False,
                  ro=None,vo=None,
                  use_c=False,enable_c=False,zsym=True,
-                 numcores=None):
+                 numcores=None,cachedir=None,tol=None,maxrefine=10):
         """
         NAME:
 
@@ -124,9 +126,9 @@ class interpRZPotential(Potential):
 
            RZPot - RZPotential to be interpolated
 
-           rgrid - R grid to be given to linspace as in rs= linspace(*rgrid)
+           rgrid - R grid to be given to linspace as in rs= linspace(*rgrid), or a numpy array of (not necessarily uniformly-spaced) grid points
 
-           zgrid - z grid to be given to linspace as in zs= linspace(*zgrid)
+           zgrid - z grid to be given to linspace as in zs= linspace(*zgrid), or a numpy array of (not necessarily uniformly-spaced) grid points
 
            logR - if True, rgrid is in the log of R so logrs= linspace(*rgrid)
 
@@ -140,6 +142,12 @@ class interpRZPotential(Potential):
 
            numcores= if set to an integer, use this many cores (only used for vcirc, dvcircdR, epifreq, and verticalfreq; NOT NECESSARILY FASTER, TIME TO MAKE SURE)
 
+           cachedir= (None) if set, directory in which the tabulated grids and spline coefficients are stored as .npy files, keyed by a fingerprint of the original potential and the grid settings; when the same interpolation is set up again, the stored grids are memory-mapped instead of being recomputed, such that many processes can share them
+
+           tol= (None) if set, adaptively refine rgrid and zgrid (which then set the starting grid) until the relative error of the interpolated potential, forces, and density (as requested using interpPot etc.) between the grid points is smaller than tol; grid points are inserted only in the grid intervals in which the error is too large
+
+           maxrefine= (10) maximum number of refinement iterations when using tol=
+
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
         OUTPUT:
@@ -178,12 +186,39 @@ class interpRZPotential(Potential):
         if not roSet: self._roSet= False
         if not voSet: self._voSet= False
         self._origPot= RZPot
-        self._rgrid= numpy.linspace(*rgrid)
         self._logR= logR
+        self._zsym= zsym
+        self._cachedir= cachedir
+        rgrid= _grid_points(rgrid)
+        zgrid= _grid_points(zgrid)
+        if not cachedir is None:
+            self._fingerprint= _fingerprint(RZPot,rgrid,zgrid,logR,zsym,
+                                            tol=tol,maxrefine=maxrefine)
+        # Values of the original potential on the refined grid
+        refined= {}
+        if not tol is None:
+            grids= {}
+            def calc_grid(name):
+                if not grids:
+                    grids['rgrid'], grids['zgrid'], refined['values']=\
+                        _refine_grid(RZPot,rgrid,zgrid,logR,tol,maxrefine,
+                                     interpPot=interpPot,
+                                     interpRforce=interpRforce,
+                                     interpzforce=interpzforce,
+                                     interpDens=interpDens)
+                return grids[name]
+            rgrid= numpy.array(self._cached('rgrid',
+                                            lambda: calc_grid('rgrid')))
+            zgrid= numpy.array(self._cached('zgrid',
+                                            lambda: calc_grid('zgrid')))
+        self._rgrid= rgrid
         if self._logR:
             self._rgrid= numpy.exp(self._rgrid)
             self._logrgrid= numpy.log(self._rgrid)
-        self._zgrid= numpy.linspace(*zgrid)
+        self._zgrid= zgrid
+        # On non-uniform grids, C uses the same spline representation as
+        # the python code rather than B-spline coefficients on the grid
+        self._nonuniform= not (_is_uniform(rgrid) and _is_uniform(zgrid))
         self._interpPot= interpPot
         self._interpRforce= interpRforce
         self._interpzforce= interpzforce
@@ -194,17 +229,19 @@ class interpRZPotential(Potential):
         self._interpverticalfreq= interpverticalfreq
         self._enable_c= enable_c*ext_loaded
         self.hasC= self._enable_c
-        self._zsym= zsym
         if interpPot:
-            if use_c*ext_loaded:
-                self._potGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid)
-            else:
+            def calc_potGrid():
+                if 'potential' in refined.get('values',{}):
+                    return refined['values']['potential']
+                if use_c*ext_loaded:
+                    return calc_potential_c(self._origPot,self._rgrid,self._zgrid)[0]
                 from galpy.potential import evaluatePotentials
                 potGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
                 for ii in range(len(self._rgrid)):
                     for jj in range(len(self._zgrid)):
                         potGrid[ii,jj]= evaluatePotentials(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._potGrid= potGrid
+                return potGrid
+            self._potGrid= self._cached('potGrid',calc_potGrid)
             if self._logR:
                 self._potInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                  self._zgrid,
@@ -215,18 +252,22 @@ class interpRZPotential(Potential):
                                                                  self._zgrid,
                                                                  self._potGrid,
                                                                  kx=3,ky=3,s=0.)
-            if enable_c*ext_loaded:
-                self._potGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._potGrid)
+            if enable_c*ext_loaded and not self._nonuniform:
+                self._potGrid_splinecoeffs= self._cached('potGrid_splinecoeffs',
+                                                         lambda: calc_2dsplinecoeffs_c(self._potGrid))
         if interpRforce:
-            if use_c*ext_loaded:
-                self._rforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,rforce=True)
-            else:
+            def calc_rforceGrid():
+                if 'Rforce' in refined.get('values',{}):
+                    return refined['values']['Rforce']
+                if use_c*ext_loaded:
+                    return calc_potential_c(self._origPot,self._rgrid,self._zgrid,rforce=True)[0]
                 from galpy.potential import evaluateRforces
                 rforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
                 for ii in range(len(self._rgrid)):
                     for jj in range(len(self._zgrid)):
                         rforceGrid[ii,jj]= evaluateRforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._rforceGrid= rforceGrid
+                return rforceGrid
+            self._rforceGrid= self._cached('rforceGrid',calc_rforceGrid)
             if self._logR:
                 self._rforceInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                     self._zgrid,
@@ -237,18 +278,22 @@ class interpRZPotential(Potential):
                                                                     self._zgrid,
                                                                     self._rforceGrid,
                                                                     kx=3,ky=3,s=0.)
-            if enable_c*ext_loaded:
-                self._rforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._rforceGrid)
+            if enable_c*ext_loaded and not self._nonuniform:
+                self._rforceGrid_splinecoeffs= self._cached('rforceGrid_splinecoeffs',
+                                                            lambda: calc_2dsplinecoeffs_c(self._rforceGrid))
         if interpzforce:
-            if use_c*ext_loaded:
-                self._zforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,zforce=True)
-            else:
+            def calc_zforceGrid():
+                if 'zforce' in refined.get('values',{}):
+                    return refined['values']['zforce']
+                if use_c*ext_loaded:
+                    return calc_potential_c(self._origPot,self._rgrid,self._zgrid,zforce=True)[0]
                 from galpy.potential import evaluatezforces
                 zforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
                 for ii in range(len(self._rgrid)):
                     for jj in range(len(self._zgrid)):
                         zforceGrid[ii,jj]= evaluatezforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._zforceGrid= zforceGrid
+                return zforceGrid
+            self._zforceGrid= self._cached('zforceGrid',calc_zforceGrid)
             if self._logR:
                 self._zforceInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                     self._zgrid,
@@ -259,15 +304,20 @@ class interpRZPotential(Potential):
                                                                     self._zgrid,
                                                                     self._zforceGrid,
                                                                     kx=3,ky=3,s=0.)
-            if enable_c*ext_loaded:
-                self._zforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._zforceGrid)
+            if enable_c*ext_loaded and not self._nonuniform:
+                self._zforceGrid_splinecoeffs= self._cached('zforceGrid_splinecoeffs',
+                                                            lambda: calc_2dsplinecoeffs_c(self._zforceGrid))
         if interpDens:
-            from galpy.potential import evaluateDensities
-            densGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
-            for ii in range(len(self._rgrid)):
-                for jj in range(len(self._zgrid)):
-                    densGrid[ii,jj]= evaluateDensities(self._origPot,self._rgrid[ii],self._zgrid[jj])
-            self._densGrid= densGrid
+            def calc_densGrid():
+                if 'dens' in refined.get('values',{}):
+                    return refined['values']['dens']
+                from galpy.potential import evaluateDensities
+                densGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
+                for ii in range(len(self._rgrid)):
+                    for jj in range(len(self._zgrid)):
+                        densGrid[ii,jj]= evaluateDensities(self._origPot,self._rgrid[ii],self._zgrid[jj])
+                return densGrid
+            self._densGrid= self._cached('densGrid',calc_densGrid)
             if self._logR:
                 self._densInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                   self._zgrid,
@@ -279,35 +329,41 @@ class interpRZPotential(Potential):
                                                                   numpy.log(self._densGrid+10.**-10.),
                                                                   kx=3,ky=3,s=0.)
         if interpvcirc:
-            from galpy.potential import vcirc
-            if not numcores is None:
-                self._vcircGrid= multi.parallel_map((lambda x: vcirc(self._origPot,self._rgrid[x])),
-                                                    list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._vcircGrid= numpy.array([vcirc(self._origPot,r) for r in self._rgrid])
+            def calc_vcircGrid():
+                from galpy.potential import vcirc
+                if not numcores is None:
+                    return multi.parallel_map((lambda x: vcirc(self._origPot,self._rgrid[x])),
+                                              list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    return numpy.array([vcirc(self._origPot,r) for r in self._rgrid])
+            self._vcircGrid= self._cached('vcircGrid',calc_vcircGrid)
             if self._logR:
                 self._vcircInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._vcircGrid,k=3)
             else:
                 self._vcircInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._vcircGrid,k=3)
         if interpdvcircdr:
-            from galpy.potential import dvcircdR
-            if not numcores is None:
-                self._dvcircdrGrid= multi.parallel_map((lambda x: dvcircdR(self._origPot,self._rgrid[x])),
-                                                       list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._dvcircdrGrid= numpy.array([dvcircdR(self._origPot,r) for r in self._rgrid])
+            def calc_dvcircdrGrid():
+                from galpy.potential import dvcircdR
+                if not numcores is None:
+                    return multi.parallel_map((lambda x: dvcircdR(self._origPot,self._rgrid[x])),
+                                              list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    return numpy.array([dvcircdR(self._origPot,r) for r in self._rgrid])
+            self._dvcircdrGrid= self._cached('dvcircdrGrid',calc_dvcircdrGrid)
             if self._logR:
                 self._dvcircdrInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._dvcircdrGrid,k=3)
             else:
                 self._dvcircdrInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._dvcircdrGrid,k=3)
         if interpepifreq:
-            from galpy.potential import epifreq
-            if not numcores is None:
-                self._epifreqGrid= numpy.array(multi.parallel_map((lambda x: epifreq(self._origPot,self._rgrid[x])),
-                                                      list(range(len(self._rgrid))),numcores=numcores))
-            else:
-                self._epifreqGrid= numpy.array([epifreq(self._origPot,r) for r in self._rgrid])
-            indx= True-numpy.isnan(self._epifreqGrid)
+            def calc_epifreqGrid():
+                from galpy.potential import epifreq
+                if not numcores is None:
+                    return numpy.array(multi.parallel_map((lambda x: epifreq(self._origPot,self._rgrid[x])),
+                                                          list(range(len(self._rgrid))),numcores=numcores))
+                else:
+                    return numpy.array([epifreq(self._origPot,r) for r in self._rgrid])
+            self._epifreqGrid= self._cached('epifreqGrid',calc_epifreqGrid)
+            indx= ~numpy.isnan(self._epifreqGrid)
             if numpy.sum(indx) < 4:
                 if self._logR:
                     self._epifreqInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid[indx],self._epifreqGrid[indx],k=1)
@@ -319,18 +375,55 @@ class interpRZPotential(Potential):
                 else:
                     self._epifreqInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid[indx],self._epifreqGrid[indx],k=3)
         if interpverticalfreq:
-            from galpy.potential import verticalfreq
-            if not numcores is None:
-                self._verticalfreqGrid= multi.parallel_map((lambda x: verticalfreq(self._origPot,self._rgrid[x])),
-                                                       list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._verticalfreqGrid= numpy.array([verticalfreq(self._origPot,r) for r in self._rgrid])
+            def calc_verticalfreqGrid():
+                from galpy.potential import verticalfreq
+                if not numcores is None:
+                    return multi.parallel_map((lambda x: verticalfreq(self._origPot,self._rgrid[x])),
+                                              list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    return numpy.array([verticalfreq(self._origPot,r) for r in self._rgrid])
+            self._verticalfreqGrid= self._cached('verticalfreqGrid',calc_verticalfreqGrid)
             if self._logR:
                 self._verticalfreqInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._verticalfreqGrid,k=3)
             else:
                 self._verticalfreqInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._verticalfreqGrid,k=3)
         return None
                                                  
+    def _cached(self,name,func):
+        """
+        NAME:
+           _cached
+        PURPOSE:
+           return a tabulated grid, memory-mapping it from the cache directory if it was stored before, computing (and storing) it otherwise
+        INPUT:
+           name - name of the grid
+           func - function that computes the grid
+        OUTPUT:
+           grid
+        """
+        if self._cachedir is None: return func()
+        filename= os.path.join(self._cachedir,'interpRZ_%s_%s.npy' \
+                                   % (self._fingerprint,name))
+        if not os.path.exists(filename):
+            if not os.path.exists(self._cachedir):
+                try:
+                    os.makedirs(self._cachedir)
+                except OSError: #pragma: no cover
+                    # Another process created it in the meantime
+                    if not os.path.isdir(self._cachedir): raise
+            # Write to a temporary file and move it into place, such that
+            # other processes never see a partially-written file
+            fd, tmpfilename= tempfile.mkstemp(suffix='.npy',
+                                              dir=self._cachedir)
+            with os.fdopen(fd,'wb') as tmpfile:
+                numpy.save(tmpfile,numpy.asarray(func(),dtype='float'))
+            try:
+                os.rename(tmpfilename,filename)
+            except OSError: #pragma: no cover
+                # Another process stored the same grid in the meantime
+                os.remove(tmpfilename)
+        return numpy.load(filename,mmap_mode='r')
+
     @scalarVectorDecorator
     @zsymDecorator(False)
     def _evaluate(self,R,z,phi=0.,t=0.):
@@ -347,10 +440,10 @@ class interpRZPotential(Potential):
                         out[indx]= self._potInterp.ev(numpy.log(R[indx]),z[indx])
                     else:
                         out[indx]= self._potInterp.ev(R[indx],z[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= evaluatePotentials(self._origPot,
-                                                   R[True-indx],
-                                                   z[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= evaluatePotentials(self._origPot,
+                                                   R[~indx],
+                                                   z[~indx])
             return out
         else:
             return evaluatePotentials(self._origPot,R,z)
@@ -371,10 +464,10 @@ class interpRZPotential(Potential):
                         out[indx]= self._rforceInterp.ev(numpy.log(R[indx]),z[indx])
                     else:
                         out[indx]= self._rforceInterp.ev(R[indx],z[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= evaluateRforces(self._origPot,
-                                                R[True-indx],
-                                                z[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= evaluateRforces(self._origPot,
+                                                R[~indx],
+                                                z[~indx])
             return out
         else:
             return evaluateRforces(self._origPot,R,z)
@@ -397,10 +490,10 @@ class interpRZPotential(Potential):
                                                          z[indx])
                     else:
                         out[indx]= self._zforceInterp.ev(R[indx],z[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= evaluatezforces(self._origPot,
-                                                R[True-indx],
-                                                z[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= evaluatezforces(self._origPot,
+                                                R[~indx],
+                                                z[~indx])
             return out
         else:
             return evaluatezforces(self._origPot,R,z)
@@ -422,10 +515,10 @@ class interpRZPotential(Potential):
                     out[indx]= numpy.exp(self._densInterp.ev(numpy.log(R[indx]),z[indx]))-10.**-10.
                 else:
                     out[indx]= numpy.exp(self._densInterp.ev(R[indx],z[indx]))-10.**-10.
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= evaluateDensities(self._origPot,
-                                                  R[True-indx],
-                                                  z[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= evaluateDensities(self._origPot,
+                                                  R[~indx],
+                                                  z[~indx])
             return out
         else:
             return evaluateDensities(self._origPot,R,z)
@@ -442,8 +535,8 @@ class interpRZPotential(Potential):
                     out[indx]= self._vcircInterp(numpy.log(R[indx]))
                 else:
                     out[indx]= self._vcircInterp(R[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= vcirc(self._origPot,R[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= vcirc(self._origPot,R[~indx])
             return out
         else:
             return vcirc(self._origPot,R)
@@ -460,8 +553,8 @@ class interpRZPotential(Potential):
                     out[indx]= self._dvcircdrInterp(numpy.log(R[indx]))
                 else:
                     out[indx]= self._dvcircdrInterp(R[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= dvcircdR(self._origPot,R[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= dvcircdR(self._origPot,R[~indx])
             return out
         else:
             return dvcircdR(self._origPot,R)
@@ -478,8 +571,8 @@ class interpRZPotential(Potential):
                     out[indx]= self._epifreqInterp(numpy.log(R[indx]))
                 else:
                     out[indx]= self._epifreqInterp(R[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= epifreq(self._origPot,R[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= epifreq(self._origPot,R[~indx])
             return out
         else:
             return epifreq(self._origPot,R)
@@ -496,12 +589,208 @@ class interpRZPotential(Potential):
                     out[indx]= self._verticalfreqInterp(numpy.log(R[indx]))
                 else:
                     out[indx]= self._verticalfreqInterp(R[indx])
-            if numpy.sum(True-indx) > 0:
-                out[True-indx]= verticalfreq(self._origPot,R[True-indx])
+            if numpy.sum(~indx) > 0:
+                out[~indx]= verticalfreq(self._origPot,R[~indx])
             return out
         else:
             return verticalfreq(self._origPot,R)
     
+def _fingerprint(pot,rgrid,zgrid,logR,zsym,tol=None,maxrefine=None):
+    """
+    NAME:
+       _fingerprint
+    PURPOSE:
+       compute a fingerprint of a potential and the grid settings of an interpolation, from the classes and the scalar parameters of the potential(s) and the value of the potential and the forces at a set of points
+    INPUT:
+       pot - Potential instance or list of such instances
+       rgrid, zgrid - grid points in (log) R and z
+       logR, zsym, tol, maxrefine - grid settings of interpRZPotential
+    OUTPUT:
+       hexadecimal fingerprint
+    """
+    from galpy.potential import evaluatePotentials, evaluateRforces, \
+        evaluatezforces
+    if not isinstance(pot,list): pot= [pot]
+    fp= hashlib.sha1()
+    fp.update(numpy.asarray(rgrid,dtype='float').tobytes())
+    fp.update(numpy.asarray(zgrid,dtype='float').tobytes())
+    fp.update(repr((bool(logR),bool(zsym),tol,maxrefine)).encode())
+    for p in pot:
+        fp.update(type(p).__name__.encode())
+        fp.update(repr(sorted((key,repr(val)) for key,val in p.__dict__.items()
+                              if isinstance(val,(int,float,bool,str,
+                                                 numpy.number)))).encode())
+    # Probe the potential throughout the grid
+    rs= numpy.asarray(rgrid,dtype='float')
+    if logR: rs= numpy.exp(rs)
+    zs= numpy.asarray(zgrid,dtype='float')
+    for r in rs[::max(len(rs)//7,1)]:
+        for z in zs[::max(len(zs)//3,1)]:
+            fp.update(numpy.array([evaluatePotentials(pot,r,z),
+                                   evaluateRforces(pot,r,z),
+                                   evaluatezforces(pot,r,z)],
+                                  dtype='float').tobytes())
+    return fp.hexdigest()
+
+def _grid_points(grid):
+    """
+    NAME:
+       _grid_points
+    PURPOSE:
+       return the grid points for a grid specification
+    INPUT:
+       grid - tuple (or list) to be given to linspace or numpy array of grid points
+    OUTPUT:
+       array of grid points
+    """
+    if isinstance(grid,numpy.ndarray):
+        return numpy.array(grid,dtype='float')
+    elif not len(grid) in [2,3]:
+        raise ValueError("Grid specification %s is neither a (start,stop[,num]) tuple to be given to linspace nor a numpy array of grid points; give individual grid points as a numpy array" % str(grid))
+    else:
+        return numpy.linspace(*grid)
+
+def _is_uniform(grid):
+    """
+    NAME:
+       _is_uniform
+    PURPOSE:
+       determine whether grid points are uniformly spaced
+    INPUT:
+       grid - grid points
+    OUTPUT:
+       True if uniformly spaced
+    """
+    if len(grid) < 3: return True
+    dgrid= numpy.diff(grid)
+    return numpy.all(numpy.fabs(dgrid-dgrid[0]) < 10.**-10.*numpy.fabs(dgrid[0]))
+
+def _refine_grid(pot,rgrid,zgrid,logR,tol,maxrefine,**interpkwargs):
+    """
+    NAME:
+       _refine_grid
+    PURPOSE:
+       adaptively refine the grid of an interpRZPotential until the interpolation error is smaller than tol
+    INPUT:
+       pot - Potential instance or list of such instances
+       rgrid, zgrid - starting grid points in (log) R and z
+       logR - if True, rgrid is in log R
+       tol - relative tolerance
+       maxrefine - maximum number of refinement iterations
+       interpPot=, interpRforce=, interpzforce=, interpDens= quantities whose interpolation error is controlled
+    OUTPUT:
+       (rgrid,zgrid,values) refined grid points and dictionary of the values of the interpolated quantities on this grid
+    """
+    from galpy.potential import evaluateBulk
+    quantities= []
+    if interpkwargs.get('interpPot',False):
+        quantities.append('potential')
+    if interpkwargs.get('interpRforce',False) \
+            or interpkwargs.get('interpzforce',False):
+        quantities.extend(['Rforce','zforce'])
+    if interpkwargs.get('interpDens',False):
+        quantities.append('dens')
+    # The original potential is evaluated only once at every point: the
+    # midpoints used to estimate the error become the new grid lines, so
+    # each iteration only requires the potential at the points it adds
+    known= {}
+    def true_grid(rs,zs):
+        points= [(r,z) for r in rs for z in zs]
+        new= [p for p in points if not p in known]
+        if len(new) > 0:
+            newrs, newzs= numpy.array(new).T
+            if logR: newrs= numpy.exp(newrs)
+            vals= numpy.array(evaluateBulk(pot,newrs,newzs,
+                                           quantities=quantities,
+                                           use_physical=False))
+            for p,v in zip(new,vals.T): known[p]= v
+        vals= numpy.array([known[p] for p in points]).T
+        return dict(zip(quantities,
+                        numpy.reshape(vals,(len(quantities),len(rs),len(zs)))))
+    for ii in range(maxrefine+1):
+        grid= true_grid(rgrid,zgrid)
+        interp= {}
+        for q in quantities:
+            if q == 'dens':
+                qgrid= numpy.log(grid[q]+10.**-10.)
+            else:
+                qgrid= grid[q]
+            interp[q]= interpolate.RectBivariateSpline(rgrid,zgrid,qgrid,
+                                                       kx=3,ky=3,s=0.)
+        # On a grid line, the interpolation reduces to a one-dimensional
+        # interpolation, so the error at the midpoints of the intervals in
+        # (log) R along the z grid lines is due to the R grid, and vice versa
+        rmid= 0.5*(rgrid[1:]+rgrid[:-1])
+        zmid= 0.5*(zgrid[1:]+zgrid[:-1])
+        rerr= numpy.amax(_interp_error(interp,true_grid(rmid,zgrid),
+                                       rmid,zgrid,interpkwargs),axis=1)
+        zerr= numpy.amax(_interp_error(interp,true_grid(rgrid,zmid),
+                                       rgrid,zmid,interpkwargs),axis=0)
+        if numpy.all(rerr <= tol) and numpy.all(zerr <= tol):
+            break
+        elif ii == maxrefine:
+            warnings.warn("interpRZPotential grid refinement did not reach tol=%g after maxrefine=%i iterations (maximum relative error %g); increase maxrefine or refine the starting grid" % (tol,maxrefine,max(numpy.amax(rerr),numpy.amax(zerr))),galpyWarning)
+            break
+        rgrid= _balance_grid(numpy.sort(numpy.hstack((rgrid,
+                                                      rmid[rerr > tol]))))
+        zgrid= _balance_grid(numpy.sort(numpy.hstack((zgrid,
+                                                      zmid[zerr > tol]))))
+    return (rgrid,zgrid,grid)
+
+def _interp_error(interp,true,rgrid,zgrid,interpkwargs):
+    """
+    NAME:
+       _interp_error
+    PURPOSE:
+       compute the relative interpolation error on a grid
+    INPUT:
+       interp - dictionary of RectBivariateSpline instances for the interpolated quantities (log density for 'dens')
+       true - dictionary of the true values of the quantities on the grid
+       rgrid, zgrid - grid in (log) R and z
+       interpkwargs - dictionary with interpPot, interpRforce, interpzforce, and interpDens
+    OUTPUT:
+       relative error [len(rgrid),len(zgrid)], the maximum over the interpolated quantities; force errors are relative to the magnitude of the force
+    """
+    Rs, zs= numpy.meshgrid(rgrid,zgrid,indexing='ij')
+    err= numpy.zeros_like(Rs)
+    if 'potential' in true:
+        err= numpy.maximum(err,numpy.fabs(interp['potential'].ev(Rs,zs)
+                                          -true['potential'])
+                           /numpy.fabs(true['potential']))
+    if 'Rforce' in true:
+        force_norm= numpy.sqrt(true['Rforce']**2.+true['zforce']**2.)
+    if interpkwargs.get('interpRforce',False):
+        err= numpy.maximum(err,numpy.fabs(interp['Rforce'].ev(Rs,zs)
+                                          -true['Rforce'])/force_norm)
+    if interpkwargs.get('interpzforce',False):
+        err= numpy.maximum(err,numpy.fabs(interp['zforce'].ev(Rs,zs)
+                                          -true['zforce'])/force_norm)
+    if 'dens' in true:
+        err= numpy.maximum(err,numpy.fabs(numpy.exp(interp['dens'].ev(Rs,zs))
+                                          -10.**-10.-true['dens'])
+                           /numpy.fabs(true['dens']))
+    return err
+
+def _balance_grid(grid):
+    """
+    NAME:
+       _balance_grid
+    PURPOSE:
+       split grid intervals until neighboring grid intervals differ by at most a factor of two in size
+    INPUT:
+       grid - grid points
+    OUTPUT:
+       balanced grid points
+    """
+    while True:
+        dgrid= numpy.diff(grid)
+        split= numpy.zeros(len(dgrid),dtype='bool')
+        split[:-1]+= dgrid[:-1] > 2.*dgrid[1:]*(1.+10.**-8.)
+        split[1:]+= dgrid[1:] > 2.*dgrid[:-1]*(1.+10.**-8.)
+        if numpy.sum(split) == 0: return grid
+        grid= numpy.sort(numpy.hstack((grid,
+                                       0.5*(grid[1:]+grid[:-1])[split])))
+
 def calc_potential_c(pot,R,z,rforce=False,zforce=False):
     """
     NAME:
@@ -509,7 +798,7 @@ def calc_potential_c(pot,R,z,rforce=False,zforce=False):
     PURPOSE:
        Use C to calculate the potential on a grid
     INPUT:
-       pot - Potential or list of such instances
+       pot - Potential or list of such instances, or a CompiledPotential
        R - grid in R
        z - grid in z
        rforce=, zforce= if either of these is True, calculate the radial or vertical force instead
@@ -520,8 +809,13 @@ def calc_potential_c(pot,R,z,rforce=False,zforce=False):
        2013-01-29 - Added forces - Bovy (IAS)
     """
     from galpy.orbit_src.integrateFullOrbit import _parse_pot #here bc otherwise there is an infinite loop
-    #Parse the potential
-    npot, pot_type, pot_args= _parse_pot(pot)
+    from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+    #Parse the potential; the potential itself is evaluated with the
+    #actionAngle parsing, the forces with the Full parsing
+    forces= rforce or zforce
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full' if forces else 'actionAngle',
+                         _parse_pot,potforactions=not forces)
 
     #Set up result arrays
     out= numpy.empty((len(R),len(z)))
@@ -530,20 +824,21 @@ def calc_potential_c(pot,R,z,rforce=False,zforce=False):
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
     if rforce:
-        interppotential_calc_potentialFunc= _lib.calc_rforce
+        interppotential_calc_potentialFunc= getattr(_lib,
+                                                    'calc_rforce'+pot_suffix)
     elif zforce:
-        interppotential_calc_potentialFunc= _lib.calc_zforce
+        interppotential_calc_potentialFunc= getattr(_lib,
+                                                    'calc_zforce'+pot_suffix)
     else:
-        interppotential_calc_potentialFunc= _lib.calc_potential
+        interppotential_calc_potentialFunc= getattr(_lib,
+                                                    'calc_potential'+pot_suffix)
     interppotential_calc_potentialFunc.argtypes= [ctypes.c_int,
                                                   ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
                                                   ctypes.c_int,
-                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                  ctypes.c_int,
-                                                  ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
-                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
-                                                  ctypes.POINTER(ctypes.c_int)]
+                                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags)]\
+                                                  +pot_argtypes\
+                                                  +[ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                                    ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [R.flags['F_CONTIGUOUS'],
@@ -557,11 +852,9 @@ def calc_potential_c(pot,R,z,rforce=False,zforce=False):
                                        R,
                                        len(z),
                                        z,
-                                       ctypes.c_int(npot),
-                                       pot_type,
-                                       pot_args,
-                                       out,
-                                       ctypes.byref(err))
+                                       *(pot_cargs
+                                         +[out,
+                                           ctypes.byref(err)]))
     
     #Reset input arrays
     if f_cont[0]: R= numpy.asfortranarray(R)
@@ -722,3 +1015,58 @@ def sign(x):
     out= numpy.ones_like(x)
     out[(x < 0.)]= -1.
     return out
+
+def eval_bulk_c(pot,R,z,phi,t,quantities):
+    """
+    NAME:
+       eval_bulk_c
+    PURPOSE:
+       Use C to evaluate the potential, forces, second derivatives, and/or density for arrays of points (parallelized using OpenMP)
+    INPUT:
+       pot - Potential or list of such instances, or a CompiledPotential
+       R - array
+       z - array (same length as R)
+       phi - array (same length as R)
+       t - array (same length as R)
+       quantities - list of integer codes of the quantities to evaluate: 0 = potential, 1 = Rforce, 2 = zforce, 3 = phiforce, 4 = R2deriv, 5 = z2deriv, 6 = Rzderiv, 7 = phi2deriv, 8 = Rphideriv, 9 = density
+    OUTPUT:
+       (out,err) - out: array of shape (len(quantities),len(R)); err: 1 if one of the quantities is not implemented in C for all potentials (out is then undefined)
+    """
+    from galpy.orbit_src.integrateFullOrbit import _parse_pot #here bc otherwise there is an infinite loop
+    from galpy.potential_src.CompiledPotential import _parse_pot_cargs
+    #Parse the potential
+    pot_suffix, pot_argtypes, pot_cargs= \
+        _parse_pot_cargs(pot,_lib,'Full',_parse_pot,ncopy=True)
+
+    #Array requirements
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C','W'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C','W'])
+    phi= numpy.require(phi,dtype=numpy.float64,requirements=['C','W'])
+    t= numpy.require(t,dtype=numpy.float64,requirements=['C','W'])
+    quantities= numpy.require(quantities,dtype=numpy.int32,
+                              requirements=['C','W'])
+
+    #Set up result arrays
+    out= numpy.empty((len(quantities),len(R)))
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    interppotential_eval_bulkFunc= getattr(_lib,'eval_bulk'+pot_suffix)
+    interppotential_eval_bulkFunc.argtypes= [ctypes.c_int,
+                                             ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                             ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                             ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                             ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                             ctypes.c_int,
+                                             ndpointer(dtype=numpy.int32,flags=ndarrayFlags)]\
+                                             +pot_argtypes\
+                                             +[ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                               ctypes.POINTER(ctypes.c_int)]
+
+    #Run the C code
+    interppotential_eval_bulkFunc(len(R),R,z,phi,t,
+                                  len(quantities),quantities,
+                                  *(pot_cargs
+                                    +[out,ctypes.byref(err)]))
+    return (out,err.value)
@@ -0,0 +1,290 @@
+###############################################################################
+#   interpRZTimeSeriesPotential.py: class that interpolates a time series of
+#                                   axisymmetric potentials (e.g., of a
+#                                   sequence of N-body snapshots) in
+#                                   (R,z) and in time
+###############################################################################
+import numpy as nu
+from galpy.potential_src.Potential import Potential, PotentialError, \
+    evaluateBulk, _APY_LOADED
+from galpy.potential_src.interp3DPotential import _bspline_weights, \
+    _bspline_coeffs_notaknot
+from galpy.util import bovy_conversion
+if _APY_LOADED:
+    from astropy import units
+# Order of the derivative with respect to (R,z) and sign for each quantity
+_QUANTITIES= {'potential':(0,0,1.),
+              'Rforce':(1,0,-1.),
+              'zforce':(0,1,-1.),
+              'R2deriv':(2,0,1.),
+              'z2deriv':(0,2,1.),
+              'Rzderiv':(1,1,1.)}
+_TINTERP= {'linear':0,'cubic':1}
+_MAXCHUNK= 2**16
+class interpRZTimeSeriesPotential(Potential):
+    """Class that interpolates a time series of axisymmetric potentials, such as those of a sequence of N-body snapshots, using bicubic B-splines in (R,z) and linear or cubic interpolation in time, for fast orbit integration in an evolving potential"""
+    def __init__(self,Pots=None,ts=None,potGrid=None,
+                 rgrid=(nu.log(0.01),nu.log(20.),101),zgrid=(0.,1.,101),
+                 logR=True,zsym=True,tinterp='cubic',
+                 solver='multipole',L=30,num_threads=None,
+                 ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           Initialize an interpRZTimeSeriesPotential instance
+
+        INPUT:
+
+           Pots - list of the potentials at times ts; each element can be an axisymmetric Potential instance or list thereof (e.g., a SnapshotRZPotential or an interpRZPotential), a simulation snapshot loaded with pynbody, or a tuple (pos,mass) of particle positions [N,3] and masses; snapshots are turned into SnapshotRZPotential instances with the given solver, L, and num_threads
+
+           ts - increasing times of the potentials (need not be equally spaced; can be Quantity)
+
+           potGrid= (None) instead of Pots, array [len(ts),nR,nz] of the potential tabulated on the (R,z) grid at each time
+
+           rgrid - R grid to be given to linspace as in rs= linspace(*rgrid)
+
+           zgrid - z grid to be given to linspace as in zs= linspace(*zgrid)
+
+           logR - if True, rgrid is in the log of R so logrs= linspace(*rgrid)
+
+           zsym= if True (default), the potential is assumed to be symmetric around z=0 (so you can use, e.g.,  zgrid=(0.,1.,101)).
+
+           tinterp= ('cubic') interpolation in time between the potentials: 'linear' or 'cubic' (piecewise-cubic Hermite with the time derivative estimated from the neighboring potentials); the potential is held constant outside of the time range
+
+           solver=, L=, num_threads= options for the SnapshotRZPotential instances set up for snapshots in Pots
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           instance
+
+        """
+        if (Pots is None) == (potGrid is None):
+            raise PotentialError('Exactly one of Pots and potGrid needs to be given to interpRZTimeSeriesPotential')
+        if ts is None:
+            raise PotentialError('The times ts of the potentials need to be given to interpRZTimeSeriesPotential')
+        if not tinterp in _TINTERP:
+            raise PotentialError("tinterp= should be 'linear' or 'cubic'")
+        if not Pots is None:
+            Pots= [_parse_pot(pot,solver,L,num_threads) for pot in Pots]
+            # Propagate ro and vo
+            firstPot= Pots[0][0] if isinstance(Pots[0],list) else Pots[0]
+            roSet= True
+            voSet= True
+            if ro is None:
+                ro= firstPot._ro
+                roSet= firstPot._roSet
+            if vo is None:
+                vo= firstPot._vo
+                voSet= firstPot._voSet
+        Potential.__init__(self,amp=1.,ro=ro,vo=vo)
+        # Turn off physical if it hadn't been on
+        if not Pots is None:
+            if not roSet: self._roSet= False
+            if not voSet: self._voSet= False
+        if _APY_LOADED and isinstance(ts,units.Quantity):
+            ts= ts.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        self._origPot= Pots
+        self._tgrid= nu.array(ts,dtype='float').flatten()
+        if nu.any(nu.diff(self._tgrid) <= 0.):
+            raise PotentialError('The times ts given to interpRZTimeSeriesPotential need to be increasing')
+        self._tinterp= tinterp
+        self._logR= logR
+        self._zsym= zsym
+        self._xrgrid= nu.linspace(*rgrid)
+        if self._logR:
+            self._rgrid= nu.exp(self._xrgrid)
+        else:
+            self._rgrid= self._xrgrid
+        self._zgrid= nu.linspace(*zgrid)
+        if len(self._rgrid) < 4 or len(self._zgrid) < 4:
+            raise PotentialError('interpRZTimeSeriesPotential requires at least four grid points in R and z')
+        # Tabulate the potentials
+        if potGrid is None:
+            R,z= nu.meshgrid(self._rgrid,self._zgrid,indexing='ij')
+            self._potGrid= nu.array([evaluateBulk(pot,R,z,
+                                                  quantities='potential',
+                                                  use_physical=False)
+                                     for pot in self._origPot])
+        else:
+            self._potGrid= nu.array(potGrid,dtype='float')
+        if not self._potGrid.shape == (len(self._tgrid),len(self._rgrid),
+                                       len(self._zgrid)):
+            raise PotentialError('The potential grid given to interpRZTimeSeriesPotential does not have shape [len(ts),nR,nz]')
+        # Pre-compute the B-spline coefficients; with zsym and a z grid
+        # starting at zero, the spline is even in z
+        coeffs= _bspline_coeffs_notaknot(self._potGrid,1)
+        self._potGrid_splinecoeffs= _bspline_coeffs_notaknot(\
+            coeffs,2,mirror_start=self._zsym and self._zgrid[0] == 0.)
+        self.hasC= True
+        self.hasC_dxdv= True
+        return None
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'potential')
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'Rforce')
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'zforce')
+
+    def _R2deriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'R2deriv')
+
+    def _z2deriv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'z2deriv')
+
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        return self._interp(R,z,t,'Rzderiv')
+
+    def _interp(self,R,z,t,quantity):
+        """
+        NAME:
+           _interp
+        PURPOSE:
+           evaluate the interpolated potential, a force, or a second derivative, falling back onto the time-interpolated original potentials outside of the (R,z) grid (or extrapolating when the potential was given as a grid)
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           t - time
+           quantity - quantity to evaluate (one of the keys of _QUANTITIES)
+        OUTPUT:
+           quantity at (R,z,t)
+        """
+        oR, oz, sign= _QUANTITIES[quantity]
+        R,z,t= nu.broadcast_arrays(nu.asarray(R,dtype='float'),
+                                   nu.asarray(z,dtype='float'),
+                                   nu.asarray(t,dtype='float'))
+        shape= R.shape
+        R,z,t= R.flatten(),z.flatten(),t.flatten()
+        if self._zsym:
+            zz= nu.fabs(z)
+        else:
+            zz= z
+        out= nu.empty(R.shape)
+        if self._origPot is None:
+            indx= nu.ones(R.shape,dtype='bool')
+        else:
+            indx= (R >= self._rgrid[0])*(R <= self._rgrid[-1])\
+                *(zz >= self._zgrid[0])*(zz <= self._zgrid[-1])
+        if nu.any(indx):
+            x= nu.log(R[indx]) if self._logR else R[indx]
+            out[indx]= self._spline(x,zz[indx],t[indx],oR,oz)
+            if self._logR and oR == 2:
+                out[indx]-= self._spline(x,zz[indx],t[indx],1,oz)
+            if self._logR and oR > 0:
+                out[indx]/= R[indx]**oR
+            if self._zsym and oz == 1:
+                out[indx]*= nu.sign(z[indx])
+            out[indx]*= sign
+        if not nu.all(indx):
+            it, wt= _time_weights(t[~indx],self._tgrid,self._tinterp)
+            out[~indx]= 0.
+            for ii,pot in enumerate(self._origPot):
+                w= nu.sum(wt*(it == ii),axis=1)
+                if not nu.any(w != 0.): continue
+                out[~indx]+= w*evaluateBulk(pot,R[~indx],z[~indx],
+                                            quantities=quantity,
+                                            use_physical=False)
+        if shape == (): return out[0]
+        else: return nu.reshape(out,shape)
+
+    def _spline(self,x,z,t,oR,oz):
+        """Evaluate the derivative of order (oR,oz) of the spline with respect to (R or log R, z)"""
+        nt, nR, nz= self._potGrid_splinecoeffs.shape
+        dR= self._xrgrid[1]-self._xrgrid[0]
+        dz= self._zgrid[1]-self._zgrid[0]
+        out= nu.empty(x.shape)
+        for ii in range(0,len(x),_MAXCHUNK):
+            sl= slice(ii,ii+_MAXCHUNK)
+            iR, wR= _bspline_weights((x[sl]-self._xrgrid[0])/dR,oR,dR,nR-4)
+            iz, wz= _bspline_weights((z[sl]-self._zgrid[0])/dz,oz,dz,nz-4)
+            it, wt= _time_weights(t[sl],self._tgrid,self._tinterp)
+            out[sl]= nu.einsum('ijkl,ij,ik,il->i',
+                               self._potGrid_splinecoeffs\
+                                   [it[:,:,None,None],
+                                    iR[:,None,:,None],
+                                    iz[:,None,None,:]],
+                               wt,wR,wz)
+        return out
+
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: [amp,logR,zsym,nR,nz,nt,tinterp,R0,dR,z0,dz,ts (nt),spline coefficients (nt x nR+2 x nz+2)]
+        """
+        nt, nR, nz= self._potGrid.shape
+        out= [self._amp,int(self._logR),int(self._zsym),nR,nz,nt,
+              _TINTERP[self._tinterp],
+              self._xrgrid[0],self._xrgrid[1]-self._xrgrid[0],
+              self._zgrid[0],self._zgrid[1]-self._zgrid[0]]
+        out.extend(self._tgrid)
+        out.extend(self._potGrid_splinecoeffs.flatten(order='C'))
+        return out
+
+def _parse_pot(pot,solver,L,num_threads):
+    """Turn a snapshot into a SnapshotRZPotential, leave Potentials alone"""
+    if isinstance(pot,Potential) \
+            or (isinstance(pot,list) and isinstance(pot[0],Potential)):
+        return pot
+    from galpy.potential_src.SnapshotRZPotential import SnapshotRZPotential
+    return SnapshotRZPotential(pot,solver=solver,L=L,num_threads=num_threads)
+
+def _time_weights(t,ts,tinterp):
+    """Indices and weights of the four time slices that contribute at times t, for linear or cubic Hermite interpolation between the times ts (constant outside of the time range)"""
+    nt= len(ts)
+    it= nu.zeros((len(t),4),dtype='int')
+    wt= nu.zeros((len(t),4))
+    if nt == 1:
+        wt[:,1]= 1.
+        return (it,wt)
+    t= nu.clip(t,ts[0],ts[-1])
+    i= nu.clip(nu.searchsorted(ts,t,side='right')-1,0,nt-2)
+    h= ts[i+1]-ts[i]
+    u= (t-ts[i])/h
+    it[:]= nu.clip(i[:,None]+nu.arange(-1,3),0,nt-1)
+    if tinterp == 'linear':
+        wt[:,1]= 1.-u
+        wt[:,2]= u
+        return (it,wt)
+    # Cubic Hermite: values and slopes at ts[i] and ts[i+1], with the slopes
+    # linear combinations of the neighboring values
+    h00= (1.+2.*u)*(1.-u)**2.
+    h10= u*(1.-u)**2.*h
+    h01= u**2.*(3.-2.*u)
+    h11= u**2.*(u-1.)*h
+    wt[:,1]= h00
+    wt[:,2]= h01
+    for jj,hh in zip([1,2],[h10,h11]):
+        k= i+jj-1
+        dm, dp= _slope_weights(k,ts)
+        wt[:,jj-1]+= hh*dm[0]
+        wt[:,jj]+= hh*dm[1]+hh*dp[0]
+        wt[:,jj+1]+= hh*dp[1]
+    return (it,wt)
+
+def _slope_weights(k,ts):
+    """Weights of the values at (k-1,k) and at (k,k+1) in the three-point estimate of the time derivative at ts[k] (one-sided at the ends)"""
+    nt= len(ts)
+    hm= ts[nu.clip(k,1,nt-1)]-ts[nu.clip(k-1,0,nt-2)]
+    hp= ts[nu.clip(k+1,1,nt-1)]-ts[nu.clip(k,0,nt-2)]
+    am= hp/(hm+hp)
+    ap= hm/(hm+hp)
+    am[k == 0]= 0.
+    ap[k == 0]= 1.
+    am[k == nt-1]= 1.
+    ap[k == nt-1]= 0.
+    return ((-am/hm,am/hm),(-ap/hp,ap/hp))
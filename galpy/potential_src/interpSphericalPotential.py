@@ -0,0 +1,355 @@
+###############################################################################
+#   interpSphericalPotential.py: class that interpolates a general spherical
+#                                potential, set up from a spherical
+#                                potential, an enclosed-mass function, or a
+#                                density profile, on a grid in log r
+###############################################################################
+import numpy as nu
+from scipy import interpolate
+from galpy.potential_src.Potential import Potential, PotentialError, \
+    evaluateBulk, _APY_LOADED
+if _APY_LOADED:
+    from astropy import units
+class interpSphericalPotential(Potential):
+    """Class that interpolates a general spherical potential, given as a spherical potential, an enclosed-mass function :math:`M(<r)`, or a density profile :math:`\\rho(r)`, on a regular grid in :math:`\\ln r` using quintic Hermite interpolation of :math:`\\Phi`, :math:`\\mathrm{d}\\Phi/\\mathrm{d}r`, and :math:`\\mathrm{d}^2\\Phi/\\mathrm{d}r^2`, for fast evaluation in C of any spherical model"""
+    def __init__(self,amp=1.,Pot=None,Mr=None,dens=None,
+                 rgrid=(0.001,100.,1001),normalize=False,ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           initialize an interpolated spherical potential
+
+        INPUT:
+
+           amp - amplitude to be applied to the potential (default: 1); can be a Quantity with units of mass or Gxmass
+
+           Pot= spherical Potential instance or list thereof to be interpolated
+
+           Mr= function of r that gives the enclosed mass in internal units (G=1), called with arrays
+
+           dens= function of r that gives the density in internal units, called with arrays
+
+           (exactly one of Pot, Mr, or dens needs to be given; for Mr and dens, mass outside of the grid is ignored)
+
+           rgrid= (0.001,100.,1001) (rmin,rmax,nr) of the logarithmic radial grid (rmin and rmax can be Quantity); inside rmin the density is assumed to be uniform and outside rmax the force is assumed to be Keplerian
+
+           normalize - if True, normalize such that vc(1.,0.)=1., or, if given as a number, such that the force is this fraction of the force necessary to make vc(1.,0.)=1.
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        if (Pot is None)+(Mr is None)+(dens is None) != 2:
+            raise PotentialError('Exactly one of Pot, Mr, and dens needs to be given to interpSphericalPotential')
+        # Propagate ro and vo
+        roSet= True
+        voSet= True
+        if not Pot is None:
+            firstPot= Pot[0] if isinstance(Pot,list) else Pot
+            if ro is None:
+                ro= firstPot._ro
+                roSet= firstPot._roSet
+            if vo is None:
+                vo= firstPot._vo
+                voSet= firstPot._voSet
+        Potential.__init__(self,amp=amp,ro=ro,vo=vo,amp_units='mass')
+        # Turn off physical if it hadn't been on
+        if not roSet: self._roSet= False
+        if not voSet: self._voSet= False
+        self._origPot= Pot
+        rmin, rmax, nr= rgrid
+        if _APY_LOADED and isinstance(rmin,units.Quantity):
+            rmin= rmin.to(units.kpc).value/self._ro
+        if _APY_LOADED and isinstance(rmax,units.Quantity):
+            rmax= rmax.to(units.kpc).value/self._ro
+        self._lnrmin= nu.log(rmin)
+        self._dlnr= (nu.log(rmax)-self._lnrmin)/(nr-1)
+        self._rgrid= nu.exp(self._lnrmin+self._dlnr*nu.arange(nr))
+        self._scale= nu.sqrt(rmin*rmax)
+        if not Pot is None:
+            self._tabulate_pot(Pot)
+        else:
+            self._tabulate_mass(Mr,dens)
+        self._setup_hermite()
+        if normalize or \
+                (isinstance(normalize,(int,float)) \
+                     and not isinstance(normalize,bool)):
+            self.normalize(normalize)
+        self.hasC= True
+        self.hasC_dxdv= True
+        return None
+
+    def _tabulate_pot(self,Pot):
+        """Tabulate Phi, dPhi/dr, and d^2Phi/dr^2 of a spherical potential"""
+        r= self._rgrid
+        self._phi, Rforce= evaluateBulk(Pot,r,0.,
+                                        quantities=['potential','Rforce'],
+                                        use_physical=False)
+        self._dphidr= -Rforce
+        try:
+            self._d2phidr2= evaluateBulk(Pot,r,0.,quantities='R2deriv',
+                                         use_physical=False)
+        except PotentialError:
+            # Use the Poisson equation, d2Phi/dr2 = 4 pi rho - 2/r dPhi/dr
+            try:
+                rho= evaluateBulk(Pot,r,0.,quantities='dens',
+                                  use_physical=False)
+            except PotentialError:
+                # Neither is implemented, differentiate dPhi/dr
+                self._d2phidr2= interpolate.InterpolatedUnivariateSpline(\
+                    nu.log(r),self._dphidr,k=3).derivative()(nu.log(r))/r
+            else:
+                self._d2phidr2= 4.*nu.pi*rho-2.*self._dphidr/r
+        return None
+
+    def _tabulate_mass(self,Mr,dens):
+        """Tabulate Phi, dPhi/dr, and d^2Phi/dr^2 for an enclosed-mass function or a density profile"""
+        r= self._rgrid
+        x= nu.log(r)
+        if Mr is None:
+            # M(r)= M(rmin) + int 4 pi r^3 rho dln r, with M(rmin) from a
+            # power-law density rho ~ r^-gamma inside rmin
+            rho= dens(r)
+            gamma= min(-nu.log(rho[1]/rho[0])/(x[1]-x[0]),2.99)
+            spl= interpolate.InterpolatedUnivariateSpline(\
+                x,4.*nu.pi*r**3.*rho,k=3).antiderivative()
+            mass= 4.*nu.pi/(3.-gamma)*r[0]**3.*rho[0]+spl(x)-spl(x[0])
+        else:
+            mass= Mr(r)
+            rho= interpolate.InterpolatedUnivariateSpline(\
+                x,mass,k=3).derivative()(x)/4./nu.pi/r**3.
+        self._dphidr= mass/r**2.
+        self._d2phidr2= 4.*nu.pi*rho-2.*mass/r**3.
+        # Phi(r)= -M(rmax)/rmax - int_r^rmax M/r'^2 dr'
+        spl= interpolate.InterpolatedUnivariateSpline(x,mass/r,
+                                                      k=3).antiderivative()
+        self._phi= -mass[-1]/r[-1]-(spl(x[-1])-spl(x))
+        return None
+
+    def _setup_hermite(self):
+        """Coefficients of the quintic polynomials in t= (ln r-ln r_i)/dlnr in each interval"""
+        r= self._rgrid
+        # Derivatives with respect to ln r, scaled to the interval
+        f= self._phi
+        d= r*self._dphidr*self._dlnr
+        s= (r**2.*self._d2phidr2+r*self._dphidr)*self._dlnr**2.
+        df= f[1:]-f[:-1]
+        d0, d1, s0, s1= d[:-1], d[1:], s[:-1], s[1:]
+        self._coeffs= nu.array([f[:-1],d0,s0/2.,
+                                10.*df-6.*d0-4.*d1-1.5*s0+0.5*s1,
+                                -15.*df+8.*d0+7.*d1+1.5*s0-s1,
+                                6.*df-3.*d0-3.*d1-0.5*s0+0.5*s1]).T
+        return None
+
+    def _revaluate(self,r):
+        """Evaluate Phi, dPhi/dr, and d^2Phi/dr^2 at spherical radius r"""
+        r= nu.atleast_1d(r)
+        nr= len(self._rgrid)
+        rmin, rmax= self._rgrid[0], self._rgrid[-1]
+        x= nu.clip((nu.log(nu.clip(r,rmin,rmax))-self._lnrmin)/self._dlnr,
+                   0.,nr-1.)
+        ii= nu.minimum(nu.floor(x).astype(int),nr-2)
+        t= x-ii
+        c= self._coeffs[ii]
+        p= ((((c[:,5]*t+c[:,4])*t+c[:,3])*t+c[:,2])*t+c[:,1])*t+c[:,0]
+        dp= (((5.*c[:,5]*t+4.*c[:,4])*t+3.*c[:,3])*t+2.*c[:,2])*t+c[:,1]
+        d2p= ((20.*c[:,5]*t+12.*c[:,4])*t+6.*c[:,3])*t+2.*c[:,2]
+        rr= nu.clip(r,rmin,rmax)
+        phi= p
+        dphidr= dp/self._dlnr/rr
+        d2phidr2= (d2p/self._dlnr**2.-dp/self._dlnr)/rr**2.
+        # Extrapolation: uniform density inside and Keplerian force outside
+        # the grid, continuous in Phi and dPhi/dr
+        indx= r < rmin
+        if nu.any(indx):
+            phi[indx]= self._phi[0]\
+                +self._dphidr[0]*(r[indx]**2.-rmin**2.)/2./rmin
+            dphidr[indx]= self._dphidr[0]*r[indx]/rmin
+            d2phidr2[indx]= self._dphidr[0]/rmin
+        indx= r > rmax
+        if nu.any(indx):
+            phi[indx]= self._phi[-1]\
+                +self._dphidr[-1]*rmax**2.*(1./rmax-1./r[indx])
+            dphidr[indx]= self._dphidr[-1]*rmax**2./r[indx]**2.
+            d2phidr2[indx]= -2.*self._dphidr[-1]*rmax**2./r[indx]**3.
+        return (phi,dphidr,d2phidr2)
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential at R,z
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           Phi(R,z)
+        """
+        R,z,shape= _broadcast(R,z)
+        return _reshape(self._revaluate(nu.sqrt(R**2.+z**2.))[0],shape)
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the radial force
+        """
+        R,z,shape= _broadcast(R,z)
+        r= nu.sqrt(R**2.+z**2.)
+        dphidr= self._revaluate(r)[1]
+        return _reshape(-dphidr*_safe_ratio(R,r),shape)
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the vertical force
+        """
+        R,z,shape= _broadcast(R,z)
+        r= nu.sqrt(R**2.+z**2.)
+        dphidr= self._revaluate(r)[1]
+        return _reshape(-dphidr*_safe_ratio(z,r),shape)
+
+    def _R2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _R2deriv
+        PURPOSE:
+           evaluate the second radial derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the second radial derivative
+        """
+        return self._2deriv(R,z,'RR')
+
+    def _z2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _z2deriv
+        PURPOSE:
+           evaluate the second vertical derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the second vertical derivative
+        """
+        return self._2deriv(R,z,'zz')
+
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rzderiv
+        PURPOSE:
+           evaluate the mixed R,z derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           d2phi/dR/dz
+        """
+        return self._2deriv(R,z,'Rz')
+
+    def _2deriv(self,R,z,which):
+        """Second derivative with respect to the cylindrical coordinates ('RR', 'zz', or 'Rz')"""
+        R,z,shape= _broadcast(R,z)
+        x1= R if which[0] == 'R' else z
+        x2= R if which[1] == 'R' else z
+        delta= float(which[0] == which[1])
+        r= nu.sqrt(R**2.+z**2.)
+        dphidr, d2phidr2= self._revaluate(r)[1:]
+        # d2Phi/dx1dx2 = Phi'' x1 x2/r^2 + Phi'/r (delta_12 - x1 x2/r^2),
+        # with the limit Phi''(0) delta_12 at the center
+        with nu.errstate(divide='ignore',invalid='ignore'):
+            out= d2phidr2*x1*x2/r**2.+dphidr/r*(delta-x1*x2/r**2.)
+        out[r == 0.]= delta*d2phidr2[r == 0.]
+        return _reshape(out,shape)
+
+    def _dens(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _dens
+        PURPOSE:
+           evaluate the density for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the density
+        """
+        R,z,shape= _broadcast(R,z)
+        r= nu.sqrt(R**2.+z**2.)
+        dphidr, d2phidr2= self._revaluate(r)[1:]
+        with nu.errstate(divide='ignore',invalid='ignore'):
+            out= (d2phidr2+2.*dphidr/r)/4./nu.pi
+        out[r == 0.]= 3.*d2phidr2[r == 0.]/4./nu.pi
+        return _reshape(out,shape)
+
+    def _c_args(self):
+        """
+        NAME:
+           _c_args
+        PURPOSE:
+           set up the arguments for the C implementation
+        INPUT:
+           (none)
+        OUTPUT:
+           list of arguments: [amp,nr,lnrmin,dlnr,Phi(rmin),dPhi/dr(rmin),Phi(rmax),dPhi/dr(rmax),polynomial coefficients (nr-1 x 6)]
+        """
+        out= [self._amp,len(self._rgrid),self._lnrmin,self._dlnr,
+              self._phi[0],self._dphidr[0],self._phi[-1],self._dphidr[-1]]
+        out.extend(self._coeffs.flatten(order='C'))
+        return out
+
+def _broadcast(R,z):
+    """Broadcast R and z to flat arrays, also returning the shape"""
+    R,z= nu.broadcast_arrays(nu.asarray(R,dtype='float'),
+                             nu.asarray(z,dtype='float'))
+    return (R.flatten(),z.flatten(),R.shape)
+
+def _reshape(out,shape):
+    if shape == (): return out[0]
+    else: return nu.reshape(out,shape)
+
+def _safe_ratio(x,r):
+    """x/r, zero at r=0"""
+    out= nu.zeros_like(x)
+    indx= r > 0.
+    out[indx]= x[indx]/r[indx]
+    return out
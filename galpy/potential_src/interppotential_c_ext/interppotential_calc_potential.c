@@ -9,12 +9,24 @@
 #include <omp.h>
 #endif
 #define CHUNKSIZE 1
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
 //Potentials
 #include <galpy_potentials.h>
 #include <actionAngle.h>
 #include <integrateFullOrbit.h>
 #include <interp_2d.h>
 #include <cubic_bspline_2d_coeffs.h>
+/*
+  Function declarations
+*/
+void calc_potential_pa(int,double *,int,double *,int,struct potentialArg *,
+		       double *,int *);
+void calc_rforce_pa(int,double *,int,double *,int,struct potentialArg *,
+		    double *,int *);
+void calc_zforce_pa(int,double *,int,double *,int,struct potentialArg *,
+		    double *,int *);
 /*
   MAIN FUNCTIONS
 */
@@ -27,6 +39,20 @@ void calc_potential(int nR,
 		    double * pot_args,
 		    double *out,
 		    int * err){
+  //Set up the potentials
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_actionAngleArgs(npot,potentialArgs,pot_type,pot_args);
+  calc_potential_pa(nR,R,nz,z,npot,potentialArgs,out,err);
+  delete_potentialArgs_actionAngle(npot,1,potentialArgs);
+}
+void calc_potential_pa(int nR,
+		       double *R,
+		       int nz,
+		       double *z,
+		       int npot,
+		       struct potentialArg * potentialArgs,
+		       double *out,
+		       int * err){
   int ii, jj, tid, nthreads;
 #ifdef _OPENMP
   nthreads = omp_get_max_threads();
@@ -34,9 +60,6 @@ void calc_potential(int nR,
   nthreads = 1;
 #endif
   double * row= (double *) malloc ( nthreads * nz * ( sizeof ( double ) ) );
-  //Set up the potentials
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_actionAngleArgs(npot,potentialArgs,pot_type,pot_args);
   //Run through the grid and calculate
   UNUSED int chunk= CHUNKSIZE;
 #pragma omp parallel for schedule(static,chunk) private(ii,tid,jj)	\
@@ -52,10 +75,6 @@ void calc_potential(int nR,
     }
     put_row(out,ii,row+tid*nz,nz); 
   }
-  for (ii=0; ii < npot; ii++) {
-    free((potentialArgs+ii)->args);
-  }
-  free(potentialArgs);
   free(row);
 }
 void calc_rforce(int nR,
@@ -67,6 +86,20 @@ void calc_rforce(int nR,
 		 double * pot_args,
 		 double *out,
 		 int * err){
+  //Set up the potentials
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+  calc_rforce_pa(nR,R,nz,z,npot,potentialArgs,out,err);
+  delete_potentialArgs_Full(npot,1,potentialArgs);
+}
+void calc_rforce_pa(int nR,
+		    double *R,
+		    int nz,
+		    double *z,
+		    int npot,
+		    struct potentialArg * potentialArgs,
+		    double *out,
+		    int * err){
   int ii, jj, tid, nthreads;
 #ifdef _OPENMP
   nthreads = omp_get_max_threads();
@@ -74,9 +107,6 @@ void calc_rforce(int nR,
   nthreads = 1;
 #endif
   double * row= (double *) malloc ( nthreads * nz * ( sizeof ( double ) ) );
-  //Set up the potentials
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
   //Run through the grid and calculate
   UNUSED int chunk= CHUNKSIZE;
 #pragma omp parallel for schedule(static,chunk) private(ii,tid,jj)	\
@@ -92,10 +122,6 @@ void calc_rforce(int nR,
     }
     put_row(out,ii,row+tid*nz,nz); 
   }
-  for (ii=0; ii < npot; ii++) {
-    free((potentialArgs+ii)->args);
-  }
-  free(potentialArgs);
   free(row);
 }
 void calc_zforce(int nR,
@@ -107,6 +133,20 @@ void calc_zforce(int nR,
 		 double * pot_args,
 		 double *out,
 		 int * err){
+  //Set up the potentials
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+  calc_zforce_pa(nR,R,nz,z,npot,potentialArgs,out,err);
+  delete_potentialArgs_Full(npot,1,potentialArgs);
+}
+void calc_zforce_pa(int nR,
+		    double *R,
+		    int nz,
+		    double *z,
+		    int npot,
+		    struct potentialArg * potentialArgs,
+		    double *out,
+		    int * err){
   int ii, jj, tid, nthreads;
 #ifdef _OPENMP
   nthreads = omp_get_max_threads();
@@ -114,9 +154,6 @@ void calc_zforce(int nR,
   nthreads = 1;
 #endif
   double * row= (double *) malloc ( nthreads * nz * ( sizeof ( double ) ) );
-  //Set up the potentials
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
   //Run through the grid and calculate
   UNUSED int chunk= CHUNKSIZE;
 #pragma omp parallel for schedule(static,chunk) private(ii,tid,jj)	\
@@ -132,10 +169,6 @@ void calc_zforce(int nR,
     }
     put_row(out,ii,row+tid*nz,nz); 
   }
-  for (ii=0; ii < npot; ii++) {
-    free((potentialArgs+ii)->args);
-  }
-  free(potentialArgs);
   free(row);
 }
 void eval_potential(int nR,
@@ -231,3 +264,149 @@ void eval_zforce(int nR,
   }
   free(potentialArgs);
 }
+/*
+  Bulk evaluation of the potential, forces, second derivatives, and density
+  for arrays of points
+*/
+static double eval_bulk_quantity(double R,double z,double phi,double t,
+				 int quantity,int npot,
+				 struct potentialArg * potentialArgs){
+  int ii;
+  double out= 0.;
+  switch ( quantity ) {
+  case 0: //potential
+    for (ii=0; ii < npot; ii++)
+      out+= (potentialArgs+ii)->potentialEval(R,z,phi,t,potentialArgs+ii);
+    return out;
+  case 1:
+    return calcRforce(R,z,phi,t,npot,potentialArgs);
+  case 2:
+    return calczforce(R,z,phi,t,npot,potentialArgs);
+  case 3:
+    return calcPhiforce(R,z,phi,t,npot,potentialArgs);
+  case 4:
+    return calcR2deriv(R,z,phi,t,npot,potentialArgs);
+  case 5:
+    return calcz2deriv(R,z,phi,t,npot,potentialArgs);
+  case 6:
+    return calcRzderiv(R,z,phi,t,npot,potentialArgs);
+  case 7:
+    return calcphi2deriv(R,z,phi,t,npot,potentialArgs);
+  case 8:
+    return calcRphideriv(R,z,phi,t,npot,potentialArgs);
+  case 9: //density, directly or from the Poisson equation
+    for (ii=0; ii < npot; ii++)
+      if ( (potentialArgs+ii)->dens )
+	out+= (potentialArgs+ii)->dens(R,z,phi,t,potentialArgs+ii);
+      else if ( R == 0. )
+	//On the axis, the in-plane Laplacian is the sum of the second 
+	//derivatives along two perpendicular directions
+	out+= ( calcR2deriv(0.,z,phi,t,1,potentialArgs+ii)
+		+ calcR2deriv(0.,z,phi+M_PI/2.,t,1,potentialArgs+ii)
+		+ calcz2deriv(0.,z,phi,t,1,potentialArgs+ii) ) / 4. / M_PI;
+      else
+	out+= ( -calcRforce(R,z,phi,t,1,potentialArgs+ii) / R
+		+ calcR2deriv(R,z,phi,t,1,potentialArgs+ii)
+		+ calcphi2deriv(R,z,phi,t,1,potentialArgs+ii) / R / R
+		+ calcz2deriv(R,z,phi,t,1,potentialArgs+ii) ) / 4. / M_PI;
+    return out;
+  }
+  return out;
+}
+static bool has_bulk_quantity(int quantity,int npot,
+			      struct potentialArg * potentialArgs){
+  int ii;
+  for (ii=0; ii < npot; ii++) {
+    switch ( quantity ) {
+    case 0:
+      if ( ! (potentialArgs+ii)->potentialEval ) return false;
+      break;
+    case 4:
+      if ( ! (potentialArgs+ii)->R2deriv ) return false;
+      break;
+    case 5:
+      if ( ! (potentialArgs+ii)->z2deriv ) return false;
+      break;
+    case 6:
+      if ( ! (potentialArgs+ii)->Rzderiv ) return false;
+      break;
+    case 7:
+      if ( ! (potentialArgs+ii)->phi2deriv ) return false;
+      break;
+    case 8:
+      if ( ! (potentialArgs+ii)->Rphideriv ) return false;
+      break;
+    case 9:
+      if ( ! (potentialArgs+ii)->dens
+	   && ( ! (potentialArgs+ii)->R2deriv
+		|| ! (potentialArgs+ii)->z2deriv
+		|| ! (potentialArgs+ii)->phi2deriv ) ) return false;
+      break;
+    }
+  }
+  return true;
+}
+void eval_bulk_pa(int npts,
+		  double *R,
+		  double *z,
+		  double *phi,
+		  double *t,
+		  int nquantity,
+		  int * quantity,
+		  int npot,
+		  int ncopy,
+		  struct potentialArg * potentialArgs,
+		  double *out,
+		  int * err){
+  //Evaluate nquantity quantities at npts points, using ncopy pre-parsed
+  //copies of the potential (one per thread); out has shape (nquantity,npts);
+  //quantity: 0 = potential, 1 = Rforce, 2 = zforce, 3 = phiforce,
+  //4 = R2deriv, 5 = z2deriv, 6 = Rzderiv, 7 = phi2deriv, 8 = Rphideriv,
+  //9 = density; err is set to 1 if a quantity is not implemented in C for
+  //all potentials
+  int ii, jj;
+  int max_threads= ( npts < ncopy ) ? npts : ncopy;
+  if ( max_threads < 1 ) max_threads= 1;
+  *err= 0;
+  for (jj=0; jj < nquantity; jj++)
+    if ( ! has_bulk_quantity(*(quantity+jj),npot,potentialArgs) ) {
+      *err= 1;
+      return;
+    }
+  UNUSED int chunk= 1024;
+#pragma omp parallel for schedule(static,chunk) private(ii,jj)	\
+  num_threads(max_threads)
+  for (ii=0; ii < npts; ii++){
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    for (jj=0; jj < nquantity; jj++)
+      *(out+jj*npts+ii)= eval_bulk_quantity(*(R+ii),*(z+ii),*(phi+ii),
+					    *(t+ii),*(quantity+jj),npot,
+					    potentialArgs+tid*npot);
+  }
+}
+void eval_bulk(int npts,
+	       double *R,
+	       double *z,
+	       double *phi,
+	       double *t,
+	       int nquantity,
+	       int * quantity,
+	       int npot,
+	       int * pot_type,
+	       double * pot_args,
+	       double *out,
+	       int * err){
+  int ncopy;
+  //One copy of the potential per thread, because interpolated potentials
+  //carry (non-thread-safe) GSL accelerators
+  struct potentialArg * potentialArgs= new_potentialArgs_Full(npot,pot_type,
+							      pot_args,
+							      &ncopy);
+  eval_bulk_pa(npts,R,z,phi,t,nquantity,quantity,npot,ncopy,potentialArgs,
+	       out,err);
+  delete_potentialArgs_Full(npot,ncopy,potentialArgs);
+}
@@ -0,0 +1,264 @@
+/*
+  C code for calculating the azimuthally-averaged potential and forces of a
+  set of particles using a multipole expansion
+
+  The azimuthal average of the potential of a particle is
+
+     -m sum_l r_<^l / r_>^(l+1) P_l(cos theta) P_l(cos theta_p)
+
+  The particles are sorted by radius and grouped into bins of npb particles;
+  the inner and outer multipole sums are accumulated at the bin edges, such
+  that the potential at a point only requires the particles in its own bin
+  to be summed directly
+*/
+#include <stdlib.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#define CHUNKSIZE 1
+/*
+  Function declarations
+*/
+void snapshot_multipole_setup(int,double *,double *,double *,int,int,
+			      double *,double *,double *,int);
+void snapshot_multipole_eval(int,double *,double *,int,double *,double *,
+			     double *,int,int,double *,double *,double *,
+			     double *,double *,double *,int);
+/*
+  Legendre polynomials P_l(x) for l < L
+*/
+static void snapshot_legendre(double x,int L,double * P){
+  int l;
+  *P= 1.;
+  if ( L > 1 ) *(P+1)= x;
+  for (l=2; l < L; l++)
+    *(P+l)= ( (2.*l-1.) * x * *(P+l-1) - (l-1.) * *(P+l-2) ) / l;
+}
+/*
+  Add the contribution of particles start,...,end-1 to the inner
+  (sum m (r_p/r)^l P_l / r, for r_p < r) and outer
+  (sum m (r/r_p)^l P_l / r_p, for r_p >= r) multipole sums at radius r
+*/
+static void snapshot_multipole_direct(double r,int start,int end,
+				      double * rp,double * costhetap,
+				      double * mass,int L,double * Pp,
+				      double * inner,double * outer){
+  int ii, l;
+  double ratio, fac;
+  for (ii=start; ii < end; ii++) {
+    snapshot_legendre(*(costhetap+ii),L,Pp);
+    if ( *(rp+ii) < r ) {
+      ratio= *(rp+ii) / r;
+      fac= *(mass+ii) / r;
+      for (l=0; l < L; l++) {
+	*(inner+l)+= fac * *(Pp+l);
+	fac*= ratio;
+      }
+    }
+    else {
+      ratio= r / *(rp+ii);
+      fac= *(mass+ii) / *(rp+ii);
+      for (l=0; l < L; l++) {
+	*(outer+l)+= fac * *(Pp+l);
+	fac*= ratio;
+      }
+    }
+  }
+}
+/*
+  Set up the multipole sums at the bin edges
+  INPUT:
+     npart - number of particles
+     rp, costhetap, mass - spherical radius (sorted), cos(theta), and mass
+     L - number of multipoles
+     npb - number of particles per bin
+     nthreads - number of OpenMP threads (<= 0: default)
+  OUTPUT:
+     redge - (nbin+1) bin edges, the radius of the first particle in each
+             bin and the radius of the last particle
+     inner - (nbin+1) x L inner sums at the bin edges (particles before
+             the edge)
+     outer - (nbin+1) x L outer sums at the bin edges (particles from the
+             edge onwards)
+*/
+void snapshot_multipole_setup(int npart,double * rp,double * costhetap,
+			      double * mass,int L,int npb,
+			      double * redge,double * inner,double * outer,
+			      int nthreads){
+  int nbin= ( npart + npb - 1 ) / npb;
+  int ii, kk, l;
+  double ratio, fac;
+  double * Pp, * tinner, * touter;
+  if ( nthreads <= 0 ) {
+#ifdef _OPENMP
+    nthreads= omp_get_max_threads();
+#else
+    nthreads= 1;
+#endif
+  }
+  for (kk=0; kk < nbin; kk++)
+    *(redge+kk)= *(rp+kk*npb);
+  *(redge+nbin)= *(rp+npart-1);
+  //Contributions of each bin to the sums at its end (inner) and start
+  //(outer), independent for each bin
+  tinner= (double *) calloc ( nbin * L, sizeof(double) );
+  touter= (double *) calloc ( nbin * L, sizeof(double) );
+  Pp= (double *) malloc ( nthreads * L * sizeof(double) );
+#pragma omp parallel for schedule(dynamic,CHUNKSIZE) private(kk,ii,l,ratio,fac) \
+  num_threads(nthreads)
+  for (kk=0; kk < nbin; kk++) {
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    int end= ( (kk+1)*npb < npart ) ? (kk+1)*npb : npart;
+    for (ii=kk*npb; ii < end; ii++) {
+      snapshot_legendre(*(costhetap+ii),L,Pp+tid*L);
+      if ( *(redge+kk+1) > 0. ) {
+	ratio= *(rp+ii) / *(redge+kk+1);
+	fac= *(mass+ii) / *(redge+kk+1);
+	for (l=0; l < L; l++) {
+	  *(tinner+kk*L+l)+= fac * *(Pp+tid*L+l);
+	  fac*= ratio;
+	}
+      }
+      if ( *(rp+ii) > 0. ) {
+	ratio= *(redge+kk) / *(rp+ii);
+	fac= *(mass+ii) / *(rp+ii);
+	for (l=0; l < L; l++) {
+	  *(touter+kk*L+l)+= fac * *(Pp+tid*L+l);
+	  fac*= ratio;
+	}
+      }
+    }
+  }
+  //Accumulate over the bins, rescaling the sums between edges such that
+  //all radius ratios are <= 1
+  for (l=0; l < L; l++) {
+    *(inner+l)= 0.;
+    *(outer+nbin*L+l)= 0.;
+  }
+  for (kk=0; kk < nbin; kk++)
+    for (l=0; l < L; l++)
+      *(inner+(kk+1)*L+l)= *(tinner+kk*L+l)
+	+ ( ( *(redge+kk+1) > 0. ) ?
+	    *(inner+kk*L+l) * pow(*(redge+kk) / *(redge+kk+1),l+1) : 0. );
+  for (kk=nbin-1; kk >= 0; kk--)
+    for (l=0; l < L; l++)
+      *(outer+kk*L+l)= *(touter+kk*L+l)
+	+ ( ( *(redge+kk+1) > 0. ) ?
+	    *(outer+(kk+1)*L+l) * pow(*(redge+kk) / *(redge+kk+1),l) : 0. );
+  free(tinner);
+  free(touter);
+  free(Pp);
+}
+/*
+  Evaluate the azimuthally-averaged potential and forces at npts points
+  INPUT:
+     npts, R, z - points
+     npart, rp, costhetap, mass, L, npb - as for snapshot_multipole_setup
+     redge, inner, outer - output of snapshot_multipole_setup
+     nthreads - number of OpenMP threads (<= 0: default)
+  OUTPUT:
+     pot, Rforce, zforce
+*/
+void snapshot_multipole_eval(int npts,double * R,double * z,
+			     int npart,double * rp,double * costhetap,
+			     double * mass,int L,int npb,
+			     double * redge,double * inner,double * outer,
+			     double * pot,double * Rforce,double * zforce,
+			     int nthreads){
+  int nbin= ( npart + npb - 1 ) / npb;
+  int ii;
+  double * work;
+  if ( nthreads <= 0 ) {
+#ifdef _OPENMP
+    nthreads= omp_get_max_threads();
+#else
+    nthreads= 1;
+#endif
+  }
+  //Per thread: P_l at the particle, P_l and dP_l/dx at the point, inner
+  //and outer sums
+  work= (double *) malloc ( nthreads * 5 * L * sizeof(double) );
+#pragma omp parallel for schedule(static,CHUNKSIZE) private(ii)	\
+  num_threads(nthreads)
+  for (ii=0; ii < npts; ii++) {
+#ifdef _OPENMP
+    int tid= omp_get_thread_num();
+#else
+    int tid= 0;
+#endif
+    double * Pp= work + tid * 5 * L;
+    double * P= Pp + L;
+    double * dP= Pp + 2 * L;
+    double * tinner= Pp + 3 * L;
+    double * touter= Pp + 4 * L;
+    double r= sqrt( *(R+ii) * *(R+ii) + *(z+ii) * *(z+ii) );
+    double costheta= ( r > 0. ) ? *(z+ii) / r : 1.;
+    double sintheta= ( r > 0. ) ? *(R+ii) / r : 0.;
+    double sum, dphidr= 0., dphidtheta= 0.;
+    int kk, lo, hi, mid, l;
+    //Find the bin that contains r: redge[kk] <= r < redge[kk+1]
+    if ( r < *redge )
+      kk= -1;
+    else if ( r >= *(redge+nbin) )
+      kk= nbin;
+    else {
+      lo= 0;
+      hi= nbin;
+      while ( hi - lo > 1 ) {
+	mid= ( lo + hi ) / 2;
+	if ( *(redge+mid) <= r ) lo= mid;
+	else hi= mid;
+      }
+      kk= lo;
+    }
+    for (l=0; l < L; l++) {
+      *(tinner+l)= 0.;
+      *(touter+l)= 0.;
+    }
+    if ( kk < 0 ) {
+      for (l=0; l < L; l++)
+	*(touter+l)= *(outer+l) * pow(r / *redge,l);
+    }
+    else if ( kk == nbin ) {
+      for (l=0; l < L; l++)
+	*(tinner+l)= *(inner+nbin*L+l) * pow(*(redge+nbin) / r,l+1);
+    }
+    else {
+      for (l=0; l < L; l++) {
+	*(tinner+l)= *(inner+kk*L+l) * pow(*(redge+kk) / r,l+1);
+	*(touter+l)= *(outer+(kk+1)*L+l) * pow(r / *(redge+kk+1),l);
+      }
+      snapshot_multipole_direct(r,kk*npb,
+				( (kk+1)*npb < npart ) ? (kk+1)*npb : npart,
+				rp,costhetap,mass,L,Pp,tinner,touter);
+    }
+    //Sum the multipoles
+    snapshot_legendre(costheta,L,P);
+    *dP= 0.;
+    for (l=1; l < L; l++)
+      *(dP+l)= ( l > 1 ? *(dP+l-2) : 0. ) + (2.*l-1.) * *(P+l-1);
+    sum= 0.;
+    for (l=0; l < L; l++) {
+      sum-= *(P+l) * ( *(tinner+l) + *(touter+l) );
+      dphidr-= *(P+l) * ( -(l+1.) * *(tinner+l) + l * *(touter+l) );
+      dphidtheta+= sintheta * *(dP+l) * ( *(tinner+l) + *(touter+l) );
+    }
+    *(pot+ii)= sum;
+    if ( r > 0. ) {
+      dphidr/= r;
+      dphidtheta/= r;
+      *(Rforce+ii)= -( sintheta * dphidr + costheta * dphidtheta );
+      *(zforce+ii)= -( costheta * dphidr - sintheta * dphidtheta );
+    }
+    else {
+      *(Rforce+ii)= 0.;
+      *(zforce+ii)= 0.;
+    }
+  }
+  free(work);
+}
@@ -25,6 +25,7 @@ class planarPotential(object):
         self.isRZ= False
         self.hasC= False
         self.hasC_dxdv= False
+        self._vectorized= True # whether the methods take arrays of points
         # Parse ro and vo
         if ro is None:
             self._ro= config.__config__.getfloat('normalization','ro')
@@ -637,6 +638,7 @@ class planarPotentialFromRZPotential(planarAxiPotential):
         self._RZPot= RZPot
         self.hasC= RZPot.hasC
         self.hasC_dxdv= RZPot.hasC_dxdv
+        self._vectorized= RZPot._vectorized
         return None
 
     def _evaluate(self,R,phi=0.,t=0.):
@@ -689,7 +691,295 @@ class planarPotentialFromRZPotential(planarAxiPotential):
            2011-10-09 - Written - Bovy (IAS)
         """
         return self._RZPot.R2deriv(R,0.,t=t,use_physical=False)
-            
+
+class planarPotentialFromFullPotential(planarPotential):
+    """Class that represents a non-axisymmetric planar potential derived from a non-axisymmetric 3D potential"""
+    def __init__(self,Pot):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           Initialize
+        INPUT:
+           Pot - Potential instance
+        OUTPUT:
+           planarPotential instance
+        """
+        planarPotential.__init__(self,amp=1.,ro=Pot._ro,vo=Pot._vo)
+        # Also transfer roSet and voSet
+        self._roSet= Pot._roSet
+        self._voSet= Pot._voSet
+        self._Pot= Pot
+        self.hasC= Pot.hasC
+        self.hasC_dxdv= Pot.hasC_dxdv
+        self._vectorized= Pot._vectorized
+        if hasattr(Pot,'OmegaP'):
+            self.OmegaP= Pot.OmegaP
+        return None
+
+    def _evaluate(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+          Pot(R(,\phi,t))
+        """
+        return self._Pot(R,0.,phi=phi,t=t,use_physical=False)
+
+    def _Rforce(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+          F_R(R(,\phi,t))
+        """
+        return self._Pot.Rforce(R,0.,phi=phi,t=t,use_physical=False)
+
+    def _phiforce(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _phiforce
+        PURPOSE:
+           evaluate the azimuthal force
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+          F_phi(R(,\phi,t))
+        """
+        return self._Pot.phiforce(R,0.,phi=phi,t=t,use_physical=False)
+
+    def _R2deriv(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _R2deriv
+        PURPOSE:
+           evaluate the second radial derivative
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+           d2phi/dR2
+        """
+        return self._Pot.R2deriv(R,0.,phi=phi,t=t,use_physical=False)
+
+    def _phi2deriv(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _phi2deriv
+        PURPOSE:
+           evaluate the second azimuthal derivative
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+           d2phi/dphi2
+        """
+        return self._Pot.phi2deriv(R,0.,phi=phi,t=t,use_physical=False)
+
+    def _Rphideriv(self,R,phi=0.,t=0.):
+        """
+        NAME:
+           _Rphideriv
+        PURPOSE:
+           evaluate the mixed radial-azimuthal derivative
+        INPUT:
+           R
+           phi
+           t
+        OUTPUT:
+           d2phi/dR/dphi
+        """
+        return self._Pot.Rphideriv(R,0.,phi=phi,t=t,use_physical=False)
+
+class FullPotentialFromplanarPotential(Potential):
+    """Class that represents a 3D potential derived from a planar potential by assuming that the potential is independent of z (that is, that it exerts no vertical force)"""
+    def __init__(self,planarPot):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           Initialize
+        INPUT:
+           planarPot - planarPotential instance
+        OUTPUT:
+           Potential instance
+        """
+        Potential.__init__(self,amp=1.,ro=planarPot._ro,vo=planarPot._vo)
+        # Also transfer roSet and voSet
+        self._roSet= planarPot._roSet
+        self._voSet= planarPot._voSet
+        self._planarPot= planarPot
+        self.isNonAxi= planarPot.isNonAxi
+        # Axisymmetric planar potentials that come from an RZPotential share
+        # their C type with the 3D RZPotential, so cannot be used in C
+        self.hasC= planarPot.hasC \
+            and not isinstance(planarPot,planarPotentialFromRZPotential)
+        self.hasC_dxdv= self.hasC and planarPot.hasC_dxdv
+        self._vectorized= planarPot._vectorized
+        if hasattr(planarPot,'OmegaP'):
+            self.OmegaP= planarPot.OmegaP
+        return None
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+          Pot(R,z(,\phi,t))
+        """
+        return self._planarPot(R,phi=phi,t=t,use_physical=False)
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+          F_R(R,z(,\phi,t))
+        """
+        return self._planarPot.Rforce(R,phi=phi,t=t,use_physical=False)
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+          F_z(R,z(,\phi,t))
+        """
+        return 0.*R
+
+    def _phiforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phiforce
+        PURPOSE:
+           evaluate the azimuthal force
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+          F_phi(R,z(,\phi,t))
+        """
+        return self._planarPot.phiforce(R,phi=phi,t=t,use_physical=False)
+
+    def _R2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _R2deriv
+        PURPOSE:
+           evaluate the second radial derivative
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+           d2phi/dR2
+        """
+        return self._planarPot.R2deriv(R,phi=phi,t=t,use_physical=False)
+
+    def _z2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _z2deriv
+        PURPOSE:
+           evaluate the second vertical derivative
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+           d2phi/dz2
+        """
+        return 0.*R
+
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rzderiv
+        PURPOSE:
+           evaluate the mixed radial-vertical derivative
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+           d2phi/dR/dz
+        """
+        return 0.*R
+
+    def _phi2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phi2deriv
+        PURPOSE:
+           evaluate the second azimuthal derivative
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+           d2phi/dphi2
+        """
+        return self._planarPot.phi2deriv(R,phi=phi,t=t,use_physical=False)
+
+    def _Rphideriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rphideriv
+        PURPOSE:
+           evaluate the mixed radial-azimuthal derivative
+        INPUT:
+           R
+           z
+           phi
+           t
+        OUTPUT:
+           d2phi/dR/dphi
+        """
+        return self._planarPot.Rphideriv(R,phi=phi,t=t,use_physical=False)
+
 def RZToplanarPotential(RZPot):
     """
     NAME:
@@ -702,7 +992,7 @@ def RZToplanarPotential(RZPot):
 
     INPUT:
 
-       RZPot - RZPotential instance or list of such instances (existing planarPotential instances are just copied to the output)
+       RZPot - RZPotential instance or list of such instances (existing planarPotential instances are just copied to the output; potentials obtained from planarToFullPotential are converted back to the original planarPotential; non-axisymmetric potentials are evaluated at the azimuth of the planar orbit)
 
     OUTPUT:
 
@@ -718,9 +1008,17 @@ def RZToplanarPotential(RZPot):
         for pot in RZPot:
             if isinstance(pot,planarPotential):
                 out.append(pot)
+            elif isinstance(pot,FullPotentialFromplanarPotential):
+                out.append(pot._planarPot)
+            elif pot.isNonAxi:
+                out.append(planarPotentialFromFullPotential(pot))
             else:
                 out.append(planarPotentialFromRZPotential(pot))
         return out
+    elif isinstance(RZPot,FullPotentialFromplanarPotential):
+        return RZPot._planarPot
+    elif isinstance(RZPot,Potential) and RZPot.isNonAxi:
+        return planarPotentialFromFullPotential(RZPot)
     elif isinstance(RZPot,Potential):
         return planarPotentialFromRZPotential(RZPot)
     elif isinstance(RZPot,planarPotential):
@@ -728,6 +1026,40 @@ def RZToplanarPotential(RZPot):
     else:
         raise PotentialError("Input to 'RZToplanarPotential' is neither an RZPotential-instance or a list of such instances")
 
+def planarToFullPotential(planarPot):
+    """
+    NAME:
+
+       planarToFullPotential
+
+    PURPOSE:
+
+       convert a planarPotential to a 3D Potential that is independent of z, such that non-axisymmetric planar potentials (bars, spirals, ...) can be added to 3D potentials for the integration of 3D orbits
+
+    INPUT:
+
+       planarPot - planarPotential instance or list of such instances (existing 3D Potential instances are just copied to the output)
+
+    OUTPUT:
+
+       Potential instance(s)
+
+    """
+    if isinstance(planarPot,list):
+        out= []
+        for pot in planarPot:
+            if isinstance(pot,Potential):
+                out.append(pot)
+            else:
+                out.append(FullPotentialFromplanarPotential(pot))
+        return out
+    elif isinstance(planarPot,planarPotential):
+        return FullPotentialFromplanarPotential(planarPot)
+    elif isinstance(planarPot,Potential):
+        return planarPot
+    else:
+        raise PotentialError("Input to 'planarToFullPotential' is neither a planarPotential-instance or a list of such instances")
+
 @potential_physical_input
 @physical_conversion('energy',pop=True)
 def evaluateplanarPotentials(Pot,R,phi=None,t=0.,dR=0,dphi=0):
@@ -0,0 +1,163 @@
+#include <math.h>
+#include <galpy_potentials.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+//DiskMultipolePotential
+//args: amp, ncomp, (Sigma type, Sigma amp, hr, Rhole, hz type, hz) for each
+//      disk component, L, nr, log rmin, dlog r, and the multipoles of the
+//      residual potential and their first and second radial derivatives
+//      (each L x nr, C order)
+//Surface density (deriv=0) or its first or second derivative at r
+static double DiskMultipoleSigma(double r,int deriv,double * comp){
+  double s= *(comp+1) * exp(-r / *(comp+2));
+  double hole, dlns;
+  if ( (int) *comp == 0 ) //exponential
+    return s * pow(-1. / *(comp+2),deriv);
+  //exponential with a hole
+  hole= *(comp+3) / r;
+  s*= exp(-hole);
+  dlns= hole / r - 1. / *(comp+2);
+  if ( deriv == 0 )
+    return s;
+  else if ( deriv == 1 )
+    return s * dlns;
+  else
+    return s * ( dlns * dlns - 2. * hole / r / r );
+}
+//Vertical profile: H(z) (deriv=0) and its first derivative
+static double DiskMultipoleH(double z,int deriv,double * comp){
+  double h= *(comp+5);
+  double x;
+  if ( (int) *(comp+4) == 0 ) { //exponential
+    if ( deriv == 0 )
+      return h / 2. * ( exp(-fabs(z)/h) - 1. + fabs(z) / h );
+    else
+      return ( z > 0. ? 1. : ( z < 0. ? -1. : 0. ) )
+	* ( 1. - exp(-fabs(z)/h) ) / 2.;
+  }
+  //sech^2
+  x= z / 2. / h;
+  if ( deriv == 0 )
+    return h * ( fabs(x) + log1p(exp(-2. * fabs(x))) - M_LN2 );
+  else
+    return tanh(x) / 2.;
+}
+//Multipole l (or its radial derivative) at r, using cubic Hermite
+//interpolation of the tabulated multipoles and derivatives with weights w
+//in interval ii (ii < 0: inside the grid, ii >= nr-1: outside the grid)
+static double DiskMultipoleInterp(double r,int l,int deriv,int L,int nr,
+				  double rmin,double rmax,int ii,double * w,
+				  double * phil){
+  double * f= phil + ( deriv * L + l ) * nr;
+  double * df= phil + ( ( deriv + 1 ) * L + l ) * nr;
+  if ( ii < 0 ) { //uniform density inside the grid
+    if ( deriv == 1 )
+      return ( l == 0 ) ? *f * r / rmin
+	: l * *(phil + l * nr) / rmin * pow(r/rmin,l-1);
+    else
+      return ( l == 0 ) ? *f + *df * ( r * r - rmin * rmin ) / 2. / rmin
+	: *f * pow(r/rmin,l);
+  }
+  if ( ii >= nr-1 ) { //vacuum outside the grid
+    f= phil + l * nr + nr - 1;
+    if ( deriv == 1 )
+      return -(l+1.) * *f * pow(rmax/r,l+1) / r;
+    else
+      return *f * pow(rmax/r,l+1);
+  }
+  return *w * *(f+ii) + *(w+1) * *(df+ii)
+    + *(w+2) * *(f+ii+1) + *(w+3) * *(df+ii+1);
+}
+//Evaluate the potential (what=0) or its derivatives with respect to R
+//(what=1) or z (what=2)
+static double DiskMultipoleEval(double R,double z,int what,double * args){
+  double amp= *args;
+  int ncomp= (int) *(args+1);
+  double * comp= args+2;
+  int L= (int) *(args+2+6*ncomp);
+  int nr= (int) *(args+3+6*ncomp);
+  double lnrmin= *(args+4+6*ncomp);
+  double dlnr= *(args+5+6*ncomp);
+  double * phil= args+6+6*ncomp;
+  double r= sqrt(R*R+z*z);
+  double costheta= ( r > 0. ) ? z/r : 1.;
+  double sintheta= ( r > 0. ) ? R/r : 0.;
+  double out= 0., dphidr= 0., dphidtheta= 0.;
+  double Pl, Plm1= 0., Plm2, dPl= 0., dPlm1= 0., dPlm2;
+  double rmin= exp(lnrmin), rmax= exp(lnrmin+dlnr*(nr-1));
+  double r0, dr, t, w[4];
+  int ii, ir, l;
+  //Analytic disk part
+  for (ii=0; ii < ncomp; ii++) {
+    if ( what == 0 )
+      out+= DiskMultipoleSigma(r,0,comp+6*ii) * DiskMultipoleH(z,0,comp+6*ii);
+    else if ( r > 0. ) {
+      out+= DiskMultipoleSigma(r,1,comp+6*ii) * DiskMultipoleH(z,0,comp+6*ii)
+	* ( what == 1 ? sintheta : costheta );
+      if ( what == 2 )
+	out+= DiskMultipoleSigma(r,0,comp+6*ii)
+	  * DiskMultipoleH(z,1,comp+6*ii);
+    }
+  }
+  out*= 4. * M_PI;
+  //Multipoles of the residual: interpolation interval and weights
+  if ( r < rmin )
+    ir= -1;
+  else if ( r > rmax )
+    ir= nr-1;
+  else {
+    ir= (int) floor( ( log(r) - lnrmin ) / dlnr );
+    if ( ir > nr-2 ) ir= nr-2;
+    r0= exp(lnrmin+dlnr*ir);
+    dr= exp(lnrmin+dlnr*(ir+1))-r0;
+    t= ( r - r0 ) / dr;
+    *w= ( 2. * t - 3. ) * t * t + 1.;
+    *(w+1)= ( ( t - 2. ) * t + 1. ) * t * dr;
+    *(w+2)= ( 3. - 2. * t ) * t * t;
+    *(w+3)= ( t - 1. ) * t * t * dr;
+  }
+  Pl= 1.;
+  for (l=0; l < L; l++) {
+    if ( l > 0 ) {
+      Plm2= Plm1;
+      Plm1= Pl;
+      Pl= ( (2.*l-1.) * costheta * Plm1 - (l-1.) * Plm2 ) / l;
+      dPlm2= dPlm1;
+      dPlm1= dPl;
+      dPl= ( l > 1 ? dPlm2 : 0. ) + (2.*l-1.) * Plm1;
+    }
+    if ( what == 0 )
+      out+= DiskMultipoleInterp(r,l,0,L,nr,rmin,rmax,ir,w,phil) * Pl;
+    else {
+      dphidr+= DiskMultipoleInterp(r,l,1,L,nr,rmin,rmax,ir,w,phil) * Pl;
+      if ( r > 0. && l > 0 )
+	dphidtheta+= DiskMultipoleInterp(r,l,0,L,nr,rmin,rmax,ir,w,phil) * dPl;
+    }
+  }
+  if ( r > 0. ) dphidtheta*= -sintheta / r;
+  if ( what == 1 )
+    out+= sintheta * dphidr + costheta * dphidtheta;
+  else if ( what == 2 )
+    out+= costheta * dphidr - sintheta * dphidtheta;
+  return amp * out;
+}
+double DiskMultipolePotentialEval(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return DiskMultipoleEval(R,z,0,potentialArgs->args);
+}
+double DiskMultipolePotentialRforce(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  return -DiskMultipoleEval(R,z,1,potentialArgs->args);
+}
+double DiskMultipolePotentialPlanarRforce(double R,double phi,double t,
+					  struct potentialArg * potentialArgs){
+  return -DiskMultipoleEval(R,0.,1,potentialArgs->args);
+}
+double DiskMultipolePotentialzforce(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  return -DiskMultipoleEval(R,z,2,potentialArgs->args);
+}
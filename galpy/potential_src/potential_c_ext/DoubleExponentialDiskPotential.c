@@ -32,7 +32,7 @@ double DoubleExponentialDiskPotentialEval(double R,double z, double phi,
   double * dj0zeros= args + 2 * glorder + nzeros + 1;
   //Calculate potential
   double out= 0.;
-  double k;
+  double k= 0.;
   int ii, jj;
   if ( R < 1. ) kmax= kmax/R;
   for (ii=0; ii < ( nzeros + 1 ); ii++) {
@@ -74,7 +74,7 @@ double DoubleExponentialDiskPotentialRforce(double R,double z, double phi,
   double * dj1zeros= args + 2 * glorder + 3 * (nzeros + 1);
   //Calculate potential
   double out= 0.;
-  double k;
+  double k= 0.;
   int ii, jj;
   if ( R < 1. ) kmax= kmax/R;
   for (ii=0; ii < ( nzeros + 1 ); ii++) {
@@ -116,7 +116,7 @@ double DoubleExponentialDiskPotentialPlanarRforce(double R,double phi,
   double * dj1zeros= args + 2 * glorder + 3 * (nzeros + 1);
   //Calculate potential
   double out= 0.;
-  double k;
+  double k= 0.;
   int ii, jj;
   if ( R < 1. ) kmax= kmax/R;
   for (ii=0; ii < ( nzeros + 1 ); ii++) {
@@ -157,7 +157,7 @@ double DoubleExponentialDiskPotentialzforce(double R,double z,double phi,
   double * dj0zeros= args + 2 * glorder + nzeros + 1;
   //Calculate potential
   double out= 0.;
-  double k;
+  double k= 0.;
   int ii, jj;
   if ( R < 1. ) kmax= kmax/R;
   for (ii=0; ii < ( nzeros + 1 ); ii++) {
@@ -175,3 +175,134 @@ double DoubleExponentialDiskPotentialzforce(double R,double z,double phi,
   else
     return amp * 2 * M_PI * alpha * beta * out;
 }
+//Array evaluation of the Hankel-transform integrals that make up the
+//potential and its derivatives, using the same Gauss-Legendre nodes between
+//the zeros of the Bessel functions as the Python implementation
+static int DoubleExponentialDiskPotential_nintervals(double target,
+						     int nzeros,
+						     double * jzeros){
+  //index of the zero closest to target (the first one for ties)
+  int ii, out= 0;
+  double dist, mindist= ( *jzeros - target ) * ( *jzeros - target );
+  for (ii=1; ii < ( nzeros + 1 ); ii++) {
+    dist= ( *(jzeros+ii) - target ) * ( *(jzeros+ii) - target );
+    if ( dist < mindist ) {
+      mindist= dist;
+      out= ii;
+    }
+  }
+  return out;
+}
+static double DoubleExponentialDiskPotential_sum(double R,double z,
+						 double alpha,double beta,
+						 double kmax,int order,
+						 int kpow,int ztype,
+						 int nzeros,int glorder,
+						 double * glx,double * glw,
+						 double * jzeros,
+						 double * djzeros){
+  //sum_k w k^kpow J_order(kR) (alpha^2+k^2)^-1.5 zfac(k) / (beta^2-k^2)
+  int ii, jj, nint;
+  double k, w, zfac, bes;
+  double out= 0.;
+  double absz= fabs(z);
+  double ebz= exp(-beta * absz);
+  double R4max= ( R < 1. ) ? 1. : R;
+  nint= DoubleExponentialDiskPotential_nintervals(kmax*R4max,nzeros,jzeros);
+  for (ii=0; ii < nint; ii++) {
+    for (jj=0; jj < glorder; jj++) {
+      k= 0.5 * ( *(glx+jj) + 1. ) * *(djzeros+ii+1) + *(jzeros+ii);
+      w= *(glw+jj) * *(djzeros+ii+1);
+      switch ( ztype ) {
+      case 0:
+	zfac= beta * exp(-k * absz) - k * ebz;
+	break;
+      case 1:
+	zfac= exp(-k * absz) - ebz;
+	break;
+      default:
+	zfac= k * exp(-k * absz) - beta * ebz;
+	break;
+      }
+      switch ( order ) {
+      case 0:
+	bes= gsl_sf_bessel_J0(k*R);
+	break;
+      case 1:
+	bes= gsl_sf_bessel_J1(k*R);
+	break;
+      default:
+	bes= gsl_sf_bessel_Jn(order,k*R);
+	break;
+      }
+      out+= w * pow(k,kpow) * bes * pow(alpha * alpha + k * k,-1.5)
+	* zfac / ( beta * beta - k * k );
+    }
+  }
+  return out;
+}
+void DoubleExponentialDiskPotential_quad_array(int npts,double * R,double * z,
+					       int qtype,
+					       double alpha,double beta,
+					       double kmaxFac,
+					       int nzeros,int glorder,
+					       double * glx,double * glw,
+					       double * jzeros,double * out){
+  //qtype: 0 = potential, 1 = Rforce, 2 = zforce, 3 = R2deriv, 4 = z2deriv,
+  //5 = Rzderiv (all without the amplitude);
+  //jzeros holds the zeros of J0, J1, and J2 and their differences,
+  //each of length nzeros+1
+  int ii;
+  int nz1= nzeros + 1;
+  double * j0zeros= jzeros;
+  double * dj0zeros= jzeros + nz1;
+  double * j1zeros= jzeros + 2 * nz1;
+  double * dj1zeros= jzeros + 3 * nz1;
+  double * j2zeros= jzeros + 4 * nz1;
+  double * dj2zeros= jzeros + 5 * nz1;
+  double kmax= kmaxFac * beta;
+#pragma omp parallel for schedule(dynamic,16) private(ii)
+  for (ii=0; ii < npts; ii++) {
+    switch ( qtype ) {
+    case 0:
+      *(out+ii)= -2. * M_PI * alpha
+	* DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					     kmax,0,0,0,nzeros,glorder,
+					     glx,glw,j0zeros,dj0zeros);
+      break;
+    case 1:
+      *(out+ii)= -2. * M_PI * alpha
+	* DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					     2.*kmax,1,1,0,nzeros,glorder,
+					     glx,glw,j1zeros,dj1zeros);
+      break;
+    case 2:
+      *(out+ii)= ( *(z+ii) > 0. ? -2. : 2. ) * M_PI * alpha * beta
+	* DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					     kmax,0,1,1,nzeros,glorder,
+					     glx,glw,j0zeros,dj0zeros);
+      break;
+    case 3:
+      *(out+ii)= M_PI * alpha
+	* ( DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					       2.*kmax,0,2,0,nzeros,glorder,
+					       glx,glw,j0zeros,dj0zeros)
+	    -DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+						2.*kmax,2,2,0,nzeros,glorder,
+						glx,glw,j2zeros,dj2zeros));
+      break;
+    case 4:
+      *(out+ii)= -2. * M_PI * alpha * beta
+	* DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					     kmax,0,1,2,nzeros,glorder,
+					     glx,glw,j0zeros,dj0zeros);
+      break;
+    case 5:
+      *(out+ii)= ( *(z+ii) >= 0. ? -2. : 2. ) * M_PI * alpha * beta
+	* DoubleExponentialDiskPotential_sum(*(R+ii),*(z+ii),alpha,beta,
+					     2.*kmax,1,2,1,nzeros,glorder,
+					     glx,glw,j1zeros,dj1zeros);
+      break;
+    }
+  }
+}
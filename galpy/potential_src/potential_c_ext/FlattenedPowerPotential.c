@@ -87,6 +87,46 @@ double FlattenedPowerPotentialPlanarR2deriv(double R,double phi,
     return amp * (1.- 2.*R*R/(R*R+core2))/(R*R+core2);
   else {
     m2= core2+R*R;
-    return - amp * pow(m2,-0.5 * alpha - 1.) * ( (alpha + 1.) * R*R/m2 -1.);
+    return - amp * pow(m2,-0.5 * alpha - 1.) * ( (alpha + 2.) * R*R/m2 -1.);
   }
 }
+double FlattenedPowerPotentialR2deriv(double R,double Z, double phi,
+				      double t,
+				      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double alpha= *(args+1);
+  double q2= *(args+2);
+  double core2= *(args+3);
+  double m2= core2+R*R+Z*Z/q2;
+  //Calculate R2deriv
+  return - amp * pow(m2,-0.5 * alpha - 1.) * ( (alpha + 2.) * R*R/m2 -1.);
+}
+double FlattenedPowerPotentialz2deriv(double R,double Z, double phi,
+				      double t,
+				      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double alpha= *(args+1);
+  double q2= *(args+2);
+  double core2= *(args+3);
+  double m2= core2+R*R+Z*Z/q2;
+  //Calculate z2deriv
+  return - amp * pow(m2,-0.5 * alpha - 1.) / q2
+    * ( (alpha + 2.) * Z*Z/m2/q2 -1.);
+}
+double FlattenedPowerPotentialRzderiv(double R,double Z, double phi,
+				      double t,
+				      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double alpha= *(args+1);
+  double q2= *(args+2);
+  double core2= *(args+3);
+  double m2= core2+R*R+Z*Z/q2;
+  //Calculate Rzderiv
+  return - amp * (alpha + 2.) * R * Z / q2 * pow(m2,-0.5 * alpha - 2.);
+}
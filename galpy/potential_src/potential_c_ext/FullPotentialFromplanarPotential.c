@@ -0,0 +1,29 @@
+#include <galpy_potentials.h>
+//FullPotentialFromplanarPotential: 3D potential that is independent of z,
+//obtained from a planar potential; uses the planar forces set up for the
+//planar potential (the vertical force is ZeroForce)
+double FullPotentialFromplanarPotentialRforce(double R,double Z,double phi,
+					      double t,
+					      struct potentialArg * potentialArgs){
+  return potentialArgs->planarRforce(R,phi,t,potentialArgs);
+}
+double FullPotentialFromplanarPotentialphiforce(double R,double Z,double phi,
+						double t,
+						struct potentialArg * potentialArgs){
+  return potentialArgs->planarphiforce(R,phi,t,potentialArgs);
+}
+double FullPotentialFromplanarPotentialR2deriv(double R,double Z,double phi,
+					       double t,
+					       struct potentialArg * potentialArgs){
+  return potentialArgs->planarR2deriv(R,phi,t,potentialArgs);
+}
+double FullPotentialFromplanarPotentialphi2deriv(double R,double Z,double phi,
+						 double t,
+						 struct potentialArg * potentialArgs){
+  return potentialArgs->planarphi2deriv(R,phi,t,potentialArgs);
+}
+double FullPotentialFromplanarPotentialRphideriv(double R,double Z,double phi,
+						 double t,
+						 struct potentialArg * potentialArgs){
+  return potentialArgs->planarRphideriv(R,phi,t,potentialArgs);
+}
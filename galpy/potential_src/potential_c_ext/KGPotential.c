@@ -0,0 +1,14 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//KGPotential
+//4 arguments: amp, K, D2, 2F
+double KGPotentialLinearForce(double x,double t,
+			      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double K= *(args+1);
+  double D2= *(args+2);
+  double twoF= *(args+3);
+  return -amp * x * (K/sqrt(x*x+D2)+twoF);
+}
@@ -104,3 +104,95 @@ double KuzminKutuzovStaeckelPotentialPlanarR2deriv(double R,double phi,
   return amp * (d2ldR2 * dVdl + dldR*dldR*d2Vdl2);
 }
 
+//Second derivatives in 3D, using the Jacobian and Hessian of the
+//(R,z) -> (lambda,nu) transformation
+static void KuzminKutuzovStaeckelPotentialDerivs(double R,double z,
+						 double * args,
+						 double * dVdl,double * dVdn,
+						 double * d2Vdl2,
+						 double * d2Vdn2,
+						 double * d2Vdldn){
+  //Get args
+  double ac    = *(args+1);
+  double Delta = *(args+2);
+  //Coordinate transformation
+  double gamma = Delta*Delta / (1.-ac*ac);
+  double alpha = gamma - Delta*Delta;
+  double term  =     R*R + z*z - alpha - gamma;
+  double discr = pow(R*R + z*z - Delta*Delta, 2.) + (4. * Delta*Delta * R*R);
+  double l     = 0.5 * (term + sqrt(discr)); 
+  double n     = 0.5 * (term - sqrt(discr));
+  double sl    = sqrt(l);
+  double sn    = sqrt(n);
+  *dVdl   = 0.5/sl/pow(sl+sn,2.);
+  *dVdn   = 0.5/sn/pow(sl+sn,2.);
+  *d2Vdl2 = (-3.*sl-sn) / (4. * pow(l,1.5) * pow(sl+sn,3.));
+  *d2Vdn2 = (-sl-3.*sn) / (4. * pow(n,1.5) * pow(sl+sn,3.));
+  *d2Vdldn= -0.5/(sl*sn*pow(sl+sn,3.));
+}
+double KuzminKutuzovStaeckelPotentialR2deriv(double R,double z,double phi,
+					     double t,
+					     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp   = *args;
+  double Delta = *(args+2);
+  double dVdl, dVdn, d2Vdl2, d2Vdn2, d2Vdldn;
+  double R2= R*R, z2= z*z, D2= Delta*Delta;
+  double discr = pow(R2 + z2 - D2, 2.) + (4. * D2 * R2);
+  double dldR  = R * (1. + (R2 + z2 + D2) / sqrt(discr));
+  double dndR  = R * (1. - (R2 + z2 + D2) / sqrt(discr));
+  double d2ldR2= 1. + (3.*R2+z2+D2)/sqrt(discr)
+    - (2.*R2*pow(R2+z2+D2,2.))/pow(discr,1.5);
+  double d2ndR2= 1. - (3.*R2+z2+D2)/sqrt(discr)
+    + (2.*R2*pow(R2+z2+D2,2.))/pow(discr,1.5);
+  KuzminKutuzovStaeckelPotentialDerivs(R,z,args,&dVdl,&dVdn,
+				       &d2Vdl2,&d2Vdn2,&d2Vdldn);
+  return amp * (d2ldR2 * dVdl + d2ndR2 * dVdn
+		+ dldR*dldR * d2Vdl2 + dndR*dndR * d2Vdn2
+		+ 2.*dldR*dndR * d2Vdldn);
+}
+double KuzminKutuzovStaeckelPotentialz2deriv(double R,double z,double phi,
+					     double t,
+					     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp   = *args;
+  double Delta = *(args+2);
+  double dVdl, dVdn, d2Vdl2, d2Vdn2, d2Vdldn;
+  double R2= R*R, z2= z*z, D2= Delta*Delta;
+  double discr = pow(R2 + z2 - D2, 2.) + (4. * D2 * R2);
+  double dldz  = z * (1. + (R2 + z2 - D2) / sqrt(discr));
+  double dndz  = z * (1. - (R2 + z2 - D2) / sqrt(discr));
+  double d2ldz2= 1. + (R2+3.*z2-D2)/sqrt(discr)
+    - (2.*z2*pow(R2+z2-D2,2.))/pow(discr,1.5);
+  double d2ndz2= 1. - (R2+3.*z2-D2)/sqrt(discr)
+    + (2.*z2*pow(R2+z2-D2,2.))/pow(discr,1.5);
+  KuzminKutuzovStaeckelPotentialDerivs(R,z,args,&dVdl,&dVdn,
+				       &d2Vdl2,&d2Vdn2,&d2Vdldn);
+  return amp * (d2ldz2 * dVdl + d2ndz2 * dVdn
+		+ dldz*dldz * d2Vdl2 + dndz*dndz * d2Vdn2
+		+ 2.*dldz*dndz * d2Vdldn);
+}
+double KuzminKutuzovStaeckelPotentialRzderiv(double R,double z,double phi,
+					     double t,
+					     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp   = *args;
+  double Delta = *(args+2);
+  double dVdl, dVdn, d2Vdl2, d2Vdn2, d2Vdldn;
+  double R2= R*R, z2= z*z, D2= Delta*Delta;
+  double discr = pow(R2 + z2 - D2, 2.) + (4. * D2 * R2);
+  double dldR  = R * (1. + (R2 + z2 + D2) / sqrt(discr));
+  double dndR  = R * (1. - (R2 + z2 + D2) / sqrt(discr));
+  double dldz  = z * (1. + (R2 + z2 - D2) / sqrt(discr));
+  double dndz  = z * (1. - (R2 + z2 - D2) / sqrt(discr));
+  double d2ldRdz= 2.*R*z/sqrt(discr) * ( 1. - (pow(R2+z2,2.)-D2*D2)/discr);
+  double d2ndRdz= -d2ldRdz;
+  KuzminKutuzovStaeckelPotentialDerivs(R,z,args,&dVdl,&dVdn,
+				       &d2Vdl2,&d2Vdn2,&d2Vdldn);
+  return amp * (d2ldRdz * dVdl + d2ndRdz * dVdn
+		+ dldR*dldz * d2Vdl2 + dndR*dndz * d2Vdn2
+		+ (dldR*dndz+dldz*dndR) * d2Vdldn);
+}
@@ -58,3 +58,42 @@ double LogarithmicHaloPotentialPlanarR2deriv(double R,double phi,
   //Calculate Rforce
   return amp * (1.- 2.*R*R/(R*R+c))/(R*R+c);
 }
+double LogarithmicHaloPotentialR2deriv(double R,double Z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double q= *(args+1);
+  double c= *(args+2);
+  //Calculate R2deriv
+  double zq= Z/q;
+  double denom= 1./(R*R+zq*zq+c);
+  return amp * denom * (1.-2.*R*R*denom);
+}
+double LogarithmicHaloPotentialz2deriv(double R,double Z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double q= *(args+1);
+  double c= *(args+2);
+  //Calculate z2deriv
+  double zq= Z/q;
+  double denom= 1./(R*R+zq*zq+c);
+  return amp * denom / q / q * (1.-2.*zq*zq*denom);
+}
+double LogarithmicHaloPotentialRzderiv(double R,double Z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args;
+  double q= *(args+1);
+  double c= *(args+2);
+  //Calculate Rzderiv
+  double zq= Z/q;
+  double denom= 1./(R*R+zq*zq+c);
+  return -2. * amp * R * Z / q / q * denom * denom;
+}
@@ -64,3 +64,50 @@ double MiyamotoNagaiPotentialPlanarR2deriv(double R,double phi,
   return amp * (pow(denom,-1.5) - 3. * R * R * pow(denom,-2.5));
 }
 
+double MiyamotoNagaiPotentialR2deriv(double R,double z, double phi,
+				     double t,
+				     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args++;
+  double a= *args++;
+  double b= *args;
+  //calculate R2deriv
+  double asqrtbz= a+sqrt(z*z+b*b);
+  double denom= R*R+asqrtbz*asqrtbz;
+  return amp * (pow(denom,-1.5) - 3. * R * R * pow(denom,-2.5));
+}
+double MiyamotoNagaiPotentialz2deriv(double R,double z, double phi,
+				     double t,
+				     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args++;
+  double a= *args++;
+  double b= *args;
+  //calculate z2deriv
+  double sqrtbz= sqrt(b*b+z*z);
+  double asqrtbz= a+sqrtbz;
+  double denom= R*R+asqrtbz*asqrtbz;
+  if ( a == 0. )
+    return amp * (b*b+R*R-2.*z*z) * pow(b*b+R*R+z*z,-2.5);
+  else
+    return amp * ( asqrtbz / sqrtbz * pow(denom,-1.5)
+		   + z * z / sqrtbz / sqrtbz * pow(denom,-1.5)
+		   * ( 1. - asqrtbz / sqrtbz
+		       - 3. * asqrtbz * asqrtbz / denom ) );
+}
+double MiyamotoNagaiPotentialRzderiv(double R,double z, double phi,
+				     double t,
+				     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args++;
+  double a= *args++;
+  double b= *args;
+  //calculate Rzderiv
+  double sqrtbz= sqrt(b*b+z*z);
+  double asqrtbz= a+sqrtbz;
+  return - 3. * amp * R * z * asqrtbz / sqrtbz
+    * pow(R*R+asqrtbz*asqrtbz,-2.5);
+}
@@ -0,0 +1,87 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//MovingObjectPotential
+//args: amp, softening type (0: Plummer), softening length, nbreak,
+//      breakpoints (nbreak), and piecewise-cubic coefficients of the x, y,
+//      and z position of the object (4 x (nbreak-1) each)
+static void MovingObjectPotentialPosition(double t,double * args,
+					  double * x,double * y,double * z){
+  int nbreak= (int) *(args+3);
+  double * breakpoints= args+4;
+  double * coeffs;
+  double dt;
+  int lo= 0, hi= nbreak-1, mid;
+  //Find the interval with breakpoints[lo] <= t < breakpoints[lo+1],
+  //extrapolating using the first or last interval
+  while ( hi-lo > 1 ) {
+    mid= (lo+hi)/2;
+    if ( t < *(breakpoints+mid) ) hi= mid;
+    else lo= mid;
+  }
+  dt= t-*(breakpoints+lo);
+  coeffs= breakpoints+nbreak+4*lo;
+  *x= ((*coeffs*dt+*(coeffs+1))*dt+*(coeffs+2))*dt+*(coeffs+3);
+  coeffs+= 4*(nbreak-1);
+  *y= ((*coeffs*dt+*(coeffs+1))*dt+*(coeffs+2))*dt+*(coeffs+3);
+  coeffs+= 4*(nbreak-1);
+  *z= ((*coeffs*dt+*(coeffs+1))*dt+*(coeffs+2))*dt+*(coeffs+3);
+}
+//Force (without direction) of the softening kernel, divided by the distance
+static inline double MovingObjectPotentialSoftenedForce(double d2,
+							double * args){
+  double soft2= *(args+2) * *(args+2);
+  //Plummer softening is the only softening currently implemented
+  return pow(d2+soft2,-1.5);
+}
+double MovingObjectPotentialRforce(double R,double Z, double phi,
+				   double t,
+				   struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double xo, yo, zo, xd, yd, zd;
+  double cosphi= cos(phi);
+  double sinphi= sin(phi);
+  MovingObjectPotentialPosition(t,args,&xo,&yo,&zo);
+  xd= xo-R*cosphi;
+  yd= yo-R*sinphi;
+  zd= zo-Z;
+  return amp*(cosphi*xd+sinphi*yd)
+    *MovingObjectPotentialSoftenedForce(xd*xd+yd*yd+zd*zd,args);
+}
+double MovingObjectPotentialzforce(double R,double Z, double phi,
+				   double t,
+				   struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double xo, yo, zo, xd, yd, zd;
+  MovingObjectPotentialPosition(t,args,&xo,&yo,&zo);
+  xd= xo-R*cos(phi);
+  yd= yo-R*sin(phi);
+  zd= zo-Z;
+  return amp*zd*MovingObjectPotentialSoftenedForce(xd*xd+yd*yd+zd*zd,args);
+}
+double MovingObjectPotentialphiforce(double R,double Z, double phi,
+				     double t,
+				     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double xo, yo, zo, xd, yd, zd;
+  double cosphi= cos(phi);
+  double sinphi= sin(phi);
+  MovingObjectPotentialPosition(t,args,&xo,&yo,&zo);
+  xd= xo-R*cosphi;
+  yd= yo-R*sinphi;
+  zd= zo-Z;
+  return amp*R*(cosphi*yd-sinphi*xd)
+    *MovingObjectPotentialSoftenedForce(xd*xd+yd*yd+zd*zd,args);
+}
+double MovingObjectPotentialPlanarRforce(double R, double phi,
+					 double t,
+					 struct potentialArg * potentialArgs){
+  return MovingObjectPotentialRforce(R,0.,phi,t,potentialArgs);
+}
+double MovingObjectPotentialPlanarphiforce(double R, double phi,
+					   double t,
+					   struct potentialArg * potentialArgs){
+  return MovingObjectPotentialphiforce(R,0.,phi,t,potentialArgs);
+}
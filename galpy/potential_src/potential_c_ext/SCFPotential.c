@@ -0,0 +1,178 @@
+#include <math.h>
+#include <stdlib.h>
+#include <galpy_potentials.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+//SCFPotential
+//args: amp, a, N, L, isNonAxi, Acos (N x L x L, C order), and, if isNonAxi,
+//      Asin (N x L x L)
+//Evaluate the expansion: what=0: potential (out[0]); what=1: derivatives of
+//the potential with respect to r, theta, and phi (out[0,1,2]); what=2:
+//density (out[0])
+static void SCFExpand(double R,double z,double phi,int what,double * args,
+		      double * out){
+  double amp= *args;
+  double a= *(args+1);
+  int N= (int) *(args+2);
+  int L= (int) *(args+3);
+  int isNonAxi= (int) *(args+4);
+  double * Acos= args+5;
+  double * Asin= Acos+N*L*L;
+  int M= ( isNonAxi == 1 ) ? L : 1;
+  int n, l, m, indx;
+  double r= sqrt(R*R+z*z);
+  double s= r/a;
+  double xi= (s-1.)/(s+1.);
+  double costheta= ( r > 0. ) ? z/r : 1.;
+  double sintheta= ( r > 0. ) ? R/r : 0.;
+  double alpha, f, dfds= 0., Cn, Cnm1, Cnm2, En, Enm1, Enm2, val, dval= 0.;
+  double Pmm, dP, trig, dtrig;
+  //Associated Legendre functions up to l=L, m=L
+  double * P= (double *) malloc ( (L+1) * (L+1) * sizeof(double) );
+  //Sums over n of the radial functions x coefficients [L,M]
+  double * B= (double *) calloc ( 4 * L * M, sizeof(double) );
+  double * Bc= B, * Bs= B+L*M, * dBc= B+2*L*M, * dBs= B+3*L*M;
+  double * cosmphi= (double *) malloc ( M * sizeof(double) );
+  double * sinmphi= (double *) malloc ( M * sizeof(double) );
+  //Legendre functions, without the Condon-Shortley phase
+  Pmm= 1.;
+  for (m=0; m <= L; m++) {
+    if ( m > 0 ) Pmm*= (2.*m-1.)*sintheta;
+    for (l=0; l < m; l++) *(P+l*(L+1)+m)= 0.;
+    *(P+m*(L+1)+m)= Pmm;
+    if ( m+1 <= L ) *(P+(m+1)*(L+1)+m)= (2.*m+1.)*costheta*Pmm;
+    for (l=m+2; l <= L; l++)
+      *(P+l*(L+1)+m)= ((2.*l-1.)*costheta* *(P+(l-1)*(L+1)+m)
+		       -(l+m-1.)* *(P+(l-2)*(L+1)+m))/(l-m);
+  }
+  for (m=0; m < M; m++) {
+    *(cosmphi+m)= cos(m*phi);
+    *(sinmphi+m)= sin(m*phi);
+  }
+  //Radial functions, using the recurrence relation of the Gegenbauer
+  //polynomials C_n^alpha and dC_n^alpha/dxi = 2 alpha C_{n-1}^{alpha+1}
+  for (l=0; l < L; l++) {
+    alpha= 2.*l+1.5;
+    if ( what == 2 )
+      f= pow(s,l-1.)/pow(1.+s,2.*l+3.)/2./M_PI/a/a/a;
+    else
+      f= -pow(s,l)/pow(1.+s,2.*l+1.)/a;
+    if ( what == 1 ) {
+      if ( l == 0 )
+	dfds= 1./(1.+s)/(1.+s)/a;
+      else
+	dfds= -pow(s,l-1.)*(l-(l+1.)*s)/pow(1.+s,2.*l+2.)/a;
+    }
+    Cnm1= 0.;
+    Cn= 1.;
+    Enm1= 0.;
+    En= 0.;
+    for (n=0; n < N; n++) {
+      if ( n > 0 ) {
+	Cnm2= Cnm1;
+	Cnm1= Cn;
+	Cn= (2.*xi*(n+alpha-1.)*Cnm1-(n+2.*alpha-2.)*Cnm2)/n;
+	if ( n == 1 )
+	  En= 1.;
+	else {
+	  Enm2= Enm1;
+	  Enm1= En;
+	  En= (2.*xi*(n+alpha-1.)*Enm1-(n+2.*alpha-1.)*Enm2)/(n-1.);
+	}
+      }
+      if ( what == 2 )
+	val= (0.5*n*(n+4.*l+3.)+(l+1.)*(2.*l+1.))*f*Cn;
+      else
+	val= f*Cn;
+      if ( what == 1 )
+	dval= (dfds*Cn+f*2.*alpha*En*2./(1.+s)/(1.+s))/a;
+      for (m=0; m < M && m <= l; m++) {
+	indx= (n*L+l)*L+m;
+	*(Bc+l*M+m)+= val * *(Acos+indx);
+	if ( what == 1 ) *(dBc+l*M+m)+= dval * *(Acos+indx);
+	if ( isNonAxi == 1 ) {
+	  *(Bs+l*M+m)+= val * *(Asin+indx);
+	  if ( what == 1 ) *(dBs+l*M+m)+= dval * *(Asin+indx);
+	}
+      }
+    }
+  }
+  //Sum the angular parts
+  *out= 0.;
+  if ( what == 1 ) {
+    *(out+1)= 0.;
+    *(out+2)= 0.;
+  }
+  for (l=0; l < L; l++)
+    for (m=0; m < M && m <= l; m++) {
+      trig= *(Bc+l*M+m) * *(cosmphi+m) + *(Bs+l*M+m) * *(sinmphi+m);
+      if ( what != 1 ) {
+	*out+= *(P+l*(L+1)+m) * trig;
+	continue;
+      }
+      if ( m == 0 )
+	dP= -*(P+l*(L+1)+1);
+      else
+	dP= 0.5*((l+m)*(l-m+1.)* *(P+l*(L+1)+m-1) - *(P+l*(L+1)+m+1));
+      dtrig= *(dBc+l*M+m) * *(cosmphi+m) + *(dBs+l*M+m) * *(sinmphi+m);
+      *out+= *(P+l*(L+1)+m) * dtrig;
+      *(out+1)+= dP * trig;
+      *(out+2)+= m * *(P+l*(L+1)+m) * ( *(Bs+l*M+m) * *(cosmphi+m)
+					 - *(Bc+l*M+m) * *(sinmphi+m) );
+    }
+  *out*= amp;
+  if ( what == 1 ) {
+    *(out+1)*= amp;
+    *(out+2)*= amp;
+  }
+  free(P);
+  free(B);
+  free(cosmphi);
+  free(sinmphi);
+}
+double SCFPotentialEval(double R,double z, double phi,
+			double t,
+			struct potentialArg * potentialArgs){
+  double out;
+  SCFExpand(R,z,phi,0,potentialArgs->args,&out);
+  return out;
+}
+double SCFPotentialRforce(double R,double z, double phi,
+			  double t,
+			  struct potentialArg * potentialArgs){
+  double r= sqrt(R*R+z*z), out[3];
+  SCFExpand(R,z,phi,1,potentialArgs->args,out);
+  if ( r == 0. ) return 0.;
+  return -(R * *out + z * *(out+1) / r) / r;
+}
+double SCFPotentialzforce(double R,double z, double phi,
+			  double t,
+			  struct potentialArg * potentialArgs){
+  double r= sqrt(R*R+z*z), out[3];
+  SCFExpand(R,z,phi,1,potentialArgs->args,out);
+  if ( r == 0. ) return -*out;
+  return -(z * *out - R * *(out+1) / r) / r;
+}
+double SCFPotentialphiforce(double R,double z, double phi,
+			    double t,
+			    struct potentialArg * potentialArgs){
+  double out[3];
+  SCFExpand(R,z,phi,1,potentialArgs->args,out);
+  return -*(out+2);
+}
+double SCFPotentialPlanarRforce(double R,double phi,double t,
+				struct potentialArg * potentialArgs){
+  return SCFPotentialRforce(R,0.,phi,t,potentialArgs);
+}
+double SCFPotentialPlanarphiforce(double R,double phi,double t,
+				  struct potentialArg * potentialArgs){
+  return SCFPotentialphiforce(R,0.,phi,t,potentialArgs);
+}
+double SCFPotentialDens(double R,double z, double phi,
+			double t,
+			struct potentialArg * potentialArgs){
+  double out;
+  SCFExpand(R,z,phi,2,potentialArgs->args,&out);
+  return out;
+}
@@ -0,0 +1,30 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//SphericalPotential: 3D second derivatives of a spherical potential Phi(r),
+//obtained from the planar forces and second derivatives set up for the
+//spherical potential (the planar kernels evaluated at R=r give -dPhi/dr and
+//d^2Phi/dr^2)
+double SphericalPotentialR2deriv(double R,double Z,double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double r= sqrt(R*R+Z*Z);
+  double dPhidr= -potentialArgs->planarRforce(r,0.,t,potentialArgs);
+  double d2Phidr2= potentialArgs->planarR2deriv(r,0.,t,potentialArgs);
+  return R*R/r/r * d2Phidr2 + Z*Z/r/r/r * dPhidr;
+}
+double SphericalPotentialz2deriv(double R,double Z,double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double r= sqrt(R*R+Z*Z);
+  double dPhidr= -potentialArgs->planarRforce(r,0.,t,potentialArgs);
+  double d2Phidr2= potentialArgs->planarR2deriv(r,0.,t,potentialArgs);
+  return Z*Z/r/r * d2Phidr2 + R*R/r/r/r * dPhidr;
+}
+double SphericalPotentialRzderiv(double R,double Z,double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double r= sqrt(R*R+Z*Z);
+  double dPhidr= -potentialArgs->planarRforce(r,0.,t,potentialArgs);
+  double d2Phidr2= potentialArgs->planarR2deriv(r,0.,t,potentialArgs);
+  return R*Z/r/r * ( d2Phidr2 - dPhidr / r );
+}
@@ -24,12 +24,22 @@ struct potentialArg{
 		      struct potentialArg *);
   double (*Rphideriv)(double R,double Z,double phi, double t,
 		      struct potentialArg *);
+  double (*z2deriv)(double R,double Z,double phi, double t,
+		    struct potentialArg *);
+  double (*Rzderiv)(double R,double Z,double phi, double t,
+		    struct potentialArg *);
+  double (*phizderiv)(double R,double Z,double phi, double t,
+		      struct potentialArg *);
   double (*planarR2deriv)(double R,double phi, double t,
 			  struct potentialArg *);
   double (*planarphi2deriv)(double R,double phi, double t,
 			    struct potentialArg *);
   double (*planarRphideriv)(double R,double phi, double t,
 			    struct potentialArg *);
+  double (*linearForce)(double x, double t,
+			struct potentialArg *);
+  double (*dens)(double R,double Z,double phi, double t,
+		 struct potentialArg *);
   int nargs;
   double * args;
   interp_2d * i2d;
@@ -41,6 +51,8 @@ struct potentialArg{
   interp_2d * i2dzforce;
   gsl_interp_accel * accxzforce;
   gsl_interp_accel * accyzforce;
+  int nwrapped;
+  struct potentialArg * wrappedPotentialArg;
 };
 /*
   Function declarations
@@ -61,6 +73,12 @@ double LogarithmicHaloPotentialzforce(double,double,double,double,
 				    struct potentialArg *);
 double LogarithmicHaloPotentialPlanarR2deriv(double ,double, double,
 				    struct potentialArg *);
+double LogarithmicHaloPotentialR2deriv(double,double,double,double,
+				       struct potentialArg *);
+double LogarithmicHaloPotentialz2deriv(double,double,double,double,
+				       struct potentialArg *);
+double LogarithmicHaloPotentialRzderiv(double,double,double,double,
+				       struct potentialArg *);
 //DehnenBarPotential
 double DehnenBarPotentialRforce(double,double,double,
 				struct potentialArg *);
@@ -104,6 +122,12 @@ double MiyamotoNagaiPotentialzforce(double,double,double,double,
 				    struct potentialArg *);
 double MiyamotoNagaiPotentialPlanarR2deriv(double ,double, double,
 					   struct potentialArg *);
+double MiyamotoNagaiPotentialR2deriv(double,double,double,double,
+				     struct potentialArg *);
+double MiyamotoNagaiPotentialz2deriv(double,double,double,double,
+				     struct potentialArg *);
+double MiyamotoNagaiPotentialRzderiv(double,double,double,double,
+				     struct potentialArg *);
 //LopsidedDiskPotential
 double LopsidedDiskPotentialRforce(double,double,double,
 					   struct potentialArg *);
@@ -168,6 +192,10 @@ double DoubleExponentialDiskPotentialPlanarRforce(double,double,double,
 						  struct potentialArg *);
 double DoubleExponentialDiskPotentialzforce(double,double, double,double,
 					    struct potentialArg *);
+void DoubleExponentialDiskPotential_quad_array(int,double *,double *,int,
+					       double,double,double,int,int,
+					       double *,double *,double *,
+					       double *);
 //FlattenedPowerPotential
 double FlattenedPowerPotentialEval(double,double,double,double,
 				   struct potentialArg *);
@@ -179,6 +207,12 @@ double FlattenedPowerPotentialzforce(double,double,double,double,
 				     struct potentialArg *);
 double FlattenedPowerPotentialPlanarR2deriv(double,double,double,
 					    struct potentialArg *);
+double FlattenedPowerPotentialR2deriv(double,double,double,double,
+				      struct potentialArg *);
+double FlattenedPowerPotentialz2deriv(double,double,double,double,
+				      struct potentialArg *);
+double FlattenedPowerPotentialRzderiv(double,double,double,double,
+				      struct potentialArg *);
 //interpRZPotential
 double interpRZPotentialEval(double ,double , double, double,
 			     struct potentialArg *);
@@ -186,6 +220,12 @@ double interpRZPotentialRforce(double ,double , double, double,
 			       struct potentialArg *);
 double interpRZPotentialzforce(double ,double , double, double,
 			       struct potentialArg *);
+double interpRZPotentialKnotsEval(double ,double , double, double,
+				  struct potentialArg *);
+double interpRZPotentialKnotsRforce(double ,double , double, double,
+				    struct potentialArg *);
+double interpRZPotentialKnotszforce(double ,double , double, double,
+				    struct potentialArg *);
 //IsochronePotential
 double IsochronePotentialEval(double ,double , double, double,
 			      struct potentialArg *);
@@ -219,6 +259,12 @@ double KuzminKutuzovStaeckelPotentialzforce(double,double,double,double,
 				        struct potentialArg *);
 double KuzminKutuzovStaeckelPotentialPlanarR2deriv(double,double,double,
 					    struct potentialArg *);
+double KuzminKutuzovStaeckelPotentialR2deriv(double,double,double,double,
+					     struct potentialArg *);
+double KuzminKutuzovStaeckelPotentialz2deriv(double,double,double,double,
+					     struct potentialArg *);
+double KuzminKutuzovStaeckelPotentialRzderiv(double,double,double,double,
+					     struct potentialArg *);
 
 //KuzminDiskPotential
 double KuzminDiskPotentialEval(double,double,double,double,
@@ -231,6 +277,12 @@ double KuzminDiskPotentialzforce(double,double,double,double,
 				        struct potentialArg *);
 double KuzminDiskPotentialPlanarR2deriv(double,double,double, 
 					    struct potentialArg *);
+double KuzminDiskPotentialR2deriv(double,double,double,double,
+				  struct potentialArg *);
+double KuzminDiskPotentialz2deriv(double,double,double,double,
+				  struct potentialArg *);
+double KuzminDiskPotentialRzderiv(double,double,double,double,
+				  struct potentialArg *);
 //PlummerPotential
 double PlummerPotentialEval(double,double,double,double,
                         struct potentialArg *);
@@ -264,4 +316,126 @@ double BurkertPotentialzforce(double,double,double,double,
 				       struct potentialArg *);
 double BurkertPotentialPlanarR2deriv(double,double,double,
 					      struct potentialArg *);
+//MovingObjectPotential
+double MovingObjectPotentialRforce(double,double,double,double,
+				   struct potentialArg *);
+double MovingObjectPotentialzforce(double,double,double,double,
+				   struct potentialArg *);
+double MovingObjectPotentialphiforce(double,double,double,double,
+				     struct potentialArg *);
+double MovingObjectPotentialPlanarRforce(double,double,double,
+					 struct potentialArg *);
+double MovingObjectPotentialPlanarphiforce(double,double,double,
+					   struct potentialArg *);
+//SCFPotential
+double SCFPotentialEval(double,double,double,double,
+			struct potentialArg *);
+double SCFPotentialRforce(double,double,double,double,
+			  struct potentialArg *);
+double SCFPotentialzforce(double,double,double,double,
+			  struct potentialArg *);
+double SCFPotentialphiforce(double,double,double,double,
+			    struct potentialArg *);
+double SCFPotentialPlanarRforce(double,double,double,
+				struct potentialArg *);
+double SCFPotentialPlanarphiforce(double,double,double,
+				  struct potentialArg *);
+double SCFPotentialDens(double,double,double,double,
+			struct potentialArg *);
+//DiskMultipolePotential
+double DiskMultipolePotentialEval(double,double,double,double,
+				  struct potentialArg *);
+double DiskMultipolePotentialRforce(double,double,double,double,
+				    struct potentialArg *);
+double DiskMultipolePotentialzforce(double,double,double,double,
+				    struct potentialArg *);
+double DiskMultipolePotentialPlanarRforce(double,double,double,
+					  struct potentialArg *);
+//interp3DPotential
+double interp3DPotentialEval(double,double,double,double,
+			     struct potentialArg *);
+double interp3DPotentialRforce(double,double,double,double,
+			       struct potentialArg *);
+double interp3DPotentialzforce(double,double,double,double,
+			       struct potentialArg *);
+double interp3DPotentialphiforce(double,double,double,double,
+				 struct potentialArg *);
+double interp3DPotentialR2deriv(double,double,double,double,
+				struct potentialArg *);
+double interp3DPotentialz2deriv(double,double,double,double,
+				struct potentialArg *);
+double interp3DPotentialRzderiv(double,double,double,double,
+				struct potentialArg *);
+double interp3DPotentialphi2deriv(double,double,double,double,
+				  struct potentialArg *);
+double interp3DPotentialRphideriv(double,double,double,double,
+				  struct potentialArg *);
+double interp3DPotentialphizderiv(double,double,double,double,
+				  struct potentialArg *);
+double interp3DPotentialPlanarRforce(double,double,double,
+				     struct potentialArg *);
+double interp3DPotentialPlanarphiforce(double,double,double,
+				       struct potentialArg *);
+double interp3DPotentialPlanarR2deriv(double,double,double,
+				      struct potentialArg *);
+double interp3DPotentialPlanarphi2deriv(double,double,double,
+					struct potentialArg *);
+double interp3DPotentialPlanarRphideriv(double,double,double,
+					struct potentialArg *);
+//interpRZTimeSeriesPotential
+double interpRZTimeSeriesPotentialEval(double,double,double,double,
+				       struct potentialArg *);
+double interpRZTimeSeriesPotentialRforce(double,double,double,double,
+					 struct potentialArg *);
+double interpRZTimeSeriesPotentialzforce(double,double,double,double,
+					 struct potentialArg *);
+double interpRZTimeSeriesPotentialR2deriv(double,double,double,double,
+					  struct potentialArg *);
+double interpRZTimeSeriesPotentialz2deriv(double,double,double,double,
+					  struct potentialArg *);
+double interpRZTimeSeriesPotentialRzderiv(double,double,double,double,
+					  struct potentialArg *);
+double interpRZTimeSeriesPotentialPlanarRforce(double,double,double,
+					       struct potentialArg *);
+double interpRZTimeSeriesPotentialPlanarR2deriv(double,double,double,
+						struct potentialArg *);
+//interpSphericalPotential
+double interpSphericalPotentialEval(double,double,double,double,
+				    struct potentialArg *);
+double interpSphericalPotentialRforce(double,double,double,double,
+				      struct potentialArg *);
+double interpSphericalPotentialzforce(double,double,double,double,
+				      struct potentialArg *);
+double interpSphericalPotentialR2deriv(double,double,double,double,
+				       struct potentialArg *);
+double interpSphericalPotentialz2deriv(double,double,double,double,
+				       struct potentialArg *);
+double interpSphericalPotentialRzderiv(double,double,double,double,
+				       struct potentialArg *);
+double interpSphericalPotentialDens(double,double,double,double,
+				    struct potentialArg *);
+double interpSphericalPotentialPlanarRforce(double,double,double,
+					    struct potentialArg *);
+double interpSphericalPotentialPlanarR2deriv(double,double,double,
+					     struct potentialArg *);
+//FullPotentialFromplanarPotential
+double FullPotentialFromplanarPotentialRforce(double,double,double,double,
+					      struct potentialArg *);
+double FullPotentialFromplanarPotentialphiforce(double,double,double,double,
+						struct potentialArg *);
+double FullPotentialFromplanarPotentialR2deriv(double,double,double,double,
+					       struct potentialArg *);
+double FullPotentialFromplanarPotentialphi2deriv(double,double,double,double,
+						 struct potentialArg *);
+double FullPotentialFromplanarPotentialRphideriv(double,double,double,double,
+						 struct potentialArg *);
+//SphericalPotential: second derivatives of spherical potentials in 3D
+double SphericalPotentialR2deriv(double,double,double,double,
+				 struct potentialArg *);
+double SphericalPotentialz2deriv(double,double,double,double,
+				 struct potentialArg *);
+double SphericalPotentialRzderiv(double,double,double,double,
+				 struct potentialArg *);
+//KGPotential
+double KGPotentialLinearForce(double,double,struct potentialArg *);
 #endif /* galpy_potentials.h */
@@ -0,0 +1,202 @@
+#include <math.h>
+#include <galpy_potentials.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+//interp3DPotential
+//args: amp, logR, zsym, nR, nphi, nz, nt, R0, dR, z0, dz, t0, dt, and the
+//      tricubic B-spline coefficients (nt x nR+2 x nphi x nz+2, C order);
+//      the grid of nR x nphi x nz points is regular in R (or log R), phi
+//      (periodic, starting at zero), and z; in time the potential is
+//      linearly interpolated between slices
+static inline long interp3DPeriodicIndex(long ii,long n){
+  ii%= n;
+  return ( ii < 0 ) ? ii+n : ii;
+}
+//Cubic B-spline weights (or their first or second derivatives) of the
+//four coefficients indx,...,indx+3 that contribute at x (in units of the
+//grid spacing); if nmax >= 0, the interval is limited to [0,nmax]
+static void interp3DWeights(double x,int order,long nmax,
+			    long * indx,double * w){
+  long ii= (long) floor(x);
+  double u, um;
+  if ( nmax >= 0 ) {
+    if ( ii < 0 ) ii= 0;
+    if ( ii > nmax ) ii= nmax;
+  }
+  u= x-ii;
+  um= 1.-u;
+  *indx= ii;
+  switch ( order ) {
+  case 0:
+    *w= um*um*um/6.;
+    *(w+1)= (3.*u*u*u-6.*u*u+4.)/6.;
+    *(w+2)= (-3.*u*u*u+3.*u*u+3.*u+1.)/6.;
+    *(w+3)= u*u*u/6.;
+    break;
+  case 1:
+    *w= -0.5*um*um;
+    *(w+1)= 1.5*u*u-2.*u;
+    *(w+2)= -1.5*u*u+u+0.5;
+    *(w+3)= 0.5*u*u;
+    break;
+  case 2:
+    *w= um;
+    *(w+1)= 3.*u-2.;
+    *(w+2)= 1.-3.*u;
+    *(w+3)= u;
+    break;
+  }
+}
+//Derivative of order (oR,ophi,oz) of the interpolated potential with
+//respect to (R or log R, phi, z)
+static double interp3DEval(double R,double z,double phi,double t,
+			   int oR,int ophi,int oz,double * args){
+  double amp= *args;
+  int logR= (int) *(args+1);
+  int zsym= (int) *(args+2);
+  long nR= (long) *(args+3);
+  long nphi= (long) *(args+4);
+  long nz= (long) *(args+5);
+  long nt= (long) *(args+6);
+  double R0= *(args+7);
+  double dR= *(args+8);
+  double z0= *(args+9);
+  double dz= *(args+10);
+  double t0= *(args+11);
+  double dt= *(args+12);
+  double * coeffs= args+13;
+  double * slice;
+  double dphi= 2.*M_PI/nphi;
+  long iR, iphi, iz, iphis[4];
+  double wR[4], wphi[4], wz[4];
+  double x, zz, xt, ft= 0., out= 0., slice_out, wRphi;
+  long it= 0, kk, ii, jj, ll, nslice= 1;
+  //R
+  if ( logR == 1 )
+    x= ( R > 0. ) ? log(R): -20.72326583694641;
+  else
+    x= R;
+  interp3DWeights((x-R0)/dR,oR,nR-2,&iR,wR);
+  //phi
+  x= fmod(phi,2.*M_PI);
+  if ( x < 0. ) x+= 2.*M_PI;
+  interp3DWeights(x/dphi,ophi,-1,&iphi,wphi);
+  //z
+  zz= ( zsym == 1 ) ? fabs(z) : z;
+  interp3DWeights((zz-z0)/dz,oz,nz-2,&iz,wz);
+  for (kk=0; kk < 4; kk++) {
+    *(iphis+kk)= interp3DPeriodicIndex(iphi+kk-1,nphi);
+    *(wR+kk)/= pow(dR,oR);
+    *(wphi+kk)/= pow(dphi,ophi);
+    *(wz+kk)/= pow(dz,oz);
+  }
+  //t: linear interpolation between the slices, constant outside
+  if ( nt > 1 ) {
+    xt= (t-t0)/dt;
+    if ( xt < 0. ) xt= 0.;
+    if ( xt > nt-1 ) xt= nt-1;
+    it= (long) floor(xt);
+    if ( it > nt-2 ) it= nt-2;
+    ft= xt-it;
+    nslice= 2;
+  }
+  for (kk=0; kk < nslice; kk++) {
+    slice= coeffs+(it+kk)*(nR+2)*nphi*(nz+2);
+    slice_out= 0.;
+    for (ii=0; ii < 4; ii++)
+      for (jj=0; jj < 4; jj++) {
+	wRphi= *(wR+ii) * *(wphi+jj);
+	for (ll=0; ll < 4; ll++)
+	  slice_out+= *(slice+((iR+ii)*nphi+*(iphis+jj))*(nz+2)+iz+ll)
+	    * wRphi * *(wz+ll);
+      }
+    out+= ( kk == 0 ) ? (1.-ft) * slice_out : ft * slice_out;
+  }
+  if ( zsym == 1 && oz % 2 == 1 && z < 0. )
+    out*= -1.;
+  return amp * out;
+}
+//R derivative, taking care of the chain rule for log R
+static double interp3DRderiv(double R,double z,double phi,double t,
+			     int ophi,int oz,double * args){
+  if ( (int) *(args+1) == 1 )
+    return interp3DEval(R,z,phi,t,1,ophi,oz,args)/R;
+  else
+    return interp3DEval(R,z,phi,t,1,ophi,oz,args);
+}
+double interp3DPotentialEval(double R,double z, double phi,
+			     double t,
+			     struct potentialArg * potentialArgs){
+  return interp3DEval(R,z,phi,t,0,0,0,potentialArgs->args);
+}
+double interp3DPotentialRforce(double R,double z, double phi,
+			       double t,
+			       struct potentialArg * potentialArgs){
+  return -interp3DRderiv(R,z,phi,t,0,0,potentialArgs->args);
+}
+double interp3DPotentialPlanarRforce(double R,double phi,double t,
+				     struct potentialArg * potentialArgs){
+  return -interp3DRderiv(R,0.,phi,t,0,0,potentialArgs->args);
+}
+double interp3DPotentialzforce(double R,double z, double phi,
+			       double t,
+			       struct potentialArg * potentialArgs){
+  return -interp3DEval(R,z,phi,t,0,0,1,potentialArgs->args);
+}
+double interp3DPotentialphiforce(double R,double z, double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  return -interp3DEval(R,z,phi,t,0,1,0,potentialArgs->args);
+}
+double interp3DPotentialPlanarphiforce(double R,double phi,double t,
+				       struct potentialArg * potentialArgs){
+  return -interp3DEval(R,0.,phi,t,0,1,0,potentialArgs->args);
+}
+double interp3DPotentialR2deriv(double R,double z, double phi,
+				double t,
+				struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  if ( (int) *(args+1) == 1 )
+    return (interp3DEval(R,z,phi,t,2,0,0,args)
+	    -interp3DEval(R,z,phi,t,1,0,0,args))/R/R;
+  else
+    return interp3DEval(R,z,phi,t,2,0,0,args);
+}
+double interp3DPotentialPlanarR2deriv(double R,double phi,double t,
+				      struct potentialArg * potentialArgs){
+  return interp3DPotentialR2deriv(R,0.,phi,t,potentialArgs);
+}
+double interp3DPotentialz2deriv(double R,double z, double phi,
+				double t,
+				struct potentialArg * potentialArgs){
+  return interp3DEval(R,z,phi,t,0,0,2,potentialArgs->args);
+}
+double interp3DPotentialRzderiv(double R,double z, double phi,
+				double t,
+				struct potentialArg * potentialArgs){
+  return interp3DRderiv(R,z,phi,t,0,1,potentialArgs->args);
+}
+double interp3DPotentialphi2deriv(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return interp3DEval(R,z,phi,t,0,2,0,potentialArgs->args);
+}
+double interp3DPotentialPlanarphi2deriv(double R,double phi,double t,
+					struct potentialArg * potentialArgs){
+  return interp3DEval(R,0.,phi,t,0,2,0,potentialArgs->args);
+}
+double interp3DPotentialRphideriv(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return interp3DRderiv(R,z,phi,t,1,0,potentialArgs->args);
+}
+double interp3DPotentialphizderiv(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return interp3DEval(R,z,phi,t,0,1,1,potentialArgs->args);
+}
+double interp3DPotentialPlanarRphideriv(double R,double phi,double t,
+					struct potentialArg * potentialArgs){
+  return interp3DRderiv(R,0.,phi,t,1,0,potentialArgs->args);
+}
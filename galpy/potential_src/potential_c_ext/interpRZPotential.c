@@ -61,3 +61,74 @@ double interpRZPotentialzforce(double R,double z, double phi,
 					      potentialArgs->accxzforce,
 					      potentialArgs->accyzforce);
 }
+//interpRZPotential on a non-uniform grid, evaluated as a tensor-product
+//cubic B-spline with general knots (the representation of
+//scipy.interpolate.RectBivariateSpline)
+//args: amp, logR, zsym, ntR, ntz, the knots in (log) R and z, and one or
+//      two sets of (ntR-4) x (ntz-4) coefficients
+//Find the knot interval and the four non-zero cubic B-splines at x
+//(de Boor's recursion, as in FITPACK's fpbspl)
+static int interpRZKnotsBasis(double x,double * t,int n,double * h){
+  int lo= 3, hi= n-5, mid, ii, jj;
+  double hh[3], f;
+  if ( x < *(t+3) ) x= *(t+3);
+  if ( x > *(t+n-4) ) x= *(t+n-4);
+  while ( lo < hi ) {
+    mid= (lo+hi+1)/2;
+    if ( x >= *(t+mid) ) lo= mid;
+    else hi= mid-1;
+  }
+  *h= 1.;
+  for (jj=1; jj < 4; jj++) {
+    for (ii=0; ii < jj; ii++)
+      *(hh+ii)= *(h+ii);
+    *h= 0.;
+    for (ii=1; ii <= jj; ii++) {
+      f= *(hh+ii-1) / ( *(t+lo+ii) - *(t+lo+ii-jj) );
+      *(h+ii-1)+= f * ( *(t+lo+ii) - x );
+      *(h+ii)= f * ( x - *(t+lo+ii-jj) );
+    }
+  }
+  return lo-3;
+}
+//Evaluate coefficient set iset
+static double interpRZKnotsEval(double R,double z,int iset,double * args){
+  double amp= *args;
+  int logR= (int) *(args+1);
+  int zsym= (int) *(args+2);
+  int ntR= (int) *(args+3);
+  int ntz= (int) *(args+4);
+  double * tR= args+5;
+  double * tz= tR+ntR;
+  double * coeffs= tz+ntz+iset*(ntR-4)*(ntz-4);
+  double x, hR[4], hz[4], out= 0.;
+  int iR, iz, ii, jj;
+  if ( logR == 1 )
+    x= ( R > 0. ) ? log(R): -20.72326583694641;
+  else
+    x= R;
+  iR= interpRZKnotsBasis(x,tR,ntR,hR);
+  iz= interpRZKnotsBasis(( zsym == 1 ) ? fabs(z) : z,tz,ntz,hz);
+  for (ii=0; ii < 4; ii++)
+    for (jj=0; jj < 4; jj++)
+      out+= *(coeffs+(iR+ii)*(ntz-4)+iz+jj) * *(hR+ii) * *(hz+jj);
+  return amp * out;
+}
+double interpRZPotentialKnotsEval(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return interpRZKnotsEval(R,z,0,potentialArgs->args);
+}
+double interpRZPotentialKnotsRforce(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  return interpRZKnotsEval(R,z,0,potentialArgs->args);
+}
+double interpRZPotentialKnotszforce(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  if ( (int) *(potentialArgs->args+2) == 1 && z < 0. )
+    return -interpRZKnotsEval(R,z,1,potentialArgs->args);
+  else
+    return interpRZKnotsEval(R,z,1,potentialArgs->args);
+}
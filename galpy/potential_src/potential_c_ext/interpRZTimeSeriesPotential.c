@@ -0,0 +1,205 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//interpRZTimeSeriesPotential
+//args: amp, logR, zsym, nR, nz, nt, tinterp, R0, dR, z0, dz, the times
+//      (nt), and the bicubic B-spline coefficients (nt x nR+2 x nz+2, C
+//      order); the grid of nR x nz points is regular in R (or log R) and z;
+//      in time the potential is interpolated linearly (tinterp=0) or using
+//      piecewise-cubic Hermite interpolation (tinterp=1) between the slices
+//Cubic B-spline weights (or their first or second derivatives) of the
+//four coefficients indx,...,indx+3 that contribute at x (in units of the
+//grid spacing), with the interval limited to [0,nmax]
+static void interpRZTimeSeriesWeights(double x,int order,long nmax,
+				      long * indx,double * w){
+  long ii= (long) floor(x);
+  double u, um;
+  if ( ii < 0 ) ii= 0;
+  if ( ii > nmax ) ii= nmax;
+  u= x-ii;
+  um= 1.-u;
+  *indx= ii;
+  switch ( order ) {
+  case 0:
+    *w= um*um*um/6.;
+    *(w+1)= (3.*u*u*u-6.*u*u+4.)/6.;
+    *(w+2)= (-3.*u*u*u+3.*u*u+3.*u+1.)/6.;
+    *(w+3)= u*u*u/6.;
+    break;
+  case 1:
+    *w= -0.5*um*um;
+    *(w+1)= 1.5*u*u-2.*u;
+    *(w+2)= -1.5*u*u+u+0.5;
+    *(w+3)= 0.5*u*u;
+    break;
+  case 2:
+    *w= um;
+    *(w+1)= 3.*u-2.;
+    *(w+2)= 1.-3.*u;
+    *(w+3)= u;
+    break;
+  }
+}
+//Add the weights of the values at k-1, k, and k+1 (stored in w at
+//offsets -1, 0, and 1) in the three-point estimate of the time
+//derivative at ts[k] (one-sided at the ends), multiplied by fac
+static void interpRZTimeSeriesSlope(long k,long nt,double * ts,double fac,
+				    double * w){
+  double hm, hp, am, ap;
+  if ( k == 0 ) {
+    hp= *(ts+1) - *ts;
+    *w-= fac / hp;
+    *(w+1)+= fac / hp;
+    return;
+  }
+  if ( k == nt-1 ) {
+    hm= *(ts+nt-1) - *(ts+nt-2);
+    *(w-1)-= fac / hm;
+    *w+= fac / hm;
+    return;
+  }
+  hm= *(ts+k) - *(ts+k-1);
+  hp= *(ts+k+1) - *(ts+k);
+  am= hp / ( hm + hp ) / hm;
+  ap= hm / ( hm + hp ) / hp;
+  *(w-1)-= fac * am;
+  *w+= fac * ( am - ap );
+  *(w+1)+= fac * ap;
+}
+//Indices and weights of the four time slices it-1,...,it+2 that contribute
+//at time t (constant outside of the time range)
+static void interpRZTimeSeriesTimeWeights(double t,long nt,double * ts,
+					  int tinterp,long * it,double * w){
+  long lo, hi, mid, kk;
+  double h, u;
+  for (kk=0; kk < 4; kk++) *(w+kk)= 0.;
+  if ( nt == 1 ) {
+    *it= 0;
+    *(w+1)= 1.;
+    return;
+  }
+  if ( t < *ts ) t= *ts;
+  if ( t > *(ts+nt-1) ) t= *(ts+nt-1);
+  lo= 0;
+  hi= nt-1;
+  while ( hi - lo > 1 ) {
+    mid= ( lo + hi ) / 2;
+    if ( *(ts+mid) <= t ) lo= mid;
+    else hi= mid;
+  }
+  *it= lo;
+  h= *(ts+lo+1) - *(ts+lo);
+  u= ( t - *(ts+lo) ) / h;
+  if ( tinterp == 0 ) {
+    *(w+1)= 1.-u;
+    *(w+2)= u;
+    return;
+  }
+  //Cubic Hermite, with the slopes linear combinations of the values
+  *(w+1)= (1.+2.*u)*(1.-u)*(1.-u);
+  *(w+2)= u*u*(3.-2.*u);
+  interpRZTimeSeriesSlope(lo,nt,ts,u*(1.-u)*(1.-u)*h,w+1);
+  interpRZTimeSeriesSlope(lo+1,nt,ts,u*u*(u-1.)*h,w+2);
+}
+//Derivative of order (oR,oz) of the interpolated potential with respect
+//to (R or log R, z)
+static double interpRZTimeSeriesEval(double R,double z,double t,
+				     int oR,int oz,double * args){
+  double amp= *args;
+  int logR= (int) *(args+1);
+  int zsym= (int) *(args+2);
+  long nR= (long) *(args+3);
+  long nz= (long) *(args+4);
+  long nt= (long) *(args+5);
+  int tinterp= (int) *(args+6);
+  double R0= *(args+7);
+  double dR= *(args+8);
+  double z0= *(args+9);
+  double dz= *(args+10);
+  double * ts= args+11;
+  double * coeffs= args+11+nt;
+  double * slice;
+  long iR, iz, it, islice, kk, ii, ll;
+  double wR[4], wz[4], wt[4];
+  double x, zz, out= 0., slice_out;
+  //R
+  if ( logR == 1 )
+    x= ( R > 0. ) ? log(R): -20.72326583694641;
+  else
+    x= R;
+  interpRZTimeSeriesWeights((x-R0)/dR,oR,nR-2,&iR,wR);
+  //z
+  zz= ( zsym == 1 ) ? fabs(z) : z;
+  interpRZTimeSeriesWeights((zz-z0)/dz,oz,nz-2,&iz,wz);
+  for (kk=0; kk < 4; kk++) {
+    *(wR+kk)/= pow(dR,oR);
+    *(wz+kk)/= pow(dz,oz);
+  }
+  //t
+  interpRZTimeSeriesTimeWeights(t,nt,ts,tinterp,&it,wt);
+  for (kk=0; kk < 4; kk++) {
+    if ( *(wt+kk) == 0. ) continue;
+    islice= it+kk-1;
+    if ( islice < 0 ) islice= 0;
+    if ( islice > nt-1 ) islice= nt-1;
+    slice= coeffs+islice*(nR+2)*(nz+2);
+    slice_out= 0.;
+    for (ii=0; ii < 4; ii++)
+      for (ll=0; ll < 4; ll++)
+	slice_out+= *(slice+(iR+ii)*(nz+2)+iz+ll) * *(wR+ii) * *(wz+ll);
+    out+= *(wt+kk) * slice_out;
+  }
+  if ( zsym == 1 && oz % 2 == 1 && z < 0. )
+    out*= -1.;
+  return amp * out;
+}
+//R derivative, taking care of the chain rule for log R
+static double interpRZTimeSeriesRderiv(double R,double z,double t,int oz,
+				       double * args){
+  if ( (int) *(args+1) == 1 )
+    return interpRZTimeSeriesEval(R,z,t,1,oz,args)/R;
+  else
+    return interpRZTimeSeriesEval(R,z,t,1,oz,args);
+}
+double interpRZTimeSeriesPotentialEval(double R,double z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  return interpRZTimeSeriesEval(R,z,t,0,0,potentialArgs->args);
+}
+double interpRZTimeSeriesPotentialRforce(double R,double z, double phi,
+					 double t,
+					 struct potentialArg * potentialArgs){
+  return -interpRZTimeSeriesRderiv(R,z,t,0,potentialArgs->args);
+}
+double interpRZTimeSeriesPotentialPlanarRforce(double R,double phi,double t,
+					       struct potentialArg * potentialArgs){
+  return -interpRZTimeSeriesRderiv(R,0.,t,0,potentialArgs->args);
+}
+double interpRZTimeSeriesPotentialzforce(double R,double z, double phi,
+					 double t,
+					 struct potentialArg * potentialArgs){
+  return -interpRZTimeSeriesEval(R,z,t,0,1,potentialArgs->args);
+}
+double interpRZTimeSeriesPotentialR2deriv(double R,double z, double phi,
+					  double t,
+					  struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  if ( (int) *(args+1) == 1 )
+    return (interpRZTimeSeriesEval(R,z,t,2,0,args)
+	    -interpRZTimeSeriesEval(R,z,t,1,0,args))/R/R;
+  else
+    return interpRZTimeSeriesEval(R,z,t,2,0,args);
+}
+double interpRZTimeSeriesPotentialPlanarR2deriv(double R,double phi,double t,
+						struct potentialArg * potentialArgs){
+  return interpRZTimeSeriesPotentialR2deriv(R,0.,phi,t,potentialArgs);
+}
+double interpRZTimeSeriesPotentialz2deriv(double R,double z, double phi,
+					  double t,
+					  struct potentialArg * potentialArgs){
+  return interpRZTimeSeriesEval(R,z,t,0,2,potentialArgs->args);
+}
+double interpRZTimeSeriesPotentialRzderiv(double R,double z, double phi,
+					  double t,
+					  struct potentialArg * potentialArgs){
+  return interpRZTimeSeriesRderiv(R,z,t,1,potentialArgs->args);
+}
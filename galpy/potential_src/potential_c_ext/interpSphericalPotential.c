@@ -0,0 +1,122 @@
+#include <math.h>
+#include <galpy_potentials.h>
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+//interpSphericalPotential
+//args: amp, nr, log rmin, dlog r, Phi(rmin), dPhi/dr(rmin), Phi(rmax),
+//      dPhi/dr(rmax), and the coefficients of the quintic polynomials in
+//      t= (log r - log r_i) / dlog r in each interval ((nr-1) x 6)
+//Phi, dPhi/dr, and d^2Phi/dr^2 at spherical radius r
+static void interpSphericalEval(double r,double * args,double * phi,
+				double * dphidr,double * d2phidr2){
+  int nr= (int) *(args+1);
+  double lnrmin= *(args+2);
+  double dlnr= *(args+3);
+  double rmin= exp(lnrmin);
+  double rmax= exp(lnrmin+dlnr*(nr-1));
+  double * c;
+  double x, t, p, dp, d2p;
+  int ii;
+  //Extrapolation: uniform density inside and Keplerian force outside the
+  //grid
+  if ( r < rmin ) {
+    *phi= *(args+4) + *(args+5) * ( r * r - rmin * rmin ) / 2. / rmin;
+    *dphidr= *(args+5) * r / rmin;
+    *d2phidr2= *(args+5) / rmin;
+    return;
+  }
+  if ( r > rmax ) {
+    *phi= *(args+6) + *(args+7) * rmax * rmax * ( 1. / rmax - 1. / r );
+    *dphidr= *(args+7) * rmax * rmax / r / r;
+    *d2phidr2= -2. * *(args+7) * rmax * rmax / r / r / r;
+    return;
+  }
+  x= ( log(r) - lnrmin ) / dlnr;
+  ii= (int) floor(x);
+  if ( ii < 0 ) ii= 0;
+  if ( ii > nr-2 ) ii= nr-2;
+  t= x - ii;
+  c= args + 8 + 6 * ii;
+  p= ((((*(c+5)*t+*(c+4))*t+*(c+3))*t+*(c+2))*t+*(c+1))*t+*c;
+  dp= (((5.* *(c+5)*t+4.* *(c+4))*t+3.* *(c+3))*t+2.* *(c+2))*t+*(c+1);
+  d2p= ((20.* *(c+5)*t+12.* *(c+4))*t+6.* *(c+3))*t+2.* *(c+2);
+  *phi= p;
+  *dphidr= dp / dlnr / r;
+  *d2phidr2= ( d2p / dlnr / dlnr - dp / dlnr ) / r / r;
+}
+//Second derivative with respect to the cylindrical coordinates x1 and x2
+//(each R or z; delta=1 when they are the same)
+static double interpSphericalSecondDeriv(double R,double z,double x1,
+					 double x2,double delta,
+					 double * args){
+  double r= sqrt(R*R+z*z);
+  double phi, dphidr, d2phidr2;
+  interpSphericalEval(r,args,&phi,&dphidr,&d2phidr2);
+  if ( r == 0. )
+    return *args * delta * d2phidr2;
+  return *args * ( d2phidr2 * x1 * x2 / r / r
+		   + dphidr / r * ( delta - x1 * x2 / r / r ) );
+}
+double interpSphericalPotentialEval(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double pot, dphidr, d2phidr2;
+  interpSphericalEval(sqrt(R*R+z*z),args,&pot,&dphidr,&d2phidr2);
+  return *args * pot;
+}
+double interpSphericalPotentialRforce(double R,double z, double phi,
+				      double t,
+				      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double r= sqrt(R*R+z*z);
+  double pot, dphidr, d2phidr2;
+  if ( r == 0. ) return 0.;
+  interpSphericalEval(r,args,&pot,&dphidr,&d2phidr2);
+  return - *args * dphidr * R / r;
+}
+double interpSphericalPotentialPlanarRforce(double R,double phi,double t,
+					    struct potentialArg * potentialArgs){
+  return interpSphericalPotentialRforce(R,0.,phi,t,potentialArgs);
+}
+double interpSphericalPotentialzforce(double R,double z, double phi,
+				      double t,
+				      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double r= sqrt(R*R+z*z);
+  double pot, dphidr, d2phidr2;
+  if ( r == 0. ) return 0.;
+  interpSphericalEval(r,args,&pot,&dphidr,&d2phidr2);
+  return - *args * dphidr * z / r;
+}
+double interpSphericalPotentialR2deriv(double R,double z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  return interpSphericalSecondDeriv(R,z,R,R,1.,potentialArgs->args);
+}
+double interpSphericalPotentialPlanarR2deriv(double R,double phi,double t,
+					     struct potentialArg * potentialArgs){
+  return interpSphericalSecondDeriv(R,0.,R,R,1.,potentialArgs->args);
+}
+double interpSphericalPotentialz2deriv(double R,double z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  return interpSphericalSecondDeriv(R,z,z,z,1.,potentialArgs->args);
+}
+double interpSphericalPotentialRzderiv(double R,double z, double phi,
+				       double t,
+				       struct potentialArg * potentialArgs){
+  return interpSphericalSecondDeriv(R,z,R,z,0.,potentialArgs->args);
+}
+double interpSphericalPotentialDens(double R,double z, double phi,
+				    double t,
+				    struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double r= sqrt(R*R+z*z);
+  double pot, dphidr, d2phidr2;
+  interpSphericalEval(r,args,&pot,&dphidr,&d2phidr2);
+  if ( r == 0. )
+    return *args * 3. * d2phidr2 / 4. / M_PI;
+  return *args * ( d2phidr2 + 2. * dphidr / r ) / 4. / M_PI;
+}
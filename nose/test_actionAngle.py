@@ -299,6 +299,42 @@ def test_actionAngleSpherical_otherIsochrone_angles():
     assert daz < 10.**-6., 'actionAngleSpherical applied to isochrone potential fails for az at %g%%' % (daz*100.)
     return None
 
+#Test that the C, vectorized, and one-by-one actionAngleSpherical agree with
+#the isochrone for arrays of phase-space points
+def test_actionAngleSpherical_c_vectorized():
+    from galpy.potential import IsochronePotential
+    from galpy.actionAngle import actionAngleSpherical, \
+        actionAngleIsochrone
+    ip= IsochronePotential(normalize=1.,b=1.2)
+    aAI= actionAngleIsochrone(ip=ip)
+    aAS= actionAngleSpherical(pot=ip)
+    R= numpy.array([1.1,0.9,1.3,1.])
+    vR= numpy.array([0.3,-0.2,0.,-0.1])
+    vT= numpy.array([1.2,0.8,-1.,-0.9])
+    z= numpy.array([0.2,-0.1,0.3,0.1])
+    vz= numpy.array([0.5,0.2,-0.3,0.1])
+    phi= numpy.array([2.,1.,0.5,4.])
+    jiO= aAI.actionsFreqsAngles(R,vR,vT,z,vz,phi)
+    #n=10 fixed_quad is less precise
+    for kwargs,tol in zip([{'c':True},{'c':False},
+                           {'c':False,'vectorized':False,'fixed_quad':True}],
+                          [10.**-6.,10.**-6.,10.**-3.]):
+        jiaO= aAS.actionsFreqsAngles(R,vR,vT,z,vz,phi,**kwargs)
+        for ii,name in enumerate(['Jr','Lz','Jz','Or','Op','Oz']):
+            assert numpy.all(numpy.fabs((jiO[ii]-jiaO[ii])/jiO[ii]) < tol), 'actionAngleSpherical with %s applied to isochrone potential fails for %s' % (kwargs,name)
+        for ii,name in zip(range(6,9),['ar','ap','az']):
+            dangle= numpy.fabs(jiO[ii]-jiaO[ii])
+            dangle[dangle > numpy.pi]= 2.*numpy.pi-dangle[dangle > numpy.pi]
+            assert numpy.all(dangle < tol), 'actionAngleSpherical with %s applied to isochrone potential fails for %s' % (kwargs,name)
+    #Also the actions and frequencies by themselves
+    jiaO= aAS.actionsFreqs(R,vR,vT,z,vz,phi)
+    for ii in range(6):
+        assert numpy.all(numpy.fabs((jiO[ii]-jiaO[ii])/jiO[ii]) < 10.**-6.), 'actionAngleSpherical applied to isochrone potential fails for actionsFreqs'
+    jiaO= aAS(R,vR,vT,z,vz,phi,c=False)
+    for ii in range(3):
+        assert numpy.all(numpy.fabs((jiO[ii]-jiaO[ii])/jiO[ii]) < 10.**-10.), 'actionAngleSpherical applied to isochrone potential fails for actions'
+    return None
+
 #Basic sanity checking of the actionAngleAdiabatic actions
 def test_actionAngleAdiabatic_basic_actions():
     from galpy.actionAngle import actionAngleAdiabatic
@@ -642,6 +678,27 @@ def test_actionAngleStaeckel_basic_actions_u0_c():
     assert numpy.fabs(js[2]) < 2.*10.**-4., 'Close-to-circular orbit in the MWPotential does not have small Jz'
     return None
 
+#Test that u0 computed in C from the phase-space coordinates agrees with
+#that computed from the energy
+def test_actionAngleStaeckel_u0_phasespace_c():
+    from galpy.potential import MWPotential, evaluatePotentials
+    from galpy.actionAngle_src.actionAngleStaeckel_c import \
+        actionAngleStaeckel_calcu0, actionAngleStaeckel_calcu0_phasespace
+    numpy.random.seed(1)
+    R= 1.+0.1*numpy.random.normal(size=11)
+    vR= 0.1*numpy.random.normal(size=11)
+    vT= 1.+0.1*numpy.random.normal(size=11)
+    z= 0.1*numpy.random.normal(size=11)
+    vz= 0.1*numpy.random.normal(size=11)
+    E= numpy.array([evaluatePotentials(MWPotential,r,zz) for r,zz in zip(R,z)])\
+        +vR**2./2.+vT**2./2.+vz**2./2.
+    u0E, err= actionAngleStaeckel_calcu0(E,R*vT,MWPotential,0.71)
+    u0ps, err= actionAngleStaeckel_calcu0_phasespace(R,vR,vT,z,vz,
+                                                     MWPotential,0.71)
+    assert err == 0, 'actionAngleStaeckel_calcu0_phasespace returned an error'
+    assert numpy.all(numpy.fabs(u0E-u0ps) < 10.**-6.), 'u0 computed in C from the phase-space coordinates does not agree with that computed from the energy'
+    return None
+
 #Basic sanity checking of the actionAngleStaeckel actions, w/ u0, and interppot
 def test_actionAngleStaeckel_basic_actions_u0_interppot_c():
     from galpy.actionAngle import actionAngleStaeckel
@@ -664,6 +721,38 @@ def test_actionAngleStaeckel_basic_actions_u0_interppot_c():
     assert numpy.fabs(js[2]) < 2.*10.**-4., 'Close-to-circular orbit in the MWPotential does not have small Jz'
     return None
 
+#Test that actionAngleStaeckel and actionAngleAdiabatic with a CompiledPotential agree with those for the original potential
+def test_actionAngle_compiledpotential_c():
+    from galpy.actionAngle import actionAngleStaeckel, actionAngleAdiabatic
+    from galpy.potential import MWPotential, interpRZPotential, \
+        CompiledPotential
+    ip= interpRZPotential(RZPot=MWPotential,
+                          rgrid=(numpy.log(0.01),numpy.log(20.),101),
+                          zgrid=(0.,1.,101),logR=True,use_c=True,enable_c=True,
+                          interpPot=True)
+    R= numpy.array([1.01,0.9,1.1])
+    vR= numpy.array([0.01,0.05,-0.1])
+    vT= numpy.array([1.,0.9,1.05])
+    z= numpy.array([0.01,0.1,-0.05])
+    vz= numpy.array([0.01,-0.02,0.03])
+    phi= numpy.array([0.,1.,2.])
+    for pot,useu0s in zip([MWPotential,ip],[[False,True],[False]]):
+        cpot= CompiledPotential(pot)
+        for useu0 in useu0s:
+            aAS= actionAngleStaeckel(pot=pot,delta=0.71,c=True,useu0=useu0)
+            caAS= actionAngleStaeckel(pot=cpot,delta=0.71,c=True,useu0=useu0)
+            for ii in range(2): #second time re-uses the C potential
+                for js,cjs in zip(aAS(R,vR,vT,z,vz),caAS(R,vR,vT,z,vz)):
+                    assert numpy.all(numpy.fabs(js-cjs) < 10.**-10.), 'actionAngleStaeckel actions with a CompiledPotential do not agree with those for the original potential'
+                for js,cjs in zip(aAS.actionsFreqsAngles(R,vR,vT,z,vz,phi),
+                                  caAS.actionsFreqsAngles(R,vR,vT,z,vz,phi)):
+                    assert numpy.all(numpy.fabs(js-cjs) < 10.**-10.), 'actionAngleStaeckel actionsFreqsAngles with a CompiledPotential do not agree with those for the original potential'
+        aAA= actionAngleAdiabatic(pot=pot,gamma=1.,c=True)
+        caAA= actionAngleAdiabatic(pot=cpot,gamma=1.,c=True)
+        for js,cjs in zip(aAA(R,vR,vT,z,vz),caAA(R,vR,vT,z,vz)):
+            assert numpy.all(numpy.fabs(js-cjs) < 10.**-10.), 'actionAngleAdiabatic actions with a CompiledPotential do not agree with those for the original potential'
+    return None
+
 #Basic sanity checking of the actionAngleStaeckel actions
 def test_actionAngleStaeckel_basic_actions_c():
     from galpy.actionAngle import actionAngleStaeckel
@@ -846,6 +935,37 @@ def test_actionAngleStaeckel_conserved_actions():
                                         -2.,-8.,-2.,ntimes=101)
     return None
 
+#Test that the vectorized NumPy actions agree with those calculated one by one
+def test_actionAngleStaeckel_vectorized():
+    from galpy.potential import MWPotential
+    from galpy.actionAngle import actionAngleStaeckel
+    aAS= actionAngleStaeckel(pot=MWPotential,c=False,delta=0.71)
+    numpy.random.seed(1)
+    R= 1.+0.2*numpy.random.normal(size=11)
+    vR= 0.1*numpy.random.normal(size=11)
+    vT= 1.+0.1*numpy.random.normal(size=11)
+    z= 0.1*numpy.random.normal(size=11)
+    vz= 0.1*numpy.random.normal(size=11)
+    # Include a circular and an in-plane orbit
+    R[0], vR[0], vT[0], z[0], vz[0]= 1., 0., 1., 0., 0.
+    z[1], vz[1]= 0., 0.
+    jv= aAS(R,vR,vT,z,vz)
+    jl= aAS(R[2:],vR[2:],vT[2:],z[2:],vz[2:],vectorized=False)
+    for ii in range(3):
+        assert numpy.all(numpy.fabs(jv[ii][2:]-jl[ii]) < 10.**-6.*numpy.fabs(jl[ii])+10.**-12.), \
+            'Vectorized actionAngleStaeckel actions do not agree with those calculated one by one'
+    assert numpy.fabs(jv[0][0]) < 10.**-16., 'Circular orbit in the MWPotential does not have Jr=0'
+    assert numpy.fabs(jv[2][0]) < 10.**-16., 'Circular orbit in the MWPotential does not have Jz=0'
+    assert numpy.fabs(jv[2][1]) < 10.**-16., 'In-plane orbit in the MWPotential does not have Jz=0'
+    # An unbound orbit has Jr=NaN, without affecting the others
+    ju= aAS(R,vR+numpy.array([0.,0.,10.]+[0.]*8),vT,z,vz)
+    assert numpy.isnan(ju[0][2]), 'Vectorized actionAngleStaeckel for an unbound orbit does not return Jr=NaN'
+    indx= numpy.arange(11) != 2
+    for ii in range(3):
+        assert numpy.all(numpy.fabs(ju[ii][indx]-jv[ii][indx]) < 10.**-12.), \
+            'Vectorized actionAngleStaeckel actions of bound orbits change when an unbound orbit is included'
+    return None
+
 #Test the actions of an actionAngleStaeckel, more eccentric orbit
 def test_actionAngleStaeckel_conserved_actions_ecc():
     from galpy.potential import MWPotential
@@ -887,6 +1007,79 @@ def test_actionAngleStaeckel_conserved_actions_c():
                                                 inclphi=True)
     return None
 
+#Test that the actions for (N,nt) orbit time series, for which the C code
+#starts the root finding from the previous time sample, are the same as those
+#calculated independently for each phase-space point
+def test_actionAngleStaeckel_timeseries_c():
+    from galpy.potential import MWPotential2014
+    from galpy.actionAngle import actionAngleStaeckel
+    from galpy.orbit import Orbit
+    aAS= actionAngleStaeckel(pot=MWPotential2014,c=True,delta=0.45)
+    ts= numpy.linspace(0.,20.,401)
+    vxvvs= [[1.05,0.02,1.05,0.03,0.,2.],
+            [1.,0.3,0.9,0.1,0.2,0.],
+            [1.,0.3,0.,0.1,0.2,0.], #Lz=0
+            [1.,0.,1.,0.,0.,0.]] #circular
+    R, vR, vT, z, vz= [numpy.empty((len(vxvvs),len(ts))) for ii in range(5)]
+    for ii,vxvv in enumerate(vxvvs):
+        o= Orbit(vxvv)
+        o.integrate(ts,MWPotential2014)
+        R[ii], vR[ii], vT[ii]= o.R(ts), o.vR(ts), o.vT(ts)
+        z[ii], vz[ii]= o.z(ts), o.vz(ts)
+    for c in [True,False]:
+        js= aAS(R.flatten(),vR.flatten(),vT.flatten(),z.flatten(),vz.flatten(),
+                c=c)
+        jts= aAS(R,vR,vT,z,vz,c=c)
+        for ii in range(3):
+            assert jts[ii].shape == R.shape, 'actionAngleStaeckel for (N,nt) input does not return (N,nt) output'
+            assert numpy.all(numpy.fabs(jts[ii].flatten()-js[ii]) < 10.**-8.), 'actionAngleStaeckel for (N,nt) time series does not agree with the actions for individual phase-space points'
+    return None
+
+#Test that Orbit.jr etc. at times along an integrated orbit use the time-series
+#mode and agree with the actions calculated at each time
+def test_orbit_interface_staeckel_timeseries():
+    from galpy.potential import MWPotential2014
+    from galpy.actionAngle import actionAngleStaeckel
+    from galpy.orbit import Orbit, Orbits
+    aAS= actionAngleStaeckel(pot=MWPotential2014,c=True,delta=0.45)
+    ts= numpy.linspace(0.,20.,401)
+    vxvvs= numpy.array([[1.05,0.02,1.05,0.03,0.,2.],
+                        [1.,0.3,0.9,0.1,0.2,0.]])
+    os= Orbits(vxvvs)
+    os.integrate(ts,MWPotential2014)
+    for ii,vxvv in enumerate(vxvvs):
+        o= Orbit(vxvv)
+        o.integrate(ts,MWPotential2014)
+        js= aAS(o.R(ts),o.vR(ts),o.vT(ts),o.z(ts),o.vz(ts))
+        for jj,func in enumerate(['jr','jp','jz']):
+            oj= getattr(o,func)(MWPotential2014,type='staeckel',delta=0.45,
+                                t=ts)
+            assert numpy.all(numpy.fabs(oj-js[jj]) < 10.**-8.), 'Orbit.%s at times along the orbit does not agree with actionAngleStaeckel' % func
+            osj= getattr(os,func)(MWPotential2014,type='staeckel',
+                                  delta=0.45,t=ts)
+            assert osj.shape == (len(vxvvs),len(ts)), 'Orbits.%s at times along the orbits does not have shape (N,nt)' % func
+            assert numpy.all(numpy.fabs(osj[ii]-js[jj]) < 10.**-8.), 'Orbits.%s at times along the orbits does not agree with actionAngleStaeckel' % func
+    # Other actionAngle modules use the flattened phase-space points
+    ja= o.jr(MWPotential2014,type='adiabatic',t=ts[:11])
+    assert numpy.all(numpy.fabs(ja-o.jr(MWPotential2014,type='adiabatic',
+                                        t=ts[:11][::-1])[::-1]) < 10.**-10.), 'Orbit.jr at times along the orbit with the adiabatic approximation is not evaluated at the right times'
+    assert numpy.fabs(ja[5]-o(ts[5]).jr(MWPotential2014,type='adiabatic')) < 10.**-8., 'Orbit.jr at times along the orbit with the adiabatic approximation does not agree with that at a single time'
+    return None
+
+def test_orbit_interface_isochroneapprox_timeseries():
+    # Actions at times along the orbit with isochroneapprox, which needs phi
+    from galpy.potential import LogarithmicHaloPotential
+    from galpy.orbit import Orbit
+    lp= LogarithmicHaloPotential(normalize=1.,q=0.9)
+    ts= numpy.linspace(0.,20.,401)
+    o= Orbit([1.05,0.02,1.05,0.03,0.,2.])
+    o.integrate(ts,lp)
+    for func in ['jr','jp','jz']:
+        ji= getattr(o,func)(lp,type='isochroneapprox',b=0.8,t=ts[:3])
+        assert ji.shape == (3,), 'Orbit.%s at times along the orbit with isochroneapprox does not have shape (nt,)' % func
+        assert numpy.fabs(ji[2]-getattr(o(ts[2]),func)(lp,type='isochroneapprox',b=0.8)) < 10.**-8., 'Orbit.%s at times along the orbit with isochroneapprox does not agree with that at a single time' % func
+    return None
+
 #Test the actions of an actionAngleStaeckel, for a dblexp disk far away from the center
 def test_actionAngleStaeckel_conserved_actions_c_specialdblexp():
     from galpy.potential import DoubleExponentialDiskPotential
@@ -1497,6 +1690,41 @@ def test_actionAngleIsochroneApprox_firstFlip():
         'actionAngleIsochroneApprox calculated w/ _firstFlip and w/o do not agree at %g%%' % (100.*numpy.amax(numpy.fabs((acfs-acfsfirstFlip)/acfs)))
     return None
 
+#Test that the C implementation of actionAngleIsochroneApprox agrees with the
+#Python implementation
+def test_actionAngleIsochroneApprox_c():
+    from galpy.potential import LogarithmicHaloPotential
+    from galpy.actionAngle import actionAngleIsochroneApprox
+    from galpy.orbit_src.FullOrbit import ext_loaded
+    if not ext_loaded: return None
+    lp= LogarithmicHaloPotential(normalize=1.,q=0.9)
+    aAIc= actionAngleIsochroneApprox(pot=lp,b=0.8,c=True)
+    aAIp= actionAngleIsochroneApprox(pot=lp,b=0.8,c=False)
+    assert aAIc._c, 'actionAngleIsochroneApprox does not use C when it should'
+    assert not aAIp._c, 'actionAngleIsochroneApprox uses C when it should not'
+    R= numpy.array([1.56148083,1.1,0.9])
+    vR= numpy.array([0.35081535,0.3,-0.1])
+    vT= numpy.array([-1.15481504,1.1,0.9])
+    z= numpy.array([0.88719443,0.2,-0.1])
+    vz= numpy.array([-0.47713334,0.1,0.2])
+    phi= numpy.array([0.12019596,2.,5.])
+    #Actions
+    jc= numpy.array(aAIc(R,vR,vT,z,vz,phi))
+    jp= numpy.array(aAIp(R,vR,vT,z,vz,phi))
+    assert numpy.amax(numpy.fabs((jc-jp)/jp)) < 10.**-8., \
+        'actionAngleIsochroneApprox actions calculated w/ C and w/o do not agree at %g%%' % (100.*numpy.amax(numpy.fabs((jc-jp)/jp)))
+    #Actions, frequencies, angles
+    acfsc= numpy.array(aAIc.actionsFreqsAngles(R,vR,vT,z,vz,phi))
+    acfsp= numpy.array(aAIp.actionsFreqsAngles(R,vR,vT,z,vz,phi))
+    assert numpy.amax(numpy.fabs((acfsc-acfsp)/acfsp)) < 10.**-6., \
+        'actionAngleIsochroneApprox actions, frequencies, and angles calculated w/ C and w/o do not agree at %g%%' % (100.*numpy.amax(numpy.fabs((acfsc-acfsp)/acfsp)))
+    #Single object
+    acfsc= numpy.array(aAIc.actionsFreqsAngles(R[0],vR[0],vT[0],
+                                               z[0],vz[0],phi[0])).flatten()
+    assert numpy.amax(numpy.fabs((acfsc-acfsp[:,0])/acfsp[:,0])) < 10.**-6., \
+        'actionAngleIsochroneApprox actions, frequencies, and angles calculated w/ C and w/o do not agree at %g%%' % (100.*numpy.amax(numpy.fabs((acfsc-acfsp[:,0])/acfsp[:,0])))
+    return None
+
 #Test the actionAngleIsochroneApprox used in Bovy (2014)
 def test_actionAngleIsochroneApprox_bovy14():   
     from galpy.potential import LogarithmicHaloPotential
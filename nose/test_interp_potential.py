@@ -949,3 +949,386 @@ def test_interpolation_potential_verticalfreq_notinterpolated():
         assert vfdiff < 10.**-10., 'RZPot interpolation w/ interpRZPotential fails when the potential was not interpolated at R = %g by %g' % (r,vfdiff)
     return None
 
+
+# Tests of the 3D interpolated potential
+def test_interp3D_potential():
+    from galpy.potential_src.planarPotential import planarToFullPotential
+    pot= [potential.LogarithmicHaloPotential(normalize=1.,q=0.9),
+          planarToFullPotential(potential.EllipticalDiskPotential(twophio=0.05))]
+    ip= potential.interp3DPotential(pot,rgrid=(numpy.log(0.5),numpy.log(2.),41),
+                                    nphi=32,zgrid=(0.,0.5,21))
+    # On the grid, the potential is reproduced exactly
+    for ii,jj,kk in [(0,0,0),(5,7,3),(40,31,20),(17,12,9)]:
+        r, phi, z= ip._rgrid[ii], ip._phigrid[jj], ip._zgrid[kk]
+        assert numpy.fabs(ip(r,z,phi=phi)-potential.evaluatePotentials(pot,r,z,phi=phi)) < 10.**-10., 'interp3DPotential does not reproduce the potential on the grid at (R,phi,z) = (%g,%g,%g)' % (r,phi,z)
+    # Within the grid, potential and forces are well approximated
+    numpy.random.seed(1)
+    rs= numpy.random.uniform(0.55,1.9,101)
+    zs= numpy.random.uniform(-0.45,0.45,101)
+    phis= numpy.random.uniform(-10.,10.,101)
+    assert numpy.all(numpy.fabs(ip(rs,zs,phi=phis)-potential.evaluateBulk(pot,rs,zs,phi=phis,quantities='potential')) < 10.**-5.), 'interp3DPotential does not approximate the potential well'
+    assert numpy.all(numpy.fabs(ip.Rforce(rs,zs,phi=phis)-potential.evaluateBulk(pot,rs,zs,phi=phis,quantities='Rforce')) < 10.**-3.), 'interp3DPotential does not approximate the radial force well'
+    assert numpy.all(numpy.fabs(ip.zforce(rs,zs,phi=phis)-potential.evaluateBulk(pot,rs,zs,phi=phis,quantities='zforce')) < 10.**-3.), 'interp3DPotential does not approximate the vertical force well'
+    assert numpy.all(numpy.fabs(ip.phiforce(rs,zs,phi=phis)-potential.evaluateBulk(pot,rs,zs,phi=phis,quantities='phiforce')) < 10.**-3.), 'interp3DPotential does not approximate the azimuthal force well'
+    # The C implementation agrees with the Python implementation
+    for quantity in ['potential','Rforce','zforce','phiforce','R2deriv',
+                     'z2deriv','Rzderiv','phi2deriv','Rphideriv']:
+        if quantity == 'potential': func= ip
+        else: func= getattr(ip,quantity)
+        assert numpy.all(numpy.fabs(potential.evaluateBulk(ip,rs,zs,phi=phis,quantities=quantity)-func(rs,zs,phi=phis)) < 10.**-10.), 'C and Python implementations of interp3DPotential disagree for %s' % quantity
+    # Outside the grid, we fall back onto the original potential
+    for r,z in [(0.3,0.1),(2.5,-0.1),(1.,0.7)]:
+        assert numpy.fabs(ip.Rforce(r,z,phi=0.2)-potential.evaluateRforces(pot,r,z,phi=0.2)) < 10.**-10., 'interp3DPotential does not fall back onto the original potential outside the grid'
+    return None
+
+def test_interp3D_orbit():
+    # Orbits integrated in C in the interpolated potential agree with those in the original potential
+    from galpy.orbit import Orbit
+    from galpy.potential_src.planarPotential import planarToFullPotential
+    pot= [potential.LogarithmicHaloPotential(normalize=1.,q=0.9),
+          planarToFullPotential(potential.EllipticalDiskPotential(twophio=0.05))]
+    ip= potential.interp3DPotential(pot,rgrid=(numpy.log(0.5),numpy.log(2.),41),
+                                    nphi=32,zgrid=(0.,0.5,21))
+    ts= numpy.linspace(0.,20.,1001)
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    oi= o()
+    o.integrate(ts,pot,method='dopr54_c')
+    oi.integrate(ts,ip,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.x(ts)-oi.x(ts)) < 10.**-4.), 'Orbit integrated in interp3DPotential does not agree with that in the original potential'
+    assert numpy.all(numpy.fabs(o.z(ts)-oi.z(ts)) < 10.**-4.), 'Orbit integrated in interp3DPotential does not agree with that in the original potential'
+    # Energy is conserved
+    assert numpy.std(oi.E(ts,pot=ip))/numpy.fabs(numpy.mean(oi.E(ts,pot=ip))) < 10.**-8., 'Energy not conserved for orbit integrated in interp3DPotential'
+    # Planar orbit
+    o= Orbit([1.,0.1,1.1,0.])
+    oi= o()
+    o.integrate(ts,potential.RZToplanarPotential(pot),method='dopr54_c')
+    oi.integrate(ts,ip.toPlanar(),method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.x(ts)-oi.x(ts)) < 10.**-4.), 'Planar orbit integrated in interp3DPotential does not agree with that in the original potential'
+    return None
+
+def test_interp3D_dxdv():
+    # Phase-space volumes integrated in C in a non-axisymmetric interpolated
+    # potential with d2Phi/dphi/dz != 0 agree with finite differences
+    from galpy.orbit import Orbit
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    oc= Orbit([1.,0.,0.,0.3,0.,1.])
+    oc.integrate(numpy.linspace(0.,1.,3),lp)
+    mp= potential.MovingObjectPotential(oc,GM=0.05,softening_length=0.3)
+    ip= potential.interp3DPotential([lp,mp],
+                                    rgrid=(numpy.log(0.5),numpy.log(2.),31),
+                                    nphi=32,zgrid=(-0.6,0.6,31),zsym=False)
+    times= numpy.linspace(0.,3.,31)
+    vxvv= numpy.array([1.,0.1,1.1,0.1,0.05,0.3])
+    for dxdv in [numpy.array([0.,0.,1.,0.,0.,0.]),
+                 numpy.array([1.,0.,0.,0.,0.,0.]),
+                 numpy.array([1.,2.,-1.,3.,-2.,1.])]:
+        dxdv*= 10.**-4.
+        o= Orbit(vxvv)
+        o.integrate_dxdv(dxdv,times,ip,method='dopr54_c')
+        cdxdv= o.getOrbit_dxdv()
+        o.integrate(times,ip,method='dopr54_c')
+        od= Orbit(vxvv+dxdv)
+        od.integrate(times,ip,method='dopr54_c')
+        fddxdv= od.getOrbit()-o.getOrbit()
+        assert numpy.all(numpy.fabs(cdxdv-fddxdv) < 10.**-6.), 'Integrating a phase-space volume in C in a non-axisymmetric interp3DPotential does not agree with finite differences'
+    return None
+
+def test_interp3D_timesliced():
+    # Time-dependent potential, tabulated in time slices
+    from galpy.potential_src.planarPotential import planarToFullPotential
+    bp= planarToFullPotential(potential.DehnenBarPotential(tform=-1.,tsteady=1.))
+    pot= [potential.LogarithmicHaloPotential(normalize=1.),bp]
+    ip= potential.interp3DPotential(pot,rgrid=(0.5,1.5,11),logR=False,
+                                    nphi=16,zgrid=(0.,0.2,5),
+                                    tgrid=(-10.,10.,41))
+    # On the grid in time and space, the potential is reproduced exactly
+    for t in [-10.,-2.5,3.,10.]:
+        assert numpy.fabs(ip(1.,0.1,phi=ip._phigrid[3],t=t)-potential.evaluatePotentials(pot,1.,0.1,phi=ip._phigrid[3],t=t)) < 10.**-10., 'interp3DPotential does not reproduce the time-dependent potential on the grid'
+    # Linear interpolation in between
+    assert numpy.fabs(ip(1.,0.1,phi=ip._phigrid[3],t=3.1)-0.8*ip(1.,0.1,phi=ip._phigrid[3],t=3.)-0.2*ip(1.,0.1,phi=ip._phigrid[3],t=3.5)) < 10.**-10., 'interp3DPotential does not linearly interpolate between time slices'
+    # Constant outside of the time grid
+    assert numpy.fabs(ip.phiforce(1.,0.1,phi=0.3,t=20.)-ip.phiforce(1.,0.1,phi=0.3,t=10.)) < 10.**-10., 'interp3DPotential is not constant after the time grid'
+    assert numpy.fabs(ip.phiforce(1.,0.1,phi=0.3,t=-20.)) < 10.**-10., 'interp3DPotential is not constant before the time grid'
+    # C agrees with Python
+    ts= numpy.linspace(-12.,12.,31)
+    assert numpy.all(numpy.fabs(potential.evaluateBulk(ip,1.1,0.05,phi=0.4,t=ts,quantities='phiforce')-ip.phiforce(1.1,0.05,phi=0.4,t=ts)) < 10.**-10.), 'C and Python implementations of time-dependent interp3DPotential disagree'
+    return None
+
+def test_interpRZTimeSeries_potential():
+    # Time series of Miyamoto-Nagai disks with a mass that grows
+    # quadratically with time, which cubic interpolation in time reproduces
+    ts= numpy.array([0.,1.,2.5,4.,6.])
+    amp= lambda t: 1.+0.1*t+0.02*t**2.
+    pots= [potential.MiyamotoNagaiPotential(amp=amp(t),a=0.5,b=0.1)
+           for t in ts]
+    mp= potential.MiyamotoNagaiPotential(a=0.5,b=0.1)
+    ip= potential.interpRZTimeSeriesPotential(pots,ts,
+                                              rgrid=(numpy.log(0.1),
+                                                     numpy.log(5.),81),
+                                              zgrid=(0.,1.,61))
+    ipl= potential.interpRZTimeSeriesPotential(pots,ts,
+                                               rgrid=(numpy.log(0.1),
+                                                      numpy.log(5.),81),
+                                               zgrid=(0.,1.,61),
+                                               tinterp='linear')
+    # On the grid in time and space, the potential is reproduced exactly
+    for t in ts:
+        for p in [ip,ipl]:
+            assert numpy.fabs(p(ip._rgrid[20],ip._zgrid[10],t=t)-amp(t)*mp(ip._rgrid[20],ip._zgrid[10])) < 10.**-10., 'interpRZTimeSeriesPotential does not reproduce the potential on the grid'
+    # In between, cubic interpolation reproduces the quadratic growth
+    numpy.random.seed(1)
+    rs= numpy.random.uniform(0.2,4.,101)
+    zs= numpy.random.uniform(-0.9,0.9,101)
+    tt= numpy.random.uniform(1.,4.,101)
+    assert numpy.all(numpy.fabs(ip(rs,zs,t=tt)-amp(tt)*mp(rs,zs)) < 10.**-5.), 'interpRZTimeSeriesPotential does not approximate the potential well'
+    assert numpy.all(numpy.fabs(ip.Rforce(rs,zs,t=tt)-amp(tt)*mp.Rforce(rs,zs)) < 10.**-4.), 'interpRZTimeSeriesPotential does not approximate the radial force well'
+    assert numpy.all(numpy.fabs(ip.zforce(rs,zs,t=tt)-amp(tt)*mp.zforce(rs,zs)) < 10.**-3.), 'interpRZTimeSeriesPotential does not approximate the vertical force well'
+    # Linear interpolation in between
+    assert numpy.fabs(ipl(1.,0.1,t=1.3)-0.8*ipl(1.,0.1,t=1.)-0.2*ipl(1.,0.1,t=2.5)) < 10.**-10., 'interpRZTimeSeriesPotential does not linearly interpolate between the potentials'
+    # Constant outside of the time range
+    assert numpy.fabs(ip.Rforce(1.,0.1,t=10.)-ip.Rforce(1.,0.1,t=6.)) < 10.**-10., 'interpRZTimeSeriesPotential is not constant after the time range'
+    assert numpy.fabs(ip.Rforce(1.,0.1,t=-3.)-ip.Rforce(1.,0.1,t=0.)) < 10.**-10., 'interpRZTimeSeriesPotential is not constant before the time range'
+    # The C implementation agrees with the Python implementation
+    tt= numpy.random.uniform(-1.,7.,101)
+    for p in [ip,ipl]:
+        for quantity in ['potential','Rforce','zforce','R2deriv',
+                         'z2deriv','Rzderiv']:
+            if quantity == 'potential': func= p
+            else: func= getattr(p,quantity)
+            assert numpy.all(numpy.fabs(potential.evaluateBulk(p,rs,zs,t=tt,quantities=quantity)-func(rs,zs,t=tt)) < 10.**-10.), 'C and Python implementations of interpRZTimeSeriesPotential disagree for %s' % quantity
+    # Outside the grid, we fall back onto the time-interpolated potentials
+    assert numpy.fabs(ip(8.,0.1,t=2.)-amp(2.)*mp(8.,0.1)) < 10.**-10., 'interpRZTimeSeriesPotential does not fall back onto the original potentials outside the grid'
+    # The potential can also be given as a grid
+    ipg= potential.interpRZTimeSeriesPotential(potGrid=ip._potGrid,ts=ts,
+                                               rgrid=(numpy.log(0.1),
+                                                      numpy.log(5.),81),
+                                               zgrid=(0.,1.,61))
+    assert numpy.all(numpy.fabs(ipg(rs,zs,t=tt)-ip(rs,zs,t=tt)) < 10.**-14.), 'interpRZTimeSeriesPotential set up from a grid does not agree with that set up from the potentials'
+    return None
+
+def test_interpRZTimeSeries_orbit():
+    # Orbits integrated in C agree with those integrated in Python
+    from galpy.orbit import Orbit
+    ts= numpy.array([0.,1.,2.5,4.,6.])
+    pots= [potential.MiyamotoNagaiPotential(amp=1.+0.1*t,a=0.5,b=0.1)
+           for t in ts]
+    ip= potential.interpRZTimeSeriesPotential(pots,ts,
+                                              rgrid=(numpy.log(0.1),
+                                                     numpy.log(5.),81),
+                                              zgrid=(0.,1.,61))
+    times= numpy.linspace(0.,6.,1001)
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    oc= o()
+    o.integrate(times,ip,method='odeint')
+    oc.integrate(times,ip,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.x(times)-oc.x(times)) < 10.**-5.), 'Orbit integrated in interpRZTimeSeriesPotential in C does not agree with that in python'
+    assert numpy.all(numpy.fabs(o.z(times)-oc.z(times)) < 10.**-5.), 'Orbit integrated in interpRZTimeSeriesPotential in C does not agree with that in python'
+    # Planar orbit
+    o= Orbit([1.,0.1,1.1,0.])
+    oc= o()
+    o.integrate(times,ip.toPlanar(),method='odeint')
+    oc.integrate(times,ip.toPlanar(),method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.x(times)-oc.x(times)) < 10.**-5.), 'Planar orbit integrated in interpRZTimeSeriesPotential in C does not agree with that in python'
+    # A static time series conserves energy
+    mp= potential.MiyamotoNagaiPotential(a=0.5,b=0.1)
+    ips= potential.interpRZTimeSeriesPotential([mp,mp],[0.,1.],
+                                               rgrid=(numpy.log(0.1),
+                                                      numpy.log(5.),81),
+                                               zgrid=(0.,1.,61))
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    o.integrate(times,ips,method='dopr54_c')
+    assert numpy.std(o.E(times,pot=ips))/numpy.fabs(numpy.mean(o.E(times,pot=ips))) < 10.**-8., 'Energy not conserved for orbit integrated in a static interpRZTimeSeriesPotential'
+    return None
+
+def test_interpRZTimeSeries_snapshots():
+    # Time series of snapshots given as (pos,mass) tuples
+    numpy.random.seed(2)
+    npart= 10000
+    snaps= [(numpy.random.normal(size=(npart,3))*s,1./npart)
+            for s in [1.,1.2,1.5]]
+    ip= potential.interpRZTimeSeriesPotential(snaps,[0.,1.,2.],
+                                              rgrid=(numpy.log(0.1),
+                                                     numpy.log(10.),61),
+                                              zgrid=(0.,2.,41))
+    sp= potential.SnapshotRZPotential(snaps[1])
+    assert numpy.fabs(ip(1.,0.,t=1.)-sp(1.,0.)) < 10.**-8., 'interpRZTimeSeriesPotential of snapshots does not agree with the snapshot potential at the time of the snapshot'
+    return None
+
+def test_interpolation_cache():
+    # Test that the grids are stored in and memory-mapped from the cache
+    import os, shutil, tempfile
+    cachedir= tempfile.mkdtemp()
+    try:
+        kwargs= dict(rgrid=(0.01,2.,51),zgrid=(0.,0.2,21),logR=False,
+                     interpPot=True,interpRforce=True,interpzforce=True,
+                     interpvcirc=True,zsym=True,enable_c=True,cachedir=cachedir)
+        rzpot= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                           **kwargs)
+        cachefiles= sorted(os.listdir(cachedir))
+        assert len(cachefiles) == 7, 'interpRZPotential did not store the expected grids in the cache'
+        assert all([f.endswith('.npy') and rzpot._fingerprint in f
+                    for f in cachefiles]), 'interpRZPotential cache files not keyed by the fingerprint'
+        # Setting up the same interpolation again loads the grids
+        rzpot2= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                            **kwargs)
+        assert sorted(os.listdir(cachedir)) == cachefiles, 'Setting up the same interpRZPotential again changed the cache'
+        assert isinstance(rzpot2._potGrid,numpy.memmap), 'Cached interpRZPotential grid is not memory-mapped'
+        assert isinstance(rzpot2._potGrid_splinecoeffs,numpy.memmap), 'Cached interpRZPotential spline coefficients are not memory-mapped'
+        rs= numpy.linspace(0.1,1.9,11)
+        zs= numpy.linspace(-0.15,0.15,11)
+        assert numpy.all(numpy.fabs(rzpot(rs,zs)-rzpot2(rs,zs)) < 10.**-14.), 'interpRZPotential loaded from the cache does not agree with the original'
+        assert numpy.all(numpy.fabs(rzpot.Rforce(rs,zs)-rzpot2.Rforce(rs,zs)) < 10.**-14.), 'interpRZPotential loaded from the cache does not agree with the original'
+        assert numpy.all(numpy.fabs(rzpot.vcirc(rs)-rzpot2.vcirc(rs)) < 10.**-14.), 'interpRZPotential loaded from the cache does not agree with the original'
+        # A different potential or grid gives a different fingerprint
+        rzpot3= potential.interpRZPotential(RZPot=potential.MWPotential2014,
+                                            **kwargs)
+        assert rzpot3._fingerprint != rzpot._fingerprint, 'Different potentials have the same interpRZPotential fingerprint'
+        lp= potential.LogarithmicHaloPotential(normalize=1.)
+        lp2= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+        kwargs['zgrid']= (0.,0.2,11)
+        rzpot4= potential.interpRZPotential(RZPot=lp,**kwargs)
+        rzpot5= potential.interpRZPotential(RZPot=lp2,**kwargs)
+        assert rzpot4._fingerprint != rzpot5._fingerprint, 'Potentials with different parameters have the same interpRZPotential fingerprint'
+        assert numpy.fabs(rzpot5(1.,0.1)-lp2(1.,0.1)) < 10.**-6., 'interpRZPotential loaded the wrong grid from the cache'
+    finally:
+        shutil.rmtree(cachedir)
+    return None
+
+def test_interpolation_tol():
+    # Test that the adaptively-refined grid reaches the requested tolerance
+    from galpy.potential import MWPotential2014
+    from galpy.orbit import Orbit
+    rzpot= potential.interpRZPotential(RZPot=MWPotential2014,
+                                       rgrid=(numpy.log(0.01),numpy.log(20.),
+                                              11),
+                                       zgrid=(0.,1.,11),logR=True,
+                                       interpPot=True,interpRforce=True,
+                                       interpzforce=True,zsym=True,
+                                       use_c=True,enable_c=True,tol=10.**-6.)
+    assert rzpot._nonuniform, 'Adaptively-refined interpRZPotential grid is uniform'
+    assert len(rzpot._rgrid)*len(rzpot._zgrid) < 201**2, 'Adaptively-refined interpRZPotential grid is unexpectedly large'
+    numpy.random.seed(1)
+    rs= numpy.exp(numpy.random.uniform(numpy.log(0.02),numpy.log(19.),1001))
+    zs= numpy.random.uniform(-0.99,0.99,1001)
+    rf= potential.evaluateRforces(MWPotential2014,rs,zs)
+    zf= potential.evaluatezforces(MWPotential2014,rs,zs)
+    fnorm= numpy.sqrt(rf**2.+zf**2.)
+    assert numpy.all(numpy.fabs(rzpot.Rforce(rs,zs)-rf)/fnorm < 3.*10.**-6.), 'Adaptively-refined interpRZPotential does not reach the requested tolerance for the radial force'
+    assert numpy.all(numpy.fabs(rzpot.zforce(rs,zs)-zf)/fnorm < 3.*10.**-6.), 'Adaptively-refined interpRZPotential does not reach the requested tolerance for the vertical force'
+    assert numpy.all(numpy.fabs(rzpot(rs,zs)/potential.evaluatePotentials(MWPotential2014,rs,zs)-1.) < 3.*10.**-6.), 'Adaptively-refined interpRZPotential does not reach the requested tolerance for the potential'
+    # Same for the python interpolation
+    rzpotpy= potential.interpRZPotential(RZPot=MWPotential2014,
+                                         rgrid=(numpy.log(0.01),
+                                                numpy.log(20.),11),
+                                         zgrid=(0.,1.,11),logR=True,
+                                         interpRforce=True,zsym=True,
+                                         tol=10.**-6.)
+    assert numpy.all(numpy.fabs(rzpotpy.Rforce(rs,zs)-rf)/fnorm < 3.*10.**-6.), 'Adaptively-refined interpRZPotential does not reach the requested tolerance for the radial force'
+    # Orbit integration in C on the non-uniform grid
+    o= Orbit([1.,0.1,1.1,0.,0.1,0.])
+    oo= o()
+    ts= numpy.linspace(0.,20.,1001)
+    o.integrate(ts,rzpot,method='dopr54_c')
+    oo.integrate(ts,MWPotential2014,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.R(ts)-oo.R(ts)) < 10.**-5.), 'Orbit integrated in an adaptively-refined interpRZPotential does not agree with the original'
+    assert numpy.all(numpy.fabs(o.z(ts)-oo.z(ts)) < 10.**-5.), 'Orbit integrated in an adaptively-refined interpRZPotential does not agree with the original'
+    return None
+
+def test_interpolation_nonuniformgrid():
+    # Test that arrays of grid points can be given
+    import warnings
+    from galpy.util import galpyWarning
+    rgrid= numpy.hstack((numpy.linspace(0.01,0.5,21)[:-1],
+                         numpy.linspace(0.5,2.,31)))
+    zgrid= numpy.linspace(0.,0.2,31)**2./0.2
+    rzpot= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                       rgrid=rgrid,zgrid=zgrid,logR=False,
+                                       interpPot=True,zsym=True,
+                                       enable_c=True)
+    assert rzpot._nonuniform, 'interpRZPotential with non-uniform grid points not recognized as such'
+    assert numpy.all(numpy.fabs(rzpot._rgrid-rgrid) < 10.**-15.), 'interpRZPotential grid points not equal to the given ones'
+    rs= numpy.linspace(0.02,1.9,21)
+    zs= numpy.linspace(-0.19,0.19,21)
+    # Python and C evaluations agree
+    rzpot._enable_c= False
+    pypot= rzpot(rs,zs)
+    rzpot._enable_c= True
+    assert numpy.all(numpy.fabs(rzpot(rs,zs)-pypot) < 10.**-12.), 'C and python evaluation of interpRZPotential on a non-uniform grid do not agree'
+    assert numpy.all(numpy.fabs(pypot/potential.evaluatePotentials(potential.MWPotential,rs,zs)-1.) < 10.**-4.), 'interpRZPotential on a non-uniform grid is inaccurate'
+    # Not reaching the tolerance raises a warning
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always",galpyWarning)
+        rzpot= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                           rgrid=(0.01,2.,11),
+                                           zgrid=(0.,0.2,11),logR=False,
+                                           interpPot=True,zsym=True,
+                                           tol=10.**-10.,maxrefine=1)
+        raisedWarning= False
+        for wa in w:
+            raisedWarning= 'did not reach tol' in str(wa.message)
+            if raisedWarning: break
+        assert raisedWarning, 'interpRZPotential that did not reach the requested tolerance did not raise a warning'
+    return None
+
+def test_interpolation_tol_evaluations():
+    # Test that the grid refinement and setting up the interpolation
+    # evaluate the original potential only once at every point
+    class countingPotential(potential.MiyamotoNagaiPotential):
+        def __init__(self,*args,**kwargs):
+            potential.MiyamotoNagaiPotential.__init__(self,*args,**kwargs)
+            self.hasC= False
+            self.points= []
+        def _evaluate(self,R,z,phi=0.,t=0.):
+            self.points.extend(zip(numpy.atleast_1d(R),
+                                   numpy.atleast_1d(z)))
+            return potential.MiyamotoNagaiPotential._evaluate(self,R,z,
+                                                              phi=phi,t=t)
+    cp= countingPotential(a=0.5,b=0.05)
+    rzpot= potential.interpRZPotential(RZPot=cp,
+                                       rgrid=(numpy.log(0.01),numpy.log(20.),
+                                              11),
+                                       zgrid=(0.,1.,11),logR=True,
+                                       interpPot=True,zsym=True,
+                                       tol=10.**-6.)
+    nr, nz= len(rzpot._rgrid), len(rzpot._zgrid)
+    assert nr > 11 and nz > 11, 'interpRZPotential grid was not refined'
+    assert len(set(cp.points)) == len(cp.points), 'interpRZPotential grid refinement evaluates the original potential more than once at some points'
+    assert len(cp.points) < 3*nr*nz, 'interpRZPotential grid refinement evaluates the original potential at too many points'
+    return None
+
+def test_interpolation_gridspec_list():
+    # Test that a list of grid points raises an informative error rather
+    # than being passed to linspace
+    try:
+        potential.interpRZPotential(RZPot=potential.MWPotential,
+                                    rgrid=[0.1,0.5,1.,1.5],
+                                    zgrid=(0.,0.2,11),logR=False,
+                                    interpPot=True,zsym=True)
+    except ValueError as e:
+        assert 'numpy array' in str(e), 'interpRZPotential grid specification error does not explain how to give grid points'
+    else:
+        raise AssertionError('interpRZPotential with a list of grid points did not raise ValueError')
+    # A list to be given to linspace still works
+    rzpot= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                       rgrid=[0.1,2.,21],
+                                       zgrid=(0.,0.2,11),logR=False,
+                                       interpPot=True,zsym=True)
+    assert len(rzpot._rgrid) == 21, 'interpRZPotential with a list grid specification does not give the right grid'
+    return None
+
+# Test that calc_potential_c gives the same for an interpRZPotential and for
+# a CompiledPotential of it, and that both agree with the interpolated potential
+def test_calc_potential_c_compiledpotential():
+    from galpy.potential_src.interpRZPotential import calc_potential_c
+    ip= potential.interpRZPotential(RZPot=potential.MWPotential2014,
+                                    rgrid=(0.01,2.,101),zgrid=(0.,0.2,101),
+                                    logR=False,interpPot=True,
+                                    interpRforce=True,interpzforce=True,
+                                    zsym=True,enable_c=True)
+    rs= numpy.linspace(0.2,1.5,5)
+    zs= numpy.linspace(0.,0.15,4)
+    direct= numpy.array([[ip(r,z) for z in zs] for r in rs])
+    for pot in [[ip],potential.CompiledPotential([ip])]:
+        out, err= calc_potential_c(pot,rs,zs)
+        assert numpy.all(numpy.fabs(out-direct) < 10.**-10.), 'calc_potential_c does not agree with the interpolated potential'
+    return None
@@ -221,8 +221,11 @@ def test_energy_jacobi_conservation():
     pots.append('mockSimpleLinearPotential')
     pots.append('mockMovingObjectLongIntPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -549,8 +552,11 @@ def test_liouville_planar():
     #pots.append('mockFlatSteadyLogSpiralPotential')
     #pots.append('mockFlatTransientLogSpiralPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     #rmpots.append('BurkertPotential')
@@ -560,6 +566,8 @@ def test_liouville_planar():
     #rmpots.append('PowerSphericalPotentialwCutoff')
     #Doesn't have the R2deriv
     rmpots.append('TwoPowerSphericalPotential')
+    rmpots.append('SCFPotential')
+    rmpots.append('DiskMultipolePotential')
     for p in rmpots:
         pots.remove(p)
     #tolerances in log10
@@ -633,6 +641,75 @@ def test_liouville_planar():
                                        or ('Burkert' in p and not tp.hasC)): break
     return None
 
+# Test that the phase-space volume is conserved for 3D orbits
+def test_liouville_3d():
+    from galpy.orbit import Orbit
+    times= numpy.linspace(0.,28.,1001) #~1 Gyr at the Solar circle
+    pots= [potential.MWPotential2014,
+           potential.LogarithmicHaloPotential(normalize=1.,q=0.8,core=0.2),
+           potential.FlattenedPowerPotential(normalize=1.,alpha=0.5,q=0.7),
+           potential.KuzminKutuzovStaeckelPotential(normalize=1.,ac=5.,
+                                                     Delta=0.5),
+           potential.MiyamotoNagaiPotential(normalize=1.,a=0.,b=0.3),
+           potential.MN3ExponentialDiskPotential(normalize=1.),
+           potential.HernquistPotential(normalize=1.),
+           potential.IsochronePotential(normalize=1.),
+           potential.PlummerPotential(normalize=1.),
+           potential.BurkertPotential(normalize=1.),
+           [potential.LogarithmicHaloPotential(normalize=1.),
+            potential.planarToFullPotential(potential.DehnenBarPotential())]]
+    for pot in pots:
+        o= Orbit([1.,0.1,1.1,0.1,0.05,0.3])
+        jac= []
+        for ii in range(6):
+            dxdv= numpy.zeros(6)
+            dxdv[ii]= 1.
+            o.integrate_dxdv(dxdv,times,pot,method='dopr54_c',
+                             rectIn=True,rectOut=True)
+            jac.append(o.getOrbit_dxdv()[-1,:])
+        tjac= numpy.linalg.det(numpy.array(jac))
+        assert numpy.fabs(tjac-1.) < 10.**-7., 'Liouville theorem jacobian differs from one by %g for 3D orbit integration in C' % (numpy.fabs(tjac-1.))
+    return None
+
+# Test that the C integration of 3D phase-space volumes agrees with Python
+# and with finite differences
+def test_integrate_dxdv_3d():
+    from galpy.orbit import Orbit
+    times= numpy.linspace(0.,10.,101)
+    vxvv= numpy.array([1.,0.1,1.1,0.1,0.05,0.3])
+    dxdv= numpy.array([1.,2.,-1.,3.,-2.,1.])*10.**-3.
+    for pot in [potential.MWPotential2014,
+                potential.KuzminKutuzovStaeckelPotential(normalize=1.,ac=5.,
+                                                          Delta=0.5),
+                [potential.LogarithmicHaloPotential(normalize=1.,q=0.9),
+                 potential.planarToFullPotential(\
+                    potential.EllipticalDiskPotential(twophio=0.1))]]:
+        o= Orbit(vxvv)
+        o.integrate_dxdv(dxdv,times,pot,method='dopr54_c')
+        cdxdv= o.getOrbit_dxdv()
+        o.integrate_dxdv(dxdv,times,pot,method='odeint')
+        pdxdv= o.getOrbit_dxdv()
+        assert numpy.all(numpy.fabs(cdxdv-pdxdv) < 10.**-6.), 'Integrating a 3D phase-space volume in C does not agree with integrating it in Python'
+        # Compare to a finite-difference estimate
+        o.integrate(times,pot,method='dopr54_c')
+        eps= 10.**-3.
+        od= Orbit(vxvv+eps*dxdv)
+        od.integrate(times,pot,method='dopr54_c')
+        fddxdv= (od.getOrbit()-o.getOrbit())/eps
+        assert numpy.all(numpy.fabs(cdxdv-fddxdv) < 10.**-5.), 'Integrating a 3D phase-space volume in C does not agree with finite differences'
+    # Potentials without second derivatives in C cannot be used in C
+    from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_dxdv_c
+    for sp in [potential.SteadyLogSpiralPotential(),
+               potential.TransientLogSpiralPotential()]:
+        try:
+            integrateFullOrbit_dxdv_c([potential.MWPotential2014[0],
+                                       potential.planarToFullPotential(sp)],
+                                      numpy.array([1.,0.,0.1,0.1,1.1,0.05]),
+                                      dxdv,times,'dopr54_c')
+        except NotImplementedError: pass
+        else: raise AssertionError('integrateFullOrbit_dxdv_c with a potential without second derivatives in C should have raised NotImplementedError')
+    return None
+
 # Test that the eccentricity of circular orbits is zero
 def test_eccentricity():
     #return None
@@ -650,8 +727,11 @@ def test_eccentricity():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -766,8 +846,11 @@ def test_pericenter():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -882,8 +965,11 @@ def test_apocenter():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -998,8 +1084,11 @@ def test_zmax():
                and not 'evaluate' in p)]
     pots.append('testMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1101,8 +1190,11 @@ def test_analytic_ecc_rperi_rap():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1301,8 +1393,11 @@ def test_analytic_zmax():
                and not 'evaluate' in p)]
     pots.append('testMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1328,6 +1423,8 @@ def test_analytic_zmax():
     tol['FlattenedPowerPotential']= -8. #these are more difficult
     tol['testMWPotential']= -6. #these are more difficult
     tol['KuzminDiskPotential']=-4 #these are more difficult
+    tol['SCFPotential']= -8. #these are more difficult
+    tol['DiskMultipolePotential']= -6. #these are more difficult
     for p in pots:
         #Setup instance of potential
         if p in list(tol.keys()): ttol= tol[p]
@@ -1420,6 +1517,246 @@ def test_fixedstepsize():
 numpy.fabs(runtimes[ii]/runtimes[0]/mults[ii]*mults[0]-1.),mults[ii]/mults[0],runtimes[ii]/runtimes[0])
     return None
 
+# Test that integrating multiple orbits in one C call gives the same result as
+# integrating them one by one
+def test_integrate_multiple_orbits_c():
+    from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c
+    integrators= ['leapfrog_c','rk4_c','rk6_c','symplec4_c','symplec6_c',
+                  'dopr54_c']
+    times= numpy.linspace(0.,10.,101)
+    # Rectangular initial conditions for a few orbits
+    numpy.random.seed(1)
+    yos= numpy.array([1.,0.,0.1,0.1,1.,0.1])\
+        +0.05*numpy.random.normal(size=(5,6))
+    for integrator in integrators:
+        out, err= integrateFullOrbit_c(potential.MWPotential2014,yos,
+                                       times,integrator)
+        assert out.shape == (len(yos),len(times),6), 'Output from integrating multiple orbits in C does not have the expected shape'
+        assert err.shape == (len(yos),), 'Error array from integrating multiple orbits in C does not have the expected shape'
+        for ii in range(len(yos)):
+            sout, serr= integrateFullOrbit_c(potential.MWPotential2014,
+                                             yos[ii],times,integrator)
+            assert numpy.all(numpy.fabs(out[ii]-sout) < 10.**-10.), 'Integrating multiple orbits in C does not give the same result as integrating them one by one for integrator %s' % integrator
+            assert err[ii] == serr, 'Integrating multiple orbits in C does not give the same error code as integrating them one by one for integrator %s' % integrator
+    return None
+
+# Check that integrating with a CompiledPotential gives the same result as
+# integrating with the original potential
+def test_integrate_compiledpotential():
+    from galpy.orbit import Orbit
+    from galpy.potential import CompiledPotential
+    cpot= CompiledPotential(potential.MWPotential2014)
+    times= numpy.linspace(0.,10.,101)
+    for integrator in ['leapfrog_c','symplec4_c','dopr54_c','odeint']:
+        for vxvv in [[1.,0.1,1.1,0.1,0.02,0.3],[1.,0.1,1.1,0.1,0.02],
+                     [1.,0.1,1.1,0.3],[1.,0.1,1.1]]:
+            o= Orbit(vxvv)
+            co= Orbit(vxvv)
+            o.integrate(times,potential.MWPotential2014,method=integrator)
+            co.integrate(times,cpot,method=integrator)
+            assert numpy.all(numpy.fabs(o.getOrbit()-co.getOrbit()) < 10.**-10.), 'Integrating an orbit with a CompiledPotential does not agree with integrating it with the original potential for integrator %s' % integrator
+            # Can re-use the same CompiledPotential
+            co.integrate(times,cpot,method=integrator)
+            assert numpy.all(numpy.fabs(o.getOrbit()-co.getOrbit()) < 10.**-10.), 'Integrating an orbit a second time with a CompiledPotential does not agree with integrating it with the original potential for integrator %s' % integrator
+    # Also for the integration of a phase-space volume
+    from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_dxdv_c
+    yo= numpy.array([1.,0.,0.1,0.1,1.1,0.02])
+    dyo= 10.**-4.*numpy.ones(6)
+    out, err= integrateFullOrbit_dxdv_c(potential.MWPotential2014,yo,dyo,
+                                        times,'dopr54_c')
+    cout, cerr= integrateFullOrbit_dxdv_c(cpot,yo,dyo,times,'dopr54_c')
+    assert numpy.all(numpy.fabs(out-cout) < 10.**-10.), 'Integrating a phase-space volume with a CompiledPotential does not agree with integrating it with the original potential'
+    return None
+
+# Check that 3D orbits in non-axisymmetric planar potentials converted to 3D
+# with planarToFullPotential agree between C and Python and with planar orbits
+def test_integrate_planarToFullPotential():
+    from galpy.orbit import Orbit
+    from galpy.potential import planarToFullPotential, RZToplanarPotential
+    pps= [potential.DehnenBarPotential(tform=-5.,tsteady=2.),
+          potential.SteadyLogSpiralPotential(tform=-3.,tsteady=2.),
+          potential.TransientLogSpiralPotential(),
+          potential.EllipticalDiskPotential(tform=-2.,tsteady=3.,
+                                            twophio=0.05),
+          potential.LopsidedDiskPotential(tform=-2.,tsteady=3.,phio=0.02)]
+    times= numpy.linspace(0.,20.,1001)
+    for pp in pps:
+        pot= potential.MWPotential2014+[planarToFullPotential(pp)]
+        assert pot[-1].hasC, 'z-independent version of a planar potential with a C implementation does not have a C implementation'
+        assert RZToplanarPotential(pot)[-1] is pp, 'RZToplanarPotential does not return the original planar potential for a potential obtained from planarToFullPotential'
+        o= Orbit([1.,0.1,1.1,0.05,0.02,0.3])
+        o.integrate(times,pot,method='dopr54_c')
+        oo= Orbit([1.,0.1,1.1,0.05,0.02,0.3])
+        oo.integrate(times,pot,method='odeint')
+        for attr in ['x','y','z','vx','vy','vz']:
+            assert numpy.all(numpy.fabs(getattr(o,attr)(times)-getattr(oo,attr)(times)) < 10.**-4.), 'Integrating a 3D orbit in a %s converted with planarToFullPotential in C does not agree with integrating it in Python' % type(pp).__name__
+        # In the plane, the orbit should be the same as the planar orbit
+        o= Orbit([1.,0.1,1.1,0.,0.,0.3])
+        o.integrate(times,pot,method='dopr54_c')
+        op= Orbit([1.,0.1,1.1,0.3])
+        op.integrate(times,RZToplanarPotential(pot),method='dopr54_c')
+        assert numpy.all(numpy.fabs(o.x(times)-op.x(times)) < 10.**-8.), 'Integrating a 3D orbit in the plane in a %s converted with planarToFullPotential does not agree with the planar orbit' % type(pp).__name__
+        assert numpy.all(numpy.fabs(o.y(times)-op.y(times)) < 10.**-8.), 'Integrating a 3D orbit in the plane in a %s converted with planarToFullPotential does not agree with the planar orbit' % type(pp).__name__
+    return None
+
+# Check that orbits in MovingObjectPotentials integrated in C agree with
+# those integrated in Python
+def test_integrate_movingobject_c():
+    from galpy.orbit import Orbit
+    from galpy.potential_src.ForceSoftening import PlummerSoftening
+    lp= potential.LogarithmicHaloPotential(normalize=1.)
+    times= numpy.linspace(-1.,10.,1001) # odeint steps beyond ts[-1]
+    o1= Orbit([0.75,0.,1.,0.,0.,0.])
+    o1.integrate(times,lp,method='dopr54_c')
+    o2= Orbit([0.75,0.1,1.1,0.05,0.,numpy.pi])
+    o2.integrate(times[::-1],lp,method='dopr54_c') # backwards
+    mp1= potential.MovingObjectPotential(o1,GM=0.06,softening_length=0.05)
+    mp2= potential.MovingObjectPotential(o2,
+                                         softening=PlummerSoftening(softening_length=0.1))
+    assert mp1.hasC and mp2.hasC, 'MovingObjectPotential with Plummer softening and an integrated orbit does not have a C implementation'
+    pot= [lp,mp1,mp2]
+    ts= numpy.linspace(0.,5.,101)
+    for vxvv in [[1.,0.1,1.1,0.05,0.02,0.3],[1.,0.1,1.1,0.3]]:
+        o= Orbit(vxvv)
+        o.integrate(ts,pot,method='dopr54_c')
+        oo= Orbit(vxvv)
+        oo.integrate(ts,pot,method='odeint')
+        for attr in ['x','y','vx','vy']:
+            assert numpy.all(numpy.fabs(getattr(o,attr)(ts)-getattr(oo,attr)(ts)) < 10.**-4.), 'Integrating an orbit in MovingObjectPotentials in C does not agree with integrating it in Python'
+    # A MovingObjectPotential for an orbit that is not integrated has no C,
+    # until the orbit is integrated
+    mp= potential.MovingObjectPotential(Orbit([1.,0.,1.,0.,0.,0.]))
+    assert not mp.hasC, 'MovingObjectPotential for an orbit that was not integrated has a C implementation'
+    mp._orb.integrate(times,lp)
+    assert mp.hasC, 'MovingObjectPotential does not have a C implementation after its orbit was integrated'
+    # Other softenings are not supported in C and fall back onto Python
+    class OtherSoftening(PlummerSoftening): pass
+    mp3= potential.MovingObjectPotential(o1,GM=0.06,
+                                         softening=OtherSoftening(softening_length=0.05))
+    assert not mp3.hasC, 'MovingObjectPotential with a softening other than Plummer has a C implementation'
+    o= Orbit([1.,0.1,1.1,0.05,0.02,0.3])
+    o.integrate(ts,[lp,mp3],method='dopr54_c')
+    oo= Orbit([1.,0.1,1.1,0.05,0.02,0.3])
+    oo.integrate(ts,[lp,mp1],method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.x(ts)-oo.x(ts)) < 10.**-4.), 'Integrating an orbit in a MovingObjectPotential with a non-Plummer softening does not agree with that in C'
+    return None
+
+# Check that the Orbits observables agree with those of individual Orbits
+def test_orbits_observables():
+    from galpy.orbit import Orbit, Orbits
+    numpy.random.seed(1)
+    vxvvs= numpy.array([1.,0.1,1.1,0.1,0.02,0.3])\
+        +0.05*numpy.random.normal(size=(5,6))
+    os= Orbits(vxvvs,ro=8.,vo=220.)
+    ol= [Orbit(vxvv,ro=8.,vo=220.) for vxvv in vxvvs]
+    assert len(os) == len(vxvvs), 'Length of Orbits instance is not the number of orbits'
+    for attr in ['R','vR','vT','z','vz','phi','x','y','vx','vy','ra','dec',
+                 'll','bb','dist','pmra','pmdec','pmll','pmbb','vlos',
+                 'vra','vdec','helioX','helioY','helioZ','U','V','W']:
+        assert numpy.all(numpy.fabs(getattr(os,attr)()-numpy.array([getattr(o,attr)() for o in ol]).flatten()) < 10.**-8.), 'Orbits method %s does not agree with that of individual Orbits' % attr
+    assert numpy.all(numpy.fabs(os.E(pot=potential.MWPotential2014)-numpy.array([o.E(pot=potential.MWPotential2014) for o in ol])) < 10.**-8.), 'Orbits energy does not agree with that of individual Orbits'
+    assert numpy.all(numpy.fabs(os.L()-numpy.array([o.L()[0] for o in ol])) < 10.**-8.), 'Orbits angular momentum does not agree with that of individual Orbits'
+    # Setup in observed coordinates
+    radec= numpy.array([[o.ra(),o.dec(),o.dist(),o.pmra(),o.pmdec(),o.vlos()]
+                        for o in ol]).reshape((len(ol),6))
+    ors= Orbits(radec,radec=True,ro=8.,vo=220.)
+    assert numpy.all(numpy.fabs(ors._orb.vxvv-vxvvs.T) < 10.**-8.), 'Orbits setup with radec does not give the correct initial conditions'
+    lbuvw= numpy.array([[o.ll(),o.bb(),o.dist(),o.U(),o.V(),o.W()]
+                        for o in ol]).reshape((len(ol),6))
+    ors= Orbits(lbuvw,lb=True,uvw=True,ro=8.,vo=220.)
+    assert numpy.all(numpy.fabs(ors._orb.vxvv-vxvvs.T) < 10.**-8.), 'Orbits setup with lb and uvw does not give the correct initial conditions'
+    # Setup with a list of rows or with a tuple of coordinate arrays
+    for tvxvvs in [[list(vxvv) for vxvv in vxvvs],
+                   [list(vxvv) for vxvv in vxvvs[:2]],
+                   tuple(vxvvs.T)]:
+        ors= Orbits(tvxvvs,ro=8.,vo=220.)
+        assert ors._orb.vxvv.shape == (6,len(vxvvs[:len(ors)])), 'Orbits setup with a list of rows or a tuple of coordinates does not give the correct number of orbits'
+        assert numpy.all(numpy.fabs(ors._orb.vxvv-vxvvs[:len(ors)].T) < 10.**-10.), 'Orbits setup with a list of rows or a tuple of coordinates does not give the correct initial conditions'
+    # Indexing
+    assert numpy.fabs(os[2].R()-ol[2].R()) < 10.**-10., 'Indexing Orbits does not return the correct Orbit'
+    assert len(os[1:4]) == 3, 'Slicing Orbits does not return the correct number of orbits'
+    return None
+
+# Check that integrating Orbits gives the same as integrating individual Orbits
+def test_orbits_integrate():
+    from galpy.orbit import Orbit, Orbits
+    numpy.random.seed(2)
+    vxvvs= numpy.array([1.,0.1,1.1,0.1,0.02,0.])\
+        +0.05*numpy.random.normal(size=(4,6))
+    times= numpy.linspace(0.,10.,201)
+    for vindx in [[0,1,2,3,4,5],[0,1,2,3,4],[0,1,2,5],[0,1,2]]:
+        for integrator in ['dopr54_c','odeint']:
+            os= Orbits(vxvvs[:,vindx])
+            os.integrate(times,potential.MWPotential2014,method=integrator)
+            ol= [Orbit(vxvv) for vxvv in vxvvs[:,vindx]]
+            for o in ol:
+                o.integrate(times,potential.MWPotential2014,method=integrator)
+            assert os.getOrbit().shape == (len(vxvvs),len(times),len(vindx)), 'Integrated Orbits do not have the expected shape'
+            assert numpy.all(numpy.fabs(os.getOrbit()-numpy.array([o.getOrbit() for o in ol])) < 10.**-10.), 'Integrating Orbits does not agree with integrating individual Orbits'
+            attrs= ['R','vR','E']
+            if len(vindx) % 2 == 0: attrs.append('x')
+            for attr in attrs:
+                assert numpy.all(numpy.fabs(getattr(os,attr)(times)-numpy.array([getattr(o,attr)(times) for o in ol])) < 10.**-8.), 'Orbits method %s does not agree with that of individual Orbits at the integration times' % attr
+                # Interpolated
+                assert numpy.all(numpy.fabs(getattr(os,attr)(3.33)-numpy.array([getattr(o,attr)(3.33) for o in ol]).flatten()) < 10.**-6.), 'Orbits method %s does not agree with that of individual Orbits at a time in between the integration times' % attr
+            assert numpy.all(numpy.fabs(os.rap()-numpy.array([o.rap() for o in ol])) < 10.**-10.), 'Orbits rap does not agree with that of individual Orbits'
+            assert numpy.all(numpy.fabs(os.rperi()-numpy.array([o.rperi() for o in ol])) < 10.**-10.), 'Orbits rperi does not agree with that of individual Orbits'
+            assert numpy.all(numpy.fabs(os.e()-numpy.array([o.e() for o in ol])) < 10.**-10.), 'Orbits e does not agree with that of individual Orbits'
+            if len(vindx) > 4:
+                assert numpy.all(numpy.fabs(os.Ez(times)-numpy.array([o.Ez(times) for o in ol])) < 10.**-8.), 'Orbits Ez does not agree with that of individual Orbits'
+                assert numpy.all(numpy.fabs(os.zmax()-numpy.array([o.zmax() for o in ol])) < 10.**-10.), 'Orbits zmax does not agree with that of individual Orbits'
+    return None
+
+# Check that the Orbits actions agree with those of individual Orbits
+def test_orbits_actions():
+    from galpy.orbit import Orbit, Orbits
+    numpy.random.seed(3)
+    vxvvs= numpy.array([1.,0.1,1.1,0.1,0.02,0.])\
+        +0.05*numpy.random.normal(size=(4,6))
+    os= Orbits(vxvvs)
+    ol= [Orbit(vxvv) for vxvv in vxvvs]
+    for attr in ['jr','jp','jz']:
+        assert numpy.all(numpy.fabs(getattr(os,attr)(potential.MWPotential2014,type='staeckel',delta=0.45)-numpy.array([getattr(o,attr)(potential.MWPotential2014,type='staeckel',delta=0.45) for o in ol]).flatten()) < 10.**-8.), 'Orbits action %s does not agree with that of individual Orbits' % attr
+    return None
+
+# Check that the analytic rperi, rap, zmax, and e, integrate_dxdv, and adding
+# Orbits agree with those of individual Orbits
+def test_orbits_analytic_dxdv_add():
+    from galpy.orbit import Orbit, Orbits
+    numpy.random.seed(4)
+    vxvvs= numpy.array([1.,0.1,1.1,0.1,0.02,0.3])\
+        +0.05*numpy.random.normal(size=(4,6))
+    pot= potential.MWPotential2014
+    for vindx in [[0,1,2,3,4,5],[0,1,2,3,4],[0,1,2,5],[0,1,2]]:
+        for tpot in [pot,potential.CompiledPotential(pot)]:
+            os= Orbits(vxvvs[:,vindx])
+            ol= [Orbit(vxvv) for vxvv in vxvvs[:,vindx]]
+            funcs= ['rperi','rap','e']
+            if len(vindx) > 4: funcs.append('zmax')
+            for func in funcs:
+                assert numpy.all(numpy.fabs(getattr(os,func)(analytic=True,pot=tpot)-numpy.array([getattr(o,func)(analytic=True,pot=pot) for o in ol])) < 10.**-8.), 'Orbits analytic %s does not agree with that of individual Orbits' % func
+    # integrate_dxdv
+    times= numpy.linspace(0.,10.,101)
+    for vindx in [[0,1,2,3,4,5],[0,1,2,5]]:
+        dxdv= 10.**-4.*numpy.random.normal(size=(len(vxvvs),len(vindx)))
+        os= Orbits(vxvvs[:,vindx])
+        os.integrate_dxdv(dxdv,times,pot,method='dopr54_c')
+        assert os.getOrbit_dxdv().shape == (len(vxvvs),len(times),len(vindx)), 'Orbits.integrate_dxdv does not give the expected shape'
+        for ii in range(len(vxvvs)):
+            o= Orbit(vxvvs[ii,vindx])
+            o.integrate_dxdv(dxdv[ii],times,pot,method='dopr54_c')
+            assert numpy.all(numpy.fabs(os.getOrbit_dxdv()[ii]-o.getOrbit_dxdv()) < 10.**-10.), 'Orbits.integrate_dxdv does not agree with that of individual Orbits'
+    # fit is not available for Orbits
+    assert not hasattr(os,'fit'), 'Orbits instance should not have a fit method'
+    # Adding linear and planar Orbits
+    lo= Orbits(vxvvs[:,[3,4]])
+    of= Orbits(vxvvs[:,[0,1,2,5]])+lo
+    assert isinstance(of,Orbits) and len(of) == len(vxvvs), 'Sum of planar and linear Orbits does not give Orbits'
+    assert numpy.all(numpy.fabs(of._orb.vxvv-vxvvs.T) < 10.**-10.), 'Sum of planar and linear Orbits does not have the correct initial conditions'
+    of= lo+Orbits(vxvvs[:,[0,1,2]])
+    assert numpy.all(numpy.fabs(of._orb.vxvv-vxvvs[:,:5].T) < 10.**-10.), 'Sum of linear and planar Orbits does not have the correct initial conditions'
+    return None
+
 # Check that adding a linear orbit to a planar orbit gives a FullOrbit
 def test_add_linear_planar_orbit():
     from galpy.orbit_src import FullOrbit, RZOrbit
@@ -2602,6 +2939,250 @@ def test_backinterpolation_issue204():
     assert numpy.all((o.vT(nitimes)+of.vT(pitimes)) < 10.**-8.), 'Forward and backward integration with interpolation do not agree'
     return None
 
+# Test that the dense output used to evaluate orbits in between the output
+# times agrees with integrating the orbit on a fine grid
+def test_dense_output():
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    times= numpy.linspace(0.,10.,1001)
+    ftimes= numpy.linspace(0.,10.,3001)
+    for method in ['dopr54_c','odeint']:
+        for vxvv in [[1.,0.1,1.1,0.1,0.05,0.3],[1.,0.1,1.1,0.1,0.05],
+                     [1.,0.1,1.1,0.3],[1.,0.1,1.1]]:
+            o= Orbit(vxvv)
+            o.integrate(times,pot,method=method)
+            of= Orbit(vxvv)
+            of.integrate(ftimes,pot,method=method)
+            diff= numpy.fabs(o._orb(ftimes)-of.getOrbit().T)
+            if len(vxvv) % 2 == 0: # phi
+                diff[-1]= numpy.fabs((diff[-1]+numpy.pi) % (2.*numpy.pi)
+                                     -numpy.pi)
+            assert numpy.all(diff < 10.**-6.), 'Dense output of the orbit does not agree with a finely-sampled integration for method %s and dim %i' % (method,len(vxvv))
+            if method == 'odeint':
+                # Python integrators do not return accelerations, splines
+                assert not hasattr(o._orb,'_dense_acc'), 'Python integration returned accelerations for dense output'
+            elif len(vxvv) == 6:
+                # C accelerations should agree with those from Python
+                assert hasattr(o._orb,'_dense_acc'), 'C integration did not return the accelerations for dense output'
+                R, z, phi= o._orb.orbit[:,0], o._orb.orbit[:,3], \
+                    o._orb.orbit[:,5]
+                Rforce= numpy.array([potential.evaluateRforces(pot,RR,zz,
+                                                               phi=pp)
+                                     for RR,zz,pp in zip(R,z,phi)])
+                phiforce= numpy.array([potential.evaluatephiforces(pot,RR,zz,
+                                                                   phi=pp)
+                                       for RR,zz,pp in zip(R,z,phi)])
+                zforce= numpy.array([potential.evaluatezforces(pot,RR,zz,
+                                                               phi=pp)
+                                     for RR,zz,pp in zip(R,z,phi)])
+                acc= numpy.array([numpy.cos(phi)*Rforce
+                                  -numpy.sin(phi)*phiforce/R,
+                                  numpy.sin(phi)*Rforce
+                                  +numpy.cos(phi)*phiforce/R,
+                                  zforce]).T
+                assert numpy.all(numpy.fabs(o._orb._dense_acc-acc) < 10.**-10.), 'Accelerations returned by the C integrator do not agree with the Python accelerations'
+    # Also for a 1D orbit
+    vpot= [p.toVertical(1.) for p in pot]
+    o= Orbit([0.1,0.2])
+    o.integrate(times,vpot)
+    of= Orbit([0.1,0.2])
+    of.integrate(ftimes,vpot)
+    assert numpy.all(numpy.fabs(o._orb(ftimes)-of.getOrbit().T) < 10.**-6.), 'Dense output of a linear orbit does not agree with a finely-sampled integration'
+    # and for backward integration
+    o= Orbit([1.,0.1,1.1,0.1,0.05,0.3])
+    o.integrate(-times,pot)
+    of= Orbit([1.,0.1,1.1,0.1,0.05,0.3])
+    of.integrate(-ftimes,pot)
+    assert numpy.all(numpy.fabs(o.R(-ftimes)-of.R(-ftimes)) < 10.**-6.), 'Dense output of a backward-integrated orbit does not agree with a finely-sampled integration'
+    assert numpy.all(numpy.fabs(o.vz(-ftimes)-of.vz(-ftimes)) < 10.**-6.), 'Dense output of a backward-integrated orbit does not agree with a finely-sampled integration'
+    return None
+
+# Test that integrate_extrema finds the turning points of the orbit in
+# between the output times, comparing to a finely-sampled integration
+def test_integrate_extrema():
+    from galpy.orbit import Orbit, Orbits
+    pot= potential.MWPotential2014
+    times= numpy.linspace(0.,10.,101)
+    ftimes= numpy.linspace(0.,10.,100001)
+    vxvvs= numpy.array([[1.,0.1,1.1,0.1,0.05,0.3],
+                        [1.1,-0.1,0.9,0.05,-0.1,2.]])
+    for method in ['dopr54_c','odeint']:
+        os= Orbits(vxvvs)
+        os.integrate_extrema(times,pot,method=method)
+        for ii in range(len(vxvvs)):
+            o= Orbit(vxvvs[ii])
+            o.integrate_extrema(times,pot,method=method)
+            of= Orbit(vxvvs[ii])
+            of.integrate(ftimes,pot,method='dopr54_c')
+            for func in ['rperi','rap','zmax','e']:
+                assert numpy.fabs(getattr(o,func)()-getattr(of,func)()) < 10.**-5., 'integrate_extrema %s does not agree with a finely-sampled integration for method %s' % (func,method)
+                assert numpy.fabs(getattr(os,func)()[ii]-getattr(o,func)()) < 10.**-10., 'Orbits.integrate_extrema %s does not agree with Orbit.integrate_extrema for method %s' % (func,method)
+    # The orbit itself is not available afterwards
+    try:
+        o.R(1.)
+    except ValueError: pass
+    else: raise AssertionError('Orbit.R(t) after integrate_extrema should have raised an error')
+    # Not implemented for 2D orbits
+    o= Orbit([1.,0.1,1.1,0.1])
+    try:
+        o.integrate_extrema(times,pot)
+    except NotImplementedError: pass
+    else: raise AssertionError('Orbit.integrate_extrema for a 2D orbit should have raised NotImplementedError')
+    return None
+
+# Test that integrate_extrema finds all turning points in between two output
+# times when there is more than one, comparing to a brute-force evaluation of
+# the same cubic-Hermite interpolation
+def test_integrate_extrema_multiple():
+    from galpy.orbit import Orbit
+    from galpy.orbit_src.FullOrbit import _orbitExtrema
+    pot= potential.MWPotential2014
+    # Output times spaced by 0.9 vertical periods, such that vz often has
+    # the same sign at both ends of an interval with two turning points
+    Tz= 2.*numpy.pi/potential.verticalfreq(pot,1.)
+    times= numpy.arange(11)*0.9*Tz
+    vxvv= [1.,0.02,1.,0.,0.05,0.]
+    o= Orbit(vxvv)
+    o.integrate(times,pot,method='dopr54_c')
+    orb= o.getOrbit()
+    cosphi, sinphi= numpy.cos(orb[:,5]), numpy.sin(orb[:,5])
+    q= numpy.array([orb[:,0]*cosphi,orb[:,0]*sinphi,orb[:,3]]).T
+    v= numpy.array([orb[:,1]*cosphi-orb[:,2]*sinphi,
+                    orb[:,2]*cosphi+orb[:,1]*sinphi,orb[:,4]]).T
+    h= (times[1:]-times[:-1])[:,numpy.newaxis]
+    s= numpy.linspace(0.,1.,100001)[:,numpy.newaxis,numpy.newaxis]
+    p= (1.+2.*s)*(1.-s)**2.*q[:-1]+s*(1.-s)**2.*h*v[:-1]\
+        +s**2.*(3.-2.*s)*q[1:]+s**2.*(s-1.)*h*v[1:]
+    r= numpy.sqrt(numpy.sum(p**2.,axis=2))
+    bf= numpy.array([numpy.amin(r),numpy.amax(r),
+                     numpy.amax(numpy.fabs(p[...,2]))])
+    assert numpy.all(numpy.fabs(_orbitExtrema(times,orb)-bf) < 10.**-8.), 'Python extrema do not find all turning points in between output times'
+    oe= Orbit(vxvv)
+    oe.integrate_extrema(times,pot,method='dopr54_c')
+    assert numpy.all(numpy.fabs(numpy.array([oe.rperi(),oe.rap(),oe.zmax()])
+                                -bf) < 10.**-8.), 'C extrema do not find all turning points in between output times'
+    return None
+
+# Test that integrating into a given (memory-mapped) array and integrating
+# in chunks gives the same orbit as a regular integration
+def test_integrate_out_chunks():
+    import tempfile
+    from galpy.orbit import Orbit, Orbits
+    pot= potential.MWPotential2014
+    times= numpy.linspace(0.,10.,1001)
+    vxvvs= numpy.array([[1.,0.1,1.1,0.1,0.05,0.3],
+                        [1.1,-0.1,0.9,0.05,-0.1,2.]])
+    for method in ['symplec4_c','dopr54_c','odeint']:
+        o= Orbit(vxvvs[0])
+        o.integrate(times,pot,method=method)
+        tmpfile= tempfile.NamedTemporaryFile()
+        out= numpy.memmap(tmpfile,dtype='float64',mode='w+',
+                          shape=(len(times),6))
+        om= Orbit(vxvvs[0])
+        om.integrate(times,pot,method=method,out=out)
+        assert om.getOrbit() is out, 'Orbit integrated with out= does not store the orbit in out'
+        assert numpy.all(numpy.fabs(out-o.getOrbit()) < 10.**-10.), 'Orbit integrated into a memmap does not agree with regular integration for method %s' % method
+        assert numpy.fabs(om.R(1.2345)-o.R(1.2345)) < 10.**-10., 'Orbit integrated into a memmap does not agree with regular integration for method %s' % method
+        assert hasattr(om._orb,'_dense_acc') == ('_c' in method), 'Orbit integrated with out= does not keep the C accelerations for dense output'
+        tmpfile.close()
+        # Also store the accelerations in a given array
+        out= numpy.empty((len(times),6))
+        out_acc= numpy.empty((len(times),3))
+        om= Orbit(vxvvs[0])
+        om.integrate(times,pot,method=method,out=out,out_acc=out_acc)
+        if '_c' in method:
+            assert numpy.all(numpy.fabs(out_acc-o._orb._dense_acc) < 10.**-10.), 'Accelerations integrated into an array do not agree with regular integration for method %s' % method
+            assert numpy.may_share_memory(om._orb._dense_acc,out_acc), 'Orbit integrated with out_acc= does not use out_acc for dense output'
+        assert numpy.fabs(om.R(1.2345)-o.R(1.2345)) < 10.**-10., 'Orbit integrated into an array with out_acc= does not agree with regular integration for method %s' % method
+        # Chunks
+        tc, oc= zip(*Orbit(vxvvs[0]).integrate_chunks(times,pot,method=method,
+                                                     chunksize=300))
+        assert len(tc) == 4, 'integrate_chunks does not return the expected number of chunks'
+        assert numpy.all(numpy.concatenate(tc) == times), 'integrate_chunks does not return the correct times'
+        diff= numpy.fabs(numpy.concatenate(oc)-o.getOrbit())
+        diff[:,5]= numpy.fabs((diff[:,5]+numpy.pi) % (2.*numpy.pi)-numpy.pi)
+        assert numpy.all(diff < 10.**-5.), 'integrate_chunks does not agree with regular integration for method %s' % method
+        ac= [c[2] for c in Orbit(vxvvs[0]).integrate_chunks(times,pot,
+                                                            method=method,
+                                                            chunksize=300,
+                                                            dense=True)]
+        if '_c' in method:
+            assert numpy.all(numpy.fabs(numpy.concatenate(ac)-o._orb._dense_acc) < 10.**-5.), 'integrate_chunks with dense=True does not return the accelerations for method %s' % method
+        else:
+            assert numpy.all([a is None for a in ac]), 'integrate_chunks with dense=True does not return None for the accelerations for method %s' % method
+        # Orbits
+        os= Orbits(vxvvs)
+        os.integrate(times,pot,method=method)
+        out= numpy.empty((len(vxvvs),len(times),6))
+        osm= Orbits(vxvvs)
+        osm.integrate(times,pot,method=method,out=out)
+        assert osm.getOrbit() is out, 'Orbits integrated with out= does not store the orbits in out'
+        assert numpy.all(numpy.fabs(out-os.getOrbit()) < 10.**-10.), 'Orbits integrated into an array does not agree with regular integration for method %s' % method
+        assert numpy.all(numpy.fabs(osm.R(1.2345)-os.R(1.2345)) < 10.**-10.), 'Orbits integrated into an array does not agree with regular integration for method %s' % method
+        oc= numpy.concatenate([c[1] for c in Orbits(vxvvs).integrate_chunks(times,pot,method=method,chunksize=300)],axis=1)
+        diff= numpy.fabs(oc-os.getOrbit())
+        diff[...,5]= numpy.fabs((diff[...,5]+numpy.pi) % (2.*numpy.pi)-numpy.pi)
+        assert numpy.all(diff < 10.**-5.), 'Orbits.integrate_chunks does not agree with regular integration for method %s' % method
+    # Wrong shape for out should raise an error
+    try:
+        Orbit(vxvvs[0]).integrate(times,pot,out=numpy.empty((10,6)))
+    except ValueError: pass
+    else: raise AssertionError('Orbit.integrate with out= of the wrong shape should have raised ValueError')
+    try:
+        Orbit(vxvvs[0]).integrate(times,pot,out_acc=numpy.empty((len(times),3)))
+    except ValueError: pass
+    else: raise AssertionError('Orbit.integrate with out_acc= but without out= should have raised ValueError')
+    return None
+
+# Test that the C integrators for linear orbits agree with odeint, also when
+# integrating many orbits at once
+def test_integrate_linear_c():
+    from galpy.orbit import Orbit, Orbits
+    times= numpy.linspace(0.,20.,1001)
+    pots= [potential.KGPotential(K=1.15,F=0.03,D=1.8,amp=0.1),
+           potential.RZToverticalPotential(potential.MWPotential2014,1.1),
+           [potential.KGPotential(amp=0.05),
+            potential.MiyamotoNagaiPotential(normalize=1.).toVertical(0.9)]]
+    vxvvs= numpy.array([[0.1,0.2],[-0.05,0.1],[0.3,-0.02]])
+    for pot in pots:
+        assert potential.CompiledPotential(pot).hasC, 'Linear potential should have a C implementation'
+        o= Orbit(vxvvs[0])
+        o.integrate(times,pot,method='odeint')
+        for method in ['leapfrog_c','symplec4_c','symplec6_c','rk4_c',
+                       'rk6_c','dopr54_c']:
+            oc= Orbit(vxvvs[0])
+            oc.integrate(times,pot,method=method)
+            assert numpy.all(numpy.fabs(oc.getOrbit()-o.getOrbit()) < 10.**-3.), 'C integration of a linear orbit does not agree with odeint for method %s' % method
+            if not method == 'leapfrog_c':
+                assert numpy.std(oc.E(times))/numpy.fabs(numpy.mean(oc.E(times))) < 10.**-6., 'C integration of a linear orbit does not conserve energy for method %s' % method
+        # Batch integration, also with a CompiledPotential
+        for tpot in [pot,potential.CompiledPotential(pot)]:
+            os= Orbits(vxvvs)
+            os.integrate(times,tpot,method='dopr54_c')
+            for ii in range(len(vxvvs)):
+                oc= Orbit(vxvvs[ii])
+                oc.integrate(times,pot,method='dopr54_c')
+                assert numpy.all(numpy.fabs(os.getOrbit()[ii]-oc.getOrbit()) < 10.**-10.), 'Batch C integration of linear orbits does not agree with integrating them one by one'
+    # 3D potentials cannot be used to integrate linear orbits
+    from galpy.potential import PotentialError
+    from galpy.orbit_src.integrateLinearOrbit import integrateLinearOrbit_c
+    for method in ['odeint','leapfrog','leapfrog_c','dopr54_c']:
+        for pot in [potential.MWPotential2014,
+                    potential.CompiledPotential(potential.MWPotential2014),
+                    [potential.KGPotential(amp=0.05),
+                     potential.MiyamotoNagaiPotential(normalize=1.)]]:
+            o= Orbit(vxvvs[0])
+            try:
+                o.integrate(times,pot,method=method)
+            except PotentialError: pass
+            else: raise AssertionError('Integrating a linear orbit in a 3D potential should have raised PotentialError for method %s' % method)
+    try:
+        integrateLinearOrbit_c(potential.MWPotential2014,vxvvs[0],times,
+                               'dopr54_c')
+    except PotentialError: pass
+    else: raise AssertionError('integrateLinearOrbit_c with a 3D potential should have raised PotentialError')
+    return None
+
 # Test that Orbit.x .y .vx and .vy return a scalar for scalar time input
 def test_scalarxyvzvz_issue247():
     # Setup an orbit
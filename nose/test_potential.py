@@ -24,8 +24,11 @@ def test_normalize_potential():
     pots.append('specialMN3ExponentialDiskPotentialPD')
     pots.append('specialMN3ExponentialDiskPotentialSECH')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -76,6 +79,7 @@ def test_forceAsDeriv_potential():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     pots.append('testlinearMWPotential')
+    pots.append('mockInterpSphericalPotential')
     pots.append('mockInterpRZPotential')
     pots.append('mockSnapshotRZPotential')
     pots.append('mockInterpSnapshotRZPotential')
@@ -96,8 +100,11 @@ def test_forceAsDeriv_potential():
     pots.append('mockMovingObjectPotential')
     pots.append('mockMovingObjectExplSoftPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -217,6 +224,7 @@ def test_2ndDeriv_potential():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     pots.append('testlinearMWPotential')
+    pots.append('mockInterpSphericalPotential')
     pots.append('mockInterpRZPotential')
     pots.append('mockCosmphiDiskPotentialT1')
     pots.append('mockCosmphiDiskPotentialTm1')
@@ -233,8 +241,11 @@ def test_2ndDeriv_potential():
     pots.append('mockTransientLogSpiralPotential')
     pots.append('mockFlatEllipticalDiskPotential') #for evaluate w/ nonaxi lists
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -429,9 +440,13 @@ def test_poisson_potential():
     pots.append('testMWPotential')
     pots.append('testplanarMWPotential')
     pots.append('testlinearMWPotential')
+    pots.append('mockInterpSphericalPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -514,8 +529,11 @@ def test_evaluateAndDerivs_potential():
     pots.append('mockTransientLogSpiralPotential')
     pots.append('mockMovingObjectPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -748,8 +766,11 @@ def test_toVertical_toPlanar():
            if ('Potential' in p and not 'plot' in p and not 'RZTo' in p 
                and not 'evaluate' in p)]
     rmpots= ['Potential','MWPotential','MWPotential2014',
-             'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'MovingObjectPotential','CompiledPotential',
+             'planarToFullPotential',
+             'interpRZPotential', 'interp3DPotential',
+             'interpRZTimeSeriesPotential','interpSphericalPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -791,6 +812,26 @@ def test_RZToplanarPotential():
         raise AssertionError('Using RZToplanarPotential with a string rather than an RZPotential or a planarPotential did not raise PotentialError')
     return None
 
+def test_planarToFullPotential():
+    dp= potential.DehnenBarPotential(tform=-2.,tsteady=1.)
+    fdp= potential.planarToFullPotential(dp)
+    assert isinstance(fdp,potential.Potential), 'Running a planarPotential through planarToFullPotential does not produce a Potential'
+    for R,z in zip([0.5,1.,2.],[0.,0.3,-1.]):
+        assert numpy.fabs(fdp(R,z,phi=0.3,t=-1.)-dp(R,phi=0.3,t=-1.)) < 10.**-10., 'Potential obtained from planarToFullPotential does not agree with the planar potential'
+        assert numpy.fabs(fdp.Rforce(R,z,phi=0.3,t=-1.)-dp.Rforce(R,phi=0.3,t=-1.)) < 10.**-10., 'Radial force of potential obtained from planarToFullPotential does not agree with that of the planar potential'
+        assert numpy.fabs(fdp.phiforce(R,z,phi=0.3,t=-1.)-dp.phiforce(R,phi=0.3,t=-1.)) < 10.**-10., 'Azimuthal force of potential obtained from planarToFullPotential does not agree with that of the planar potential'
+        assert numpy.fabs(fdp.zforce(R,z,phi=0.3,t=-1.)) < 10.**-10., 'Potential obtained from planarToFullPotential has a vertical force'
+    # 3D potentials are just copied, lists are converted element-wise
+    assert potential.planarToFullPotential(potential.MWPotential2014) == potential.MWPotential2014, 'Running a list of 3D Potentials through planarToFullPotential does not return the same list'
+    assert potential.RZToplanarPotential(fdp) is dp, 'Running a potential obtained from planarToFullPotential through RZToplanarPotential does not return the original planarPotential'
+    try:
+        potential.planarToFullPotential('something else')
+    except potential.PotentialError:
+        pass
+    else:
+        raise AssertionError('Using planarToFullPotential with a string rather than a planarPotential or a Potential did not raise PotentialError')
+    return None
+
 # Sanity check the derivative of the rotation curve and the frequencies in the plane
 def test_dvcircdR_omegac_epifreq_rl_vesc():
     #Derivative of rotation curve
@@ -1056,6 +1097,246 @@ def test_ExpDisk_special():
     else: raise AssertionError("RazorThinExponentialDiskPotential's R2deriv did not raise AttributeError for z=/= 0 input")
     return None
 
+def test_DoubleExponentialDisk_quad_c():
+    # Test that the C and numpy implementations of the vectorized quadrature
+    # for the DoubleExponentialDiskPotential agree
+    dp= potential.DoubleExponentialDiskPotential(normalize=1.,hr=0.3,hz=0.05)
+    rs, zs= numpy.meshgrid(numpy.linspace(0.05,3.,11),
+                           numpy.linspace(-0.5,0.5,11))
+    rs= rs.flatten()
+    zs= zs.flatten()
+    for qtype in ['pot','Rforce','zforce','R2deriv','z2deriv','Rzderiv']:
+        cevals= dp._quad(rs,zs,qtype,use_c=True)
+        pyevals= dp._quad(rs,zs,qtype,use_c=False)
+        assert numpy.all(numpy.fabs(cevals-pyevals) < 10.**-10.*numpy.amax(numpy.fabs(pyevals))), \
+            'C and numpy quadrature for DoubleExponentialDiskPotential %s do not agree' % qtype
+    # Also compare to the original point-by-point quadrature, such that an
+    # error common to both vectorized implementations is caught
+    for qtype in ['pot','Rforce','zforce']:
+        scalarevals= numpy.array([dblexpquad(dp,r,z,qtype)
+                                  for r,z in zip(rs,zs)])
+        for use_c in [True,False]:
+            evals= dp._quad(rs,zs,qtype,use_c=use_c)
+            assert numpy.all(numpy.fabs(evals-scalarevals) < 10.**-10.*numpy.amax(numpy.fabs(scalarevals))), \
+                'Vectorized quadrature for DoubleExponentialDiskPotential %s does not agree with the point-by-point quadrature' % qtype
+    # Scalar z with array R, spanning the Keplerian approximation at large R
+    rs= numpy.linspace(0.1,10.,21)
+    assert numpy.all(numpy.fabs(dp.Rforce(rs,0.1)-numpy.array([dp.Rforce(r,0.1) for r in rs])) < 10.**-10.), \
+        'DoubleExponentialDiskPotential Rforce evaluation does not work as expected for array R and scalar z'
+    return None
+
+def test_evaluateBulk():
+    # Test that the bulk evaluation agrees with the individual evaluate
+    # functions, both in C and in the Python fallback
+    from galpy.potential import MWPotential2014
+    rs= numpy.linspace(0.1,2.,11)
+    zs= numpy.linspace(-0.5,0.5,11)
+    quantities= ['potential','Rforce','zforce','R2deriv','z2deriv','Rzderiv',
+                 'dens']
+    funcs= [potential.evaluatePotentials,potential.evaluateRforces,
+            potential.evaluatezforces,potential.evaluateR2derivs,
+            potential.evaluatez2derivs,potential.evaluateRzderivs,
+            potential.evaluateDensities]
+    pots= [MWPotential2014,
+           potential.CompiledPotential(MWPotential2014),
+           [potential.MiyamotoNagaiPotential(normalize=.5),
+            potential.TwoPowerSphericalPotential(normalize=.5)]] # no C
+    nquants= [7,7,3] # TwoPowerSphericalPotential has no second derivatives
+    for pot,nquant in zip(pots,nquants):
+        bulk= potential.evaluateBulk(pot,rs,zs,
+                                     quantities=quantities[:nquant])
+        tpot= pot.pot if isinstance(pot,potential.CompiledPotential) else pot
+        for quantity,func,b in zip(quantities,funcs,bulk):
+            assert numpy.all(numpy.fabs(b-numpy.array([func(tpot,r,z) for r,z in zip(rs,zs)])) < 10.**-8.), \
+                'evaluateBulk does not agree with the evaluate functions for %s' % quantity
+    # Density on the axis, R=0, where the Poisson equation has 1/R terms
+    rs0= numpy.zeros(5)
+    zs0= numpy.linspace(0.05,0.5,5)
+    for pot in pots[:2]+[potential.MiyamotoNagaiPotential(normalize=1.),
+                         potential.NFWPotential(normalize=1.)]:
+        tpot= pot.pot if isinstance(pot,potential.CompiledPotential) else pot
+        assert numpy.all(numpy.fabs(potential.evaluateBulk(pot,rs0,zs0,quantities='dens')-numpy.array([potential.evaluateDensities(tpot,0.,z) for z in zs0])) < 10.**-8.), \
+            'evaluateBulk density does not agree with evaluateDensities at R=0'
+    # Single quantity, scalar z, and non-axisymmetric phi dependence
+    dp= potential.DehnenBarPotential()
+    fp= [potential.LogarithmicHaloPotential(normalize=1.),
+         potential.planarToFullPotential(dp)]
+    phis= numpy.linspace(0.,3.,11)
+    assert numpy.all(numpy.fabs(potential.evaluateBulk(fp,rs,0.1,phi=phis,quantities='phiforce')-numpy.array([dp.phiforce(r,phi=phi) for r,phi in zip(rs,phis)])) < 10.**-8.), \
+        'evaluateBulk does not agree with phiforce for a non-axisymmetric potential'
+    # Potentials whose Python implementation is not vectorized are evaluated
+    # one point at a time when they cannot be evaluated in C
+    cp= potential.CosmphiDiskPotential(m=2,p=-0.1) # no C
+    rp= potential.RazorThinExponentialDiskPotential()
+    assert not cp._vectorized and not rp._vectorized, 'Potentials that are not vectorized claim to be vectorized'
+    for pot,func in [(potential.planarToFullPotential(cp),
+                      lambda r,z,phi: cp(r,phi=phi)),
+                     (rp,lambda r,z,phi: rp(r,z,phi=phi))]:
+        assert numpy.all(numpy.fabs(potential.evaluateBulk(pot,rs,0.1,phi=phis)-numpy.array([func(r,0.1,phi) for r,phi in zip(rs,phis)])) < 10.**-8.), \
+            'evaluateBulk does not agree with the potential for a potential that is not vectorized'
+    # Physical output
+    lp= potential.LogarithmicHaloPotential(normalize=1.,ro=8.,vo=220.)
+    assert numpy.fabs(potential.evaluateBulk(lp,1.,0.1,quantities='Rforce')-lp.Rforce(1.,0.1)) < 10.**-8., \
+        'evaluateBulk does not return physical output when physical is turned on'
+    try:
+        potential.evaluateBulk(lp,1.,0.1,quantities='mass')
+    except potential.PotentialError: pass
+    else: raise AssertionError('evaluateBulk with an unknown quantity did not raise PotentialError')
+    return None
+
+def test_SCF_hernquist():
+    # The lowest-order SCF basis function is a Hernquist potential
+    sp= potential.SCFPotential(a=1.5)
+    hp= potential.HernquistPotential(amp=2.,a=1.5)
+    rs= numpy.linspace(0.1,5.,11)
+    zs= numpy.linspace(-2.,2.,11)
+    for func in ['__call__','Rforce','zforce','dens']:
+        assert numpy.all(numpy.fabs(numpy.array([getattr(sp,func)(r,z)-getattr(hp,func)(r,z) for r,z in zip(rs,zs)])) < 10.**-12.), \
+            'SCFPotential with the default coefficients does not agree with HernquistPotential for %s' % func
+    # Coefficients computed from the Hernquist density
+    Acos, Asin= potential.scf_compute_coeffs_axi(lambda R,z: hp.dens(R,z),
+                                                 5,4,a=1.5)
+    assert numpy.fabs(Acos[0,0,0]-1.) < 10.**-8., \
+        'scf_compute_coeffs_axi does not recover the Hernquist potential'
+    Acos[0,0,0]= 0.
+    assert numpy.all(numpy.fabs(Acos) < 10.**-8.), \
+        'scf_compute_coeffs_axi does not recover the Hernquist potential'
+    assert numpy.all(Asin == 0.), \
+        'scf_compute_coeffs_axi returns non-zero sine coefficients'
+    return None
+
+def test_SCF_compute_coeffs():
+    # Expanding the density of an SCFPotential recovers its coefficients
+    numpy.random.seed(1)
+    N, L= 4, 3
+    Acos= numpy.random.normal(size=(N,L,L))*0.1
+    Asin= numpy.random.normal(size=(N,L,L))*0.1
+    Acos[0,0,0]= 1.
+    sp= potential.SCFPotential(Acos=Acos,Asin=Asin,a=0.8)
+    tAcos, tAsin= potential.scf_compute_coeffs(\
+        lambda R,z,phi: sp.dens(R,z,phi=phi),N,L,a=0.8)
+    l, m= numpy.meshgrid(numpy.arange(L),numpy.arange(L),indexing='ij')
+    assert numpy.all(numpy.fabs((tAcos-Acos)[:,m <= l]) < 10.**-8.), \
+        'scf_compute_coeffs does not recover the cosine coefficients'
+    assert numpy.all(numpy.fabs((tAsin-Asin)[:,(m <= l)*(m > 0)]) < 10.**-8.), \
+        'scf_compute_coeffs does not recover the sine coefficients'
+    # Particles drawn from a Hernquist profile, M(<r)= r^2/(1+r)^2 for a=1
+    npart= 100000
+    u= numpy.random.uniform(size=npart)
+    r= numpy.sqrt(u)/(1.-numpy.sqrt(u))
+    costheta= numpy.random.uniform(-1.,1.,size=npart)
+    phi= numpy.random.uniform(0.,2.*numpy.pi,size=npart)
+    tAcos, tAsin= potential.scf_compute_coeffs_nbody(\
+        (r*numpy.sqrt(1.-costheta**2.),r*costheta,phi),1./npart,3,2)
+    assert numpy.fabs(tAcos[0,0,0]-1.) < 10.**-2., \
+        'scf_compute_coeffs_nbody does not recover the Hernquist potential'
+    assert numpy.all(numpy.fabs(tAcos[1:]) < 0.1), \
+        'scf_compute_coeffs_nbody does not recover the Hernquist potential'
+    return None
+
+def test_SCF_c():
+    # The C implementation agrees with the Python implementation
+    numpy.random.seed(2)
+    N, L= 5, 4
+    Acos= numpy.random.normal(size=(N,L,L))*0.1
+    Asin= numpy.random.normal(size=(N,L,L))*0.1
+    Acos[0,0,0]= 1.
+    rs= numpy.linspace(0.1,3.,11)
+    zs= numpy.linspace(-1.,1.,11)
+    phis= numpy.linspace(0.,6.,11)
+    quantities= ['potential','Rforce','zforce','phiforce','dens']
+    funcs= ['_evaluate','_Rforce','_zforce','_phiforce','_dens']
+    for sp in [potential.SCFPotential(Acos=Acos,a=1.2),
+               potential.SCFPotential(Acos=Acos,Asin=Asin,a=0.7)]:
+        bulk= potential.evaluateBulk(sp,rs,zs,phi=phis,quantities=quantities)
+        for quantity,func,b in zip(quantities,funcs,bulk):
+            assert numpy.all(numpy.fabs(b-numpy.array([getattr(sp,func)(r,z,phi=phi) for r,z,phi in zip(rs,zs,phis)])) < 10.**-10.), \
+                'SCFPotential evaluated in C does not agree with Python for %s' % quantity
+    return None
+
+def test_DiskMultipole_dblexp():
+    # The default DiskMultipolePotential is the default double-exponential disk
+    dp= potential.DiskMultipolePotential()
+    dep= potential.DoubleExponentialDiskPotential()
+    rs= numpy.array([0.1,0.5,1.,2.,1.,0.5])
+    zs= numpy.array([0.01,0.05,0.,0.3,0.1,-0.2])
+    for func in ['__call__','Rforce']:
+        assert numpy.all(numpy.fabs(numpy.array([getattr(dp,func)(r,z)/getattr(dep,func)(r,z)-1. for r,z in zip(rs,zs)])) < 3.*10.**-3.), \
+            'DiskMultipolePotential does not agree with DoubleExponentialDiskPotential for %s' % func
+    assert numpy.all(numpy.fabs(numpy.array([dp.zforce(r,z)/dep.zforce(r,z)-1. for r,z in zip(rs[zs != 0.],zs[zs != 0.])])) < 10.**-2.), \
+        'DiskMultipolePotential does not agree with DoubleExponentialDiskPotential for zforce'
+    return None
+
+def test_DiskMultipole_poisson():
+    # The potential of a sech^2 disk with a hole satisfies Poisson's equation
+    dens= lambda R,z: numpy.exp(-0.5/R-2.*R)/numpy.cosh(z/0.2)**2.
+    dp= potential.DiskMultipolePotential(dens=dens,
+                                         Sigma={'type':'expwhole','h':0.5,
+                                                'amp':0.4,'Rhole':0.5},
+                                         hz={'type':'sech2','h':0.1})
+    dR, dz= 10.**-4., 10.**-4.
+    for R,z in zip([0.5,1.,2.],[0.05,0.2,0.5]):
+        lapl= ((R+dR)*dp.Rforce(R+dR,z)-(R-dR)*dp.Rforce(R-dR,z))/2./dR/R\
+            +(dp.zforce(R,z+dz)-dp.zforce(R,z-dz))/2./dz
+        assert numpy.fabs(-lapl/4./numpy.pi/dens(R,z)-1.) < 10.**-2., \
+            'DiskMultipolePotential does not satisfy the Poisson equation'
+    # The C implementation agrees with the Python implementation
+    rs= numpy.array([0.,0.0001,0.3,1.,3.,50.])
+    zs= numpy.array([0.,0.,0.02,-0.2,1.,60.])
+    quantities= ['potential','Rforce','zforce']
+    bulk= potential.evaluateBulk(dp,rs,zs,quantities=quantities)
+    for quantity,func,b in zip(quantities,['_evaluate','_Rforce','_zforce'],bulk):
+        assert numpy.all(numpy.fabs(b-getattr(dp,func)(rs,zs)) < 10.**-10.), \
+            'DiskMultipolePotential evaluated in C does not agree with Python for %s' % quantity
+    return None
+
+def test_interpSpherical_pot():
+    # Interpolating a spherical potential recovers it, in Python and in C
+    tp= potential.TwoPowerSphericalPotential(amp=2.,a=0.8,alpha=1.5,beta=3.5)
+    ip= potential.interpSphericalPotential(Pot=tp,rgrid=(0.001,100.,1001))
+    rs= numpy.array([0.,0.0005,0.01,0.3,1.,3.,20.,80.,200.])
+    zs= numpy.array([0.,0.,0.01,-0.2,1.,-3.,10.,40.,0.])
+    quantities= ['potential','Rforce','zforce','R2deriv','z2deriv','Rzderiv',
+                 'dens']
+    funcs= ['_evaluate','_Rforce','_zforce','_R2deriv','_z2deriv','_Rzderiv',
+            '_dens']
+    bulk= potential.evaluateBulk(ip,rs,zs,quantities=quantities)
+    for quantity,func,b in zip(quantities,funcs,bulk):
+        assert numpy.all(numpy.fabs(b-getattr(ip,func)(rs,zs)) < 10.**-10.*numpy.fabs(b)+10.**-12.), \
+            'interpSphericalPotential evaluated in C does not agree with Python for %s' % quantity
+    # Inside the grid, the interpolation is accurate
+    indx= (numpy.sqrt(rs**2.+zs**2.) > 0.001)*(numpy.sqrt(rs**2.+zs**2.) < 100.)
+    for func in ['__call__','Rforce','zforce','dens']:
+        assert numpy.all(numpy.fabs(numpy.array([getattr(ip,func)(r,z)-getattr(tp,func)(r,z) for r,z in zip(rs[indx],zs[indx])])) < 10.**-8.*numpy.fabs(numpy.array([getattr(tp,func)(r,z) for r,z in zip(rs[indx],zs[indx])]))+10.**-12.), \
+            'interpSphericalPotential does not agree with the interpolated potential for %s' % func
+    # Outside the grid, the force is Keplerian
+    assert numpy.fabs(ip.Rforce(200.,0.)/ip.Rforce(100.,0.)-0.25) < 10.**-10., \
+        'interpSphericalPotential force outside of the grid is not Keplerian'
+    return None
+
+def test_interpSpherical_mass_dens():
+    # Setting up from M(<r) or from rho(r) gives the right potential
+    hp= potential.HernquistPotential(amp=2.,a=1.)
+    Mr= lambda r: r**2./(1.+r)**2.
+    dens= lambda r: 1./2./numpy.pi/r/(1.+r)**3.
+    rs= numpy.array([0.01,0.3,1.,3.,20.,80.])
+    for ip in [potential.interpSphericalPotential(Mr=Mr,rgrid=(0.001,1000.,1001)),
+               potential.interpSphericalPotential(dens=dens,rgrid=(0.001,1000.,1001))]:
+        for func in ['__call__','Rforce','R2deriv','dens']:
+            assert numpy.all(numpy.fabs(numpy.array([getattr(ip,func)(r,0.)/getattr(hp,func)(r,0.)-1. for r in rs])) < 10.**-3.), \
+                'interpSphericalPotential set up from a mass profile or density does not agree with HernquistPotential for %s' % func
+    # Giving none or more than one of Pot, Mr, and dens raises an error
+    from galpy.potential import PotentialError
+    try:
+        potential.interpSphericalPotential()
+    except PotentialError: pass
+    else: raise AssertionError('interpSphericalPotential without input did not raise PotentialError')
+    try:
+        potential.interpSphericalPotential(Pot=hp,Mr=Mr)
+    except PotentialError: pass
+    else: raise AssertionError('interpSphericalPotential with two inputs did not raise PotentialError')
+    return None
+
 def test_MovingObject_density():
     mp= mockMovingObjectPotential()
     #Just test that the density far away from the object is close to zero
@@ -1634,6 +1915,12 @@ class mockInterpRZPotential(interpRZPotential):
                                    logR=True,
                                    interpPot=True,interpRforce=True,
                                    interpzforce=True,interpDens=True)
+class mockInterpSphericalPotential(potential.interpSphericalPotential):
+    def __init__(self):
+        potential.interpSphericalPotential.__init__(self,
+            Pot=potential.TwoPowerSphericalPotential(amp=2.,a=0.8,alpha=1.5,
+                                                     beta=3.5),
+            rgrid=(0.001,100.,1001))
 class mockSnapshotRZPotential(potential.SnapshotRZPotential):
     def __init__(self):
         # Test w/ equivalent of KeplerPotential: one mass
@@ -1938,3 +2225,37 @@ class mockMovingObjectLongIntPotential(mockMovingObjectPotential):
     def __init__(self,rc=0.75):
         mockMovingObjectPotential.__init__(self,rc=rc,maxt=29.,nt=1001)
         return None
+
+def dblexpquad(dp,R,z,qtype):
+    """The original, point-by-point Gaussian quadrature between the zeros of
+    the Bessel functions for the DoubleExponentialDiskPotential"""
+    from scipy import special
+    if qtype == 'Rforce':
+        jzeros, djzeros= dp._j1zeros, dp._dj1zeros
+        kmax= 2.*dp._kmaxFac*dp._beta
+    else:
+        jzeros, djzeros= dp._j0zeros, dp._dj0zeros
+        kmax= dp._kmaxFac*dp._beta
+    R4max= max(R,1.)
+    maxzeroIndx= numpy.argmin((jzeros-kmax*R4max)**2.)
+    ks= numpy.array([0.5*(dp._glx+1.)*djzeros[ii+1]+jzeros[ii]
+                     for ii in range(maxzeroIndx)]).flatten()
+    weights= numpy.array([dp._glw*djzeros[ii+1]
+                          for ii in range(maxzeroIndx)]).flatten()
+    denom= (dp._alpha**2.+ks**2.)**-1.5/(dp._beta**2.-ks**2.)
+    if qtype == 'pot':
+        evalInt= special.jn(0,ks*R)*denom\
+            *(dp._beta*numpy.exp(-ks*numpy.fabs(z))
+              -ks*numpy.exp(-dp._beta*numpy.fabs(z)))
+        return -2.*numpy.pi*dp._alpha*numpy.sum(weights*evalInt)
+    elif qtype == 'Rforce':
+        evalInt= ks*special.jn(1,ks*R)*denom\
+            *(dp._beta*numpy.exp(-ks*numpy.fabs(z))
+              -ks*numpy.exp(-dp._beta*numpy.fabs(z)))
+        return -2.*numpy.pi*dp._alpha*numpy.sum(weights*evalInt)
+    else: #zforce
+        evalInt= ks*special.jn(0,ks*R)*denom\
+            *(numpy.exp(-ks*numpy.fabs(z))-numpy.exp(-dp._beta*numpy.fabs(z)))
+        out= 2.*numpy.pi*dp._alpha*dp._beta*numpy.sum(weights*evalInt)
+        if z > 0.: return -out
+        else: return out
@@ -488,6 +488,96 @@ def test_interpsnapshotKeplerpotential_Rzderiv():
             assert numpy.fabs((sp.Rzderiv(r,z)-kp.Rzderiv(r,z))/kp.Rzderiv(r,z)) < 10.**-4.*(1.+19.*(numpy.fabs(z) < 0.05)), 'RZPot interpolation of Rzderiv w/ InterpSnapShotPotential of KeplerPotential fails at (R,z) = (%g,%g) by %g' % (r,z,numpy.fabs((sp.Rzderiv(r,z)-kp.Rzderiv(r,z))/kp.Rzderiv(r,z)))
     return None
 
+def test_snapshotKeplerPotential_multipole():
+    # Single unit mass at the origin using the multipole solver
+    s= pynbody.new(star=1)
+    s['mass']= 1.
+    s['eps']= 0.
+    sp= potential.SnapshotRZPotential(s,solver='multipole')
+    kp= potential.KeplerPotential(amp=1.) #should be the same
+    rs= numpy.array([0.5,1.,1.,1.])
+    zs= numpy.array([0.,0.,0.5,-0.5])
+    assert numpy.all(numpy.fabs(sp(rs,zs)-kp(rs,zs)) < 10.**-8.), 'SnapshotRZPotential with single unit mass and the multipole solver does not correspond to KeplerPotential'
+    assert numpy.all(numpy.fabs(sp.Rforce(rs,zs)-kp.Rforce(rs,zs)) < 10.**-8.), 'SnapshotRZPotential with single unit mass and the multipole solver does not correspond to KeplerPotential'
+    assert numpy.all(numpy.fabs(sp.zforce(rs,zs)-kp.zforce(rs,zs)) < 10.**-8.), 'SnapshotRZPotential with single unit mass and the multipole solver does not correspond to KeplerPotential'
+    return None
+
+def test_snapshotMultipole_tuple_ring():
+    # Particles given as a (pos,mass) tuple; a ring of particles in the
+    # x-y plane has the same azimuthally-averaged potential as a single
+    # particle on the ring
+    phis= numpy.linspace(0.,2.*numpy.pi,5)[:-1]
+    pos= numpy.array([numpy.cos(phis),numpy.sin(phis),numpy.zeros(4)]).T
+    sp= potential.SnapshotRZPotential((pos,0.25))
+    sp1= potential.SnapshotRZPotential((numpy.array([[0.,1.,0.]]),1.))
+    rs= numpy.array([0.5,2.,1.,0.3])
+    zs= numpy.array([0.,0.1,0.5,-0.7])
+    assert numpy.all(numpy.fabs(sp(rs,zs)-sp1(rs,zs)) < 10.**-10.), 'SnapshotRZPotential of a ring of particles does not agree with that of a single particle'
+    assert numpy.all(numpy.fabs(sp.Rforce(rs,zs)-sp1.Rforce(rs,zs)) < 10.**-10.), 'SnapshotRZPotential of a ring of particles does not agree with that of a single particle'
+    # Far from the ring, the potential is that of a point mass
+    kp= potential.KeplerPotential(amp=1.)
+    assert numpy.fabs(sp(30.,10.)-kp(30.,10.)) < 10.**-4., 'SnapshotRZPotential of a ring of particles does not approach a point mass far away'
+    return None
+
+def test_snapshotMultipole_hernquist():
+    # A sampled Hernquist sphere should give the Hernquist potential
+    # (amp=2 corresponds to unit mass)
+    numpy.random.seed(1)
+    npart= 100000
+    r= 1./(1./numpy.sqrt(numpy.random.uniform(size=npart))-1.)
+    costheta= numpy.random.uniform(size=npart)*2.-1.
+    phi= numpy.random.uniform(size=npart)*2.*numpy.pi
+    sintheta= numpy.sqrt(1.-costheta**2.)
+    pos= numpy.array([r*sintheta*numpy.cos(phi),r*sintheta*numpy.sin(phi),
+                      r*costheta]).T
+    sp= potential.SnapshotRZPotential((pos,1./npart),solver='multipole')
+    hp= potential.HernquistPotential(amp=2.,a=1.)
+    rs= numpy.array([0.5,1.,2.,1.])
+    zs= numpy.array([0.,0.5,1.,-1.])
+    assert numpy.all(numpy.fabs((sp(rs,zs)-hp(rs,zs))/hp(rs,zs)) < 10.**-2.), 'SnapshotRZPotential with the multipole solver of a sampled Hernquist sphere does not agree with HernquistPotential'
+    assert numpy.all(numpy.fabs((sp.Rforce(rs,zs)-hp.Rforce(rs,zs))/hp.Rforce(rs,zs)) < 3.*10.**-2.), 'SnapshotRZPotential with the multipole solver of a sampled Hernquist sphere does not agree with HernquistPotential'
+    return None
+
+def test_interpsnapshotKeplerPotential_multipole():
+    # Interpolated potential of a single mass using the multipole solver
+    sp= potential.InterpSnapshotRZPotential((numpy.zeros((1,3)),1.),
+                                            rgrid=(numpy.log(0.01),
+                                                   numpy.log(20.),251),
+                                            logR=True,
+                                            zgrid=(0.,0.2,201),
+                                            interpPot=True,
+                                            interpepifreq=True,
+                                            interpverticalfreq=True,
+                                            zsym=True)
+    kp= potential.KeplerPotential(amp=1.) #should be the same
+    rs= numpy.linspace(0.02,16.,20)
+    zs= numpy.linspace(-0.15,0.15,40)
+    mr,mz= numpy.meshgrid(rs,zs)
+    mr= mr.flatten()
+    mz= mz.flatten()
+    assert numpy.all(numpy.fabs((sp(mr,mz)-kp(mr,mz))/kp(mr,mz)) < 10.**-5.), 'RZPot interpolation w/ InterpSnapShotPotential and the multipole solver of KeplerPotential fails'
+    rs= numpy.linspace(0.1,2.,11)
+    assert numpy.all(numpy.fabs((sp.epifreq(rs)-kp.epifreq(rs))/kp.epifreq(rs)) < 10.**-4.), 'RZPot interpolation of epifreq w/ InterpSnapShotPotential and the multipole solver of KeplerPotential fails'
+    assert numpy.all(numpy.fabs((sp.verticalfreq(rs)-kp.verticalfreq(rs))/kp.verticalfreq(rs)) < 10.**-4.), 'RZPot interpolation of verticalfreq w/ InterpSnapShotPotential and the multipole solver of KeplerPotential fails'
+    return None
+
+def test_snapshotrzpotential_multipole_nopynbody():
+    # Without pynbody, the multipole solver with a (pos,mass) tuple works,
+    # but requesting the direct solver raises an ImportError
+    from galpy.potential_src import SnapshotRZPotential
+    SnapshotRZPotential._PYNBODY_LOADED= False
+    sp= potential.SnapshotRZPotential((numpy.zeros((1,3)),1.))
+    kp= potential.KeplerPotential(amp=1.)
+    assert numpy.fabs(sp(1.,0.5)-kp(1.,0.5)) < 10.**-8., 'SnapshotRZPotential with a (pos,mass) tuple w/o pynbody does not correspond to KeplerPotential'
+    try:
+        sp= potential.SnapshotRZPotential((numpy.zeros((1,3)),1.),
+                                          solver='direct')
+    except ImportError: pass
+    else:
+        raise AssertionError("SnapshotRZPotential w/o pynbody and solver='direct' should have raised an error, but didn't")
+    SnapshotRZPotential._PYNBODY_LOADED= True
+    return None
+
 def test_snapshotrzpotential_nopynbody():
     # Test that if we cannot load pynbody, we get an ImportError
     from galpy.potential_src import SnapshotRZPotential